@@ -1,6 +1,7 @@
-from fastapi import APIRouter
+from fastapi import APIRouter, HTTPException
 from pydantic import BaseModel
 
+from app.services.bureau_client import BureauError
 from app.services.credit_service import evaluate_credit
 
 
@@ -24,7 +25,10 @@ class CreditEvaluateRequest(BaseModel):
 
 @router.post("/loan/credit-evaluate")
 async def credit_evaluate(request: CreditEvaluateRequest):
-    return evaluate_credit(request.pan, request.aadhaar, request.monthly_income)
+    try:
+        return await evaluate_credit(request.pan, request.aadhaar, request.monthly_income)
+    except BureauError as exc:
+        raise HTTPException(503, str(exc))
 
 
 class ApprovalRequest(BaseModel):
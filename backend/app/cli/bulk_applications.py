@@ -0,0 +1,54 @@
+"""Run a JSONL file of complete applications through verification and underwriting.
+
+Each input line is an ``/applications`` payload; each output line is the
+decision for it, in input order. Re-running the same command after a crash
+resumes from the ``<output>.progress`` marker.
+
+Usage (from backend/):
+    python -m app.cli.bulk_applications applications.jsonl -o decisions.jsonl --concurrency 64 --workers 4
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+from pathlib import Path
+
+from app.services.bulk_intake import DEFAULT_CONCURRENCY, DEFAULT_MARKER_EVERY, BulkProcessor, process_pool
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("input", type=Path)
+    parser.add_argument("-o", "--output", type=Path, required=True)
+    parser.add_argument("--concurrency", type=int, default=DEFAULT_CONCURRENCY, help="Applications in flight")
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=os.cpu_count() or 1,
+        help="Processes for the underwriting stage (0 runs it on the event loop)",
+    )
+    parser.add_argument("--marker-every", type=int, default=DEFAULT_MARKER_EVERY, help="Records between progress markers")
+    parser.add_argument("--restart", action="store_true", help="Ignore an existing progress marker")
+    args = parser.parse_args()
+
+    executor = process_pool(args.workers)
+    processor = BulkProcessor(
+        concurrency=args.concurrency,
+        executor=executor,
+        marker_every=args.marker_every,
+        thread_prefix=f"bulk_{args.input.stem}",
+    )
+    try:
+        report = asyncio.run(processor.run(args.input, args.output, resume=not args.restart))
+    finally:
+        if executor is not None:
+            executor.shutdown()
+    report["workers"] = args.workers
+    print(json.dumps(report), file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
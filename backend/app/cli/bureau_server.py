@@ -0,0 +1,112 @@
+"""Local stand-in credit bureau with configurable latency and failure rates.
+
+Serves the same inquiry API the bureau client speaks, scoring with the
+in-process bureau model, so integration tests and load benchmarks exercise
+the real HTTP client path (pooling, timeouts, retries, circuit breaker)
+without network access.
+
+Usage (from backend/):
+    python -m app.cli.bureau_server --port 8090 --latency-ms 150 --jitter-ms 50 --error-rate 0.05
+    BUREAU_URL=http://127.0.0.1:8090 uvicorn app.main:app
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import random
+import time
+import uuid
+from typing import Any, Dict, List, Optional
+
+from fastapi import FastAPI
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel, Field
+
+from app.services.credit_bureau import fetch_credit_score
+
+
+class Inquiry(BaseModel):
+    pan: Optional[str] = None
+    aadhaar: Optional[str] = None
+    monthly_income: Optional[float] = None
+
+
+class BatchInquiry(BaseModel):
+    inquiries: List[Inquiry] = Field(..., max_length=100)
+
+
+def create_bureau_app(
+    latency_ms: float = 0.0,
+    jitter_ms: float = 0.0,
+    error_rate: float = 0.0,
+    stall_rate: float = 0.0,
+    stall_s: float = 30.0,
+    seed: Optional[int] = None,
+) -> FastAPI:
+    """``error_rate`` of requests answer 503; ``stall_rate`` hang for ``stall_s`` (client timeouts)."""
+    rng = random.Random(seed)
+    app = FastAPI(title="Stand-in credit bureau")
+    app.state.counters = {"inquiries": 0, "batches": 0, "errors": 0, "stalls": 0}
+
+    def report(inquiry: Inquiry) -> Dict[str, Any]:
+        return {
+            "credit_score": fetch_credit_score(inquiry.pan, inquiry.aadhaar, inquiry.monthly_income),
+            "report_id": uuid.uuid4().hex[:12],
+            "pulled_at": time.time(),
+        }
+
+    async def simulate() -> Optional[JSONResponse]:
+        roll = rng.random()
+        if roll < stall_rate:
+            app.state.counters["stalls"] += 1
+            await asyncio.sleep(stall_s)
+        delay = max(0.0, latency_ms + rng.uniform(-jitter_ms, jitter_ms)) / 1000
+        if delay:
+            await asyncio.sleep(delay)
+        if stall_rate <= roll < stall_rate + error_rate:
+            app.state.counters["errors"] += 1
+            return JSONResponse({"error": "bureau temporarily unavailable"}, status_code=503)
+        return None
+
+    @app.post("/v1/inquiries")
+    async def inquire(inquiry: Inquiry):
+        failure = await simulate()
+        if failure is not None:
+            return failure
+        app.state.counters["inquiries"] += 1
+        return report(inquiry)
+
+    @app.post("/v1/inquiries/batch")
+    async def inquire_batch(batch: BatchInquiry):
+        failure = await simulate()
+        if failure is not None:
+            return failure
+        app.state.counters["batches"] += 1
+        app.state.counters["inquiries"] += len(batch.inquiries)
+        return {"results": [report(inquiry) for inquiry in batch.inquiries]}
+
+    @app.get("/health")
+    async def health():
+        return {"status": "ok", **app.state.counters}
+
+    return app
+
+
+def main() -> None:
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8090)
+    parser.add_argument("--latency-ms", type=float, default=150.0)
+    parser.add_argument("--jitter-ms", type=float, default=50.0)
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of requests answered with 503")
+    parser.add_argument("--stall-rate", type=float, default=0.0, help="Fraction of requests that hang past the client timeout")
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+    app = create_bureau_app(args.latency_ms, args.jitter_ms, args.error_rate, args.stall_rate, seed=args.seed)
+    uvicorn.run(app, host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
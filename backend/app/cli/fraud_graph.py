@@ -0,0 +1,69 @@
+"""Build or inspect the embedded fraud graph file.
+
+Edges are CSV rows of ``user_id,kind,value`` (kind is device, ip or phone);
+known fraudsters are listed one user ID per line.
+
+Usage (from backend/):
+    python -m app.cli.fraud_graph build edges.csv --fraud-users fraudsters.txt -o uploads/cache/fraud_graph.bin
+    python -m app.cli.fraud_graph stats uploads/cache/fraud_graph.bin
+    python -m app.cli.fraud_graph query uploads/cache/fraud_graph.bin --user USER_ID
+"""
+from __future__ import annotations
+
+import argparse
+import csv
+import json
+import sys
+import time
+from pathlib import Path
+from typing import Iterator, Tuple
+
+from app.services.fraud_graph import KINDS, FraudGraph
+
+
+def _read_edges(path: Path) -> Iterator[Tuple[str, str, str]]:
+    with path.open("r", encoding="utf-8", newline="") as f:
+        for row in csv.DictReader(f):
+            kind = (row.get("kind") or "").strip().lower()
+            if kind not in KINDS or not row.get("user_id") or not row.get("value"):
+                continue
+            yield row["user_id"].strip(), kind, row["value"].strip()
+
+
+def _read_fraud_users(path: Path) -> Iterator[str]:
+    with path.open("r", encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                yield line.strip()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    commands = parser.add_subparsers(dest="command", required=True)
+    build = commands.add_parser("build")
+    build.add_argument("edges", type=Path)
+    build.add_argument("--fraud-users", type=Path)
+    build.add_argument("-o", "--output", type=Path, required=True)
+    stats = commands.add_parser("stats")
+    stats.add_argument("graph", type=Path)
+    query = commands.add_parser("query")
+    query.add_argument("graph", type=Path)
+    query.add_argument("--user", required=True)
+    args = parser.parse_args()
+
+    if args.command == "build":
+        start = time.perf_counter()
+        fraud_users = _read_fraud_users(args.fraud_users) if args.fraud_users else ()
+        graph = FraudGraph.from_edges(_read_edges(args.edges), fraud_users)
+        graph.save(args.output)
+        report = graph.stats()
+        report["elapsed_s"] = round(time.perf_counter() - start, 3)
+        print(json.dumps(report), file=sys.stderr)
+    elif args.command == "stats":
+        print(json.dumps(FraudGraph.load(args.graph).stats()))
+    else:
+        print(json.dumps(FraudGraph.load(args.graph).detect(args.user)))
+
+
+if __name__ == "__main__":
+    main()
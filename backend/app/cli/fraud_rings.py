@@ -0,0 +1,40 @@
+"""Find fraud rings: connected components over the fraud graph, scored and indexed for request-time lookup.
+
+Reads a graph file written by ``app.cli.fraud_graph`` (or a worker flush) and
+writes the ring file that ``analyze_fraud`` consults via FRAUD_RINGS_PATH.
+Workers pick up a rebuilt file within FRAUD_RINGS_RELOAD_INTERVAL_S.
+
+Usage (from backend/):
+    python -m app.cli.fraud_rings uploads/cache/fraud_graph.bin -o uploads/cache/fraud_rings.bin
+    python -m app.cli.fraud_rings uploads/cache/fraud_graph.bin -o uploads/cache/fraud_rings.bin --max-shared 20 --min-users 4
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+
+from app.services.fraud_graph import read_arrays
+from app.services.fraud_rings import DEFAULT_MAX_SHARED, RING_MIN_USERS, FraudRings, find_rings
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("graph", type=Path)
+    parser.add_argument("-o", "--output", type=Path, required=True)
+    parser.add_argument("--max-shared", type=int, default=DEFAULT_MAX_SHARED, help="Identifiers shared more widely do not link users")
+    parser.add_argument("--min-users", type=int, default=RING_MIN_USERS)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    arrays, graph_meta = read_arrays(args.graph)
+    rings, stats = find_rings(arrays, args.max_shared, args.min_users)
+    meta = {**stats, "built_at": time.time(), "graph_built_at": graph_meta.get("built_at")}
+    FraudRings(rings, meta).save(args.output)
+    print(json.dumps({**meta, "elapsed_s": round(time.perf_counter() - start, 3)}), file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+"""Sweep underwriting thresholds over historical applications and write outcome surfaces.
+
+Usage (from backend/):
+    python -m app.cli.policy_backtest applications.csv -o surface.csv \\
+        --sweep min_credit_score=650:760:10 --sweep limit_multiplier=1.5:3:0.25 --sweep max_emi_ratio=0.4,0.5,0.6
+    python -m app.cli.policy_backtest --checkpoints --sweep min_credit_score=680:720:5
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import csv
+import json
+import sys
+import time
+from pathlib import Path
+from typing import List
+
+from app.services.batch_underwriting import (
+    DEFAULT_CHUNK_ROWS,
+    Chunk,
+    chunk_from_records,
+    iter_batch_chunks,
+    parse_param_overrides,
+)
+from app.services.policy_backtest import backtest, iter_checkpoint_records, parse_sweep
+from app.services.policy_engine import compile_policy, get_policy_engine, load_policy_spec
+from app.settings import settings
+
+
+async def _load_checkpoint_chunks(dsn: str, chunk_rows: int) -> List[Chunk]:
+    from langgraph.checkpoint.postgres.aio import AsyncPostgresSaver
+
+    chunks: List[Chunk] = []
+    records = []
+    async with AsyncPostgresSaver.from_conn_string(dsn) as saver:
+        async for record in iter_checkpoint_records(saver):
+            records.append(record)
+            if len(records) == chunk_rows:
+                chunks.append(chunk_from_records(records))
+                records = []
+    if records:
+        chunks.append(chunk_from_records(records))
+    return chunks
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("input", type=Path, nargs="?", help="CSV/Parquet/Arrow export of past applications")
+    parser.add_argument("--checkpoints", action="store_true", help="Read the latest snapshot per thread from POSTGRES_DSN")
+    parser.add_argument("--sweep", action="append", default=[], metavar="NAME=START:STOP:STEP|V1,V2", required=True)
+    parser.add_argument("-o", "--output", type=Path, help="Output file (default: stdout)")
+    parser.add_argument("--format", choices=["csv", "jsonl"], default="csv")
+    parser.add_argument("--input-format", choices=["csv", "parquet", "arrow"], default=None)
+    parser.add_argument("--chunk-rows", type=int, default=DEFAULT_CHUNK_ROWS)
+    parser.add_argument("--policy", type=Path, help="Policy file (default: the live underwriting policy)")
+    parser.add_argument("--param", action="append", default=[], metavar="NAME=VALUE", help="Override a fixed threshold")
+    parser.add_argument(
+        "--assume-documents-verified",
+        action="store_true",
+        help="Treat the document gate as passed to see final decisions instead of pending requests",
+    )
+    args = parser.parse_args()
+    if bool(args.input) == args.checkpoints:
+        parser.error("give either an input file or --checkpoints")
+    if args.checkpoints and not settings.postgres_dsn:
+        parser.error("--checkpoints needs POSTGRES_DSN")
+
+    policy = compile_policy(load_policy_spec(args.policy)) if args.policy else get_policy_engine().policy
+    policy = policy.with_params(parse_param_overrides(args.param))
+    grid = parse_sweep(args.sweep)
+
+    start = time.perf_counter()
+    if args.checkpoints:
+        chunks = asyncio.run(_load_checkpoint_chunks(settings.postgres_dsn, args.chunk_rows))
+    else:
+        chunks = iter_batch_chunks(args.input, args.input_format, args.chunk_rows)
+    surface = backtest(chunks, policy, grid, assume_documents_verified=args.assume_documents_verified)
+    elapsed = time.perf_counter() - start
+
+    rows = surface.rows()
+    out = open(args.output, "w", encoding="utf-8", newline="") if args.output else sys.stdout
+    try:
+        if args.format == "jsonl":
+            for row in rows:
+                out.write(json.dumps(row) + "\n")
+        else:
+            writer = csv.DictWriter(out, fieldnames=list(rows[0]), lineterminator="\n")
+            writer.writeheader()
+            writer.writerows(rows)
+    finally:
+        if args.output:
+            out.close()
+
+    report = {
+        "policy_version": policy.version,
+        "applications": rows[0]["applications"],
+        "variants": surface.variants - 1,
+        "elapsed_s": round(elapsed, 3),
+        "baseline": {name: rows[0][name] for name in grid},
+    }
+    print(json.dumps(report), file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,9 +1,10 @@
 from __future__ import annotations
 
+import asyncio
 import json
 import re
 from datetime import datetime
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Tuple
 
 from pydantic import BaseModel, field_validator
 from langchain_core.messages import AIMessage, HumanMessage
@@ -13,6 +14,12 @@ from app.services.llm_service import get_llm_service, LLMConfigError, LLMService
 from app.services.tools import calculate_emi, analyze_purpose, check_affordability, analyze_fraud_tool, verify_kyc_tool, fetch_credit_score_tool
 from app.services.sanction_service import generate_sanction_letter_pdf
 from app.services.offer_mart_service import find_customer_offer
+from app.services.policy_engine import document_status, get_policy_engine, underwriting_facts
+from app.services.counter_offer import find_counter_offer
+from app.services.pricing_service import get_pricing_grid
+from app.services.entity_extractor import extract_entities
+from app.services.customer_index import get_customer_index
+from app.services.velocity import get_velocity_engine
 
 
 class SalesExtraction(BaseModel):
@@ -111,6 +118,20 @@ class VerificationExtraction(BaseModel):
         return v
 
 
+class ApplicationExtraction(SalesExtraction, VerificationExtraction):
+    """Sales and KYC fields together, so one LLM call per turn captures whatever the user volunteered."""
+
+
+# Bare answers to these prompts are parsed deterministically; the LLM is not consulted.
+_DIRECT_ANSWERS = {
+    "otp_required": re.compile(r"\d{6}"),
+    "mobile": re.compile(r"(?:\+?91[\s-]?)?\d{10}"),
+    "email": re.compile(r"[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Za-z]{2,}"),
+    "pan": re.compile(r"[A-Za-z]{5}\d{4}[A-Za-z]"),
+    "aadhaar": re.compile(r"\d{4}\s?\d{4}\s?\d{4}"),
+}
+
+
 def _last_user_message(state: AgentState) -> str:
     for msg in reversed(state.get("messages", [])):
         if isinstance(msg, HumanMessage):
@@ -118,6 +139,96 @@ def _last_user_message(state: AgentState) -> str:
     return ""
 
 
+def _user_turn(state: AgentState) -> int:
+    return sum(1 for msg in state.get("messages", []) if isinstance(msg, HumanMessage))
+
+
+def _pending_prompt(state: AgentState) -> Optional[str]:
+    """What the previous assistant turn asked for: an interrupt type, or the first field requested."""
+    interrupt = state.get("interrupt_signal") or {}
+    if interrupt.get("type") in {"sales_input_required", "verification_input_required"}:
+        return (interrupt.get("fields") or [None])[0]
+    return interrupt.get("type")
+
+
+async def _extract_turn(state: AgentState, user_message: str) -> Optional[ApplicationExtraction]:
+    """Run the LLM extractor at most once per user turn.
+
+    Returns None when an earlier node already extracted this turn, and an
+    empty extraction when the message is a bare answer to the pending prompt
+    (OTP, mobile, PAN, ...) that the regex parsers handle on their own.
+    """
+    if state.get("extracted_turn") == _user_turn(state):
+        return None
+    pending = _pending_prompt(state)
+    text = (user_message or "").strip()
+    direct = _DIRECT_ANSWERS.get(pending or "")
+    if not text or (direct and direct.fullmatch(text)):
+        return ApplicationExtraction()
+    if pending == "kyc_consent" and len(text.split()) <= 4 and _extract_consent(text) is not None:
+        return ApplicationExtraction()
+    try:
+        llm = get_llm_service()
+        return await llm.achat_structured(
+            [{"role": "user", "content": user_message}],
+            ApplicationExtraction,
+            system_prompt=(
+                "Extract any loan and KYC details from the user's message: amount, tenure, purpose, "
+                "employment type, monthly income, full name, mobile, email, PAN, Aadhaar, consent, OTP. "
+                "Return only provided values. Do not guess."
+            ),
+        )
+    except Exception:
+        return ApplicationExtraction()
+
+
+def _apply_identity_fields(
+    loan_data: LoanApplicationDetails,
+    extraction: Optional[VerificationExtraction],
+    user_message: str,
+    pending: Optional[str],
+) -> None:
+    """KYC fields from the extraction, with regex fallbacks for anything still missing.
+
+    Consent and OTP only count as answers to their own prompts: consent has to
+    follow the disclosure, and an OTP cannot be typed before it is sent.
+    """
+    if extraction is not None:
+        if extraction.full_name:
+            loan_data.customer_name = extraction.full_name.strip()
+        if extraction.mobile:
+            loan_data.mobile = extraction.mobile
+        if extraction.email:
+            loan_data.email = extraction.email
+        if extraction.pan:
+            loan_data.pan = extraction.pan
+        if extraction.aadhaar:
+            loan_data.aadhaar = extraction.aadhaar
+        if pending == "kyc_consent" and extraction.consent is not None:
+            loan_data.kyc_consent = extraction.consent
+        if pending == "otp_required" and extraction.otp:
+            loan_data.otp_verified = True
+
+    if pending == "kyc_consent" and loan_data.kyc_consent is None:
+        inferred_consent = _extract_consent(user_message)
+        if inferred_consent is not None:
+            loan_data.kyc_consent = inferred_consent
+    if pending == "otp_required" and not loan_data.otp_verified:
+        if re.fullmatch(r"\d{6}", user_message.strip()):
+            loan_data.otp_verified = True
+
+    if not loan_data.customer_name:
+        loan_data.customer_name = _extract_full_name(user_message)
+    if not loan_data.mobile:
+        loan_data.mobile = _extract_mobile(user_message)
+    if not loan_data.email:
+        loan_data.email = _extract_email(user_message)
+    if not loan_data.pan:
+        loan_data.pan = _extract_pan(user_message)
+    if not loan_data.aadhaar:
+        loan_data.aadhaar = _extract_aadhaar(user_message)
+
+
 def _append_tool_call(state: AgentState, name: str, args: Dict[str, Any], result: str, success: bool = True, error: Optional[str] = None) -> List[ToolCall]:
     tool_calls = list(state.get("tool_calls", []))
     tool_calls.append(
@@ -132,100 +243,104 @@ def _append_tool_call(state: AgentState, name: str, args: Dict[str, Any], result
     return tool_calls
 
 
-def _extract_number(text: str) -> Optional[float]:
-    if not text:
-        return None
-    match = re.search(r"(\d[\d,]*\.?\d*)", text.replace("₹", "").replace("â‚¹", "").replace("rs", ""))
-    if not match:
-        return None
-    try:
-        return float(match.group(1).replace(",", ""))
-    except ValueError:
-        return None
+def _extract_amount(text: str, role: Optional[str]) -> Optional[float]:
+    return extract_entities(text).amount(role)
 
 
 def _extract_tenure_months(text: str) -> Optional[int]:
-    if not text:
-        return None
-    match = re.search(r"(\d+)\s*(months|month|mos|m)\b", text.lower())
-    if match:
-        return int(match.group(1))
-    match = re.search(r"(\d+)\s*(years|year|yrs|yr)\b", text.lower())
-    if match:
-        return int(match.group(1)) * 12
-    return None
+    entity = extract_entities(text).first("tenure_months")
+    return entity.value if entity else None
 
 
 def _extract_employment_type(text: str) -> Optional[str]:
-    if not text:
-        return None
-    lowered = text.lower()
-    if "salaried" in lowered:
-        return "salaried"
-    if "self" in lowered and "employ" in lowered:
-        return "self_employed"
-    if "freelanc" in lowered:
-        return "freelancer"
-    if "unemploy" in lowered:
-        return "unemployed"
-    return None
+    entity = extract_entities(text).first("employment_type")
+    return entity.value if entity else None
 
 
 def _extract_email(text: str) -> Optional[str]:
-    if not text:
-        return None
-    match = re.search(r"[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Za-z]{2,}", text)
-    return match.group(0) if match else None
+    entity = extract_entities(text).first("email")
+    return entity.value if entity else None
 
 
 def _extract_pan(text: str) -> Optional[str]:
-    if not text:
-        return None
-    match = re.search(r"\b[A-Z]{5}\d{4}[A-Z]\b", text.upper())
-    return match.group(0) if match else None
+    entity = extract_entities(text).first("pan")
+    return entity.value if entity else None
 
 
 def _extract_aadhaar(text: str) -> Optional[str]:
-    if not text:
-        return None
-    match = re.search(r"\b\d{4}\s?\d{4}\s?\d{4}\b", text)
-    return match.group(0).replace(" ", "") if match else None
+    entity = extract_entities(text).first("aadhaar")
+    return entity.value if entity else None
 
 
 def _extract_mobile(text: str) -> Optional[str]:
-    if not text:
-        return None
-    match = re.search(r"\b\d{10}\b", text)
-    return match.group(0) if match else None
+    entity = extract_entities(text).first("mobile")
+    return entity.value if entity else None
+
+
+def _extract_full_name(text: str) -> Optional[str]:
+    entity = extract_entities(text).first("full_name")
+    return entity.value if entity else None
 
 
 def _extract_consent(text: str) -> Optional[bool]:
-    lowered = (text or "").strip().lower()
-    if not lowered:
-        return None
-    yes_tokens = ["yes", "i consent", "consent", "agree", "approved", "ok", "okay", "yep", "sure"]
-    no_tokens = ["no", "i do not consent", "don't consent", "do not consent", "deny", "disagree"]
-    if any(token in lowered for token in no_tokens):
-        return False
-    if any(token in lowered for token in yes_tokens):
-        return True
-    return None
+    return extract_entities(text).consent()
 
 
 def _build_plan(missing_fields: List[str]) -> List[str]:
     return [f"Collect {field.replace('_', ' ')}" for field in missing_fields]
 
 
-def _looks_like_income_context(text: str) -> bool:
-    lowered = (text or "").lower()
-    markers = ["income", "salary", "per month", "monthly", "take home", "take-home"]
-    return any(m in lowered for m in markers)
+async def _analyze_and_price(state: AgentState, loan_data: LoanApplicationDetails) -> List[ToolCall]:
+    """Purpose category, risk-based rate and indicative EMI once the loan basics are known.
+
+    Each tool re-runs only when its inputs changed since it last ran, so a turn
+    that only collects another field adds no tool calls.
+    """
+    tool_calls = list(state.get("tool_calls", []))
+    if loan_data.loan_purpose and loan_data.is_stale("purpose_category"):
+        try:
+            purpose_result = await analyze_purpose.ainvoke({"purpose": loan_data.loan_purpose})
+            tool_calls = _append_tool_call(
+                state, "analyze_purpose", {"purpose": loan_data.loan_purpose}, str(purpose_result)
+            )
+            parsed = json.loads(purpose_result)
+            loan_data.purpose_category = parsed.get("category")
+            loan_data.mark_derived("purpose_category")
+        except Exception as exc:
+            tool_calls = _append_tool_call(
+                state, "analyze_purpose", {"purpose": loan_data.loan_purpose}, str(exc), success=False, error=str(exc)
+            )
+
+    if loan_data.requested_amount and loan_data.tenure_months:
+        loan_data.interest_rate = get_pricing_grid().rate_for(loan_data)
+        if loan_data.is_stale("calculated_emi"):
+            tool_calls = await _refresh_emi({**state, "tool_calls": tool_calls}, loan_data)
+    return tool_calls
 
 
-def _looks_like_loan_amount_context(text: str) -> bool:
-    lowered = (text or "").lower()
-    markers = ["borrow", "loan amount", "need", "want", "amount", "loan", "finance"]
-    return any(m in lowered for m in markers)
+async def _refresh_emi(state: AgentState, loan_data: LoanApplicationDetails) -> List[ToolCall]:
+    tool_calls = list(state.get("tool_calls", []))
+    emi_args = {
+        "principal": loan_data.requested_amount,
+        "tenure_months": loan_data.tenure_months,
+        "interest_rate": loan_data.interest_rate,
+    }
+    try:
+        emi_result = await calculate_emi.ainvoke(emi_args)
+        tool_calls = _append_tool_call(state, "calculate_emi", emi_args, str(emi_result))
+        parsed = json.loads(emi_result)
+        loan_data.calculated_emi = parsed.get("emi")
+        loan_data.mark_derived("calculated_emi")
+    except Exception as exc:
+        tool_calls = _append_tool_call(
+            state,
+            "calculate_emi",
+            emi_args,
+            str(exc),
+            success=False,
+            error=str(exc),
+        )
+    return tool_calls
 
 
 async def sales_agent_node(state: AgentState) -> Dict[str, Any]:
@@ -272,36 +387,24 @@ async def sales_agent_node(state: AgentState) -> Dict[str, Any]:
     if not loan_data.monthly_income:
         missing.append("monthly_income")
 
-    extraction = None
-    try:
-        llm = get_llm_service()
-        extraction = await llm.achat_structured(
-            [{"role": "user", "content": user_message}],
-            SalesExtraction,
-            system_prompt=(
-                "Extract any loan details from the user's message. "
-                "Return only provided values. Do not guess."
-            ),
-        )
-    except Exception:
-        extraction = SalesExtraction()
+    # One extraction covers both stages: identity details volunteered here are kept,
+    # so verification only asks for what is still missing.
+    extraction = await _extract_turn(state, user_message) or ApplicationExtraction()
+    _apply_identity_fields(loan_data, extraction, user_message, _pending_prompt(state))
 
     employment_type = extraction.employment_type or _extract_employment_type(user_message)
-    monthly_income = extraction.monthly_income if (missing and missing[0] == "monthly_income") else None
-    requested_amount = extraction.requested_amount if (missing and missing[0] == "requested_amount") else None
+    monthly_income = extraction.monthly_income or _extract_amount(user_message, "income")
+    requested_amount = extraction.requested_amount or _extract_amount(user_message, "loan")
     tenure_months = extraction.tenure_months or _extract_tenure_months(user_message)
     loan_purpose = extraction.loan_purpose
-    extracted_number = _extract_number(user_message)
-
-    if extracted_number is not None:
-        if _looks_like_income_context(user_message):
-            monthly_income = monthly_income or extracted_number
-        elif _looks_like_loan_amount_context(user_message):
-            requested_amount = requested_amount or extracted_number
-        elif missing and missing[0] == "requested_amount":
-            requested_amount = requested_amount or extracted_number
+    # A bare amount ("5 lakh") answers whichever of the two was asked for.
+    unlabelled_amount = _extract_amount(user_message, None)
+
+    if unlabelled_amount is not None:
+        if missing and missing[0] == "requested_amount":
+            requested_amount = requested_amount or unlabelled_amount
         elif missing and missing[0] == "monthly_income":
-            monthly_income = monthly_income or extracted_number
+            monthly_income = monthly_income or unlabelled_amount
 
     if missing and missing[0] == "loan_purpose" and not loan_purpose:
         candidate = (user_message or "").strip()
@@ -346,42 +449,7 @@ async def sales_agent_node(state: AgentState) -> Dict[str, Any]:
     else:
         reply = "Thanks! Moving on to verification."
 
-    tool_calls = list(state.get("tool_calls", []))
-    if loan_data.loan_purpose:
-        try:
-            purpose_result = await analyze_purpose.ainvoke({"purpose": loan_data.loan_purpose})
-            tool_calls = _append_tool_call(
-                state, "analyze_purpose", {"purpose": loan_data.loan_purpose}, str(purpose_result)
-            )
-            parsed = json.loads(purpose_result)
-            loan_data.purpose_category = parsed.get("category")
-        except Exception as exc:
-            tool_calls = _append_tool_call(
-                state, "analyze_purpose", {"purpose": loan_data.loan_purpose}, str(exc), success=False, error=str(exc)
-            )
-
-    if loan_data.requested_amount and loan_data.tenure_months:
-        try:
-            emi_result = await calculate_emi.ainvoke(
-                {"principal": loan_data.requested_amount, "tenure_months": loan_data.tenure_months}
-            )
-            tool_calls = _append_tool_call(
-                state,
-                "calculate_emi",
-                {"principal": loan_data.requested_amount, "tenure_months": loan_data.tenure_months},
-                str(emi_result),
-            )
-            parsed = json.loads(emi_result)
-            loan_data.calculated_emi = parsed.get("emi")
-        except Exception as exc:
-            tool_calls = _append_tool_call(
-                state,
-                "calculate_emi",
-                {"principal": loan_data.requested_amount, "tenure_months": loan_data.tenure_months},
-                str(exc),
-                success=False,
-                error=str(exc),
-            )
+    tool_calls = await _analyze_and_price(state, loan_data)
 
     waiting_for_user_input = bool(updated_missing)
     next_step = "END" if waiting_for_user_input else "verification_agent"
@@ -407,9 +475,132 @@ async def sales_agent_node(state: AgentState) -> Dict[str, Any]:
         ),
         "agent_thoughts": [
             f"Captured: {', '.join([f for f in ['employment type','income','amount','tenure','purpose'] if f not in updated_missing]) or 'none'}",
+            f"Changed this turn: {', '.join(loan_data.changed_fields) or 'nothing'}",
             f"Next: {next_step}",
         ],
         "tool_calls": tool_calls,
+        "extracted_turn": _user_turn(state),
+        "updated_at": datetime.utcnow().isoformat(),
+    }
+
+
+async def _run_verification_checks(state: AgentState, loan_data: LoanApplicationDetails) -> Dict[str, Any]:
+    """Fraud, KYC and offer-mart checks once identity details and consent are captured.
+
+    KYC outcomes still valid in the customer index (same PAN and mobile, e.g.
+    from an earlier thread) are reused instead of calling the service again.
+    The fraud check always runs: it scores this thread's device and IP, and it
+    records them in the fraud graph.
+    """
+    tool_calls = list(state.get("tool_calls", []))
+    index = get_customer_index()
+    reused: List[str] = []
+
+    fraud_payload: Dict[str, Any] = {}
+    try:
+        fraud_result = await analyze_fraud_tool.ainvoke(
+            {
+                "user_id": state.get("thread_id"),
+                "device_id": state.get("device_id"),
+                "ip_address": state.get("ip_address"),
+                "phone": loan_data.mobile,
+            }
+        )
+        tool_calls = _append_tool_call({**state, "tool_calls": tool_calls}, "analyze_fraud", {"phone": loan_data.mobile}, str(fraud_result))
+        fraud_payload = json.loads(fraud_result) if isinstance(fraud_result, str) else fraud_result
+    except Exception as exc:
+        tool_calls = _append_tool_call({**state, "tool_calls": tool_calls}, "analyze_fraud", {"phone": loan_data.mobile}, str(exc), success=False, error=str(exc))
+
+    velocity: Dict[str, Any] = {}
+    try:
+        velocity = get_velocity_engine().check(state.get("device_id"), state.get("ip_address"), loan_data.mobile, loan_data.pan)
+        tool_calls = _append_tool_call({**state, "tool_calls": tool_calls}, "check_velocity", {"phone": loan_data.mobile}, json.dumps(velocity))
+    except Exception as exc:
+        tool_calls = _append_tool_call({**state, "tool_calls": tool_calls}, "check_velocity", {"phone": loan_data.mobile}, str(exc), success=False, error=str(exc))
+    fraud_risk_score = max(fraud_payload.get("risk_score", 0), velocity.get("risk_score", 0))
+    fraud_flags = list(fraud_payload.get("flags", [])) + velocity.get("flags", [])
+
+    crm_payload = index.lookup("kyc", loan_data.pan, loan_data.mobile)
+    if crm_payload is not None:
+        reused.append("KYC")
+        tool_calls = _append_tool_call(
+            {**state, "tool_calls": tool_calls}, "verify_kyc", {"phone": loan_data.mobile, "reused": True}, json.dumps(crm_payload)
+        )
+    else:
+        crm_payload = {}
+        try:
+            crm_result = await verify_kyc_tool.ainvoke({"phone": loan_data.mobile, "address": loan_data.address})
+            tool_calls = _append_tool_call({**state, "tool_calls": tool_calls}, "verify_kyc", {"phone": loan_data.mobile}, str(crm_result))
+            crm_payload = json.loads(crm_result) if isinstance(crm_result, str) else crm_result
+            if crm_payload.get("status") == "verified":  # failures are re-checked next time
+                index.record("kyc", loan_data.pan, loan_data.mobile, crm_payload)
+        except Exception as exc:
+            tool_calls = _append_tool_call({**state, "tool_calls": tool_calls}, "verify_kyc", {"phone": loan_data.mobile}, str(exc), success=False, error=str(exc))
+
+    if crm_payload.get("status") != "verified":
+        return {
+            "messages": [AIMessage(content="We could not verify your KYC details. Please contact support.")],
+            "loan_data": loan_data,
+            "next_step": "END",
+            "dialogue_stage": "rejected",
+            "application_status": "rejected",
+            "rejection_reason": crm_payload.get("reason", "KYC verification failed."),
+            "fraud_risk_score": fraud_risk_score,
+            "fraud_flags": fraud_flags,
+            "tool_calls": tool_calls,
+            "agent_thoughts": ["KYC verification failed."],
+            "updated_at": datetime.utcnow().isoformat(),
+        }
+
+    if fraud_risk_score > 70:
+        return {
+            "messages": [AIMessage(content="We cannot proceed due to risk signals in verification checks.")],
+            "loan_data": loan_data,
+            "next_step": "END",
+            "dialogue_stage": "rejected",
+            "application_status": "rejected",
+            "rejection_reason": "High fraud risk detected.",
+            "fraud_risk_score": fraud_risk_score,
+            "fraud_flags": fraud_flags,
+            "tool_calls": tool_calls,
+            "agent_thoughts": ["Fraud risk too high."],
+            "updated_at": datetime.utcnow().isoformat(),
+        }
+
+    offer = find_customer_offer(pan=loan_data.pan, phone=loan_data.mobile, customer_name=loan_data.customer_name)
+    if offer:
+        loan_data.preapproved_limit = float(offer["preapproved_limit"])
+        loan_data.customer_id = offer.get("customer_id") or loan_data.customer_id
+
+    # A recent bureau score for this customer saves underwriting the pull.
+    bureau = index.lookup("bureau", loan_data.pan, loan_data.mobile) if loan_data.is_stale("credit_score") else None
+    if bureau is not None and bureau.get("credit_score") is not None:
+        reused.append("bureau")
+        loan_data.credit_score = bureau["credit_score"]
+        loan_data.mark_derived("credit_score")
+        tool_calls = _append_tool_call(
+            {**state, "tool_calls": tool_calls},
+            "fetch_credit_score",
+            {"pan": loan_data.pan, "reused": True},
+            json.dumps({**bureau, "source": "customer_index"}),
+        )
+
+    return {
+        "messages": [
+            AIMessage(
+                content="Verification completed. Proceeding to underwriting."
+            )
+        ],
+        "loan_data": loan_data,
+        "next_step": "underwriting_agent",
+        "dialogue_stage": "underwriting",
+        "interrupt_signal": None,
+        "fraud_risk_score": fraud_risk_score,
+        "fraud_flags": fraud_flags,
+        "tool_calls": tool_calls,
+        "plan": ["Run underwriting checks"],
+        "current_goal": "Underwriting decision",
+        "agent_thoughts": ["Verification passed."] + ([f"Reused recent {', '.join(reused)} results for this customer."] if reused else []),
         "updated_at": datetime.utcnow().isoformat(),
     }
 
@@ -447,47 +638,9 @@ async def verification_agent_node(state: AgentState) -> Dict[str, Any]:
             "updated_at": datetime.utcnow().isoformat(),
         }
 
-    extraction = None
-    try:
-        llm = get_llm_service()
-        extraction = await llm.achat_structured(
-            [{"role": "user", "content": user_message}],
-            VerificationExtraction,
-            system_prompt="Extract KYC details from the user's message. Return only provided values.",
-        )
-    except Exception:
-        extraction = VerificationExtraction()
-
-    if extraction.full_name:
-        loan_data.customer_name = extraction.full_name.strip()
-    if extraction.mobile:
-        loan_data.mobile = extraction.mobile
-    if extraction.email:
-        loan_data.email = extraction.email
-    if extraction.pan:
-        loan_data.pan = extraction.pan
-    if extraction.aadhaar:
-        loan_data.aadhaar = extraction.aadhaar
-    if extraction.consent is not None:
-        loan_data.kyc_consent = extraction.consent
-    elif loan_data.kyc_consent is None:
-        inferred_consent = _extract_consent(user_message)
-        if inferred_consent is not None:
-            loan_data.kyc_consent = inferred_consent
-    if extraction.otp:
-        loan_data.otp_verified = True
-    if not loan_data.otp_verified:
-        if re.fullmatch(r"\d{6}", user_message.strip()):
-            loan_data.otp_verified = True
-
-    if not loan_data.mobile:
-        loan_data.mobile = _extract_mobile(user_message)
-    if not loan_data.email:
-        loan_data.email = _extract_email(user_message)
-    if not loan_data.pan:
-        loan_data.pan = _extract_pan(user_message)
-    if not loan_data.aadhaar:
-        loan_data.aadhaar = _extract_aadhaar(user_message)
+    # Skipped when the sales node already extracted this turn's message.
+    extraction = await _extract_turn(state, user_message)
+    _apply_identity_fields(loan_data, extraction, user_message, _pending_prompt(state))
 
     # Enforce exact collection order:
     # full_name -> mobile -> otp -> email -> pan -> aadhaar -> consent
@@ -590,76 +743,39 @@ async def verification_agent_node(state: AgentState) -> Dict[str, Any]:
             "updated_at": datetime.utcnow().isoformat(),
         }
 
-    tool_calls = list(state.get("tool_calls", []))
-    fraud_result = {}
-    crm_result = {}
-    try:
-        fraud_result = await analyze_fraud_tool.ainvoke(
-            {
-                "user_id": state.get("thread_id"),
-                "device_id": None,
-                "ip_address": None,
-                "phone": loan_data.mobile,
-            }
-        )
-        tool_calls = _append_tool_call(state, "analyze_fraud", {"phone": loan_data.mobile}, str(fraud_result))
-    except Exception as exc:
-        tool_calls = _append_tool_call(state, "analyze_fraud", {"phone": loan_data.mobile}, str(exc), success=False, error=str(exc))
+    return await _run_verification_checks(state, loan_data)
 
-    try:
-        crm_result = await verify_kyc_tool.ainvoke({"phone": loan_data.mobile, "address": loan_data.address})
-        tool_calls = _append_tool_call(state, "verify_kyc", {"phone": loan_data.mobile}, str(crm_result))
-    except Exception as exc:
-        tool_calls = _append_tool_call(state, "verify_kyc", {"phone": loan_data.mobile}, str(exc), success=False, error=str(exc))
-
-    crm_payload = json.loads(crm_result) if isinstance(crm_result, str) else crm_result
-    fraud_payload = json.loads(fraud_result) if isinstance(fraud_result, str) else fraud_result
-
-    if crm_payload.get("status") != "verified":
-        return {
-            "messages": [AIMessage(content="We could not verify your KYC details. Please contact support.")],
-            "loan_data": loan_data,
-            "next_step": "END",
-            "dialogue_stage": "rejected",
-            "application_status": "rejected",
-            "rejection_reason": crm_payload.get("reason", "KYC verification failed."),
-            "tool_calls": tool_calls,
-            "agent_thoughts": ["KYC verification failed."],
-            "updated_at": datetime.utcnow().isoformat(),
-        }
-
-    if fraud_payload.get("risk_score", 0) > 70:
-        return {
-            "messages": [AIMessage(content="We cannot proceed due to risk signals in verification checks.")],
-            "loan_data": loan_data,
-            "next_step": "END",
-            "dialogue_stage": "rejected",
-            "application_status": "rejected",
-            "rejection_reason": "High fraud risk detected.",
-            "tool_calls": tool_calls,
-            "agent_thoughts": ["Fraud risk too high."],
-            "updated_at": datetime.utcnow().isoformat(),
-        }
-
-    offer = find_customer_offer(pan=loan_data.pan, phone=loan_data.mobile, customer_name=loan_data.customer_name)
-    if offer:
-        loan_data.preapproved_limit = float(offer["preapproved_limit"])
-        loan_data.customer_id = offer.get("customer_id") or loan_data.customer_id
 
+def _counter_offer_response(
+    loan_data: LoanApplicationDetails,
+    offer: Dict[str, Any],
+    tool_calls: List[ToolCall],
+    repeat: bool = False,
+) -> Dict[str, Any]:
+    terms = (
+        f"₹{offer['amount']:,.0f} over {offer['tenure_months']} months "
+        f"at an EMI of ₹{offer['emi']:,.0f} ({offer['annual_rate_percent']}% p.a.)"
+    )
+    if repeat:
+        message = f"Would you like to go ahead with {terms}? Please reply yes or no."
+    else:
+        message = (
+            f"We cannot approve ₹{offer['requested_amount']:,.0f}: {(offer.get('rejection_reason') or '').rstrip('.')}. "
+            f"You are eligible for {terms}. Would you like to proceed with this offer? (yes/no)"
+        )
+        if offer.get("requires_documents"):
+            message += " Income and KYC documents will be needed before final approval."
     return {
-        "messages": [
-            AIMessage(
-                content="Verification completed. Proceeding to underwriting."
-            )
-        ],
+        "messages": [AIMessage(content=message)],
         "loan_data": loan_data,
-        "next_step": "underwriting_agent",
+        "next_step": "END",
         "dialogue_stage": "underwriting",
-        "interrupt_signal": None,
+        "application_status": "in_progress",
+        "rejection_reason": None,
+        "interrupt_signal": {"type": "counter_offer", "message": message, "offer": offer},
         "tool_calls": tool_calls,
-        "plan": ["Run underwriting checks"],
-        "current_goal": "Underwriting decision",
-        "agent_thoughts": ["Verification passed."],
+        "current_goal": "Confirm counter-offer",
+        "agent_thoughts": [f"Counter-offer presented: {terms}."],
         "updated_at": datetime.utcnow().isoformat(),
     }
 
@@ -683,240 +799,230 @@ async def underwriting_agent_node(state: AgentState) -> Dict[str, Any]:
             "updated_at": datetime.utcnow().isoformat(),
         }
 
-    try:
-        credit_result = await fetch_credit_score_tool.ainvoke(
-            {"pan": loan_data.pan, "aadhaar": loan_data.aadhaar, "monthly_income": loan_data.monthly_income}
-        )
-        tool_calls = _append_tool_call(state, "fetch_credit_score", {"pan": loan_data.pan}, str(credit_result))
-        parsed_credit = json.loads(credit_result)
-        loan_data.credit_score = parsed_credit.get("credit_score")
-    except Exception as exc:
-        tool_calls = _append_tool_call(state, "fetch_credit_score", {"pan": loan_data.pan}, str(exc), success=False, error=str(exc))
-
-    if loan_data.preapproved_limit is None:
-        offer = find_customer_offer(pan=loan_data.pan, phone=loan_data.mobile, customer_name=loan_data.customer_name)
-        if offer:
-            loan_data.preapproved_limit = float(offer["preapproved_limit"])
-            loan_data.customer_id = offer.get("customer_id") or loan_data.customer_id
-
-    try:
-        emi_result = await calculate_emi.ainvoke(
-            {"principal": loan_data.requested_amount, "tenure_months": loan_data.tenure_months}
-        )
-        tool_calls = _append_tool_call(
-            state,
-            "calculate_emi",
-            {"principal": loan_data.requested_amount, "tenure_months": loan_data.tenure_months},
-            str(emi_result),
-        )
-        parsed_emi = json.loads(emi_result)
-        loan_data.calculated_emi = parsed_emi.get("emi")
-    except Exception as exc:
-        tool_calls = _append_tool_call(
-            state,
-            "calculate_emi",
-            {"principal": loan_data.requested_amount, "tenure_months": loan_data.tenure_months},
-            str(exc),
-            success=False,
-            error=str(exc),
-        )
+    offer = loan_data.counter_offer
+    if offer:
+        answer = _extract_consent(_last_user_message(state))
+        if answer is None:
+            return _counter_offer_response(loan_data, offer, tool_calls, repeat=True)
+        loan_data.counter_offer = None
+        if answer is False:
+            return {
+                "messages": [AIMessage(content="Understood. We have closed this application without the counter-offer.")],
+                "loan_data": loan_data,
+                "next_step": "END",
+                "dialogue_stage": "rejected",
+                "application_status": "rejected",
+                "rejection_reason": offer.get("rejection_reason"),
+                "interrupt_signal": None,
+                "tool_calls": tool_calls,
+                "agent_thoughts": ["Customer declined the counter-offer."],
+                "updated_at": datetime.utcnow().isoformat(),
+            }
+        loan_data.requested_amount = offer["amount"]
+        loan_data.tenure_months = offer["tenure_months"]
 
-    if loan_data.calculated_emi and loan_data.monthly_income:
-        loan_data.affordability_ratio = round(loan_data.calculated_emi / loan_data.monthly_income, 4)
+    # Bureau pull, EMI and affordability re-run only when their inputs moved
+    # (e.g. not on every re-entry while documents are being collected).
+    if loan_data.bureau_refresh_requested or loan_data.is_stale("credit_score"):
         try:
-            affordability_result = await check_affordability.ainvoke(
+            credit_result = await fetch_credit_score_tool.ainvoke(
                 {
+                    "pan": loan_data.pan,
+                    "aadhaar": loan_data.aadhaar,
                     "monthly_income": loan_data.monthly_income,
-                    "existing_emis": loan_data.existing_emis or 0,
-                    "proposed_emi": loan_data.calculated_emi,
+                    "force_refresh": loan_data.bureau_refresh_requested,
                 }
             )
-            tool_calls = _append_tool_call(
-                state,
-                "check_affordability",
-                {"monthly_income": loan_data.monthly_income, "proposed_emi": loan_data.calculated_emi},
-                str(affordability_result),
-            )
+            tool_calls = _append_tool_call(state, "fetch_credit_score", {"pan": loan_data.pan}, str(credit_result))
+            parsed_credit = json.loads(credit_result)
+            loan_data.credit_score = parsed_credit.get("credit_score")
+            loan_data.bureau_refresh_requested = False
+            loan_data.mark_derived("credit_score")
+            get_customer_index().record("bureau", loan_data.pan, loan_data.mobile, {"credit_score": loan_data.credit_score})
         except Exception as exc:
-            tool_calls = _append_tool_call(
-                state,
-                "check_affordability",
-                {"monthly_income": loan_data.monthly_income, "proposed_emi": loan_data.calculated_emi},
-                str(exc),
-                success=False,
-                error=str(exc),
-            )
+            tool_calls = _append_tool_call(state, "fetch_credit_score", {"pan": loan_data.pan}, str(exc), success=False, error=str(exc))
 
-    # Exact PS rules:
-    # 1) Reject if credit score < 700
-    # 2) Approve if requested_amount <= preapproved_limit
-    # 3) If requested_amount <= 2x preapproved_limit: request salary slip and approve only when EMI <= 50% salary
-    # 4) Reject if requested_amount > 2x preapproved_limit
-    requested_amount = float(loan_data.requested_amount or 0)
-    credit_score = int(loan_data.credit_score or 0)
-    preapproved_limit = float(loan_data.preapproved_limit or 0)
-    docs_by_type = {}
-    for doc in loan_data.documents_received:
-        t = doc.get("type")
-        if t:
-            docs_by_type[t] = doc
-    mandatory_docs = ["bank_statement", "address_proof", "selfie_pan"]
-    if loan_data.employment_type == "salaried":
-        mandatory_docs.insert(0, "salary_slip")
-
-    if credit_score < 700:
-        return {
-            "messages": [AIMessage(content="Your credit score is below the minimum threshold. We cannot proceed with this application.")],
-            "loan_data": loan_data,
-            "next_step": "END",
-            "dialogue_stage": "rejected",
-            "application_status": "rejected",
-            "rejection_reason": "Credit score below 700.",
-            "interrupt_signal": None,
-            "tool_calls": tool_calls,
-            "underwriting_reasoning": "Rejected as credit score is below 700.",
-            "underwriting_decision": "reject",
-            "underwriting_confidence": 0.9,
-            "agent_thoughts": ["Rejected due to credit score threshold (<700)."],
-            "updated_at": datetime.utcnow().isoformat(),
-        }
+    if loan_data.preapproved_limit is None:
+        offer = find_customer_offer(pan=loan_data.pan, phone=loan_data.mobile, customer_name=loan_data.customer_name)
+        if offer:
+            loan_data.preapproved_limit = float(offer["preapproved_limit"])
+            loan_data.customer_id = offer.get("customer_id") or loan_data.customer_id
 
-    if preapproved_limit <= 0:
-        return {
-            "messages": [AIMessage(content="We could not find your pre-approved offer at the moment. Please try again later.")],
-            "loan_data": loan_data,
-            "next_step": "END",
-            "dialogue_stage": "rejected",
-            "application_status": "rejected",
-            "rejection_reason": "Pre-approved offer unavailable.",
-            "interrupt_signal": None,
-            "tool_calls": tool_calls,
-            "underwriting_reasoning": "Offer mart lookup did not return a pre-approved limit.",
-            "underwriting_decision": "reject",
-            "underwriting_confidence": 0.8,
-            "agent_thoughts": ["Offer mart did not return pre-approved limit."],
-            "updated_at": datetime.utcnow().isoformat(),
-        }
+    # Price once the bureau score is known; EMI, affordability, counter-offer and letter all use it.
+    loan_data.interest_rate = get_pricing_grid().rate_for(loan_data)
+    if loan_data.is_stale("calculated_emi"):
+        tool_calls = await _refresh_emi({**state, "tool_calls": tool_calls}, loan_data)
 
-    if requested_amount <= preapproved_limit:
-        sanction_letter = generate_sanction_letter_pdf(loan_data)
-        return {
-            "messages": [AIMessage(content="Great news! Your loan is approved within your pre-approved limit. Your sanction letter is ready.")],
-            "loan_data": loan_data,
-            "next_step": "END",
-            "dialogue_stage": "closure",
-            "application_status": "approved",
-            "sanction_letter_path": sanction_letter,
-            "interrupt_signal": None,
-            "underwriting_reasoning": "Requested amount is within pre-approved limit.",
-            "underwriting_decision": "approve",
-            "underwriting_confidence": 0.92,
-            "tool_calls": tool_calls,
-            "agent_thoughts": ["Approved instantly using pre-approved offer rule."],
-            "updated_at": datetime.utcnow().isoformat(),
-        }
+    # Prefer the income read off the salary slip over the self-declared figure.
+    policy_income = float(loan_data.verified_monthly_income or loan_data.monthly_income or 0)
+    if loan_data.calculated_emi and policy_income:
+        loan_data.affordability_ratio = round(loan_data.calculated_emi / policy_income, 4)
+        if loan_data.is_stale("affordability"):
+            try:
+                affordability_result = await check_affordability.ainvoke(
+                    {
+                        "monthly_income": policy_income,
+                        "existing_emis": loan_data.existing_emis or 0,
+                        "proposed_emi": loan_data.calculated_emi,
+                    }
+                )
+                tool_calls = _append_tool_call(
+                    {**state, "tool_calls": tool_calls},
+                    "check_affordability",
+                    {"monthly_income": policy_income, "proposed_emi": loan_data.calculated_emi},
+                    str(affordability_result),
+                )
+                loan_data.mark_derived("affordability")
+            except Exception as exc:
+                tool_calls = _append_tool_call(
+                    {**state, "tool_calls": tool_calls},
+                    "check_affordability",
+                    {"monthly_income": policy_income, "proposed_emi": loan_data.calculated_emi},
+                    str(exc),
+                    success=False,
+                    error=str(exc),
+                )
+
+    # PS rules live in the versioned policy file (app/data/underwriting_policy.json);
+    # this node gathers the facts and renders whichever rule matched.
+    docs_by_type = {doc.get("type"): doc for doc in loan_data.documents_received if doc.get("type")}
+    missing_docs, unverified_docs, verified_docs = document_status(loan_data)
+    requested_docs = list(dict.fromkeys(missing_docs + unverified_docs))
 
-    if requested_amount <= (2 * preapproved_limit):
-        missing_docs = [d for d in mandatory_docs if d not in docs_by_type]
-        unverified_docs = [
-            d for d in mandatory_docs
-            if d in docs_by_type and not bool(docs_by_type[d].get("verified"))
+    facts = underwriting_facts(
+        loan_data,
+        monthly_income=policy_income,
+        documents_verified=not requested_docs,
+    )
+    policy = get_policy_engine().policy
+    rule = policy.evaluate(facts)
+    template_values = {
+        "requested_documents": ", ".join(requested_docs),
+        "verified_documents": ", ".join(verified_docs) if verified_docs else "required documents",
+    }
+    message = rule.message.format(**template_values)
+    result: Dict[str, Any] = {
+        "messages": [AIMessage(content=message)],
+        "loan_data": loan_data,
+        "next_step": "END",
+        "interrupt_signal": None,
+        "tool_calls": tool_calls,
+        "underwriting_decision": rule.decision,
+        "underwriting_confidence": rule.confidence,
+        "underwriting_rule": f"{rule.policy_version}:{rule.id}",
+        "updated_at": datetime.utcnow().isoformat(),
+    }
+    if rule.reasoning:
+        result["underwriting_reasoning"] = rule.reasoning.format(**template_values)
+    if rule.thought:
+        result["agent_thoughts"] = [rule.thought.format(**template_values)]
+
+    if rule.decision == "approve":
+        sanction_letter = await asyncio.to_thread(
+            generate_sanction_letter_pdf, loan_data, thread_id=state.get("thread_id")
+        )
+        result.update(
+            {
+                "dialogue_stage": "closure",
+                "application_status": "approved",
+                "sanction_letter_path": sanction_letter,
+            }
+        )
+    elif rule.decision == "request_documents":
+        unverified_details = {}
+        for doc_type in unverified_docs:
+            verification = (docs_by_type.get(doc_type) or {}).get("verification") or {}
+            reason = verification.get("reason") if isinstance(verification, dict) else None
+            if reason:
+                unverified_details[doc_type] = reason
+        loan_data.documents_requested = [
+            {
+                "type": doc,
+                "reason": "Mandatory KYC/income verification before final approval.",
+                "requested_at": datetime.utcnow().isoformat(),
+            }
+            for doc in requested_docs
         ]
-        if missing_docs or unverified_docs:
-            unverified_details = {}
-            for doc_type in unverified_docs:
-                verification = (docs_by_type.get(doc_type) or {}).get("verification") or {}
-                reason = verification.get("reason") if isinstance(verification, dict) else None
-                if reason:
-                    unverified_details[doc_type] = reason
-            requested_docs = list(dict.fromkeys(missing_docs + unverified_docs))
-            loan_data.documents_requested = [
-                {
-                    "type": doc,
-                    "reason": "Mandatory KYC/income verification before final approval.",
-                    "requested_at": datetime.utcnow().isoformat(),
-                }
-                for doc in requested_docs
-            ]
-            docs_human = ", ".join(requested_docs)
-            return {
-                "messages": [AIMessage(content=f"Before final decision, please upload or re-upload: {docs_human}.")],
-                "loan_data": loan_data,
-                "next_step": "END",
+        result.update(
+            {
                 "dialogue_stage": "underwriting",
                 "application_status": "awaiting_documents",
                 "interrupt_signal": {
                     "type": "document_upload",
                     "required_documents": requested_docs,
-                    "message": f"Please upload required document(s): {docs_human}",
+                    "message": f"Please upload required document(s): {template_values['requested_documents']}",
                     "missing_documents": missing_docs,
                     "unverified_documents": unverified_docs,
                     "unverified_reasons": unverified_details,
                 },
-                "tool_calls": tool_calls,
                 "current_goal": "Collect mandatory verification documents",
                 "agent_thoughts": [
                     f"Missing docs: {', '.join(missing_docs) if missing_docs else 'none'}",
                     f"Unverified docs: {', '.join(unverified_docs) if unverified_docs else 'none'}",
                 ],
-                "underwriting_decision": "request_documents",
-                "underwriting_confidence": 0.9,
-                "updated_at": datetime.utcnow().isoformat(),
             }
-
-        max_allowed_emi = float(loan_data.monthly_income or 0) * 0.5
-        current_emi = float(loan_data.calculated_emi or 0)
-        if current_emi <= max_allowed_emi:
-            sanction_letter = generate_sanction_letter_pdf(loan_data)
-            verified_docs = [d for d in mandatory_docs if d in docs_by_type and bool((docs_by_type[d] or {}).get("verified"))]
-            docs_human = ", ".join(verified_docs) if verified_docs else "required documents"
-            return {
-                "messages": [AIMessage(content=f"Documents verified ({docs_human}). Your loan is approved and sanction letter is generated.")],
-                "loan_data": loan_data,
-                "next_step": "END",
-                "dialogue_stage": "closure",
-                "application_status": "approved",
-                "sanction_letter_path": sanction_letter,
-                "interrupt_signal": None,
-                "underwriting_reasoning": "Within 2x pre-approved limit and EMI <= 50% of monthly salary.",
-                "underwriting_decision": "approve",
-                "underwriting_confidence": 0.88,
-                "tool_calls": tool_calls,
-                "agent_thoughts": [f"Approved after document verification: {docs_human}."],
-                "updated_at": datetime.utcnow().isoformat(),
+        )
+    elif rule.decision == "reject":
+        counter_offer = find_counter_offer(facts, policy, annual_rate_percent=loan_data.interest_rate)
+        if counter_offer:
+            offer = counter_offer.as_dict()
+            offer.update(
+                {
+                    "requested_amount": facts["requested_amount"],
+                    "preapproved_limit": facts["preapproved_limit"],
+                    "rejection_reason": rule.rejection_reason,
+                    "policy_rule": result["underwriting_rule"],
+                }
+            )
+            loan_data.counter_offer = offer
+            result.update(_counter_offer_response(loan_data, offer, tool_calls))
+            return result
+        result.update(
+            {
+                "dialogue_stage": "rejected",
+                "application_status": "rejected",
+                "rejection_reason": rule.rejection_reason,
             }
+        )
+    else:
+        result.update({"dialogue_stage": "underwriting", "application_status": "manual_review"})
+    return result
 
-        return {
-            "messages": [AIMessage(content="We cannot approve this request because the EMI exceeds 50% of your salary.")],
-            "loan_data": loan_data,
-            "next_step": "END",
-            "dialogue_stage": "rejected",
-            "application_status": "rejected",
-            "rejection_reason": "EMI exceeds 50% of monthly salary.",
-            "interrupt_signal": None,
-            "underwriting_reasoning": "Requested amount required salary-slip verification but EMI exceeded policy threshold.",
-            "underwriting_decision": "reject",
-            "underwriting_confidence": 0.9,
-            "tool_calls": tool_calls,
-            "agent_thoughts": ["Rejected on EMI-to-income rule (>50%)."],
-            "updated_at": datetime.utcnow().isoformat(),
-        }
 
-    return {
-        "messages": [AIMessage(content="We cannot approve this request because it exceeds 2x of your pre-approved limit.")],
-        "loan_data": loan_data,
-        "next_step": "END",
-        "dialogue_stage": "rejected",
-        "application_status": "rejected",
-        "rejection_reason": "Requested amount exceeds 2x pre-approved limit.",
-        "interrupt_signal": None,
-        "underwriting_reasoning": "Rejected as requested amount is beyond 2x pre-approved limit.",
-        "underwriting_decision": "reject",
-        "underwriting_confidence": 0.95,
-        "tool_calls": tool_calls,
-        "agent_thoughts": ["Rejected on 2x pre-approved policy rule."],
-        "updated_at": datetime.utcnow().isoformat(),
-    }
+def _merge_state(state: Dict[str, Any], update: Dict[str, Any]) -> Dict[str, Any]:
+    merged = {**state, **update}
+    merged["messages"] = list(state.get("messages", [])) + list(update.get("messages", []))
+    merged["agent_thoughts"] = list(state.get("agent_thoughts", [])) + list(update.get("agent_thoughts", []))
+    return merged
+
+
+async def verify_structured_application(state: AgentState) -> Tuple[Dict[str, Any], bool]:
+    """Pricing plus fraud/KYC checks for a fully specified application.
+
+    Returns the updated state and whether it may proceed to underwriting.
+    """
+    loan_data: LoanApplicationDetails = state["loan_data"]
+    state = {**state, "tool_calls": await _analyze_and_price(state, loan_data)}
+    verification = await _run_verification_checks(state, loan_data)
+    return _merge_state(state, verification), verification.get("next_step") == "underwriting_agent"
+
+
+async def underwrite_structured_application(state: AgentState) -> Dict[str, Any]:
+    return _merge_state(state, await underwriting_agent_node(state))
+
+
+async def run_structured_application(state: AgentState) -> Tuple[Dict[str, Any], str]:
+    """Take a fully specified application through pricing, verification and underwriting.
+
+    Used by partner intake: the same checks and policy as the chat flow, but
+    with no LLM extraction and no turn-by-turn prompting. Returns the final
+    state and the last node that ran, so the caller can checkpoint it as if
+    the graph had run.
+    """
+    state, verified = await verify_structured_application(state)
+    if not verified:
+        return state, "verification_agent"
+    return await underwrite_structured_application(state), "underwriting_agent"
 
 
 async def reflection_node(state: AgentState) -> Dict[str, Any]:
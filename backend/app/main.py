@@ -1,29 +1,54 @@
 # backend/app/main.py
 from __future__ import annotations
 
+import asyncio
+import hmac
+import ipaddress
+import itertools
 import uuid
 import json
 import re
 import os
+import shutil
+import tempfile
 import time
 from contextlib import asynccontextmanager
-from typing import Optional, AsyncIterator, Dict, Any
+from functools import lru_cache
+from typing import Annotated, Optional, AsyncIterator, Dict, Any, List, Literal, Tuple
 from datetime import datetime
 from collections import deque, defaultdict
+from pathlib import Path
 
-from fastapi import FastAPI, UploadFile, File, HTTPException, Form, Header
-from fastapi.responses import StreamingResponse, JSONResponse
+from fastapi import FastAPI, UploadFile, File, HTTPException, Form, Header, Query, Request
+from fastapi.responses import Response, StreamingResponse, JSONResponse
+from starlette.background import BackgroundTask
 from langgraph.checkpoint.memory import MemorySaver
 from langgraph.checkpoint.postgres.aio import AsyncPostgresSaver
 from langchain_core.messages import HumanMessage, AIMessage
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 
 from app.graph.workflow import create_agentic_workflow
-from app.models.state import AgentState, LoanApplicationDetails, ToolCall
+from app.graph.nodes import run_structured_application
+from app.models.intake import ApplicationRequest, intake_state
+from app.models.state import AgentState, LoanApplicationDetails, ToolCall, create_initial_state
 from app.settings import settings
 from app.services.storage_service import save_upload_file
 from app.services.offer_mart_service import get_mock_customers, get_offer_mart
 from app.services.document_verification_service import verify_uploaded_document
+from app.services.salary_slip_service import aparse_salary_slip
+from app.services.bank_statement_service import aanalyze_bank_statement
+from app.services.image_service import anormalize_image
+from app.services.sanction_renderer import sanction_renderer
+from app.services.sanction_service import get_sanction_letter_file
+from app.services.file_serving import IMMUTABLE_CACHE_CONTROL, REVALIDATE_CACHE_CONTROL, etag_matches, file_response
+from app.services.batch_underwriting import detect_format, iter_batch_chunks, stream_underwriting
+from app.services.policy_engine import PolicyError, get_policy_engine
+from app.services.amortization import Prepayment, RateChange, build_schedule, schedule_grid
+from app.services.quote_service import QUOTE_CACHE_CONTROL, quote_payload
+from app.services.bureau_cache import get_bureau_cache
+from app.services.customer_index import get_customer_index
+from app.services.velocity import get_velocity_engine
+from app.services.fraud_graph import FraudGraphError, get_fraud_graph
 
 
 # Global state
@@ -54,10 +79,19 @@ async def lifespan(app: FastAPI):
         # Use MemorySaver instead of Postgres for quick testing
         checkpointer = MemorySaver()
     graph = create_agentic_workflow(checkpointer=checkpointer)
+    # Compile letter templates and warm render workers before the first approval.
+    sanction_renderer.start()
     
     print(f"✅ Agentic workflow initialized at {datetime.utcnow()}")
     yield
     
+    sanction_renderer.shutdown()
+    if settings.fraud_graph_path:
+        # Edges this worker ingested join the shared file for the next start.
+        try:
+            get_fraud_graph().flush(Path(settings.fraud_graph_path))
+        except (OSError, FraudGraphError) as exc:
+            print(f"⚠️ Fraud graph not saved: {exc}")
     print("🛑 Shutting down")
 
 
@@ -68,22 +102,75 @@ app = FastAPI(
 )
 
 
-@app.middleware("http")
-async def rate_limit_middleware(request, call_next):
-    """Simple per-IP in-memory rate limiting for demo hardening."""
-    if request.url.path in {"/health"}:
-        return await call_next(request)
-    ip = request.client.host if request.client else "unknown"
-    now = time.monotonic()
-    window = max(settings.rate_limit_window_s, 1)
-    max_requests = max(settings.rate_limit_max_requests, 1)
-    bucket = _request_buckets[ip]
-    while bucket and (now - bucket[0]) > window:
-        bucket.popleft()
-    if len(bucket) >= max_requests:
-        return JSONResponse(status_code=429, content={"detail": "Rate limit exceeded. Please retry shortly."})
-    bucket.append(now)
-    return await call_next(request)
+@lru_cache()
+def _trusted_networks(spec: str) -> Tuple[Any, ...]:
+    return tuple(ipaddress.ip_network(part.strip(), strict=False) for part in spec.split(",") if part.strip())
+
+
+def _is_trusted(address: str, networks: Tuple[Any, ...]) -> bool:
+    try:
+        ip = ipaddress.ip_address(address)
+    except ValueError:
+        return False
+    return any(ip in network for network in networks)
+
+
+def client_ip(peer: Optional[str], forwarded_for: List[str]) -> Optional[str]:
+    """The applicant's address, as seen by infrastructure we control.
+
+    A request from one of ``TRUSTED_PROXIES`` is attributed to the nearest
+    ``X-Forwarded-For`` hop that is not itself a trusted proxy: every hop
+    right of it was appended by our proxies, anything left of it is whatever
+    the client chose to send. Any other request is the connection's peer.
+    """
+    networks = _trusted_networks(settings.trusted_proxies)
+    if not peer or not networks or not _is_trusted(peer, networks):
+        return peer
+    hops = [hop.strip() for value in forwarded_for for hop in value.split(",") if hop.strip()]
+    for hop in reversed(hops):
+        if not _is_trusted(hop, networks):
+            try:
+                return str(ipaddress.ip_address(hop))
+            except ValueError:
+                return peer
+    return hops[0] if hops else peer
+
+
+class RateLimitMiddleware:
+    """Simple per-IP in-memory rate limiting for demo hardening.
+
+    Plain ASGI rather than ``@app.middleware("http")``, which runs every
+    request through an extra task group and streaming wrapper.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"] in {"/health"}:
+            return await self.app(scope, receive, send)
+        client = scope.get("client")
+        forwarded_for = [value.decode("latin-1") for name, value in scope.get("headers", ()) if name == b"x-forwarded-for"]
+        ip = client_ip(client[0] if client else None, forwarded_for) or "unknown"
+        now = time.monotonic()
+        window = max(settings.rate_limit_window_s, 1)
+        max_requests = max(settings.rate_limit_max_requests, 1)
+        key = ip
+        if scope["path"] == "/quote":
+            # Anonymous landing-page traffic gets its own, larger budget.
+            key = f"quote:{ip}"
+            max_requests = max(settings.quote_rate_limit_max_requests, 1)
+        bucket = _request_buckets[key]
+        while bucket and (now - bucket[0]) > window:
+            bucket.popleft()
+        if len(bucket) >= max_requests:
+            response = JSONResponse(status_code=429, content={"detail": "Rate limit exceeded. Please retry shortly."})
+            return await response(scope, receive, send)
+        bucket.append(now)
+        return await self.app(scope, receive, send)
+
+
+app.add_middleware(RateLimitMiddleware)
 
 
 class ChatRequest(BaseModel):
@@ -94,46 +181,49 @@ class ChatRequest(BaseModel):
     ip_address: Optional[str] = None
 
 
-def create_initial_state(thread_id: str) -> Dict[str, Any]:
-    """Create fresh state for new loan application"""
-    return {
-        "messages": [],
-        "loan_data": LoanApplicationDetails(),
-        "next_step": "sales_agent",
-        "dialogue_stage": "discovery",
-        "agent_thoughts": [],
-        "tool_calls": [],
-        "plan": [],
-        "current_goal": "Initial discovery: Understand customer need",
-        "interrupt_signal": None,
-        "reflection_count": 0,
-        "max_reflections": 3,
-        "last_agent_action": None,
-        "fraud_risk_score": None,
-        "fraud_flags": [],
-        "fraud_assessment": None,
-        "underwriting_reasoning": None,
-        "underwriting_decision": None,
-        "underwriting_confidence": None,
-        "application_status": "in_progress",
-        "rejection_reason": None,
-        "sanction_letter_path": None,
-        "thread_id": thread_id,
-        "created_at": datetime.utcnow().isoformat(),
-        "updated_at": datetime.utcnow().isoformat(),
-    }
+class PrepaymentRequest(BaseModel):
+    month: int = Field(..., ge=1)
+    amount: float = Field(..., gt=0)
+    reduce: Literal["tenure", "emi"] = "tenure"
+
+
+class RateChangeRequest(BaseModel):
+    month: int = Field(..., ge=1)
+    annual_rate_percent: float = Field(..., ge=0, le=60)
+
+
+class ScheduleRequest(BaseModel):
+    principal: float = Field(..., gt=0)
+    tenure_months: int = Field(..., ge=6, le=84)
+    annual_rate_percent: float = Field(12.5, ge=0, le=60)
+    prepayments: List[PrepaymentRequest] = Field(default_factory=list)
+    rate_changes: List[RateChangeRequest] = Field(default_factory=list)
+    foreclose_month: Optional[int] = Field(None, ge=1)
+    foreclosure_charge_percent: float = Field(0, ge=0, le=10)
+    grid_tenures: List[Annotated[int, Field(ge=6, le=84)]] = Field(default_factory=list, max_length=79)
+    grid_rates: List[Annotated[float, Field(ge=0, le=60)]] = Field(default_factory=list, max_length=50)
 
 
 async def _prepare_graph_inputs(
     thread_id: str,
     message: str,
     config: Dict[str, Any],
+    device_id: Optional[str] = None,
+    ip_address: Optional[str] = None,
+    reported_ip_address: Optional[str] = None,
 ) -> Dict[str, Any]:
     """Ensure graph-required state exists before first turn."""
     base_inputs: Dict[str, Any] = {
         "messages": [HumanMessage(content=message)],
         "updated_at": datetime.utcnow().isoformat(),
     }
+    # Client signals for fraud checks; a turn without them keeps the earlier ones.
+    if device_id:
+        base_inputs["device_id"] = device_id
+    if ip_address:
+        base_inputs["ip_address"] = ip_address
+    if reported_ip_address:
+        base_inputs["reported_ip_address"] = reported_ip_address
     existing_state = await _get_state_values(config)
     if existing_state.get("loan_data"):
         return base_inputs
@@ -158,8 +248,22 @@ async def _get_state_values(config: Dict[str, Any]) -> Dict[str, Any]:
     return {}
 
 
+def _client_signals(request: ChatRequest, http_request: Request) -> Dict[str, Optional[str]]:
+    """Device and IP for fraud checks.
+
+    The IP is the connection's (see ``client_ip``); the one the client reports
+    is kept beside it as a hint only, since anyone can send any address.
+    """
+    client = http_request.client
+    return {
+        "device_id": request.device_id,
+        "ip_address": client_ip(client.host if client else None, http_request.headers.getlist("x-forwarded-for")),
+        "reported_ip_address": request.ip_address,
+    }
+
+
 @app.post("/chat")
-async def chat_endpoint(request: ChatRequest):
+async def chat_endpoint(request: ChatRequest, http_request: Request):
     """Main agentic entry point"""
     global graph
     
@@ -176,7 +280,9 @@ async def chat_endpoint(request: ChatRequest):
     
     try:
         # Handle new message
-        return await _handle_message(thread_id, request.message, config, is_new_thread)
+        return await _handle_message(
+            thread_id, request.message, config, is_new_thread, _client_signals(request, http_request)
+        )
         
     except Exception as e:
         print(f"❌ Error: {_redact_pii(str(e))}")
@@ -189,28 +295,30 @@ async def _handle_message(
     thread_id: str, 
     message: str, 
     config: Dict[str, Any],
-    is_new_thread: bool
+    is_new_thread: bool,
+    signals: Optional[Dict[str, Optional[str]]] = None,
 ) -> Dict[str, Any]:
     """Process new chat message through agentic workflow"""
-    inputs = await _prepare_graph_inputs(thread_id, message, config)
+    inputs = await _prepare_graph_inputs(thread_id, message, config, **(signals or {}))
     
-    # Stream through graph
+    # Run the turn to the end: earlier snapshots (starting with the input one) still carry
+    # the previous turn's interrupt, and a turn may pass through several stages.
     final_state = None
     async for event in graph.astream(inputs, config, stream_mode="values"):
         final_state = event
-        
-        # Check for interrupts (agent needs human action)
-        if event.get("interrupt_signal"):
-            return {
-                "response": event["messages"][-1].content if event["messages"] else "I need some information...",
-                "requires_action": event["interrupt_signal"],
-                "thread_id": thread_id,
-                "status": "awaiting_input",
-                "agent_thoughts": event.get("agent_thoughts", [])[-3:] if event.get("agent_thoughts") else [],
-                "plan": event.get("plan", []),
-                "loan_data": event.get("loan_data").model_dump(exclude_none=True) if event.get("loan_data") else {},
-            }
-    
+
+    # Check for interrupts (agent needs human action)
+    if final_state and final_state.get("interrupt_signal"):
+        return {
+            "response": final_state["messages"][-1].content if final_state["messages"] else "I need some information...",
+            "requires_action": final_state["interrupt_signal"],
+            "thread_id": thread_id,
+            "status": "awaiting_input",
+            "agent_thoughts": final_state.get("agent_thoughts", [])[-3:] if final_state.get("agent_thoughts") else [],
+            "plan": final_state.get("plan", []),
+            "loan_data": final_state.get("loan_data").model_dump(exclude_none=True) if final_state.get("loan_data") else {},
+        }
+
     # Check for completion
     if final_state:
         status = final_state.get("application_status", "in_progress")
@@ -247,10 +355,22 @@ async def _register_document(
 ) -> Dict[str, Any]:
     """Handle document upload and update state."""
     allowed_types = ["application/pdf", "image/jpeg", "image/png"]
+    if doc_type == "bank_statement":
+        allowed_types += ["text/csv", "application/vnd.ms-excel"]
     if file_upload.content_type not in allowed_types:
         raise HTTPException(400, f"Invalid file type: {file_upload.content_type}")
 
     saved_path = await save_upload_file(file_upload, thread_id)
+    content_type = file_upload.content_type
+    image_meta: Dict[str, Any] = {}
+    if content_type in {"image/jpeg", "image/png"}:
+        try:
+            image_meta = await anormalize_image(saved_path)
+            saved_path = image_meta["path"]
+            content_type = image_meta["content_type"]
+        except Exception as exc:
+            # Keep the original upload if it cannot be decoded; verification decides what to do with it.
+            print(f"⚠️ Image normalisation skipped: {_redact_pii(str(exc))}")
     file_size = os.path.getsize(saved_path) if os.path.exists(saved_path) else None
     state = await _get_state_values(config)
     if not state:
@@ -262,42 +382,53 @@ async def _register_document(
             "type": doc_type or "unknown",
             "path": saved_path,
             "filename": file_upload.filename,
-            "content_type": file_upload.content_type,
+            "content_type": content_type,
             "size_bytes": file_size,
             "received_at": datetime.utcnow().isoformat(),
             "verified": False,
         }
     )
+    if image_meta:
+        documents_received[-1]["preview_path"] = image_meta["preview_path"]
+        documents_received[-1]["original_size_bytes"] = image_meta["original_size_bytes"]
     verification_result = verify_uploaded_document(
         doc_type=doc_type or "unknown",
         file_path=saved_path,
         filename=file_upload.filename or "",
-        content_type=file_upload.content_type,
+        content_type=content_type,
         pan=loan_data.pan,
         aadhaar=loan_data.aadhaar,
     )
     documents_received[-1]["verified"] = bool(verification_result.get("verified"))
     documents_received[-1]["verification"] = verification_result
     if doc_type == "salary_slip":
+        extracted = await aparse_salary_slip(saved_path)
         loan_data.salary_slip_path = saved_path
         loan_data.salary_slip_data = {
             "file": saved_path,
             "filename": file_upload.filename,
-            "content_type": file_upload.content_type,
+            "content_type": content_type,
             "size_bytes": file_size,
-            "parsed": True,
+            **extracted,
             "verified_at": datetime.utcnow().isoformat(),
         }
+        if extracted.get("verified_income"):
+            loan_data.verified_monthly_income = float(extracted["verified_income"])
+        if extracted.get("employer_name") and not loan_data.employer_name:
+            loan_data.employer_name = extracted["employer_name"]
     elif doc_type == "bank_statement":
+        analytics = await aanalyze_bank_statement(saved_path, file_upload.content_type)
         loan_data.bank_statement_path = saved_path
         loan_data.bank_statement_data = {
             "file": saved_path,
             "filename": file_upload.filename,
-            "content_type": file_upload.content_type,
+            "content_type": content_type,
             "size_bytes": file_size,
-            "parsed": True,
+            **analytics,
             "verified_at": datetime.utcnow().isoformat(),
         }
+        if analytics.get("parsed"):
+            loan_data.existing_emis = float(analytics.get("existing_emis") or 0)
     elif doc_type == "address_proof":
         documents_received[-1]["category"] = "address_proof"
     elif doc_type == "selfie_pan":
@@ -317,6 +448,7 @@ async def _register_document(
         "document_received": file_upload.filename,
         "doc_type": doc_type,
         "path": saved_path,
+        "preview_path": image_meta.get("preview_path"),
         "verification": verification_result,
     }
 
@@ -324,6 +456,7 @@ async def _register_document(
 @app.post("/chat/stream")
 async def chat_stream_endpoint(
     request: ChatRequest,
+    http_request: Request,
 ):
     """
     Streaming endpoint for real-time agent responses.
@@ -345,7 +478,9 @@ async def chat_stream_endpoint(
         streamed_tokens = False
         last_emitted_text = ""
         try:
-            inputs = await _prepare_graph_inputs(thread_id, request.message, config)
+            inputs = await _prepare_graph_inputs(
+                thread_id, request.message, config, **_client_signals(request, http_request)
+            )
             async for event in graph.astream(inputs, config, stream_mode="values"):
                 # Capture latest assistant text from graph state snapshots.
                 if event.get("messages"):
@@ -441,6 +576,55 @@ async def get_state_endpoint(thread_id: str, x_admin_token: Optional[str] = Head
     }
 
 
+@app.post("/applications")
+async def create_application_endpoint(
+    request: ApplicationRequest, x_partner_token: Optional[str] = Header(default=None)
+):
+    """One-shot structured intake: verification and underwriting in a single call, no LLM.
+
+    The resulting state is checkpointed on the thread, so ``/state/{thread_id}``,
+    ``/loan/upload`` and ``/chat`` continue from it exactly as for a chat application.
+    Partners attest OTP and KYC consent, so the endpoint is closed unless
+    ``PARTNER_API_TOKEN`` is set and sent as ``x-partner-token``.
+    """
+    if not settings.partner_api_token or not hmac.compare_digest(
+        (x_partner_token or "").encode("utf-8"), settings.partner_api_token.encode("utf-8")
+    ):
+        raise HTTPException(403, "Forbidden")
+    if not graph:
+        raise HTTPException(503, "Service initializing, please retry")
+
+    thread_id = request.thread_id or f"loan_{uuid.uuid4().hex[:12]}"
+    config = {"configurable": {"thread_id": thread_id}}
+    if (await _get_state_values(config)).get("loan_data"):
+        raise HTTPException(409, "Thread already has an application")
+
+    try:
+        final_state, last_node = await run_structured_application(intake_state(request, thread_id))
+        await graph.aupdate_state(config, final_state, as_node=last_node)
+    except Exception as e:
+        print(f"❌ Intake error: {_redact_pii(str(e))}")
+        raise HTTPException(500, f"Internal error: {str(e)}")
+
+    status = final_state.get("application_status", "in_progress")
+    loan_data = final_state["loan_data"]
+    response: Dict[str, Any] = {
+        "thread_id": thread_id,
+        "status": status,
+        "dialogue_stage": final_state.get("dialogue_stage"),
+        "response": final_state["messages"][-1].content if final_state.get("messages") else "",
+        "decision": final_state.get("underwriting_decision"),
+        "underwriting_rule": final_state.get("underwriting_rule"),
+        "requires_action": final_state.get("interrupt_signal"),
+        "loan_data": loan_data.model_dump(exclude_none=True),
+    }
+    if status == "approved":
+        response["sanction_letter"] = final_state.get("sanction_letter_path")
+    elif status == "rejected":
+        response["rejection_reason"] = final_state.get("rejection_reason")
+    return response
+
+
 @app.post("/reset/{thread_id}")
 async def reset_thread_endpoint(thread_id: str):
     """Reset a thread (for testing)"""
@@ -449,6 +633,168 @@ async def reset_thread_endpoint(thread_id: str):
     return {"status": "reset", "thread_id": thread_id}
 
 
+@app.get("/sanction/{reference}")
+async def sanction_letter_endpoint(reference: str, request: Request, v: Optional[str] = None):
+    """Serve a generated sanction letter PDF with ETag and range support.
+
+    Only the URL versioned with the current content hash may be cached as
+    immutable; a bare or stale URL gets the current letter, revalidated by ETag.
+    """
+    letter = get_sanction_letter_file(reference)
+    if not letter:
+        raise HTTPException(404, "Sanction letter not found")
+    path, etag = letter
+    cache_control = IMMUTABLE_CACHE_CONTROL if v == etag else REVALIDATE_CACHE_CONTROL
+    return file_response(
+        request, path, etag=etag, media_type="application/pdf", filename=f"{reference}.pdf", cache_control=cache_control
+    )
+
+
+@app.get("/quote")
+async def quote_endpoint(
+    request: Request,
+    amount: float = Query(..., gt=0, le=100_000_000),
+    tenure_months: int = Query(..., ge=6, le=84),
+    pan: Optional[str] = Query(None, max_length=10),
+    phone: Optional[str] = Query(None, max_length=10),
+):
+    """Stateless pre-qualification quote: offer mart + EMI only, no graph, checkpoint or LLM."""
+    if not pan and not phone:
+        raise HTTPException(400, "Provide pan or phone")
+    body, etag = quote_payload(pan, phone, amount, tenure_months)
+    headers = {"ETag": f'"{etag}"', "Cache-Control": QUOTE_CACHE_CONTROL}
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match and etag_matches(if_none_match, headers["ETag"]):
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
+@app.post("/loan/schedule")
+async def loan_schedule_endpoint(request: ScheduleRequest):
+    """Amortization schedule with optional prepayment / rate-change / foreclosure what-ifs."""
+    try:
+        schedule = build_schedule(
+            request.principal,
+            request.annual_rate_percent,
+            request.tenure_months,
+            prepayments=[Prepayment(p.month, p.amount, p.reduce) for p in request.prepayments],
+            rate_changes=[RateChange(c.month, c.annual_rate_percent) for c in request.rate_changes],
+            foreclose_month=request.foreclose_month,
+            foreclosure_charge_percent=request.foreclosure_charge_percent,
+        )
+    except ValueError as exc:
+        raise HTTPException(400, str(exc))
+
+    response: Dict[str, Any] = {"summary": schedule.summary(), "schedule": schedule.rows()}
+    if request.prepayments or request.rate_changes or request.foreclose_month:
+        baseline = build_schedule(request.principal, request.annual_rate_percent, request.tenure_months).summary()
+        response["baseline"] = baseline
+        response["interest_saved"] = round(baseline["total_interest"] - schedule.summary()["total_interest"], 2)
+    if request.grid_tenures or request.grid_rates:
+        grid = schedule_grid(
+            request.principal,
+            request.grid_tenures or [request.tenure_months],
+            request.grid_rates or [request.annual_rate_percent],
+        )
+        response["grid"] = {
+            "rates": grid["rates"].tolist(),
+            "tenures": grid["tenures"].tolist(),
+            "emi": grid["emi"].round(2).tolist(),
+            "total_interest": grid["total_interest"].round(2).tolist(),
+        }
+    return response
+
+
+@app.post("/underwriting/batch")
+async def batch_underwriting_endpoint(
+    file: UploadFile = File(...),
+    output_format: str = Form("csv"),
+    params: Optional[str] = Form(None),
+    x_admin_token: Optional[str] = Header(default=None),
+):
+    """Re-score a CSV/Parquet/Arrow batch against the underwriting policy, streamed back in chunks."""
+    if settings.state_debug_token and x_admin_token != settings.state_debug_token:
+        raise HTTPException(403, "Forbidden")
+    if output_format not in {"csv", "jsonl"}:
+        raise HTTPException(400, "output_format must be 'csv' or 'jsonl'")
+    try:
+        overrides = json.loads(params) if params else None
+        policy = get_policy_engine().policy.with_params(overrides)
+    except (ValueError, PolicyError) as exc:
+        raise HTTPException(400, f"Invalid params: {exc}")
+
+    fmt = detect_format(file.filename or "")
+    # The upload is closed once this handler returns, so spool it to a file the stream owns.
+    spooled = tempfile.NamedTemporaryFile(delete=False, suffix=f".{fmt}")
+    await asyncio.to_thread(shutil.copyfileobj, file.file, spooled)
+    spooled.close()
+    chunks = iter_batch_chunks(spooled.name, fmt)
+    try:
+        # Read the first chunk up front so a bad header is a 400, not a broken stream.
+        first = await asyncio.to_thread(next, chunks, None)
+    except ValueError as exc:
+        chunks.close()
+        os.unlink(spooled.name)
+        raise HTTPException(400, str(exc))
+    if first is not None:
+        chunks = itertools.chain([first], chunks)
+    media_type = "text/csv" if output_format == "csv" else "application/x-ndjson"
+    # A sync generator: Starlette iterates it in the threadpool, off the event loop.
+    return StreamingResponse(
+        stream_underwriting(chunks, policy, output_format),
+        media_type=media_type,
+        headers={"X-Policy-Version": policy.version},
+        background=BackgroundTask(os.unlink, spooled.name),
+    )
+
+
+@app.get("/bureau/cache")
+async def bureau_cache_stats_endpoint(x_admin_token: Optional[str] = Header(default=None)):
+    """Bureau cache hit rate and size for this worker."""
+    if settings.state_debug_token and x_admin_token != settings.state_debug_token:
+        raise HTTPException(403, "Forbidden")
+    return get_bureau_cache().stats()
+
+
+@app.post("/bureau/refresh/{thread_id}")
+async def bureau_refresh_endpoint(thread_id: str, x_admin_token: Optional[str] = Header(default=None)):
+    """Underwriter override: the thread's next underwriting pass pulls the bureau afresh."""
+    if settings.state_debug_token and x_admin_token != settings.state_debug_token:
+        raise HTTPException(403, "Forbidden")
+    config = {"configurable": {"thread_id": thread_id}}
+    state = await _get_state_values(config)
+    if not state:
+        raise HTTPException(404, "Thread not found")
+    loan_data: LoanApplicationDetails = state["loan_data"]
+    loan_data.bureau_refresh_requested = True
+    await graph.aupdate_state(config, {"loan_data": loan_data, "updated_at": datetime.utcnow().isoformat()})
+    return {"status": "refresh_requested", "thread_id": thread_id}
+
+
+@app.get("/verification/index")
+async def customer_index_stats_endpoint(x_admin_token: Optional[str] = Header(default=None)):
+    """Customer verification index hit rate, size and per-outcome TTLs for this worker."""
+    if settings.state_debug_token and x_admin_token != settings.state_debug_token:
+        raise HTTPException(403, "Forbidden")
+    return get_customer_index().stats()
+
+
+@app.get("/verification/velocity")
+async def velocity_stats_endpoint(x_admin_token: Optional[str] = Header(default=None)):
+    """Velocity rules, checks flagged and counters held by this worker."""
+    if settings.state_debug_token and x_admin_token != settings.state_debug_token:
+        raise HTTPException(403, "Forbidden")
+    return get_velocity_engine().stats()
+
+
+@app.get("/fraud/graph")
+async def fraud_graph_stats_endpoint(x_admin_token: Optional[str] = Header(default=None)):
+    """Embedded fraud graph size and overlay for this worker."""
+    if settings.state_debug_token and x_admin_token != settings.state_debug_token:
+        raise HTTPException(403, "Forbidden")
+    return get_fraud_graph().stats()
+
+
 @app.get("/mock/customers")
 async def mock_customers_endpoint():
     """Demo endpoint: synthetic customer records."""
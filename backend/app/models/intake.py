@@ -0,0 +1,69 @@
+from __future__ import annotations
+
+import re
+from typing import Any, Dict, Literal, Optional
+
+from pydantic import BaseModel, Field, field_validator
+
+from app.models.state import LoanApplicationDetails, create_initial_state
+
+
+class ApplicationRequest(BaseModel):
+    """A complete application from a partner/DSA channel.
+
+    Only customer-declared fields are accepted; bureau score, pre-approved
+    limit, pricing and verified income are always derived server-side.
+    """
+
+    thread_id: Optional[str] = Field(None, max_length=64, pattern=r"^[A-Za-z0-9_-]+$")
+    customer_name: str = Field(..., min_length=2, max_length=120)
+    mobile: str = Field(..., pattern=r"^\d{10}$")
+    email: str = Field(..., pattern=r"^[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Za-z]{2,}$")
+    pan: str = Field(..., pattern=r"^[A-Z]{5}\d{4}[A-Z]$")
+    aadhaar: str = Field(..., pattern=r"^\d{12}$")
+    address: Optional[str] = Field(None, max_length=300)
+    requested_amount: float = Field(..., gt=0)
+    tenure_months: int = Field(..., ge=6, le=84)
+    loan_purpose: str = Field(..., min_length=2, max_length=200)
+    employment_type: Literal["salaried", "self_employed", "freelancer", "unemployed"]
+    monthly_income: float = Field(..., gt=0)
+    employer_name: Optional[str] = Field(None, max_length=120)
+    existing_emis: float = Field(0, ge=0)
+    # Where the partner captured the application, for velocity and fraud-graph checks.
+    device_id: Optional[str] = Field(None, max_length=128)
+    ip_address: Optional[str] = Field(None, max_length=64)
+    # The partner attests both; the chat flow collects them turn by turn.
+    otp_verified: bool
+    kyc_consent: bool
+
+    @field_validator("pan", mode="before")
+    @classmethod
+    def _normalize_pan(cls, v: Any) -> Any:
+        return v.strip().upper() if isinstance(v, str) else v
+
+    @field_validator("aadhaar", "mobile", mode="before")
+    @classmethod
+    def _strip_spaces(cls, v: Any) -> Any:
+        return re.sub(r"[\s-]", "", v) if isinstance(v, str) else v
+
+    @field_validator("otp_verified", "kyc_consent")
+    @classmethod
+    def _must_be_true(cls, v: bool) -> bool:
+        if not v:
+            raise ValueError("must be true to process an application")
+        return v
+
+    def to_loan_data(self) -> LoanApplicationDetails:
+        return LoanApplicationDetails(**self.model_dump(exclude={"thread_id", "device_id", "ip_address"}))
+
+
+def intake_state(request: ApplicationRequest, thread_id: str) -> Dict[str, Any]:
+    """Fresh thread state for a structured application, positioned at verification."""
+    return {
+        **create_initial_state(thread_id),
+        "loan_data": request.to_loan_data(),
+        "dialogue_stage": "verification",
+        "current_goal": "Structured intake",
+        "device_id": request.device_id,
+        "ip_address": request.ip_address,
+    }
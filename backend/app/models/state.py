@@ -1,6 +1,6 @@
 # backend/app/models/state.py
-from typing import TypedDict, Annotated, Optional, List, Dict, Any, Literal
-from pydantic import BaseModel, Field, field_validator
+from typing import TypedDict, Annotated, Optional, List, Dict, Any, Literal, ClassVar, Set, Tuple
+from pydantic import BaseModel, Field, PrivateAttr, field_validator
 from langgraph.graph.message import add_messages
 from datetime import datetime
 
@@ -21,12 +21,13 @@ class LoanApplicationDetails(BaseModel):
     # Loan details
     requested_amount: Optional[float] = Field(None, description="Amount requested")
     loan_purpose: Optional[str] = Field(None, description="Purpose category")
-    purpose_category: Optional[Literal["debt_consolidation", "medical", "wedding", "education", "business", "other"]] = None
+    purpose_category: Optional[Literal["debt_consolidation", "medical", "wedding", "education", "business", "home_renovation", "other"]] = None
     tenure_months: Optional[int] = Field(None, ge=6, le=84)
     
     # Financial profile
     employment_type: Optional[Literal["salaried", "self_employed", "freelancer", "unemployed"]] = None
     monthly_income: Optional[float] = Field(None, ge=0)
+    verified_monthly_income: Optional[float] = Field(None, ge=0)  # From parsed salary slip
     employer_name: Optional[str] = None
     employer_tier: Optional[Literal["tier_1", "tier_2", "tier_3", "unverified"]] = None
     work_experience_years: Optional[float] = Field(None, ge=0)
@@ -38,6 +39,7 @@ class LoanApplicationDetails(BaseModel):
     existing_emis: Optional[float] = Field(0, ge=0)
     dti_ratio: Optional[float] = Field(None, ge=0, le=100)
     bureau_flags: List[str] = Field(default_factory=list)
+    bureau_refresh_requested: bool = False  # Underwriter override: bypass the bureau cache on the next pull
     
     # Document handling
     salary_slip_path: Optional[str] = None
@@ -55,8 +57,45 @@ class LoanApplicationDetails(BaseModel):
     objections_handled: List[str] = Field(default_factory=list)
     
     # Calculated fields
+    interest_rate: Optional[float] = None  # Annual %, from the risk-based pricing grid
     calculated_emi: Optional[float] = None
     affordability_ratio: Optional[float] = None  # EMI / monthly_income
+    counter_offer: Optional[Dict[str, Any]] = None  # Pending max-approvable offer after a rejection
+
+    # Input values each derived result was last computed from (see DERIVED_INPUTS).
+    derived_from: Dict[str, List[Any]] = Field(default_factory=dict)
+
+    # Derived result -> the fields it is a function of.
+    DERIVED_INPUTS: ClassVar[Dict[str, Tuple[str, ...]]] = {
+        "purpose_category": ("loan_purpose",),
+        "calculated_emi": ("requested_amount", "tenure_months", "interest_rate"),
+        "credit_score": ("pan", "aadhaar", "monthly_income"),
+        "affordability": ("monthly_income", "verified_monthly_income", "existing_emis", "calculated_emi"),
+    }
+
+    # Fields assigned a different value since this object was loaded, i.e. during this turn.
+    _changed: Set[str] = PrivateAttr(default_factory=set)
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        if name in type(self).model_fields and getattr(self, name, None) != value:
+            self._changed.add(name)
+        super().__setattr__(name, value)
+
+    @property
+    def changed_fields(self) -> List[str]:
+        return sorted(self._changed)
+
+    def _derived_inputs(self, derived: str) -> List[Any]:
+        return [getattr(self, name) for name in self.DERIVED_INPUTS[derived]]
+
+    def is_stale(self, derived: str) -> bool:
+        """Whether ``derived`` must be recomputed: never computed, or an input changed since."""
+        previous = self.derived_from.get(derived)
+        return previous is None or previous != self._derived_inputs(derived)
+
+    def mark_derived(self, derived: str) -> None:
+        """Record the inputs ``derived`` was just computed from."""
+        self.derived_from[derived] = self._derived_inputs(derived)
     
     @property
     def is_complete(self) -> bool:
@@ -116,8 +155,12 @@ class AgentState(TypedDict):
     reflection_count: Annotated[int, lambda x, y: x + 1]  # Auto-increment
     max_reflections: int = 3  # Prevent infinite loops
     last_agent_action: Optional[str]
+    extracted_turn: Optional[int]  # User turn whose message has already been through the LLM extractor
     
     # Risk and compliance
+    device_id: Optional[str]  # Client-reported device fingerprint, latest turn wins
+    ip_address: Optional[str]  # Connection address (via trusted proxies); what fraud checks use
+    reported_ip_address: Optional[str]  # What the client claims; a hint, never scored
     fraud_risk_score: Optional[int]
     fraud_flags: List[str]
     fraud_assessment: Optional[str]  # Detailed reasoning
@@ -125,6 +168,7 @@ class AgentState(TypedDict):
     underwriting_reasoning: Optional[str]
     underwriting_decision: Optional[Literal["approve", "reject", "request_guarantor", "request_documents", "manual_review"]]
     underwriting_confidence: Optional[float]
+    underwriting_rule: Optional[str]  # "<policy version>:<rule id>" that decided
     
     # Final status
     application_status: Optional[Literal["approved", "rejected", "manual_review", "in_progress", "awaiting_documents"]]
@@ -148,3 +192,37 @@ class AgentDecision(BaseModel):
     tool_calls: Optional[List[Dict]] = None
     requires_human: bool = False
     human_reason: Optional[str] = None  # Why human is needed
+
+
+def create_initial_state(thread_id: str) -> Dict[str, Any]:
+    """Create fresh state for new loan application"""
+    return {
+        "messages": [],
+        "loan_data": LoanApplicationDetails(),
+        "next_step": "sales_agent",
+        "dialogue_stage": "discovery",
+        "agent_thoughts": [],
+        "tool_calls": [],
+        "plan": [],
+        "current_goal": "Initial discovery: Understand customer need",
+        "interrupt_signal": None,
+        "reflection_count": 0,
+        "max_reflections": 3,
+        "last_agent_action": None,
+        "extracted_turn": None,
+        "device_id": None,
+        "ip_address": None,
+        "reported_ip_address": None,
+        "fraud_risk_score": None,
+        "fraud_flags": [],
+        "fraud_assessment": None,
+        "underwriting_reasoning": None,
+        "underwriting_decision": None,
+        "underwriting_confidence": None,
+        "application_status": "in_progress",
+        "rejection_reason": None,
+        "sanction_letter_path": None,
+        "thread_id": thread_id,
+        "created_at": datetime.utcnow().isoformat(),
+        "updated_at": datetime.utcnow().isoformat(),
+    }
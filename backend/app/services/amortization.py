@@ -0,0 +1,258 @@
+from __future__ import annotations
+
+import math
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, List, Literal, Optional, Sequence, Tuple
+
+import numpy as np
+
+from app.services.emi import calculate_emi, calculate_emi_array
+
+# Balances below this are treated as paid off (float noise from the closed form).
+PAID_OFF_EPSILON = 1e-6
+
+
+@dataclass(frozen=True)
+class Prepayment:
+    month: int  # paid together with this month's EMI
+    amount: float
+    reduce: Literal["tenure", "emi"] = "tenure"
+
+
+@dataclass(frozen=True)
+class RateChange:
+    month: int  # first month charged at the new rate
+    annual_rate_percent: float
+
+
+@dataclass
+class AmortizationSchedule:
+    """Month-by-month schedule as parallel arrays (one entry per instalment)."""
+
+    month: np.ndarray
+    annual_rate_percent: np.ndarray
+    opening_balance: np.ndarray
+    emi: np.ndarray
+    interest: np.ndarray
+    principal: np.ndarray
+    prepayment: np.ndarray
+    closing_balance: np.ndarray
+    foreclosure_charge: float = 0.0
+
+    @property
+    def months(self) -> int:
+        return int(self.month.size)
+
+    @property
+    def total_interest(self) -> float:
+        return float(self.interest.sum())
+
+    @property
+    def total_paid(self) -> float:
+        return float(self.emi.sum() + self.prepayment.sum() + self.foreclosure_charge)
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "months": self.months,
+            "first_emi": round(float(self.emi[0]), 2) if self.months else 0.0,
+            "total_interest": round(self.total_interest, 2),
+            "total_prepayment": round(float(self.prepayment.sum()), 2),
+            "foreclosure_charge": round(self.foreclosure_charge, 2),
+            "total_paid": round(self.total_paid, 2),
+        }
+
+    def rows(self) -> List[Dict[str, Any]]:
+        columns = {
+            "month": self.month.tolist(),
+            "annual_rate_percent": self.annual_rate_percent.tolist(),
+            "opening_balance": np.round(self.opening_balance, 2).tolist(),
+            "emi": np.round(self.emi, 2).tolist(),
+            "interest": np.round(self.interest, 2).tolist(),
+            "principal": np.round(self.principal, 2).tolist(),
+            "prepayment": np.round(self.prepayment, 2).tolist(),
+            "closing_balance": np.round(self.closing_balance, 2).tolist(),
+        }
+        return [dict(zip(columns, values)) for values in zip(*columns.values())]
+
+
+def amortize(
+    principal: Any,
+    annual_rate_percent: Any,
+    tenure_months: Any,
+    max_months: Optional[int] = None,
+) -> Dict[str, np.ndarray]:
+    """Closed-form schedules for every broadcast combination of the inputs.
+
+    Inputs broadcast against each other (e.g. rates as a column and tenures as
+    a row give a rates x tenures grid); outputs gain a trailing month axis of
+    length ``max_months`` with months past each tenure zeroed.
+    """
+    p = np.asarray(principal, dtype=np.float64)
+    n = np.asarray(tenure_months, dtype=np.int64)
+    r = np.asarray(annual_rate_percent, dtype=np.float64) / 100 / 12
+    p, r, n = np.broadcast_arrays(p, r, n)
+    emi = calculate_emi_array(p, r * 1200, n)
+
+    horizon = int(max_months if max_months is not None else (n.max() if n.size else 0))
+    k = np.arange(horizon + 1, dtype=np.float64)
+    p_, r_, n_, emi_ = (a[..., None] for a in (p, r, n, emi))
+    with np.errstate(divide="ignore", invalid="ignore", over="ignore"):
+        growth = (1 + r_) ** k
+        balance = np.where(r_ == 0, p_ - emi_ * k, p_ * growth - emi_ * (growth - 1) / r_)
+    balance = np.where(k <= n_, np.maximum(balance, 0.0), 0.0)
+    # The final instalment clears whatever rounding left behind.
+    balance = np.where(k == n_, 0.0, balance)
+
+    opening = balance[..., :-1]
+    closing = balance[..., 1:]
+    active = k[1:] <= n_
+    interest = np.where(active, opening * r_, 0.0)
+    principal_paid = np.where(active, opening - closing, 0.0)
+    return {
+        "emi": emi,
+        "opening_balance": opening,
+        "closing_balance": closing,
+        "interest": interest,
+        "principal": principal_paid,
+        "payment": interest + principal_paid,
+        "total_interest": interest.sum(axis=-1),
+    }
+
+
+def schedule_grid(principal: float, tenures: Sequence[int], rates: Sequence[float]) -> Dict[str, np.ndarray]:
+    """EMI and total interest for every rate x tenure pair in one call."""
+    grid = amortize(principal, np.asarray(rates, dtype=np.float64)[:, None], np.asarray(tenures)[None, :])
+    return {
+        "rates": np.asarray(rates, dtype=np.float64),
+        "tenures": np.asarray(tenures, dtype=np.int64),
+        "emi": grid["emi"],
+        "total_interest": grid["total_interest"],
+        "total_paid": grid["total_interest"] + principal,
+    }
+
+
+def _months_to_payoff(balance: float, monthly_rate: float, emi: float) -> int:
+    if balance <= PAID_OFF_EPSILON:
+        return 0
+    if monthly_rate == 0:
+        return math.ceil(balance / emi - 1e-9)
+    if emi <= balance * monthly_rate:
+        raise ValueError("EMI does not cover the monthly interest.")
+    return math.ceil(math.log(emi / (emi - balance * monthly_rate)) / math.log(1 + monthly_rate) - 1e-9)
+
+
+def _segment(balance: float, monthly_rate: float, emi: float, months: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Opening/closing balances for ``months`` instalments at a fixed EMI and rate."""
+    k = np.arange(months + 1, dtype=np.float64)
+    if monthly_rate == 0:
+        balances = balance - emi * k
+    else:
+        growth = (1 + monthly_rate) ** k
+        balances = balance * growth - emi * (growth - 1) / monthly_rate
+    balances = np.maximum(balances, 0.0)
+    balances[balances < PAID_OFF_EPSILON] = 0.0
+    return balances[:-1], balances[1:]
+
+
+def build_schedule(
+    principal: float,
+    annual_rate_percent: float,
+    tenure_months: int,
+    prepayments: Iterable[Prepayment] = (),
+    rate_changes: Iterable[RateChange] = (),
+    foreclose_month: Optional[int] = None,
+    foreclosure_charge_percent: float = 0.0,
+) -> AmortizationSchedule:
+    """Full schedule with part-prepayment, rate-change and foreclosure what-ifs.
+
+    The loan runs in segments between events; each segment is filled in with
+    the closed-form balance formula rather than a month-by-month loop. A
+    prepayment either keeps the EMI and shortens the loan (``reduce="tenure"``)
+    or keeps the end date and lowers the EMI. A rate change keeps the
+    remaining tenure and re-prices the EMI. Foreclosure pays off the balance
+    with that month's EMI, plus the charge on the amount foreclosed.
+    """
+    if principal <= 0 or tenure_months <= 0:
+        raise ValueError("principal and tenure_months must be positive")
+
+    prepay_by_month: Dict[int, List[Prepayment]] = {}
+    for item in prepayments:
+        prepay_by_month.setdefault(int(item.month), []).append(item)
+    rate_changes = list(rate_changes)
+    # Events must fall inside the contractual tenure; the last instalment already clears the loan.
+    if any(not 1 <= m < tenure_months for m in prepay_by_month):
+        raise ValueError(f"prepayment month must be between 1 and {tenure_months - 1}")
+    if any(not 1 <= int(c.month) <= tenure_months for c in rate_changes):
+        raise ValueError(f"rate change month must be between 1 and {tenure_months}")
+    if foreclose_month is not None and not 1 <= foreclose_month < tenure_months:
+        raise ValueError(f"foreclose_month must be between 1 and {tenure_months - 1}")
+    # A rate from month m onwards is applied right after instalment m - 1.
+    rate_after: Dict[int, float] = {int(c.month) - 1: float(c.annual_rate_percent) for c in rate_changes}
+    event_months = sorted(set(prepay_by_month) | set(rate_after) | ({foreclose_month} if foreclose_month else set()))
+
+    rate = float(annual_rate_percent)
+    balance = float(principal)
+    emi = calculate_emi(balance, rate, tenure_months)
+    done = 0
+    remaining = tenure_months
+    parts: Dict[str, List[np.ndarray]] = {name: [] for name in ("month", "rate", "opening", "closing", "prepayment")}
+    charge = 0.0
+
+    for event in event_months + [None]:
+        if balance <= PAID_OFF_EPSILON:
+            break
+        monthly_rate = rate / 1200
+        payoff = _months_to_payoff(balance, monthly_rate, emi)
+        run = payoff if event is None else min(event - done, payoff)
+        if run > 0:
+            opening, closing = _segment(balance, monthly_rate, emi, run)
+            if run == payoff:
+                closing[-1] = 0.0
+            parts["month"].append(np.arange(done + 1, done + run + 1))
+            parts["rate"].append(np.full(run, rate))
+            parts["opening"].append(opening)
+            parts["closing"].append(closing)
+            parts["prepayment"].append(np.zeros(run))
+            balance = float(closing[-1])
+            done += run
+            remaining = max(remaining - run, 0)
+        if event is None or balance <= PAID_OFF_EPSILON or done != event:
+            continue
+
+        extra = 0.0
+        for item in prepay_by_month.get(event, []):
+            extra += min(float(item.amount), balance - extra)
+        if foreclose_month == event:
+            charge = (balance - extra) * foreclosure_charge_percent / 100
+            extra = balance
+        if extra > 0 and done > 0:
+            balance -= extra
+            parts["prepayment"][-1][-1] += extra
+            parts["closing"][-1][-1] = balance
+            if balance <= PAID_OFF_EPSILON:
+                break
+            if any(item.reduce == "emi" for item in prepay_by_month.get(event, [])):
+                emi = calculate_emi(balance, rate, remaining)
+            else:
+                remaining = _months_to_payoff(balance, rate / 1200, emi)
+        if event in rate_after:
+            rate = rate_after[event]
+            emi = calculate_emi(balance, rate, max(remaining, 1))
+
+    opening = np.concatenate(parts["opening"]) if parts["opening"] else np.zeros(0)
+    closing = np.concatenate(parts["closing"]) if parts["closing"] else np.zeros(0)
+    prepayment = np.concatenate(parts["prepayment"]) if parts["prepayment"] else np.zeros(0)
+    rates = np.concatenate(parts["rate"]) if parts["rate"] else np.zeros(0)
+    interest = opening * rates / 1200
+    principal_paid = opening - closing - prepayment
+    return AmortizationSchedule(
+        month=np.concatenate(parts["month"]) if parts["month"] else np.zeros(0, dtype=np.int64),
+        annual_rate_percent=rates,
+        opening_balance=opening,
+        emi=interest + principal_paid,
+        interest=interest,
+        principal=principal_paid,
+        prepayment=prepayment,
+        closing_balance=closing,
+        foreclosure_charge=charge,
+    )
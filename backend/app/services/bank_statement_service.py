@@ -0,0 +1,379 @@
+from __future__ import annotations
+
+import asyncio
+import csv
+import re
+from dataclasses import dataclass
+from datetime import date, datetime
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from app.services.document_verification_service import iter_pdf_page_text
+
+# Transaction flag bits, stored per row in a uint8 column.
+FLAG_SALARY = 1
+FLAG_EMI_KEYWORD = 2
+FLAG_MANDATE = 4
+FLAG_BOUNCE = 8
+
+SALARY_RE = re.compile(r"\b(?:salary|sal\b|sal\s*cr|payroll|wages)", re.IGNORECASE)
+EMI_KEYWORD_RE = re.compile(r"\b(?:emi|loan|ln\s*ac|finance|fin\s*ltd|nbfc)\b", re.IGNORECASE)
+MANDATE_RE = re.compile(r"\b(?:nach|ach|ecs|si|mandate|standing\s*instruction|autopay|auto\s*debit)\b", re.IGNORECASE)
+BOUNCE_RE = re.compile(
+    r"\b(?:bounce|bounced|return(?:ed)?|rtn|insuff(?:icient)?|dishono(?:u)?r(?:ed)?|chq\s*ret)\b", re.IGNORECASE
+)
+PAYEE_NOISE_RE = re.compile(r"[^a-z ]+")
+AMOUNT_TOKEN_RE = re.compile(r"-?\d{1,3}(?:,\d{2,3})+(?:\.\d{1,2})?|-?\d+\.\d{1,2}")
+PDF_ROW_RE = re.compile(
+    r"^\s*(?P<date>\d{1,2}[/\-.](?:\d{1,2}|[A-Za-z]{3})[/\-.]\d{2,4}|\d{4}-\d{2}-\d{2})\s+(?P<rest>.+)$"
+)
+DATE_FORMATS = ("%d/%m/%Y", "%d-%m-%Y", "%Y-%m-%d", "%d-%b-%Y", "%d/%m/%y", "%d-%m-%y", "%d %b %Y", "%d.%m.%Y", "%d-%b-%y")
+
+DATE_HEADERS = {"date", "txn date", "transaction date", "value date", "posting date"}
+DESCRIPTION_HEADERS = {"description", "narration", "particulars", "details", "remarks", "transaction details"}
+DEBIT_HEADERS = {"debit", "withdrawal", "withdrawals", "withdrawal amt", "debit amount", "dr"}
+CREDIT_HEADERS = {"credit", "deposit", "deposits", "deposit amt", "credit amount", "cr"}
+AMOUNT_HEADERS = {"amount", "txn amount", "transaction amount"}
+BALANCE_HEADERS = {"balance", "closing balance", "running balance", "available balance"}
+
+CHUNK_ROWS = 8192
+# A recurring debit must recur in this many distinct months to count as an EMI.
+MIN_RECURRING_MONTHS = 3
+# Max coefficient of variation of a recurring debit's amount.
+MAX_EMI_AMOUNT_CV = 0.05
+_EPOCH = date(1970, 1, 1)
+
+
+@dataclass
+class TransactionColumns:
+    """Columnar transaction store; ``amount`` is signed (credit > 0, debit < 0)."""
+
+    day: np.ndarray  # int32 days since 1970-01-01
+    amount: np.ndarray  # float64
+    balance: np.ndarray  # float64, NaN when the statement has no balance column
+    payee: np.ndarray  # int32 id into ``payees``
+    flags: np.ndarray  # uint8 bitmask of FLAG_*
+    payees: List[str]
+
+    def __len__(self) -> int:
+        return int(self.day.shape[0])
+
+
+class _ColumnBuilder:
+    """Accumulate rows in small Python buffers, flushing them to NumPy chunks."""
+
+    def __init__(self) -> None:
+        self._payee_ids: Dict[str, int] = {}
+        self._chunks: List[Tuple[np.ndarray, ...]] = []
+        self._reset_buffers()
+
+    def _reset_buffers(self) -> None:
+        self._day: List[int] = []
+        self._amount: List[float] = []
+        self._balance: List[float] = []
+        self._payee: List[int] = []
+        self._flags: List[int] = []
+
+    def add(self, day: int, amount: float, balance: Optional[float], description: str) -> None:
+        key = _payee_key(description)
+        payee_id = self._payee_ids.setdefault(key, len(self._payee_ids))
+        self._day.append(day)
+        self._amount.append(amount)
+        self._balance.append(np.nan if balance is None else balance)
+        self._payee.append(payee_id)
+        self._flags.append(_flags_for(description))
+        if len(self._day) >= CHUNK_ROWS:
+            self._flush()
+
+    def _flush(self) -> None:
+        if not self._day:
+            return
+        self._chunks.append(
+            (
+                np.asarray(self._day, dtype=np.int32),
+                np.asarray(self._amount, dtype=np.float64),
+                np.asarray(self._balance, dtype=np.float64),
+                np.asarray(self._payee, dtype=np.int32),
+                np.asarray(self._flags, dtype=np.uint8),
+            )
+        )
+        self._reset_buffers()
+
+    def build(self) -> TransactionColumns:
+        self._flush()
+        if self._chunks:
+            day, amount, balance, payee, flags = (np.concatenate(cols) for cols in zip(*self._chunks))
+        else:
+            day = np.empty(0, dtype=np.int32)
+            amount = np.empty(0, dtype=np.float64)
+            balance = np.empty(0, dtype=np.float64)
+            payee = np.empty(0, dtype=np.int32)
+            flags = np.empty(0, dtype=np.uint8)
+        payees = [""] * len(self._payee_ids)
+        for key, idx in self._payee_ids.items():
+            payees[idx] = key
+        return TransactionColumns(day=day, amount=amount, balance=balance, payee=payee, flags=flags, payees=payees)
+
+
+def _payee_key(description: str) -> str:
+    # Drop reference numbers and punctuation so repeat debits to the same lender share a key.
+    tokens = PAYEE_NOISE_RE.sub(" ", description.lower()).split()
+    return " ".join(tokens[:4])
+
+
+def _flags_for(description: str) -> int:
+    flags = 0
+    if SALARY_RE.search(description):
+        flags |= FLAG_SALARY
+    if EMI_KEYWORD_RE.search(description):
+        flags |= FLAG_EMI_KEYWORD
+    if MANDATE_RE.search(description):
+        flags |= FLAG_MANDATE
+    if BOUNCE_RE.search(description):
+        flags |= FLAG_BOUNCE
+    return flags
+
+
+_date_cache: Dict[str, Optional[int]] = {}
+
+
+def _parse_day(raw: str) -> Optional[int]:
+    raw = raw.strip()
+    if raw in _date_cache:
+        return _date_cache[raw]
+    parsed: Optional[int] = None
+    for fmt in DATE_FORMATS:
+        try:
+            parsed = (datetime.strptime(raw, fmt).date() - _EPOCH).days
+            break
+        except ValueError:
+            continue
+    # Statements repeat the same few hundred dates; bound the memo anyway.
+    if len(_date_cache) < 100_000:
+        _date_cache[raw] = parsed
+    return parsed
+
+
+def _parse_money(raw: Optional[str]) -> Optional[float]:
+    if raw is None:
+        return None
+    cleaned = raw.strip().replace(",", "").replace("₹", "").replace("INR", "").strip()
+    if not cleaned or cleaned in {"-", "--"}:
+        return None
+    suffix = cleaned[-2:].upper()
+    sign = 1.0
+    if suffix in {"DR", "CR"}:
+        sign = -1.0 if suffix == "DR" else 1.0
+        cleaned = cleaned[:-2].strip()
+    try:
+        return sign * float(cleaned)
+    except ValueError:
+        return None
+
+
+def _match_header(header: List[str], names: set) -> Optional[int]:
+    for idx, col in enumerate(header):
+        if col.strip().lower() in names:
+            return idx
+    return None
+
+
+def _iter_csv_rows(lines: Iterable[str]) -> Iterator[Tuple[int, float, Optional[float], str]]:
+    """Yield (day, signed amount, balance, description) rows from a CSV statement."""
+    reader = csv.reader(lines)
+    columns: Optional[Dict[str, Optional[int]]] = None
+    for row in reader:
+        if not row:
+            continue
+        if columns is None:
+            # Banks prepend account metadata; the header is the first row naming a date column.
+            date_idx = _match_header(row, DATE_HEADERS)
+            if date_idx is None:
+                continue
+            columns = {
+                "date": date_idx,
+                "description": _match_header(row, DESCRIPTION_HEADERS),
+                "debit": _match_header(row, DEBIT_HEADERS),
+                "credit": _match_header(row, CREDIT_HEADERS),
+                "amount": _match_header(row, AMOUNT_HEADERS),
+                "balance": _match_header(row, BALANCE_HEADERS),
+            }
+            continue
+
+        def cell(name: str) -> Optional[str]:
+            idx = columns[name]
+            return row[idx] if idx is not None and idx < len(row) else None
+
+        day = _parse_day(cell("date") or "")
+        if day is None:
+            continue
+        debit = _parse_money(cell("debit"))
+        credit = _parse_money(cell("credit"))
+        if debit or credit:
+            amount = (credit or 0.0) - abs(debit or 0.0)
+        else:
+            amount = _parse_money(cell("amount"))
+            if amount is None:
+                continue
+        yield day, amount, _parse_money(cell("balance")), cell("description") or ""
+
+
+def _iter_pdf_rows(pages: Iterable[str]) -> Iterator[Tuple[int, float, Optional[float], str]]:
+    """Yield rows from PDF text tables: date, narration, then amount(s) with the running balance last."""
+    previous_balance: Optional[float] = None
+    for page in pages:
+        for line in page.splitlines():
+            match = PDF_ROW_RE.match(line)
+            if not match:
+                continue
+            day = _parse_day(match.group("date"))
+            if day is None:
+                continue
+            rest = match.group("rest")
+            amounts = list(AMOUNT_TOKEN_RE.finditer(rest))
+            if len(amounts) < 2:
+                continue
+            description = rest[: amounts[0].start()].strip()
+            balance = _parse_money(amounts[-1].group(0))
+            value = _parse_money(amounts[-2].group(0))
+            if balance is None or value is None:
+                continue
+            # Extracted text loses empty debit/credit cells; the balance movement gives the side.
+            if previous_balance is not None and balance < previous_balance:
+                amount = -abs(value)
+            elif previous_balance is not None:
+                amount = abs(value)
+            else:
+                amount = -abs(value) if BOUNCE_RE.search(description) or MANDATE_RE.search(description) else abs(value)
+            previous_balance = balance
+            yield day, amount, balance, description
+
+
+def load_transactions(file_path: str, content_type: Optional[str] = None) -> TransactionColumns:
+    """Stream a CSV or PDF bank statement into columnar arrays."""
+    builder = _ColumnBuilder()
+    is_pdf = (content_type or "").lower() == "application/pdf" or Path(file_path).suffix.lower() == ".pdf"
+    if is_pdf:
+        rows: Iterator[Tuple[int, float, Optional[float], str]] = _iter_pdf_rows(iter_pdf_page_text(file_path))
+        for day, amount, balance, description in rows:
+            builder.add(day, amount, balance, description)
+    else:
+        with open(file_path, "r", encoding="utf-8-sig", errors="replace", newline="") as f:
+            for day, amount, balance, description in _iter_csv_rows(f):
+                builder.add(day, amount, balance, description)
+    return builder.build()
+
+
+def _month_index(days: np.ndarray) -> np.ndarray:
+    return days.astype("datetime64[D]").astype("datetime64[M]").astype(np.int64)
+
+
+def _average_monthly_balance(tx: TransactionColumns) -> Optional[float]:
+    """Average of end-of-day balances across every calendar day, carried forward over idle days."""
+    has_balance = ~np.isnan(tx.balance)
+    if not has_balance.any():
+        return None
+    day = tx.day[has_balance]
+    balance = tx.balance[has_balance]
+    order = np.argsort(day, kind="stable")
+    day, balance = day[order], balance[order]
+    # Last row of each day is the end-of-day balance.
+    last_of_day = np.r_[day[1:] != day[:-1], True]
+    eod_day, eod_balance = day[last_of_day], balance[last_of_day]
+    all_days = np.arange(eod_day[0], eod_day[-1] + 1, dtype=np.int64)
+    filled = eod_balance[np.searchsorted(eod_day, all_days, side="right") - 1]
+    months = _month_index(all_days)
+    month_ids, inverse = np.unique(months, return_inverse=True)
+    per_month = np.bincount(inverse, weights=filled) / np.bincount(inverse)
+    return float(per_month.mean()) if month_ids.size else None
+
+
+def _recurring_emis(tx: TransactionColumns, months: np.ndarray) -> Tuple[float, List[Dict[str, Any]]]:
+    is_debit = (tx.amount < 0) & ((tx.flags & FLAG_BOUNCE) == 0)
+    emi_like = (tx.flags & (FLAG_EMI_KEYWORD | FLAG_MANDATE)) != 0
+    candidate = is_debit & emi_like
+    if not candidate.any():
+        return 0.0, []
+
+    payee = tx.payee[candidate].astype(np.int64)
+    amount = -tx.amount[candidate]
+    month = months[candidate]
+    n_payees = len(tx.payees)
+
+    count = np.bincount(payee, minlength=n_payees)
+    total = np.bincount(payee, weights=amount, minlength=n_payees)
+    total_sq = np.bincount(payee, weights=amount * amount, minlength=n_payees)
+    distinct_pairs = np.unique(payee * (month.max() + 1) + month)
+    distinct_months = np.bincount(distinct_pairs // (month.max() + 1), minlength=n_payees)
+    last_month = np.full(n_payees, np.iinfo(np.int64).min)
+    np.maximum.at(last_month, payee, month)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        mean = total / count
+        cv = np.sqrt(np.maximum(total_sq / count - mean * mean, 0.0)) / mean
+    statement_months = int(np.unique(months).size)
+    required_months = min(MIN_RECURRING_MONTHS, statement_months)
+    latest_month = int(months.max())
+    recurring = (
+        (count > 0)
+        & (distinct_months >= required_months)
+        & (cv <= MAX_EMI_AMOUNT_CV)
+        # Loans that stopped debiting before the last two months are treated as closed.
+        & (last_month >= latest_month - 1)
+    )
+    details = [
+        {
+            "payee": tx.payees[idx],
+            "monthly_amount": round(float(mean[idx]), 2),
+            "months_observed": int(distinct_months[idx]),
+        }
+        for idx in np.flatnonzero(recurring)
+    ]
+    return round(float(mean[recurring].sum()), 2), details
+
+
+def analyze_transactions(tx: TransactionColumns) -> Dict[str, Any]:
+    """Vectorized statement aggregates: balances, salary credits, EMI-like debits and bounces."""
+    if len(tx) == 0:
+        return {"parsed": False, "reason": "No transactions found in statement.", "transaction_count": 0}
+
+    months = _month_index(tx.day)
+    month_ids = np.unique(months)
+    credits = tx.amount > 0
+    salary = credits & ((tx.flags & FLAG_SALARY) != 0)
+    salary_months = np.unique(months[salary]).size
+    salary_total = float(tx.amount[salary].sum())
+    existing_emis, emi_details = _recurring_emis(tx, months)
+    amb = _average_monthly_balance(tx)
+
+    return {
+        "parsed": True,
+        "transaction_count": len(tx),
+        "period_start": str(np.datetime64(int(tx.day.min()), "D")),
+        "period_end": str(np.datetime64(int(tx.day.max()), "D")),
+        "months_covered": int(month_ids.size),
+        "total_credits": round(float(tx.amount[credits].sum()), 2),
+        "total_debits": round(float(-tx.amount[~credits].sum()), 2),
+        "average_monthly_balance": round(amb, 2) if amb is not None else None,
+        "salary_credit_count": int(salary.sum()),
+        "average_monthly_salary": round(salary_total / salary_months, 2) if salary_months else None,
+        "recurring_emis": emi_details,
+        "existing_emis": existing_emis,
+        "bounce_count": int(((tx.flags & FLAG_BOUNCE) != 0).sum()),
+    }
+
+
+def analyze_bank_statement(file_path: str, content_type: Optional[str] = None) -> Dict[str, Any]:
+    """Parse and analyse a bank statement on disk."""
+    try:
+        tx = load_transactions(file_path, content_type)
+    except OSError:
+        return {"parsed": False, "reason": "File missing or unreadable."}
+    return analyze_transactions(tx)
+
+
+async def aanalyze_bank_statement(file_path: str, content_type: Optional[str] = None) -> Dict[str, Any]:
+    """Run statement analysis in a worker thread to keep the event loop free."""
+    return await asyncio.to_thread(analyze_bank_statement, file_path, content_type)
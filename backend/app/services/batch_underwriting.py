@@ -0,0 +1,327 @@
+from __future__ import annotations
+
+import csv
+import io
+import json
+from itertools import islice
+from pathlib import Path
+from typing import IO, Any, Dict, Iterable, Iterator, List, Optional, Union
+
+import numpy as np
+
+from app.services.emi import calculate_emi_array
+from app.services.policy_engine import NO_MATCH_RULE, CompiledPolicy
+from app.services.pricing_service import get_pricing_grid
+from app.services.tools import FOIR_BANDS, FOIR_OVER_LIMIT_STATUS, MAX_EMI_SHARE
+
+DEFAULT_CHUNK_ROWS = 65_536
+
+REQUIRED_COLUMNS = ("credit_score", "preapproved_limit", "requested_amount", "monthly_income", "tenure_months")
+# A missing or blank interest_rate is priced from the rate card (see ``pricing_service``).
+NUMERIC_DEFAULTS = {
+    "existing_emis": 0.0,
+    "interest_rate": np.nan,
+    "verified_monthly_income": np.nan,
+}
+PRICING_COLUMNS = ("employer_tier", "purpose_category")
+ID_COLUMNS = ("application_id", "thread_id", "customer_id")
+TRUE_STRINGS = {"1", "true", "yes", "y", "t"}
+
+OUTPUT_COLUMNS = (
+    "application_id",
+    "emi",
+    "foir_percentage",
+    "affordability_status",
+    "emi_ratio",
+    "limit_ratio",
+    "available_for_new_emi",
+    "rule_id",
+    "decision",
+    "confidence",
+)
+
+_FOIR_LIMITS = np.array([limit for limit, _ in FOIR_BANDS], dtype=np.float64)
+_FOIR_LABELS = np.array([label for _, label in FOIR_BANDS] + [FOIR_OVER_LIMIT_STATUS], dtype=object)
+
+Chunk = Dict[str, np.ndarray]
+
+
+def _float_column(values: Iterable[Any]) -> np.ndarray:
+    values = list(values)
+    try:
+        return np.asarray(values, dtype=np.float64)
+    except (TypeError, ValueError):
+        out = np.empty(len(values), dtype=np.float64)
+        for i, value in enumerate(values):
+            try:
+                out[i] = float(value)
+            except (TypeError, ValueError):
+                out[i] = np.nan
+        return out
+
+
+def _bool_column(values: Iterable[Any]) -> np.ndarray:
+    return np.fromiter((str(v).strip().lower() in TRUE_STRINGS for v in values), dtype=bool)
+
+
+def _finish_chunk(columns: Dict[str, Any], size: int) -> Chunk:
+    """Coerce raw columns to typed arrays and fill optional columns."""
+    missing = [name for name in REQUIRED_COLUMNS if name not in columns]
+    if missing:
+        raise ValueError(f"Batch is missing required column(s): {', '.join(missing)}")
+    chunk: Chunk = {name: _float_column(columns[name]) for name in REQUIRED_COLUMNS}
+    for name, default in NUMERIC_DEFAULTS.items():
+        chunk[name] = _float_column(columns[name]) if name in columns else np.full(size, default)
+    for name in PRICING_COLUMNS:
+        if name in columns:
+            chunk[name] = np.asarray(columns[name], dtype=object)
+    chunk["documents_verified"] = (
+        _bool_column(columns["documents_verified"]) if "documents_verified" in columns else np.zeros(size, dtype=bool)
+    )
+    id_column = next((name for name in ID_COLUMNS if name in columns), None)
+    chunk["application_id"] = (
+        np.asarray(columns[id_column], dtype=object) if id_column else np.arange(size).astype(str).astype(object)
+    )
+    return chunk
+
+
+def chunk_from_records(records: List[Dict[str, Any]]) -> Chunk:
+    """Build one chunk from row dicts (e.g. applications read back from checkpoints)."""
+    names = list(dict.fromkeys(name for record in records for name in record))
+    columns = {name: [record.get(name) for record in records] for name in names}
+    return _finish_chunk(columns, len(records))
+
+
+def _checked_rows(reader: Iterator[List[str]], width: int) -> Iterator[List[str]]:
+    """Data rows with the header's width; a ragged row is an error, never dropped."""
+    for row in reader:
+        if not row:
+            continue  # blank line, as csv.DictReader skips it
+        if len(row) != width:
+            raise ValueError(
+                f"Batch line {reader.line_num} has {len(row)} field(s); the header has {width}"
+            )
+        yield row
+
+
+def iter_csv_chunks(stream: IO[str], chunk_rows: int = DEFAULT_CHUNK_ROWS) -> Iterator[Chunk]:
+    reader = csv.reader(stream)
+    header = [h.strip().lower() for h in next(reader, [])]
+    rows_in = _checked_rows(reader, len(header))
+    offset = 0
+    while True:
+        rows = list(islice(rows_in, chunk_rows))
+        if not rows:
+            return
+        columns = dict(zip(header, zip(*rows)))
+        chunk = _finish_chunk(columns, len(rows))
+        if not any(name in columns for name in ID_COLUMNS):
+            chunk["application_id"] = np.arange(offset, offset + len(rows)).astype(str).astype(object)
+        offset += len(rows)
+        yield chunk
+
+
+def _iter_arrow_chunks(source: Union[str, Path, IO[bytes]], fmt: str, chunk_rows: int) -> Iterator[Chunk]:
+    try:
+        import pyarrow as pa  # optional dependency
+        import pyarrow.parquet as pq
+    except ImportError as exc:
+        raise ValueError(f"pyarrow is required to read {fmt} batches.") from exc
+
+    if fmt == "parquet":
+        batches = pq.ParquetFile(source).iter_batches(batch_size=chunk_rows)
+    else:
+        try:
+            reader = pa.ipc.open_file(source)
+            batches = (reader.get_batch(i) for i in range(reader.num_record_batches))
+        except pa.ArrowInvalid:
+            if hasattr(source, "seek"):
+                source.seek(0)
+            batches = iter(pa.ipc.open_stream(source))
+
+    offset = 0
+    for batch in batches:
+        for start in range(0, batch.num_rows, chunk_rows):
+            piece = batch.slice(start, chunk_rows)
+            columns = {
+                name.lower(): piece.column(i).to_numpy(zero_copy_only=False)
+                for i, name in enumerate(piece.schema.names)
+            }
+            chunk = _finish_chunk(columns, piece.num_rows)
+            if not any(name in columns for name in ID_COLUMNS):
+                chunk["application_id"] = np.arange(offset, offset + piece.num_rows).astype(str).astype(object)
+            offset += piece.num_rows
+            yield chunk
+
+
+def detect_format(filename: str) -> str:
+    suffix = Path(filename).suffix.lower()
+    if suffix in {".parquet", ".pq"}:
+        return "parquet"
+    if suffix in {".arrow", ".feather", ".ipc"}:
+        return "arrow"
+    return "csv"
+
+
+def iter_batch_chunks(
+    source: Union[str, Path, IO[bytes]],
+    fmt: Optional[str] = None,
+    chunk_rows: int = DEFAULT_CHUNK_ROWS,
+) -> Iterator[Chunk]:
+    """Read a CSV/Parquet/Arrow batch as bounded-size columnar chunks."""
+    fmt = fmt or detect_format(str(getattr(source, "name", source)))
+    if fmt in {"parquet", "arrow"}:
+        yield from _iter_arrow_chunks(source, fmt, chunk_rows)
+        return
+    if isinstance(source, (str, Path)):
+        with open(source, "r", encoding="utf-8", newline="") as f:
+            yield from iter_csv_chunks(f, chunk_rows)
+        return
+    # Binary streams are wrapped, not owned: the caller closes the file.
+    text = io.TextIOWrapper(source, encoding="utf-8", newline="")
+    try:
+        yield from iter_csv_chunks(text, chunk_rows)
+    finally:
+        text.detach()
+
+
+def chunk_facts(chunk: Chunk) -> Chunk:
+    """Columnar policy facts for one chunk (the array form of ``underwriting_facts``).
+
+    Mirrors ``underwriting_agent_node``: the salary-slip income wins over the
+    declared one and EMI follows ``emi.calculate_emi``. Rows without an
+    ``interest_rate`` are priced from the rate card like the chat flow.
+    """
+    declared = np.nan_to_num(chunk["monthly_income"], nan=0.0)
+    verified = chunk["verified_monthly_income"]
+    income = np.where(np.isfinite(verified) & (verified > 0), verified, declared)
+    requested = np.nan_to_num(chunk["requested_amount"], nan=0.0)
+    tenure = np.nan_to_num(chunk["tenure_months"], nan=0.0)
+
+    rate = chunk["interest_rate"]
+    unpriced = ~np.isfinite(rate)
+    if unpriced.any():
+        priced = get_pricing_grid().rates(
+            chunk["credit_score"],
+            chunk.get("employer_tier"),
+            chunk.get("purpose_category"),
+        )
+        rate = np.where(unpriced, priced, rate)
+    emi = np.round(calculate_emi_array(requested, rate, tenure), 2)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        emi_ratio = np.where(income > 0, emi / income, np.inf)
+
+    return {
+        "credit_score": np.nan_to_num(chunk["credit_score"], nan=0.0),
+        "preapproved_limit": np.nan_to_num(chunk["preapproved_limit"], nan=0.0),
+        "requested_amount": requested,
+        "monthly_income": income,
+        "emi": emi,
+        "emi_ratio": emi_ratio,
+        "existing_emis": np.nan_to_num(chunk["existing_emis"], nan=0.0),
+        "tenure_months": tenure,
+        "documents_verified": chunk["documents_verified"],
+    }
+
+
+def underwrite_chunk(chunk: Chunk, policy: CompiledPolicy) -> Chunk:
+    """Vectorised EMI, FOIR, limit ratios and policy outcome for one chunk.
+
+    Facts come from ``chunk_facts``; the FOIR bands follow ``check_affordability``.
+    """
+    facts = chunk_facts(chunk)
+    income = facts["monthly_income"]
+    existing = facts["existing_emis"]
+    requested = facts["requested_amount"]
+    preapproved = facts["preapproved_limit"]
+    emi = facts["emi"]
+    emi_ratio = facts["emi_ratio"]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        foir = np.where(income > 0, (existing + emi) / income * 100, np.inf)
+        limit_ratio = np.where(preapproved > 0, requested / preapproved, np.inf)
+
+    rule_idx = policy.evaluate_batch(facts)
+    # Index -1 (no rule matched) lands on the trailing NO_MATCH entry.
+    rules = list(policy.rules) + [NO_MATCH_RULE]
+    rule_ids = np.array([r.id for r in rules], dtype=object)
+    decisions = np.array([r.decision for r in rules], dtype=object)
+    confidences = np.array([r.confidence for r in rules], dtype=np.float64)
+
+    return {
+        "application_id": chunk["application_id"],
+        "emi": emi,
+        "foir_percentage": np.round(foir, 2),
+        "affordability_status": _FOIR_LABELS[np.searchsorted(_FOIR_LIMITS, foir, side="right")],
+        "emi_ratio": np.round(emi_ratio, 4),
+        "limit_ratio": np.round(limit_ratio, 4),
+        "available_for_new_emi": np.round(income * MAX_EMI_SHARE - existing, 2),
+        "rule_id": rule_ids[rule_idx],
+        "decision": decisions[rule_idx],
+        "confidence": confidences[rule_idx],
+    }
+
+
+def _cell(value: Any) -> Any:
+    return None if isinstance(value, float) and not np.isfinite(value) else value
+
+
+def format_chunk(result: Chunk, output_format: str, header: bool = False) -> str:
+    columns = [result[name].tolist() for name in OUTPUT_COLUMNS]
+    buffer = io.StringIO()
+    if output_format == "jsonl":
+        for row in zip(*columns):
+            buffer.write(json.dumps(dict(zip(OUTPUT_COLUMNS, map(_cell, row)))))
+            buffer.write("\n")
+        return buffer.getvalue()
+    writer = csv.writer(buffer, lineterminator="\n")
+    if header:
+        writer.writerow(OUTPUT_COLUMNS)
+    writer.writerows(zip(*columns))
+    return buffer.getvalue()
+
+
+class BatchSummary:
+    """Running totals while a batch streams through."""
+
+    def __init__(self, policy_version: str) -> None:
+        self.policy_version = policy_version
+        self.rows = 0
+        self.decisions: Dict[str, int] = {}
+
+    def add(self, result: Chunk) -> None:
+        self.rows += len(result["decision"])
+        labels, counts = np.unique(result["decision"].astype(str), return_counts=True)
+        for label, count in zip(labels.tolist(), counts.tolist()):
+            self.decisions[label] = self.decisions.get(label, 0) + count
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {"policy_version": self.policy_version, "rows": self.rows, "decisions": dict(self.decisions)}
+
+
+def stream_underwriting(
+    chunks: Iterable[Chunk],
+    policy: CompiledPolicy,
+    output_format: str = "csv",
+    summary: Optional[BatchSummary] = None,
+) -> Iterator[str]:
+    """Yield formatted decisions chunk by chunk; memory stays bounded by chunk size."""
+    if output_format not in {"csv", "jsonl"}:
+        raise ValueError("output_format must be 'csv' or 'jsonl'")
+    first = True
+    for chunk in chunks:
+        result = underwrite_chunk(chunk, policy)
+        if summary is not None:
+            summary.add(result)
+        yield format_chunk(result, output_format, header=first)
+        first = False
+
+
+def parse_param_overrides(pairs: List[str]) -> Dict[str, float]:
+    """Parse ``name=value`` threshold overrides from the CLI or API."""
+    overrides: Dict[str, float] = {}
+    for pair in pairs:
+        name, sep, value = pair.partition("=")
+        if not sep:
+            raise ValueError(f"Expected name=value, got '{pair}'")
+        overrides[name.strip()] = float(value)
+    return overrides
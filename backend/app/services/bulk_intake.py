@@ -0,0 +1,266 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import os
+import time
+import uuid
+from collections import deque
+from concurrent.futures import Executor, ProcessPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+from pydantic import ValidationError
+
+from app.graph.nodes import underwrite_structured_application, verify_structured_application
+from app.models.intake import ApplicationRequest, intake_state
+from app.models.state import ToolCall
+from app.services.bureau_cache import get_bureau_cache
+from app.services.bureau_client import BureauError, InquiryBatcher, get_bureau
+from app.services.customer_index import get_customer_index
+
+DEFAULT_CONCURRENCY = 32
+DEFAULT_MARKER_EVERY = 200
+STAGES = ("validate", "verify", "bureau", "underwrite")
+
+
+def progress_marker_path(output: Path) -> Path:
+    return output.with_name(output.name + ".progress")
+
+
+@dataclass
+class ProgressMarker:
+    """How far a bulk run got: input consumed and output known-good, both in bytes."""
+
+    input_offset: int = 0
+    output_bytes: int = 0
+    lines: int = 0  # input lines consumed, including blank ones
+
+    @classmethod
+    def load(cls, path: Path) -> "ProgressMarker":
+        try:
+            data = json.loads(path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return cls()
+        return cls(int(data["input_offset"]), int(data["output_bytes"]), int(data["lines"]))
+
+    def save(self, path: Path) -> None:
+        tmp = path.with_name(f".{path.name}.{uuid.uuid4().hex[:6]}")
+        tmp.write_text(json.dumps(self.__dict__), encoding="utf-8")
+        os.replace(tmp, path)
+
+
+@dataclass
+class StageStats:
+    count: int = 0
+    busy_s: float = 0.0
+    latencies: List[float] = field(default_factory=list)
+
+    def add(self, seconds: float) -> None:
+        self.count += 1
+        self.busy_s += seconds
+        self.latencies.append(seconds)
+
+    def as_dict(self) -> Dict[str, Any]:
+        ordered = sorted(self.latencies)
+        p95 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))] if ordered else 0.0
+        return {
+            "count": self.count,
+            "busy_s": round(self.busy_s, 3),
+            "avg_ms": round(self.busy_s / self.count * 1000, 3) if self.count else 0.0,
+            "p95_ms": round(p95 * 1000, 3),
+            # What a single lane sustains; concurrency/workers multiply it.
+            "per_lane_per_s": round(self.count / self.busy_s, 1) if self.busy_s else None,
+        }
+
+
+def _underwrite_sync(state: Dict[str, Any]) -> Tuple[Dict[str, Any], float]:
+    """Process-pool entry point: policy, counter-offer search and letter rendering are CPU-bound."""
+    start = time.perf_counter()
+    final_state = asyncio.run(underwrite_structured_application(state))
+    return final_state, time.perf_counter() - start
+
+
+def summarize(line: int, final_state: Dict[str, Any]) -> Dict[str, Any]:
+    loan_data = final_state["loan_data"]
+    interrupt = final_state.get("interrupt_signal") or {}
+    letter = final_state.get("sanction_letter_path") or {}
+    return {
+        "line": line,
+        "thread_id": final_state.get("thread_id"),
+        "status": final_state.get("application_status"),
+        "decision": final_state.get("underwriting_decision"),
+        "underwriting_rule": final_state.get("underwriting_rule"),
+        "rejection_reason": final_state.get("rejection_reason"),
+        "requires_action": interrupt.get("type"),
+        "credit_score": loan_data.credit_score,
+        "preapproved_limit": loan_data.preapproved_limit,
+        "interest_rate": loan_data.interest_rate,
+        "emi": loan_data.calculated_emi,
+        "counter_offer": loan_data.counter_offer,
+        "sanction_reference": letter.get("referenceNumber") if isinstance(letter, dict) else None,
+    }
+
+
+class BulkProcessor:
+    """Stream JSONL applications through verification and underwriting.
+
+    At most ``concurrency`` records are in flight; verification runs on the
+    event loop and underwriting in ``executor`` (a process pool, or inline
+    when None). Results are written in input order, so the output plus the
+    progress marker is always a clean prefix of the input and a crashed run
+    resumes exactly where it stopped.
+    """
+
+    def __init__(
+        self,
+        concurrency: int = DEFAULT_CONCURRENCY,
+        executor: Optional[Executor] = None,
+        marker_every: int = DEFAULT_MARKER_EVERY,
+        thread_prefix: str = "bulk",
+    ) -> None:
+        self.concurrency = max(1, concurrency)
+        self.executor = executor
+        self.marker_every = max(1, marker_every)
+        self.thread_prefix = thread_prefix
+        self.stats = {stage: StageStats() for stage in STAGES}
+        self.outcomes: Dict[str, int] = {}
+        self.batcher: Optional[InquiryBatcher] = None
+
+    async def _pull_credit(self, state: Dict[str, Any]) -> Dict[str, Any]:
+        """Bureau pull through the shared cache, coalesced with other in-flight records into batch inquiries.
+
+        The score is stored as already derived, so underwriting (possibly in a
+        worker process with its own cache) does not pull again.
+        """
+        loan_data = state["loan_data"]
+        if not loan_data.is_stale("credit_score"):
+            return state
+        if self.batcher is None:
+            self.batcher = InquiryBatcher(get_bureau())
+        batcher = self.batcher
+        try:
+            result, source = await get_bureau_cache().aget_or_fetch(
+                loan_data.pan,
+                loan_data.aadhaar,
+                lambda: batcher.inquire(loan_data.pan, loan_data.aadhaar, loan_data.monthly_income),
+            )
+        except BureauError:
+            return state  # underwriting retries the pull itself
+        loan_data.credit_score = result.get("credit_score")
+        loan_data.mark_derived("credit_score")
+        get_customer_index().record("bureau", loan_data.pan, loan_data.mobile, {"credit_score": loan_data.credit_score})
+        call = ToolCall(
+            tool_name="fetch_credit_score",
+            arguments={"pan": loan_data.pan},
+            result=json.dumps({**result, "source": source}),
+        )
+        return {**state, "loan_data": loan_data, "tool_calls": list(state.get("tool_calls") or []) + [call]}
+
+    async def _process(self, line: int, text: str) -> Dict[str, Any]:
+        # One bad record must not abort the run (and every resume after it).
+        try:
+            return await self._process_record(line, text)
+        except Exception as exc:
+            return {"line": line, "status": "error", "error": f"{type(exc).__name__}: {exc}"}
+
+    async def _process_record(self, line: int, text: str) -> Dict[str, Any]:
+        start = time.perf_counter()
+        try:
+            request = ApplicationRequest.model_validate_json(text)
+        except ValidationError as exc:
+            self.stats["validate"].add(time.perf_counter() - start)
+            return {"line": line, "status": "invalid", "errors": exc.errors(include_url=False, include_context=False)}
+        self.stats["validate"].add(time.perf_counter() - start)
+
+        thread_id = request.thread_id or f"{self.thread_prefix}_{line}"
+        start = time.perf_counter()
+        state, verified = await verify_structured_application(intake_state(request, thread_id))
+        self.stats["verify"].add(time.perf_counter() - start)
+        if not verified:
+            return summarize(line, state)
+
+        start = time.perf_counter()
+        state = await self._pull_credit(state)
+        self.stats["bureau"].add(time.perf_counter() - start)
+
+        if self.executor is None:
+            start = time.perf_counter()
+            final_state = await underwrite_structured_application(state)
+            seconds = time.perf_counter() - start
+        else:
+            loop = asyncio.get_running_loop()
+            final_state, seconds = await loop.run_in_executor(self.executor, _underwrite_sync, state)
+        self.stats["underwrite"].add(seconds)
+        return summarize(line, final_state)
+
+    async def run(self, input_path: Path, output_path: Path, resume: bool = True) -> Dict[str, Any]:
+        marker_path = progress_marker_path(output_path)
+        marker = ProgressMarker.load(marker_path) if resume else ProgressMarker()
+        if not resume or not output_path.exists():
+            marker = ProgressMarker()
+            marker_path.unlink(missing_ok=True)
+
+        started = time.perf_counter()
+        resumed_from = marker.lines
+        written = 0
+        window: Deque[Tuple[int, asyncio.Task]] = deque()
+
+        with open(input_path, "rb") as src, open(output_path, "ab" if marker.output_bytes else "wb") as out:
+            # Anything past the marker was written after the last checkpoint; redo it.
+            out.truncate(marker.output_bytes)
+            src.seek(marker.input_offset)
+            offset = marker.input_offset
+            line = marker.lines
+
+            async def write_head() -> None:
+                nonlocal written
+                line_no, task = window.popleft()
+                record = await task
+                status = record.get("status") or "unknown"
+                self.outcomes[status] = self.outcomes.get(status, 0) + 1
+                out.write(json.dumps(record, default=str).encode("utf-8") + b"\n")
+                written += 1
+                input_offset = offsets.pop(line_no)
+                if written % self.marker_every == 0:
+                    self._checkpoint(out, marker, marker_path, input_offset, line_no)
+
+            offsets: Dict[int, int] = {}
+            for raw in src:
+                offset += len(raw)
+                line += 1
+                text = raw.decode("utf-8", errors="replace").strip()
+                if not text:
+                    continue
+                if len(window) >= self.concurrency:
+                    await write_head()
+                offsets[line] = offset
+                window.append((line, asyncio.create_task(self._process(line, text))))
+            while window:
+                await write_head()
+            self._checkpoint(out, marker, marker_path, offset, line)
+
+        elapsed = time.perf_counter() - started
+        return {
+            "records": written,
+            "resumed_from_line": resumed_from,
+            "elapsed_s": round(elapsed, 3),
+            "records_per_s": round(written / elapsed, 1) if elapsed > 0 else None,
+            "concurrency": self.concurrency,
+            "outcomes": dict(self.outcomes),
+            "stages": {stage: stats.as_dict() for stage, stats in self.stats.items()},
+        }
+
+    @staticmethod
+    def _checkpoint(out: Any, marker: ProgressMarker, path: Path, input_offset: int, line: int) -> None:
+        out.flush()
+        os.fsync(out.fileno())
+        marker.input_offset = input_offset
+        marker.output_bytes = out.tell()
+        marker.lines = line
+        marker.save(path)
+
+
+def process_pool(workers: int) -> Optional[Executor]:
+    return ProcessPoolExecutor(max_workers=workers) if workers > 0 else None
@@ -0,0 +1,108 @@
+from __future__ import annotations
+
+import hashlib
+import secrets
+import sqlite3
+import time
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+from app.services.ttl_cache import TTLCache
+from app.settings import settings
+
+DAY_S = 86400.0
+
+
+def identity_key(salt: str, pan: Optional[str], aadhaar: Optional[str]) -> Optional[str]:
+    """Salted SHA-256 of the normalised PAN and Aadhaar; None when neither is known."""
+    pan = (pan or "").strip().upper()
+    aadhaar = "".join(ch for ch in (aadhaar or "") if ch.isdigit())
+    if not pan and not aadhaar:
+        return None
+    return hashlib.sha256(f"{salt}\x00{pan}\x00{aadhaar}".encode("utf-8")).hexdigest()
+
+
+class BureauCache(TTLCache):
+    """TTL cache for credit bureau results, keyed by a salted hash of PAN and Aadhaar.
+
+    An in-process LRU answers repeat pulls within a worker; the optional SQLite
+    file is shared by every worker on the host, so a report bought by one is
+    reused by all until it expires. Raw identifiers are never stored.
+    """
+
+    def __init__(
+        self,
+        ttl_s: float,
+        salt: str,
+        sqlite_path: Optional[Path] = None,
+        max_entries: int = 10000,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        super().__init__(ttl_s, sqlite_path, max_entries, clock, table="bureau_results")
+        self.salt = salt
+        self.counters["forced_refreshes"] = 0
+
+    def _cached(self, key: Optional[str], force_refresh: bool) -> Tuple[Optional[Dict[str, Any]], Optional[str]]:
+        if key is None:
+            return None, None
+        if force_refresh:
+            with self._lock:
+                self.counters["forced_refreshes"] += 1
+            return None, None
+        return self.get(key)
+
+    def get_or_fetch(
+        self,
+        pan: Optional[str],
+        aadhaar: Optional[str],
+        fetch: Callable[[], Dict[str, Any]],
+        force_refresh: bool = False,
+    ) -> Tuple[Dict[str, Any], str]:
+        """Bureau result for an identity and where it came from ("memory", "sqlite" or "bureau")."""
+        key = identity_key(self.salt, pan, aadhaar)
+        result, tier = self._cached(key, force_refresh)
+        if result is not None:
+            return result, tier  # type: ignore[return-value]
+        result = fetch()
+        if key is not None:
+            self.put(key, result)
+        return result, "bureau"
+
+    async def aget_or_fetch(
+        self,
+        pan: Optional[str],
+        aadhaar: Optional[str],
+        fetch: Callable[[], Awaitable[Dict[str, Any]]],
+        force_refresh: bool = False,
+    ) -> Tuple[Dict[str, Any], str]:
+        """Async get_or_fetch for the bureau client; failed pulls are not cached."""
+        key = identity_key(self.salt, pan, aadhaar)
+        result, tier = self._cached(key, force_refresh)
+        if result is not None:
+            return result, tier  # type: ignore[return-value]
+        result = await fetch()
+        if key is not None:
+            self.put(key, result)
+        return result, "bureau"
+
+    def stats(self) -> Dict[str, Any]:
+        return {**super().stats(), "ttl_days": round(self.ttl_s / DAY_S, 2)}
+
+
+@lru_cache()
+def get_bureau_cache() -> BureauCache:
+    """Get singleton bureau cache"""
+    salt = settings.bureau_cache_salt
+    sqlite_path = Path(settings.bureau_cache_path) if settings.bureau_cache_path else None
+    if not salt:
+        # Without a configured salt, keys cannot match across workers, so stay in-process.
+        salt = secrets.token_hex(16)
+        if sqlite_path is not None:
+            print("⚠️ BUREAU_CACHE_SALT is not set; bureau cache is in-process only")
+            sqlite_path = None
+    try:
+        return BureauCache(settings.bureau_cache_ttl_days * DAY_S, salt, sqlite_path, settings.bureau_cache_max_entries)
+    except sqlite3.Error as exc:
+        print(f"⚠️ Bureau cache SQLite tier unavailable, using memory only: {exc}")
+        return BureauCache(settings.bureau_cache_ttl_days * DAY_S, salt, None, settings.bureau_cache_max_entries)
@@ -0,0 +1,251 @@
+from __future__ import annotations
+
+import asyncio
+import random
+import time
+import weakref
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Union
+
+import httpx
+
+from app.services.credit_bureau import fetch_credit_score
+from app.settings import settings
+
+# Status codes worth retrying: the bureau is overloaded or briefly down.
+RETRYABLE_STATUS = frozenset({429, 500, 502, 503, 504})
+MAX_BATCH = 100
+
+
+class BureauError(RuntimeError):
+    """Raised when a bureau inquiry fails after retries."""
+
+
+class BureauUnavailable(BureauError):
+    """Raised without calling out while the circuit breaker is open."""
+
+
+class CircuitBreaker:
+    """Opens after ``failure_threshold`` consecutive failures; lets one probe through after ``reset_after_s``."""
+
+    def __init__(self, failure_threshold: int = 5, reset_after_s: float = 30.0) -> None:
+        self.failure_threshold = max(1, failure_threshold)
+        self.reset_after_s = reset_after_s
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        self._probing = False
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        if time.monotonic() - self.opened_at >= self.reset_after_s:
+            return "half_open"
+        return "open"
+
+    def allow(self) -> bool:
+        state = self.state
+        if state == "closed":
+            return True
+        if state == "half_open" and not self._probing:
+            self._probing = True
+            return True
+        return False
+
+    def record_success(self) -> None:
+        self.failures = 0
+        self.opened_at = None
+        self._probing = False
+
+    def record_failure(self) -> None:
+        self.failures += 1
+        if self._probing or self.failures >= self.failure_threshold:
+            self.opened_at = time.monotonic()
+        self._probing = False
+
+
+def _inquiry(pan: Optional[str], aadhaar: Optional[str], monthly_income: Optional[float]) -> Dict[str, Any]:
+    return {"pan": pan, "aadhaar": aadhaar, "monthly_income": monthly_income}
+
+
+class BureauClient:
+    """Async HTTP client for the credit bureau.
+
+    One pooled ``httpx.AsyncClient`` per instance (keep-alive, bounded
+    connections), a per-request timeout, retries with full-jitter exponential
+    backoff on transport errors and 429/5xx, and a circuit breaker so a bureau
+    outage fails fast instead of tying up every underwriting call.
+    """
+
+    def __init__(
+        self,
+        base_url: str,
+        timeout_s: float = 2.0,
+        max_connections: int = 20,
+        retries: int = 2,
+        backoff_s: float = 0.1,
+        breaker: Optional[CircuitBreaker] = None,
+        transport: Optional[httpx.AsyncBaseTransport] = None,
+    ) -> None:
+        self.retries = max(0, retries)
+        self.backoff_s = backoff_s
+        self.breaker = breaker or CircuitBreaker()
+        self.stats = {"requests": 0, "retries": 0, "failures": 0, "rejected_open": 0}
+        self._http = httpx.AsyncClient(
+            base_url=base_url,
+            timeout=httpx.Timeout(timeout_s),
+            limits=httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections),
+            transport=transport,
+        )
+
+    async def _post(self, path: str, payload: Dict[str, Any]) -> Dict[str, Any]:
+        if not self.breaker.allow():
+            self.stats["rejected_open"] += 1
+            raise BureauUnavailable("Credit bureau circuit is open")
+        last_error: Optional[str] = None
+        settled = False
+        try:
+            for attempt in range(self.retries + 1):
+                if attempt:
+                    self.stats["retries"] += 1
+                    await asyncio.sleep(random.uniform(0, self.backoff_s * (2 ** (attempt - 1))))
+                self.stats["requests"] += 1
+                try:
+                    response = await self._http.post(path, json=payload)
+                except httpx.TransportError as exc:  # connect/read timeouts, resets, refused connections
+                    last_error = f"{type(exc).__name__}: {exc}"
+                    continue
+                if response.status_code in RETRYABLE_STATUS:
+                    last_error = f"HTTP {response.status_code}"
+                    continue
+                if response.status_code >= 400:
+                    # The inquiry itself is wrong; retrying will not help, and the bureau is up.
+                    self.breaker.record_success()
+                    settled = True
+                    raise BureauError(f"Bureau rejected inquiry: HTTP {response.status_code} {response.text[:200]}")
+                body = response.json()
+                self.breaker.record_success()
+                settled = True
+                return body
+            raise BureauError(f"Bureau inquiry failed after {self.retries + 1} attempts: {last_error}")
+        finally:
+            # Every other exit (retries exhausted, cancellation, a bad body) is a failure, so a
+            # half-open probe is always released and the breaker cannot stay shut for good.
+            if not settled:
+                self.stats["failures"] += 1
+                self.breaker.record_failure()
+
+    async def inquire(
+        self, pan: Optional[str], aadhaar: Optional[str], monthly_income: Optional[float]
+    ) -> Dict[str, Any]:
+        return await self._post("/v1/inquiries", _inquiry(pan, aadhaar, monthly_income))
+
+    async def inquire_batch(
+        self, inquiries: Sequence[Tuple[Optional[str], Optional[str], Optional[float]]]
+    ) -> List[Union[Dict[str, Any], BureauError]]:
+        """One result per inquiry, in order; a failed chunk or entry is returned as its BureauError."""
+        results: List[Union[Dict[str, Any], BureauError]] = []
+        for start in range(0, len(inquiries), MAX_BATCH):
+            chunk = inquiries[start:start + MAX_BATCH]
+            try:
+                body = await self._post("/v1/inquiries/batch", {"inquiries": [_inquiry(*item) for item in chunk]})
+            except BureauError as exc:
+                results.extend(exc for _ in chunk)
+                continue
+            for entry in body.get("results", []):
+                results.append(BureauError(entry["error"]) if "error" in entry else entry)
+        return results
+
+    async def aclose(self) -> None:
+        await self._http.aclose()
+
+
+class LocalBureau:
+    """In-process bureau model used when no BUREAU_URL is configured; same interface as BureauClient."""
+
+    async def inquire(
+        self, pan: Optional[str], aadhaar: Optional[str], monthly_income: Optional[float]
+    ) -> Dict[str, Any]:
+        return {"credit_score": fetch_credit_score(pan, aadhaar, monthly_income), "pulled_at": time.time()}
+
+    async def inquire_batch(
+        self, inquiries: Sequence[Tuple[Optional[str], Optional[str], Optional[float]]]
+    ) -> List[Union[Dict[str, Any], BureauError]]:
+        return [await self.inquire(*item) for item in inquiries]
+
+    async def aclose(self) -> None:
+        return None
+
+
+class InquiryBatcher:
+    """Coalesces single inquiries from concurrent tasks into batch calls.
+
+    A batch goes out when ``max_batch`` inquiries are waiting or ``max_wait_s``
+    after the first one arrived, whichever is sooner.
+    """
+
+    def __init__(self, bureau: Union[BureauClient, LocalBureau], max_batch: int = 50, max_wait_s: float = 0.005) -> None:
+        self.bureau = bureau
+        self.max_batch = max(1, min(max_batch, MAX_BATCH))
+        self.max_wait_s = max_wait_s
+        self._pending: List[Tuple[Tuple[Optional[str], Optional[str], Optional[float]], asyncio.Future]] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._in_flight: set = set()  # strong references, so sends are not garbage-collected mid-flight
+        self.batches = 0
+
+    async def inquire(
+        self, pan: Optional[str], aadhaar: Optional[str], monthly_income: Optional[float]
+    ) -> Dict[str, Any]:
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append(((pan, aadhaar, monthly_income), future))
+        if len(self._pending) >= self.max_batch:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.max_wait_s, self._flush)
+        return await future
+
+    def _flush(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        pending, self._pending = self._pending, []
+        if pending:
+            self.batches += 1
+            task = asyncio.ensure_future(self._send(pending))
+            self._in_flight.add(task)
+            task.add_done_callback(self._in_flight.discard)
+
+    async def _send(self, pending: List[Tuple[Tuple[Optional[str], Optional[str], Optional[float]], asyncio.Future]]) -> None:
+        try:
+            results = await self.bureau.inquire_batch([inquiry for inquiry, _ in pending])
+        except Exception as exc:  # surface unexpected failures to every waiter
+            results = [exc] * len(pending)
+        for (_, future), result in zip(pending, results):
+            if future.done():
+                continue
+            if isinstance(result, BaseException):
+                future.set_exception(result)
+            else:
+                future.set_result(result)
+
+
+# httpx connections belong to the event loop that opened them, so keep one client per loop.
+_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, BureauClient]" = weakref.WeakKeyDictionary()
+_local_bureau = LocalBureau()
+
+
+def get_bureau() -> Union[BureauClient, LocalBureau]:
+    """Bureau for the running event loop: the HTTP client when BUREAU_URL is set, else the local model."""
+    if not settings.bureau_url:
+        return _local_bureau
+    loop = asyncio.get_running_loop()
+    client = _clients.get(loop)
+    if client is None:
+        client = _clients[loop] = BureauClient(
+            settings.bureau_url,
+            timeout_s=settings.bureau_timeout_s,
+            max_connections=settings.bureau_max_connections,
+            retries=settings.bureau_retries,
+            breaker=CircuitBreaker(settings.bureau_breaker_failures, settings.bureau_breaker_reset_s),
+        )
+    return client
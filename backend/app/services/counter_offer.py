@@ -0,0 +1,109 @@
+from __future__ import annotations
+
+from dataclasses import asdict, dataclass
+from typing import Any, Dict, Mapping, Optional
+
+import numpy as np
+
+from app.services.emi import calculate_emi_array
+from app.services.policy_engine import CompiledPolicy
+
+# Same bounds as LoanApplicationDetails.tenure_months.
+MIN_TENURE_MONTHS = 6
+MAX_TENURE_MONTHS = 84
+TENURES = np.arange(MIN_TENURE_MONTHS, MAX_TENURE_MONTHS + 1)
+# Offers are quoted in round thousands, always rounded down so they stay within policy.
+AMOUNT_STEP = 1000.0
+
+
+@dataclass(frozen=True)
+class CounterOffer:
+    amount: float
+    tenure_months: int
+    emi: float
+    annual_rate_percent: float
+    rule_id: str
+    requires_documents: bool
+
+    def as_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+def _annuity_factor(monthly_rate: float, tenures: np.ndarray) -> np.ndarray:
+    """Principal repaid by an EMI of 1 over each tenure (EMI formula inverted)."""
+    if monthly_rate == 0:
+        return tenures.astype(np.float64)
+    return (1 - (1 + monthly_rate) ** -tenures.astype(np.float64)) / monthly_rate
+
+
+def find_counter_offer(
+    facts: Mapping[str, Any],
+    policy: CompiledPolicy,
+    annual_rate_percent: float = 12.5,
+) -> Optional[CounterOffer]:
+    """Largest amount below the request that the policy approves, with its tenure.
+
+    Candidates come from inverting the EMI formula per tenure (the most the
+    EMI cap allows), capped by the limit multiple and by the pre-approved
+    limit itself; the whole candidate grid is then run through the policy's
+    array plan, so the offer passes every rule rather than just the ones
+    modelled here. Among tenures giving the top amount, the one closest to
+    the customer's request wins.
+    """
+    requested = float(facts["requested_amount"])
+    limit = float(facts["preapproved_limit"])
+    income = float(facts["monthly_income"])
+    if requested <= 0 or limit <= 0:
+        return None
+
+    params = policy.params
+    cap = np.full(TENURES.size, requested - AMOUNT_STEP)
+    if "limit_multiplier" in params:
+        cap = np.minimum(cap, params["limit_multiplier"] * limit)
+    by_emi = cap.copy()
+    if "max_emi_ratio" in params and income > 0:
+        max_emi = params["max_emi_ratio"] * income
+        by_emi = np.minimum(cap, max_emi * _annuity_factor(annual_rate_percent / 1200, TENURES))
+    within_limit = np.minimum(cap, limit)
+
+    amounts = np.floor(np.concatenate([by_emi, within_limit]) / AMOUNT_STEP) * AMOUNT_STEP
+    tenures = np.concatenate([TENURES, TENURES])
+    emi = np.round(calculate_emi_array(amounts, annual_rate_percent, tenures), 2)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        emi_ratio = emi / income if income > 0 else np.full(amounts.size, np.inf)
+
+    size = amounts.size
+    candidate_facts = {
+        "credit_score": np.full(size, facts["credit_score"]),
+        "preapproved_limit": np.full(size, limit),
+        "requested_amount": amounts,
+        "monthly_income": np.full(size, income),
+        "emi": emi,
+        "emi_ratio": emi_ratio,
+        "existing_emis": np.full(size, facts.get("existing_emis", 0.0)),
+        "tenure_months": tenures,
+        # Judge the offer as it would stand once the requested documents arrive.
+        "documents_verified": np.ones(size, dtype=bool),
+    }
+    rule_idx = policy.evaluate_batch(candidate_facts)
+    approved_rules = np.array([rule.decision == "approve" for rule in policy.rules] + [False])
+    ok = approved_rules[rule_idx] & (amounts > 0)
+    if not ok.any():
+        return None
+
+    best_amount = amounts[ok].max()
+    best = np.flatnonzero(ok & (amounts == best_amount))
+    requested_tenure = facts.get("tenure_months") or MAX_TENURE_MONTHS
+    pick = int(best[np.argmin(np.abs(tenures[best] - requested_tenure))])
+
+    chosen = {name: values[pick] for name, values in candidate_facts.items()}
+    chosen["documents_verified"] = bool(facts.get("documents_verified", False))
+    current_rule = policy.evaluate(chosen)
+    return CounterOffer(
+        amount=float(amounts[pick]),
+        tenure_months=int(tenures[pick]),
+        emi=float(emi[pick]),
+        annual_rate_percent=float(annual_rate_percent),
+        rule_id=policy.rule_for_index(int(rule_idx[pick])).id,
+        requires_documents=current_rule.decision == "request_documents",
+    )
@@ -1,14 +1,28 @@
+from __future__ import annotations
+
 from datetime import datetime
+from typing import Any, Dict, Optional
+
+from app.services.bureau_cache import get_bureau_cache
+from app.services.bureau_client import get_bureau
+from app.services.policy_engine import get_policy_engine
+
 
+async def evaluate_credit(pan: str, aadhaar: str, monthly_income: float) -> Dict[str, Any]:
+    """Bureau score and a pass/fail against the policy's minimum score.
 
-def evaluate_credit(pan: str, aadhaar: str, monthly_income: float) -> dict:
-    # Deterministic, mock-like evaluation for demo integration.
-    base_score = 600
-    income_multiplier = min(monthly_income / 50000, 2.0)
-    score = min(850, round(base_score + (income_multiplier * 100)))
-    status = "approved" if score >= 650 else "rejected"
+    Same bureau path as underwriting (cache, then the bureau client), so this
+    endpoint and the agent can no longer disagree about a customer's score.
+    """
+    result, source = await get_bureau_cache().aget_or_fetch(
+        pan, aadhaar, lambda: get_bureau().inquire(pan, aadhaar, monthly_income)
+    )
+    score: Optional[int] = result.get("credit_score")
+    min_score = get_policy_engine().policy.params.get("min_credit_score", 0)
     return {
-        "status": status,
+        "status": "approved" if score is not None and score >= min_score else "rejected",
         "score": score,
+        "min_credit_score": min_score,
+        "source": source,
         "evaluated_at": datetime.utcnow().isoformat(),
     }
@@ -0,0 +1,100 @@
+from __future__ import annotations
+
+import hashlib
+import secrets
+import sqlite3
+import time
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional
+
+from app.services.ttl_cache import TTLCache
+from app.settings import settings
+
+HOUR_S = 3600.0
+DAY_S = 86400.0
+
+# Outcomes the index remembers, each matched on both PAN and mobile. OTP is
+# deliberately absent: it proves who holds the handset in this conversation,
+# and anyone who knows a mobile number could claim it in another. So is the
+# fraud check, which scores the device and IP of each thread.
+OUTCOMES = ("kyc", "bureau")
+
+
+def customer_key(salt: str, kind: str, pan: Optional[str], mobile: Optional[str]) -> Optional[str]:
+    """Salted SHA-256 of the outcome kind and normalised identifiers; None when either is missing."""
+    pan = (pan or "").strip().upper()
+    mobile = "".join(ch for ch in (mobile or "") if ch.isdigit())[-10:]
+    if not pan or not mobile:
+        return None
+    return hashlib.sha256(f"{salt}\x00{kind}\x00{pan}\x00{mobile}".encode("utf-8")).hexdigest()
+
+
+class CustomerIndex:
+    """Recent verification outcomes per customer, shared across conversation threads.
+
+    A returning applicant (same PAN and mobile) within each outcome's TTL gets
+    the earlier KYC and bureau results instead of new external calls.
+    Only hashes of the identifiers are stored. An outcome with a TTL of 0 is
+    never recorded or reused.
+    """
+
+    def __init__(self, store: TTLCache, salt: str, ttls: Dict[str, float]) -> None:
+        unknown = set(ttls) - set(OUTCOMES)
+        if unknown:
+            raise ValueError(f"Unknown outcome kinds: {sorted(unknown)}")
+        self.store = store
+        self.salt = salt
+        self.ttls = {kind: float(ttls.get(kind, 0.0)) for kind in OUTCOMES}
+
+    def lookup(self, kind: str, pan: Optional[str], mobile: Optional[str]) -> Optional[Dict[str, Any]]:
+        """The recorded outcome, with its ``recorded_at``, or None if absent, expired or disabled."""
+        if self.ttls[kind] <= 0:
+            return None
+        key = customer_key(self.salt, kind, pan, mobile)
+        if key is None:
+            return None
+        return self.store.get(key)[0]
+
+    def record(self, kind: str, pan: Optional[str], mobile: Optional[str], outcome: Dict[str, Any]) -> None:
+        ttl_s = self.ttls[kind]
+        key = customer_key(self.salt, kind, pan, mobile)
+        if ttl_s <= 0 or key is None:
+            return
+        self.store.put(key, {**outcome, "recorded_at": self.store.clock()}, ttl_s=ttl_s)
+
+    def stats(self) -> Dict[str, Any]:
+        return {**self.store.stats(), "ttl_hours": {kind: round(ttl / HOUR_S, 2) for kind, ttl in self.ttls.items()}}
+
+
+def build_customer_index(
+    salt: str,
+    ttls: Dict[str, float],
+    sqlite_path: Optional[Path] = None,
+    max_entries: int = 10000,
+    clock: Callable[[], float] = time.time,
+) -> CustomerIndex:
+    store = TTLCache(max(ttls.values(), default=0.0), sqlite_path, max_entries, clock, table="customer_outcomes")
+    return CustomerIndex(store, salt, ttls)
+
+
+@lru_cache()
+def get_customer_index() -> CustomerIndex:
+    """Get singleton customer verification index"""
+    salt = settings.customer_index_salt
+    sqlite_path = Path(settings.customer_index_path) if settings.customer_index_path else None
+    if not salt:
+        # Same constraint as the bureau cache: a random salt cannot match across workers.
+        salt = secrets.token_hex(16)
+        if sqlite_path is not None:
+            print("⚠️ CUSTOMER_INDEX_SALT is not set; customer index is in-process only")
+            sqlite_path = None
+    ttls = {
+        "kyc": settings.customer_index_kyc_ttl_days * DAY_S,
+        "bureau": settings.bureau_cache_ttl_days * DAY_S,
+    }
+    try:
+        return build_customer_index(salt, ttls, sqlite_path, settings.customer_index_max_entries)
+    except sqlite3.Error as exc:
+        print(f"⚠️ Customer index SQLite tier unavailable, using memory only: {exc}")
+        return build_customer_index(salt, ttls, None, settings.customer_index_max_entries)
@@ -3,7 +3,7 @@ from __future__ import annotations
 import os
 import re
 from pathlib import Path
-from typing import Any, Dict, Optional
+from typing import Any, Dict, Iterator, Optional
 
 from app.settings import settings
 
@@ -11,25 +11,28 @@ PAN_RE = re.compile(r"\b[A-Z]{5}\d{4}[A-Z]\b")
 AADHAAR_RE = re.compile(r"\b\d{4}\s?\d{4}\s?\d{4}\b")
 
 
-def _extract_pdf_text(file_path: str) -> str:
+def iter_pdf_page_text(file_path: str) -> Iterator[str]:
+    """Yield extracted text page by page so callers can stream large PDFs."""
     # Guard against mislabeled files (e.g., image bytes with .pdf extension).
     try:
         with open(file_path, "rb") as f:
             header = f.read(5)
         if header != b"%PDF-":
-            return ""
+            return
     except Exception:
-        return ""
+        return
     try:
         from pypdf import PdfReader  # optional dependency
 
         reader = PdfReader(file_path)
-        texts = []
         for page in reader.pages:
-            texts.append(page.extract_text() or "")
-        return "\n".join(texts)
+            yield page.extract_text() or ""
     except Exception:
-        return ""
+        return
+
+
+def extract_pdf_text(file_path: str) -> str:
+    return "\n".join(iter_pdf_page_text(file_path))
 
 
 def _normalize_aadhaar(value: Optional[str]) -> str:
@@ -62,7 +65,7 @@ def verify_uploaded_document(
 
     text = ""
     if (content_type or "").lower() == "application/pdf" or Path(filename).suffix.lower() == ".pdf":
-        text = _extract_pdf_text(file_path).upper()
+        text = extract_pdf_text(file_path).upper()
 
     file_upper = filename.upper()
     expected_pan = (pan or "").upper().strip()
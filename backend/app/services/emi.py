@@ -1,3 +1,6 @@
+import numpy as np
+
+
 def calculate_emi(principal: float, annual_rate_percent: float, tenure_months: int) -> float:
     if principal <= 0 or tenure_months <= 0:
         return 0.0
@@ -7,3 +10,16 @@ def calculate_emi(principal: float, annual_rate_percent: float, tenure_months: i
     numerator = principal * monthly_rate * (1 + monthly_rate) ** tenure_months
     denominator = (1 + monthly_rate) ** tenure_months - 1
     return numerator / denominator
+
+
+def calculate_emi_array(principal: np.ndarray, annual_rate_percent: np.ndarray, tenure_months: np.ndarray) -> np.ndarray:
+    """Element-wise ``calculate_emi`` over arrays (scalars broadcast)."""
+    principal = np.asarray(principal, dtype=np.float64)
+    tenure = np.asarray(tenure_months, dtype=np.float64)
+    monthly_rate = np.asarray(annual_rate_percent, dtype=np.float64) / 100 / 12
+    with np.errstate(divide="ignore", invalid="ignore", over="ignore"):
+        growth = (1 + monthly_rate) ** tenure
+        amortized = principal * monthly_rate * growth / (growth - 1)
+        flat = principal / tenure
+    emi = np.where(monthly_rate == 0, flat, amortized)
+    return np.where((principal <= 0) | (tenure <= 0), 0.0, emi)
@@ -0,0 +1,254 @@
+from __future__ import annotations
+
+import re
+from dataclasses import dataclass
+from functools import lru_cache
+from string import ascii_letters
+from typing import Any, List, NamedTuple, Optional, Tuple
+
+# How far (in characters) an amount looks for words saying whether it is income or the loan.
+CONTEXT_WINDOW = 32
+
+# Numbers may carry an attached unit ("80k", "36m", "1.2L"); words may carry
+# digits (PAN) or an apostrophe ("don't", "I'm").
+_TOKEN = re.compile(r"\d(?:[\d,]*\d)?(?:\.\d+)?[A-Za-z]*|[A-Za-z][A-Za-z0-9']*|₹")
+# Only used when the message contains "@": the email alternative backtracks on every word.
+_TOKEN_WITH_EMAIL = re.compile(r"[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Za-z]{2,}|" + _TOKEN.pattern)
+
+_WORD_NUMBERS = {
+    "one": 1, "two": 2, "three": 3, "four": 4, "five": 5, "six": 6,
+    "seven": 7, "eight": 8, "nine": 9, "ten": 10, "twelve": 12, "eighteen": 18,
+}
+_TENURE_UNITS = {
+    "m": 1, "mo": 1, "mos": 1, "mth": 1, "mths": 1, "month": 1, "months": 1,
+    "y": 12, "yr": 12, "yrs": 12, "year": 12, "years": 12,
+}
+_MULTIPLIERS = {
+    "k": 1e3, "thousand": 1e3,
+    "l": 1e5, "lakh": 1e5, "lakhs": 1e5, "lac": 1e5, "lacs": 1e5,
+    "cr": 1e7, "crore": 1e7, "crores": 1e7,
+}
+_CURRENCY = {"₹", "rs", "inr"}
+_EMPLOYMENT = {"salaried": "salaried", "unemployed": "unemployed", "businessman": "self_employed", "businesswoman": "self_employed"}
+_CONSENT = {
+    "yes": True, "yeah": True, "yep": True, "sure": True, "ok": True, "okay": True,
+    "consent": True, "agree": True, "agreed": True, "approved": True,
+    "no": False, "nope": False, "nah": False, "deny": False, "disagree": False, "refuse": False,
+}
+_INCOME_CUES = {"month", "monthly", "pm", "salary", "income", "inhand", "takehome"}
+_LOAN_CUES = {"loan", "need", "want", "amount"}
+_PREFIX_KIND = {"earn": "income", "borrow": "loan", "financ": "loan", "requir": "loan", "freelanc": "employment"}
+_PREFIXES = tuple(_PREFIX_KIND)
+_NEGATIONS = {"not", "don't", "dont", "do"}  # "do" only as "do not": "I do consent" is a yes
+_NAME_INTROS = {"my": ("my", "name", "is"), "i": ("i", "am"), "this": ("this", "is"), "i'm": ("i'm",), "name": ("name",)}
+_NOT_NAMES = {"salaried", "self", "looking", "interested", "working", "employed", "unemployed", "fine", "not", "from"}
+# Two-word phrases, keyed by (first word, second word).
+_PAIRS = {
+    ("self", "employed"): "self_employed",
+    ("business", "owner"): "self_employed",
+    ("take", "home"): "income",
+    ("in", "hand"): "income",
+    ("go", "ahead"): "consent",
+}
+
+# Every word the scanner acts on, so ordinary words cost one dict miss.
+_VOCABULARY = {
+    **{w: "number" for w in _WORD_NUMBERS},
+    **{w: "consent" for w in _CONSENT},
+    **{w: "employment" for w in _EMPLOYMENT},
+    **{w: "income" for w in _INCOME_CUES},
+    **{w: "loan" for w in _LOAN_CUES},
+    **{w: "pair" for w in {first for first, _ in _PAIRS} | _NEGATIONS | set(_NAME_INTROS)},
+}
+
+
+class Entity(NamedTuple):
+    """One span of the message. A NamedTuple: frozen dataclasses cost more to build than the scan itself."""
+
+    kind: str  # amount, tenure_months, mobile, email, pan, aadhaar, employment_type, consent, full_name
+    value: Any
+    start: int
+    end: int
+    confidence: float
+    role: Optional[str] = None  # amounts only: "income", "loan" or None when the context does not say
+
+
+@dataclass(frozen=True)
+class MessageEntities:
+    text: str
+    entities: Tuple[Entity, ...]
+
+    def all(self, kind: str) -> List[Entity]:
+        return [e for e in self.entities if e.kind == kind]
+
+    def first(self, kind: str) -> Optional[Entity]:
+        for entity in self.entities:
+            if entity.kind == kind:
+                return entity
+        return None
+
+    def amount(self, role: Optional[str]) -> Optional[float]:
+        """First amount whose context marks it as ``role`` (None: amounts with no cue nearby)."""
+        for entity in self.entities:
+            if entity.kind == "amount" and entity.role == role:
+                return entity.value
+        return None
+
+    def consent(self) -> Optional[bool]:
+        """A refusal anywhere outweighs agreement elsewhere in the message."""
+        answers = [e.value for e in self.entities if e.kind == "consent"]
+        if False in answers:
+            return False
+        return True if answers else None
+
+
+def _roles(amounts: List[Tuple[int, int]], cues: List[Tuple[int, int, str]]) -> List[Optional[str]]:
+    """Nearest income/loan cue within CONTEXT_WINDOW characters of each amount."""
+    roles: List[Optional[str]] = []
+    for start, end in amounts:
+        best, best_distance = None, CONTEXT_WINDOW + 1
+        for c_start, c_end, role in cues:
+            distance = start - c_end if c_end <= start else c_start - end
+            if distance < best_distance:
+                best, best_distance = role, distance
+        roles.append(best)
+    return roles
+
+
+def _scan(text: str) -> MessageEntities:
+    has_at = "@" in text
+    pattern = _TOKEN_WITH_EMAIL if has_at else _TOKEN
+    tokens = [(m.group(), *m.span()) for m in pattern.finditer(text)]
+    words = [tok.lower() for tok, _, _ in tokens]
+    count = len(tokens)
+
+    def follows(j: int, separators: str = " -") -> bool:
+        """Token j exists and comes right after token j - 1, at most one separator apart."""
+        if j >= count:
+            return False
+        gap = tokens[j][1] - tokens[j - 1][2]
+        return gap == 0 or (gap == 1 and text[tokens[j][1] - 1] in separators)
+
+    def digits(j: int, size: int) -> bool:
+        return follows(j) and len(tokens[j][0]) == size and tokens[j][0].isdigit()
+
+    def word_after(i: int) -> str:
+        return words[i + 1] if follows(i + 1, " -") else ""
+
+    # (kind, value, start, end, confidence); amounts get their role once all cues are known.
+    found: List[Tuple[str, Any, int, int, float]] = []
+    amounts: List[Tuple[int, int]] = []
+    cues: List[Tuple[int, int, str]] = []
+    i = 0
+    while i < count:
+        tok, start, end = tokens[i]
+        word = words[i]
+        step = 1
+        if tok[0].isdigit():
+            number = tok.rstrip(ascii_letters)
+            unit = word[len(number):]
+            bare = not unit and number.isdigit()
+            if bare and len(number) == 12:
+                found.append(("aadhaar", number, start, end, 0.9 if number[0] not in "01" else 0.5))
+            elif bare and len(number) == 4 and digits(i + 1, 4) and digits(i + 2, 4):
+                aadhaar = number + tokens[i + 1][0] + tokens[i + 2][0]
+                found.append(("aadhaar", aadhaar, start, tokens[i + 2][2], 0.9 if aadhaar[0] not in "01" else 0.5))
+                step = 3
+            elif bare and len(number) == 10:
+                found.append(("mobile", number, start, end, 0.95 if number[0] in "6789" else 0.5))
+            elif bare and len(number) == 5 and digits(i + 1, 5):
+                mobile = number + tokens[i + 1][0]
+                found.append(("mobile", mobile, start, tokens[i + 1][2], 0.95 if mobile[0] in "6789" else 0.5))
+                step = 2
+            elif bare and number == "91" and digits(i + 1, 10):
+                mobile = tokens[i + 1][0]
+                found.append(("mobile", mobile, start, tokens[i + 1][2], 0.95 if mobile[0] in "6789" else 0.5))
+                step = 2
+            elif bare and number == "91" and start and text[start - 1] == "+":
+                pass  # country code ahead of a spaced mobile number
+            else:
+                if not unit:
+                    following = word_after(i)
+                    if following in _TENURE_UNITS or following in _MULTIPLIERS:
+                        unit, end, step = following, tokens[i + 1][2], 2
+                value = float(number.replace(",", ""))
+                if unit in _TENURE_UNITS:
+                    found.append(("tenure_months", int(round(value * _TENURE_UNITS[unit])), start, end, 0.9))
+                elif not unit or unit in _MULTIPLIERS:
+                    currency = i > 0 and words[i - 1] in _CURRENCY
+                    if currency:
+                        start = tokens[i - 1][1]
+                    found.append(("amount", value * _MULTIPLIERS.get(unit, 1.0), start, end, 0.9 if unit or currency else 0.7))
+                    amounts.append((start, end))
+        else:
+            kind = _VOCABULARY.get(word)
+            if kind is None:
+                if has_at and "@" in tok:
+                    found.append(("email", tok, start, end, 0.99))
+                elif len(tok) == 10 and tok[:5].isalpha() and tok[5:9].isdigit() and tok[9].isalpha():
+                    found.append(("pan", tok.upper(), start, end, 0.95 if tok.isupper() else 0.85))
+                elif word.startswith(_PREFIXES):
+                    kind = _PREFIX_KIND[next(p for p in _PREFIXES if word.startswith(p))]
+            if kind is None:
+                pass
+            elif kind == "income" or kind == "loan":
+                cues.append((start, end, kind))
+            elif kind == "consent":
+                found.append(("consent", _CONSENT[word], start, end, 0.8))
+            elif kind == "employment":
+                found.append(("employment_type", _EMPLOYMENT.get(word, "freelancer"), start, end, 0.9))
+            elif kind == "number":
+                if word_after(i) in _TENURE_UNITS:
+                    found.append(("tenure_months", _WORD_NUMBERS[word] * _TENURE_UNITS[words[i + 1]], start, tokens[i + 1][2], 0.8))
+                    step = 2
+            elif kind == "pair":
+                following = word_after(i)
+                pair = _PAIRS.get((word, following))
+                if pair == "self_employed":
+                    found.append(("employment_type", pair, start, tokens[i + 1][2], 0.9))
+                    step = 2
+                elif pair == "income":
+                    cues.append((start, tokens[i + 1][2], "income"))
+                    step = 2
+                elif pair == "consent":
+                    found.append(("consent", True, start, tokens[i + 1][2], 0.8))
+                    step = 2
+                elif word in _NEGATIONS and (word != "do" or following == "not"):
+                    # Any negation in a consent reply is a refusal ("not sure", "yes but not now");
+                    # a consent word one or two tokens on is swallowed with it ("not ok", "don't agree").
+                    j = i + 2 if following == "not" else i + 1
+                    step, end = j - i, tokens[j - 1][2]
+                    for k in range(j, min(j + 2, count)):
+                        width = 2 if _PAIRS.get((words[k], word_after(k))) == "consent" else 1
+                        if width == 2 or words[k] in _CONSENT:
+                            step, end = k + width - i, tokens[k + width - 1][2]
+                            break
+                    found.append(("consent", False, start, end, 0.8))
+                if word in _NAME_INTROS and step == 1 and tuple(words[i:i + len(_NAME_INTROS[word])]) == _NAME_INTROS[word]:
+                    first = j = i + len(_NAME_INTROS[word])
+                    while j < count and j - first < 4 and follows(j, " ") and tokens[j][0].istitle() and tokens[j][0].isalpha():
+                        j += 1
+                    if j > first and words[first] not in _NOT_NAMES:
+                        name = " ".join(tok for tok, _, _ in tokens[first:j])
+                        found.append(("full_name", name, tokens[first][1], tokens[j - 1][2], 0.6))
+                        step = j - i
+        i += step
+
+    roles = iter(_roles(amounts, cues)) if amounts else None
+    return MessageEntities(
+        text,
+        tuple(Entity(*item, next(roles)) if item[0] == "amount" else Entity(*item) for item in found),  # type: ignore[arg-type]
+    )
+
+
+@lru_cache(maxsize=1024)
+def extract_entities(text: str) -> MessageEntities:
+    """Every entity in a chat message, from one tokenising pass.
+
+    Handles Indian amount notation (5 lakh, 1.2 cr, 80k, 10,00,000), tenures
+    in months or years (digits or words), mobile, email, PAN, Aadhaar,
+    employment type, yes/no consent and "I'm <Name>" introductions. Amounts
+    carry a role from the nearest income or loan wording around them.
+    Memoised, since several agent nodes read the same message in one turn.
+    """
+    return _scan(text or "")
@@ -0,0 +1,114 @@
+from __future__ import annotations
+
+from pathlib import Path
+from typing import AsyncIterator, Dict, Optional, Tuple
+
+import anyio
+from starlette.requests import Request
+from starlette.responses import FileResponse, Response, StreamingResponse
+
+CHUNK_SIZE = 64 * 1024
+# Content addressed by its hash (a versioned URL): let clients keep it for a year.
+IMMUTABLE_CACHE_CONTROL = "private, max-age=31536000, immutable"
+# Content that can change under the same URL: clients keep it but revalidate with the ETag.
+REVALIDATE_CACHE_CONTROL = "private, no-cache"
+
+
+def etag_matches(header: str, etag: str) -> bool:
+    if header.strip() == "*":
+        return True
+    candidates = [tag.strip() for tag in header.split(",")]
+    return etag in candidates or f"W/{etag}" in candidates
+
+
+def parse_byte_range(header: str, size: int) -> Optional[Tuple[int, int]]:
+    """Parse a single ``bytes=`` range into inclusive (start, end).
+
+    Returns None when the header should be ignored (malformed or multi-range)
+    and raises ValueError when the range cannot be satisfied.
+    """
+    unit, _, spec = header.partition("=")
+    if unit.strip().lower() != "bytes" or "," in spec:
+        return None
+    first, sep, last = spec.strip().partition("-")
+    if not sep:
+        return None
+    try:
+        start = int(first) if first else None
+        end = int(last) if last else None
+    except ValueError:
+        return None
+    if start is None:
+        if end is None:
+            return None
+        if end == 0:
+            raise ValueError("empty suffix range")
+        return max(size - end, 0), size - 1
+    end = size - 1 if end is None else end
+    if start >= size or start > end:
+        raise ValueError("range not satisfiable")
+    return start, min(end, size - 1)
+
+
+async def _iter_file_range(path: Path, start: int, end: int) -> AsyncIterator[bytes]:
+    remaining = end - start + 1
+    async with await anyio.open_file(path, "rb") as f:
+        await f.seek(start)
+        while remaining > 0:
+            chunk = await f.read(min(CHUNK_SIZE, remaining))
+            if not chunk:
+                break
+            remaining -= len(chunk)
+            yield chunk
+
+
+def file_response(
+    request: Request,
+    path: Path,
+    *,
+    etag: str,
+    media_type: str,
+    filename: Optional[str] = None,
+    cache_control: str = REVALIDATE_CACHE_CONTROL,
+) -> Response:
+    """Serve a file with ETag revalidation, single byte-range support and cache headers.
+
+    Full-body responses go through ``FileResponse`` so servers that implement
+    the ASGI pathsend extension can hand the file to the kernel directly.
+    """
+    stat = path.stat()
+    quoted = f'"{etag}"'
+    headers: Dict[str, str] = {"ETag": quoted, "Cache-Control": cache_control, "Accept-Ranges": "bytes"}
+
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match and etag_matches(if_none_match, quoted):
+        return Response(status_code=304, headers=headers)
+
+    range_header = request.headers.get("range")
+    if_range = request.headers.get("if-range")
+    if range_header and (not if_range or if_range.strip() == quoted):
+        try:
+            byte_range = parse_byte_range(range_header, stat.st_size)
+        except ValueError:
+            return Response(status_code=416, headers={**headers, "Content-Range": f"bytes */{stat.st_size}"})
+        if byte_range is not None:
+            start, end = byte_range
+            return StreamingResponse(
+                _iter_file_range(path, start, end),
+                status_code=206,
+                media_type=media_type,
+                headers={
+                    **headers,
+                    "Content-Range": f"bytes {start}-{end}/{stat.st_size}",
+                    "Content-Length": str(end - start + 1),
+                },
+            )
+
+    return FileResponse(
+        path,
+        media_type=media_type,
+        filename=filename,
+        headers=headers,
+        stat_result=stat,
+        content_disposition_type="inline",
+    )
@@ -0,0 +1,607 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import threading
+import time
+import uuid
+from array import array
+from contextlib import contextmanager
+from functools import lru_cache
+from pathlib import Path
+from typing import Callable, Dict, Generic, Iterable, Iterator, List, Optional, Set, Tuple, TypeVar
+
+import numpy as np
+
+from app.services.neo4j_service import score_signals
+from app.settings import settings
+
+# Identifier kinds linking users, in the order of their codes in edge arrays.
+KINDS = ("device", "ip", "phone")
+KIND_CODES = {kind: code for code, kind in enumerate(KINDS)}
+
+# Unions up to this many user IDs are counted with a Python set.
+SMALL_UNION = 256
+# Overlay entries (edges plus fraud marks) a worker holds before folding them into arrays.
+DEFAULT_MAX_OVERLAY = 100000
+DEFAULT_FLUSH_INTERVAL_S = 300.0
+
+FILE_MAGIC = b"FRGRAPH1"
+FILE_ALIGN = 64
+LAYOUT_VERSION = 1
+
+
+class FraudGraphError(ValueError):
+    """Raised when a fraud graph file cannot be read."""
+
+
+def node_key(kind: str, value: str) -> int:
+    """64-bit ID of a node; users are kind "user". Collisions are negligible below ~10^8 nodes per kind."""
+    return int.from_bytes(hashlib.blake2b(f"{kind}\x00{value}".encode("utf-8"), digest_size=8).digest(), "little")
+
+
+def _csr(rows: np.ndarray, cols: np.ndarray, n_rows: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Row pointers and column indices for (row, col) pairs already sorted by row."""
+    ptr = np.zeros(n_rows + 1, dtype=np.int64)
+    np.cumsum(np.bincount(rows, minlength=n_rows), out=ptr[1:])
+    dtype = np.int32 if cols.size == 0 or int(cols.max()) < 2**31 else np.int64
+    return ptr, cols.astype(dtype)
+
+
+def build_arrays(
+    user_keys: np.ndarray, kind_codes: np.ndarray, attr_keys: np.ndarray, fraud_keys: np.ndarray
+) -> Dict[str, np.ndarray]:
+    """Compact adjacency arrays from parallel edge arrays of node keys.
+
+    Per kind: sorted attribute keys, user->attribute and attribute->user CSR
+    indexes over integer node IDs (duplicate edges collapse, as with MERGE),
+    and for phones the number of known-fraud users on each.
+    """
+    user_keys = np.asarray(user_keys, dtype=np.uint64)
+    kind_codes = np.asarray(kind_codes, dtype=np.uint8)
+    attr_keys = np.asarray(attr_keys, dtype=np.uint64)
+    fraud_keys = np.asarray(fraud_keys, dtype=np.uint64)
+
+    users = np.unique(np.concatenate([user_keys, fraud_keys]))
+    fraud = np.zeros(users.size, dtype=np.uint8)
+    fraud[np.searchsorted(users, fraud_keys)] = 1
+    edge_users = np.searchsorted(users, user_keys).astype(np.int64)
+    arrays: Dict[str, np.ndarray] = {"user": users, "fraud": fraud}
+    for code, kind in enumerate(KINDS):
+        selected = kind_codes == code
+        keys, attrs = np.unique(attr_keys[selected], return_inverse=True)
+        width = max(1, keys.size)
+        pairs = np.unique(edge_users[selected] * width + attrs.astype(np.int64))
+        pair_users, pair_attrs = pairs // width, pairs % width
+        arrays[kind] = keys
+        arrays[f"{kind}_uptr"], arrays[f"{kind}_uidx"] = _csr(pair_users, pair_attrs, users.size)
+        order = np.argsort(pair_attrs, kind="stable")
+        arrays[f"{kind}_aptr"], arrays[f"{kind}_aidx"] = _csr(pair_attrs[order], pair_users[order], keys.size)
+    arrays["phone_fraud"] = np.bincount(
+        arrays["phone_uidx"].astype(np.int64),
+        weights=np.repeat(fraud, np.diff(arrays["phone_uptr"])),
+        minlength=arrays["phone"].size,
+    ).astype(np.int32)
+    return arrays
+
+
+def write_arrays(path: Path, arrays: Dict[str, np.ndarray], meta: Dict[str, object]) -> None:
+    """One flat file: magic, JSON header with dtypes and offsets, then 64-byte aligned arrays."""
+    layout: Dict[str, List[object]] = {}
+    offset = 0
+    for name, array in arrays.items():
+        layout[name] = [array.dtype.str, offset, int(array.size)]
+        offset += -(-array.nbytes // FILE_ALIGN) * FILE_ALIGN
+    header = json.dumps({"layout_version": LAYOUT_VERSION, **meta, "arrays": layout}).encode("utf-8")
+    data_start = -(-(len(FILE_MAGIC) + 8 + len(header)) // FILE_ALIGN) * FILE_ALIGN
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f".{path.name}.{uuid.uuid4().hex[:6]}")
+    with tmp.open("wb") as f:
+        f.write(FILE_MAGIC + len(header).to_bytes(8, "little") + header)
+        for name, array in arrays.items():
+            f.seek(data_start + layout[name][1])
+            f.write(np.ascontiguousarray(array).tobytes())
+        f.truncate(data_start + offset)
+    os.replace(tmp, path)
+
+
+def read_arrays(path: Path) -> Tuple[Dict[str, np.ndarray], Dict[str, object]]:
+    """Memory-mapped arrays and header of a file written by write_arrays."""
+    try:
+        with path.open("rb") as f:
+            if f.read(len(FILE_MAGIC)) != FILE_MAGIC:
+                raise FraudGraphError(f"{path} is not a fraud graph file")
+            header_len = int.from_bytes(f.read(8), "little")
+            header = json.loads(f.read(header_len))
+        if header.get("layout_version") != LAYOUT_VERSION:
+            raise FraudGraphError(f"{path} has layout version {header.get('layout_version')}, expected {LAYOUT_VERSION}")
+        data_start = -(-(len(FILE_MAGIC) + 8 + header_len) // FILE_ALIGN) * FILE_ALIGN
+        buffer = np.memmap(path, dtype=np.uint8, mode="r")
+        arrays: Dict[str, np.ndarray] = {}
+        for name, (dtype, offset, count) in header.pop("arrays").items():
+            dtype = np.dtype(dtype)
+            start = data_start + offset
+            # Plain ndarray views over the mapping: every worker shares the same pages.
+            arrays[name] = np.asarray(buffer[start:start + count * dtype.itemsize]).view(dtype)
+    except FraudGraphError:
+        raise
+    except (OSError, ValueError, KeyError, TypeError) as exc:
+        raise FraudGraphError(f"Cannot read fraud graph {path}: {exc}") from exc
+    return arrays, header
+
+
+@contextmanager
+def _file_lock(path: Path) -> Iterator[None]:
+    """Exclusive lock on ``path`` across processes: flock on POSIX, msvcrt on Windows."""
+    with path.open("a+b") as handle:
+        try:
+            import fcntl
+        except ImportError:  # Windows
+            import msvcrt
+
+            handle.seek(0)
+            while True:
+                try:
+                    msvcrt.locking(handle.fileno(), msvcrt.LK_LOCK, 1)
+                    break
+                except OSError:  # LK_LOCK gives up after about 10 s; keep waiting as flock does
+                    continue
+            try:
+                yield
+            finally:
+                handle.seek(0)
+                msvcrt.locking(handle.fileno(), msvcrt.LK_UNLCK, 1)
+        else:
+            fcntl.flock(handle, fcntl.LOCK_EX)  # released when the handle closes
+            yield
+
+
+def _members(sorted_ids: np.ndarray, values: np.ndarray) -> np.ndarray:
+    """Which ``values`` occur in a sorted array."""
+    if sorted_ids.size == 0:
+        return np.zeros(values.size, dtype=bool)
+    found = np.minimum(np.searchsorted(sorted_ids, values), sorted_ids.size - 1)
+    return sorted_ids[found] == values
+
+
+def _rebuild(edges: List[np.ndarray], fraud: List[np.ndarray]) -> Dict[str, np.ndarray]:
+    """build_arrays over (user key, kind code, attr key) edge blocks, each shaped (3, n)."""
+    stacked = np.concatenate(edges, axis=1)
+    return build_arrays(stacked[0], stacked[1].astype(np.uint8), stacked[2], np.concatenate(fraud))
+
+
+T = TypeVar("T")
+
+
+class MappedFile(Generic[T]):
+    """Serves a file a batch job rewrites and picks up new versions, as the policy engine does with policies.
+
+    The file may not exist yet when a worker starts; it is picked up once the
+    job writes it. A file that fails to load is skipped until it changes.
+    """
+
+    def __init__(self, path: Path, loader: Callable[[Path], T], reload_interval_s: float = 60.0, label: str = "file") -> None:
+        self.path = path
+        self.loader = loader
+        self.label = label
+        self.reload_interval_s = reload_interval_s
+        self._lock = threading.Lock()
+        self._mtime = 0.0
+        self._current: Optional[T] = None
+        self.reload()
+        self._next_check = time.monotonic() + reload_interval_s
+
+    def _stat_mtime(self) -> float:
+        try:
+            return self.path.stat().st_mtime
+        except OSError:
+            return 0.0
+
+    @property
+    def current(self) -> Optional[T]:
+        if self.reload_interval_s > 0 and time.monotonic() >= self._next_check:
+            self._next_check = time.monotonic() + self.reload_interval_s
+            if self._stat_mtime() != self._mtime:
+                self.reload()
+        return self._current
+
+    def reload(self) -> bool:
+        """Load the file again; on failure keep serving the current version."""
+        with self._lock:
+            mtime = self._stat_mtime()
+            if not mtime:
+                return False
+            try:
+                loaded = self.loader(self.path)
+            except FraudGraphError as exc:
+                print(f"⚠️ {self.label.capitalize()} reload failed, keeping the current one: {exc}")
+                self._mtime = mtime
+                return False
+            self._current = loaded  # the old mapping stays valid for readers still holding it
+            self._mtime = mtime
+            return True
+
+
+class FraudGraph:
+    """Embedded user-device/IP/phone graph answering the Neo4j ``DETECTION_QUERY``.
+
+    The base is a set of compact CSR arrays over integer node IDs, usually
+    memory-mapped from a file built offline, so tens of millions of edges cost
+    a few hundred MB shared by every worker. Edges ingested at request time go
+    to a small in-memory overlay until ``compact()`` folds them into new arrays.
+
+    The overlay is kept bounded: once it holds ``max_overlay`` entries, or
+    ``flush_interval_s`` has passed since the last flush, a background thread
+    merges it into ``path`` (``flush``) or, without a file, into the in-memory
+    arrays (``compact``).
+    """
+
+    def __init__(
+        self,
+        arrays: Optional[Dict[str, np.ndarray]] = None,
+        meta: Optional[Dict[str, object]] = None,
+        path: Optional[Path] = None,
+        max_overlay: int = DEFAULT_MAX_OVERLAY,
+        flush_interval_s: float = DEFAULT_FLUSH_INTERVAL_S,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        self._lock = threading.RLock()
+        self._rebuild_lock = threading.Lock()  # one compaction or flush at a time
+        self.path = path
+        self.max_overlay = max(1, max_overlay)
+        self.flush_interval_s = flush_interval_s
+        self.clock = clock
+        self._next_flush = clock() + flush_interval_s
+        self.maintainer: Optional[threading.Thread] = None
+        self._set_base(arrays if arrays is not None else build_arrays([], [], [], []), meta or {})
+
+    def _set_base(self, arrays: Dict[str, np.ndarray], meta: Dict[str, object]) -> None:
+        self.arrays = arrays
+        self.meta = meta
+        self.n_base_users = int(arrays["user"].size)
+        self.n_base_attrs = {kind: int(arrays[kind].size) for kind in KINDS}
+        # Overlay, in the same integer-ID space: nodes first seen after the build
+        # get IDs after the base ones, so queries never go back to keys.
+        self._extra_users: Dict[int, int] = {}
+        self._extra_user_keys: List[int] = []
+        self._extra_attrs: Dict[str, Dict[int, int]] = {kind: {} for kind in KINDS}
+        self._extra_attr_keys: Dict[str, List[int]] = {kind: [] for kind in KINDS}
+        self._delta_attrs: Dict[str, Dict[int, Set[int]]] = {kind: {} for kind in KINDS}  # user -> attrs
+        self._delta_users: Dict[str, Dict[int, Set[int]]] = {kind: {} for kind in KINDS}  # attr -> users
+        self._delta_fraud: Set[int] = set()
+        self.delta_edges = 0
+        # The same overlay in key space, in arrival order: what a rebuild folds in,
+        # and what is replayed onto the new base when it arrived during the rebuild.
+        self._log_edges: List[Tuple[int, int, int]] = []  # (user key, kind code, attr key)
+        self._log_fraud: List[int] = []
+
+    @classmethod
+    def from_edges(cls, edges: Iterable[Tuple[str, str, str]], fraud_users: Iterable[str] = ()) -> "FraudGraph":
+        """Graph from (user_id, kind, value) edges; kind is one of KINDS."""
+        # Packed 8-byte arrays, not lists of Python ints: fifty million edges fit in ~1 GB while building.
+        user_keys, kind_codes, attr_keys = array("Q"), array("B"), array("Q")
+        for user_id, kind, value in edges:
+            user_keys.append(node_key("user", user_id))
+            kind_codes.append(KIND_CODES[kind])
+            attr_keys.append(node_key(kind, value))
+        fraud_keys = array("Q", (node_key("user", user_id) for user_id in fraud_users))
+        arrays = build_arrays(
+            np.frombuffer(user_keys, dtype=np.uint64),
+            np.frombuffer(kind_codes, dtype=np.uint8),
+            np.frombuffer(attr_keys, dtype=np.uint64),
+            np.frombuffer(fraud_keys, dtype=np.uint64),
+        )
+        return cls(arrays, {"built_at": time.time()})
+
+    @classmethod
+    def load(cls, path: Path, **options: object) -> "FraudGraph":
+        arrays, meta = read_arrays(path)
+        return cls(arrays, meta, **options)  # type: ignore[arg-type]
+
+    # -- lookups ---------------------------------------------------------
+
+    @staticmethod
+    def _find(keys: np.ndarray, key: int) -> int:
+        i = int(np.searchsorted(keys, np.uint64(key)))
+        return i if i < keys.size and int(keys[i]) == key else -1
+
+    def _user_id(self, user_id: str) -> int:
+        return self._user_index(node_key("user", user_id))
+
+    def _user_index(self, key: int) -> int:
+        found = self._find(self.arrays["user"], key)
+        return found if found >= 0 else self._extra_users.get(key, -1)
+
+    def _attr_id(self, kind: str, key: int) -> int:
+        found = self._find(self.arrays[kind], key)
+        return found if found >= 0 else self._extra_attrs[kind].get(key, -1)
+
+    def _base_attrs(self, kind: str, user: int) -> List[int]:
+        if user >= self.n_base_users:
+            return []
+        ptr = self.arrays[f"{kind}_uptr"]
+        return self.arrays[f"{kind}_uidx"][ptr[user]:ptr[user + 1]].tolist()
+
+    def _base_users(self, kind: str, attr: int) -> np.ndarray:
+        if attr >= self.n_base_attrs[kind]:
+            return self.arrays[f"{kind}_aidx"][:0]
+        ptr = self.arrays[f"{kind}_aptr"]
+        return self.arrays[f"{kind}_aidx"][ptr[attr]:ptr[attr + 1]]
+
+    def _attrs(self, kind: str, user: int) -> List[Tuple[int, bool]]:
+        """(attr ID, edge is in the base) for each of the user's attributes."""
+        attrs = [(attr, True) for attr in self._base_attrs(kind, user)]
+        extra = self._delta_attrs[kind].get(user)
+        if extra:
+            attrs.extend((attr, False) for attr in extra)  # ingest never duplicates a base edge
+        return attrs
+
+    @staticmethod
+    def _distinct_others(parts: List[np.ndarray], extra: Set[int], user: int) -> int:
+        """Size of the union of sorted user-ID arrays and a set, not counting ``user``.
+
+        Small unions go through a Python set. Large ones (an IP behind a
+        carrier NAT can have millions of users) are counted without building
+        the union: each list only adds the members that binary search does not
+        find in a larger list already counted.
+        """
+        if sum(part.size for part in parts) <= SMALL_UNION:
+            seen = set(extra)
+            for part in parts:
+                seen.update(part.tolist())
+            return len(seen) - (user in seen)
+        counted: List[np.ndarray] = []
+        count = 0
+        for part in sorted(parts, key=len, reverse=True):
+            fresh = np.ones(part.size, dtype=bool)
+            for larger in counted:
+                fresh &= ~_members(larger, part)
+            count += int(fresh.sum())
+            counted.append(part)
+        if extra:
+            candidates = np.fromiter(extra, dtype=np.int64, count=len(extra))
+            fresh = np.ones(candidates.size, dtype=bool)
+            for part in counted:
+                fresh &= ~_members(part, candidates)
+            count += int(fresh.sum())
+        probe = np.array([user], dtype=np.int64)
+        return count - int(user in extra or any(_members(part, probe)[0] for part in counted))
+
+    def _is_fraud(self, user: int) -> bool:
+        return user in self._delta_fraud or (user < self.n_base_users and bool(self.arrays["fraud"][user]))
+
+    def _shared_count(self, kind: str, user: int) -> int:
+        attrs = self._attrs(kind, user)
+        if not attrs:
+            return 0
+        delta_users = self._delta_users[kind]
+        if len(attrs) == 1 and attrs[0][1] and attrs[0][0] not in delta_users:
+            return int(self._base_users(kind, attrs[0][0]).size) - 1  # the common case: one device, one IP
+        parts = [self._base_users(kind, attr) for attr, _ in attrs]
+        extra = {other for attr, _ in attrs for other in delta_users.get(attr, ())}
+        return self._distinct_others(parts, extra, user)
+
+    def _linked_fraudsters(self, user: int) -> int:
+        # Cypher's count(fraudster) counts paths, so a fraudster on two shared phones counts twice.
+        delta_users = self._delta_users["phone"]
+        total = 0
+        for attr, in_base in self._attrs("phone", user):
+            if in_base and attr not in delta_users and not self._delta_fraud:
+                total += int(self.arrays["phone_fraud"][attr]) - self._is_fraud(user)
+                continue
+            members = set(self._base_users("phone", attr).tolist())
+            members.update(delta_users.get(attr, ()))
+            members.discard(user)
+            total += sum(1 for member in members if self._is_fraud(member))
+        return total
+
+    def detect(self, user_id: str) -> Dict[str, int]:
+        """The counts ``DETECTION_QUERY`` returns for a user."""
+        with self._lock:
+            user = self._user_id(user_id)
+            if user < 0:
+                return {"shared_device_count": 0, "shared_ip_count": 0, "linked_fraudsters": 0}
+            return {
+                "shared_device_count": self._shared_count("device", user),
+                "shared_ip_count": self._shared_count("ip", user),
+                "linked_fraudsters": self._linked_fraudsters(user),
+            }
+
+    # -- updates ---------------------------------------------------------
+
+    def _ensure_user(self, key: int) -> int:
+        user = self._user_index(key)
+        if user < 0:
+            user = self._extra_users[key] = self.n_base_users + len(self._extra_user_keys)
+            self._extra_user_keys.append(key)
+        return user
+
+    def _ensure_attr(self, kind: str, key: int) -> int:
+        attr = self._attr_id(kind, key)
+        if attr < 0:
+            attr = self._extra_attrs[kind][key] = self.n_base_attrs[kind] + len(self._extra_attr_keys[kind])
+            self._extra_attr_keys[kind].append(key)
+        return attr
+
+    def _add_edge(self, user: int, user_key: int, code: int, attr_key: int) -> None:
+        kind = KINDS[code]
+        attr = self._ensure_attr(kind, attr_key)
+        if attr in self._delta_attrs[kind].get(user, ()) or attr in self._base_attrs(kind, user):
+            return
+        self._delta_attrs[kind].setdefault(user, set()).add(attr)
+        self._delta_users[kind].setdefault(attr, set()).add(user)
+        self._log_edges.append((user_key, code, attr_key))
+        self.delta_edges += 1
+
+    def _add_fraud(self, user_key: int) -> None:
+        user = self._ensure_user(user_key)
+        if user not in self._delta_fraud:
+            self._delta_fraud.add(user)
+            self._log_fraud.append(user_key)
+
+    def ingest(self, user_id: str, device_id: Optional[str], ip_address: Optional[str], phone: Optional[str]) -> None:
+        """Link a user to the identifiers seen with them; missing identifiers add no edge."""
+        user_key = node_key("user", user_id)
+        with self._lock:
+            user = self._ensure_user(user_key)
+            for kind, value in (("device", device_id), ("ip", ip_address), ("phone", phone)):
+                if value:
+                    self._add_edge(user, user_key, KIND_CODES[kind], node_key(kind, value))
+        self._maybe_maintain()
+
+    def mark_fraud(self, user_id: str) -> None:
+        with self._lock:
+            self._add_fraud(node_key("user", user_id))
+        self._maybe_maintain()
+
+    def analyze_fraud_network(
+        self,
+        user_id: Optional[str],
+        device_id: Optional[str],
+        ip_address: Optional[str],
+        phone: Optional[str],
+    ) -> dict:
+        """Same contract as ``Neo4jService.analyze_fraud_network``, answered in-process."""
+        if not user_id:
+            return {"risk_score": 0, "flags": [], "source": "mock"}
+        self.ingest(user_id, device_id, ip_address, phone)
+        return {**score_signals(self.detect(user_id)), "source": "embedded"}
+
+    # -- persistence -----------------------------------------------------
+
+    @staticmethod
+    def _edges_of(arrays: Dict[str, np.ndarray]) -> List[np.ndarray]:
+        parts = []
+        for code, kind in enumerate(KINDS):
+            counts = np.diff(arrays[f"{kind}_uptr"])
+            users = np.repeat(arrays["user"], counts)
+            parts.append(np.stack([users, np.full(users.size, code, dtype=np.uint64), arrays[kind][arrays[f"{kind}_uidx"]]]))
+        return parts
+
+    @staticmethod
+    def _fraud_of(arrays: Dict[str, np.ndarray]) -> np.ndarray:
+        return arrays["user"][arrays["fraud"] == 1]
+
+    def _snapshot(self) -> Tuple[np.ndarray, np.ndarray, int, int]:
+        """The overlay so far as key arrays, plus the log positions it covers."""
+        with self._lock:
+            edges = np.array(self._log_edges, dtype=np.uint64).reshape(-1, 3).T
+            fraud = np.array(self._log_fraud, dtype=np.uint64)
+            return edges, fraud, len(self._log_edges), len(self._log_fraud)
+
+    def _swap(self, arrays: Dict[str, np.ndarray], meta: Dict[str, object], edges_done: int, fraud_done: int) -> None:
+        """Install a rebuilt base and replay the overlay entries that arrived while it was built."""
+        with self._lock:
+            late_edges, late_fraud = self._log_edges[edges_done:], self._log_fraud[fraud_done:]
+            self._set_base(arrays, meta)
+            for user_key, code, attr_key in late_edges:
+                self._add_edge(self._ensure_user(user_key), user_key, code, attr_key)
+            for user_key in late_fraud:
+                self._add_fraud(user_key)
+
+    def _compact(self) -> None:
+        base, meta = self.arrays, self.meta
+        edges, fraud, edges_done, fraud_done = self._snapshot()
+        if not edges_done and not fraud_done:
+            return
+        # Built outside the graph lock: queries and ingests carry on against the old base meanwhile.
+        arrays = _rebuild(self._edges_of(base) + [edges], [self._fraud_of(base), fraud])
+        self._swap(arrays, {**meta, "built_at": time.time()}, edges_done, fraud_done)
+
+    def _flush(self, path: Path) -> None:
+        edges, fraud, edges_done, fraud_done = self._snapshot()
+        if not edges_done and not fraud_done:
+            return
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with _file_lock(path.with_name(path.name + ".lock")):
+            disk, meta = read_arrays(path) if path.is_file() else (build_arrays([], [], [], []), {})
+            arrays = _rebuild(self._edges_of(disk) + [edges], [self._fraud_of(disk), fraud])
+            write_arrays(path, arrays, {**meta, "built_at": time.time()})
+            # Map the file just written, so workers share its pages again.
+            arrays, meta = read_arrays(path)
+        self._swap(arrays, meta, edges_done, fraud_done)
+
+    def compact(self) -> None:
+        """Fold the overlay into new base arrays."""
+        with self._rebuild_lock:
+            self._compact()
+
+    def save(self, path: Path) -> None:
+        """Write this graph, overlay included, replacing the file."""
+        with self._rebuild_lock:
+            self._compact()
+            with self._lock:
+                arrays, meta = self.arrays, self.meta
+            write_arrays(path, arrays, meta)
+
+    def flush(self, path: Path) -> None:
+        """Merge this process's overlay into the file as it is now on disk.
+
+        Another worker may have rewritten the file since this one loaded it,
+        so the overlay is replayed on top of the latest file rather than
+        overwriting it; an exclusive lock on a sidecar file serialises writers.
+        """
+        with self._rebuild_lock:
+            self._flush(path)
+
+    def maintenance_due(self) -> bool:
+        overlay = self.delta_edges + len(self._log_fraud)
+        if overlay >= self.max_overlay:
+            return True
+        return bool(overlay) and self.path is not None and self.clock() >= self._next_flush
+
+    def maintain(self) -> bool:
+        """Flush the overlay to ``path`` (compact it without one) if it is due; True if that ran."""
+        if not self._rebuild_lock.acquire(blocking=False):
+            return False  # already running
+        try:
+            if not self.maintenance_due():
+                return False
+            if self.path is not None:
+                self._flush(self.path)
+            else:
+                self._compact()
+            return True
+        except (OSError, FraudGraphError) as exc:
+            print(f"⚠️ Fraud graph overlay not flushed: {exc}")
+            return False
+        finally:
+            self._next_flush = self.clock() + self.flush_interval_s
+            self._rebuild_lock.release()
+
+    def _maybe_maintain(self) -> None:
+        if self.maintenance_due() and not self._rebuild_lock.locked():
+            self.maintainer = threading.Thread(target=self.maintain, name="fraud-graph-maintenance", daemon=True)
+            self.maintainer.start()
+
+    def stats(self) -> Dict[str, object]:
+        arrays = self.arrays
+        return {
+            "users": self.n_base_users + len(self._extra_user_keys),
+            "known_fraud": int(arrays["fraud"].sum()) + len(self._delta_fraud),
+            **{f"{kind}_nodes": self.n_base_attrs[kind] + len(self._extra_attr_keys[kind]) for kind in KINDS},
+            "edges": sum(int(arrays[f"{kind}_uidx"].size) for kind in KINDS) + self.delta_edges,
+            "overlay_edges": self.delta_edges,
+            "overlay_fraud": len(self._log_fraud),
+            "max_overlay": self.max_overlay,
+            "bytes": sum(int(array.nbytes) for array in arrays.values()),
+            "built_at": self.meta.get("built_at"),
+        }
+
+
+@lru_cache()
+def get_fraud_graph() -> FraudGraph:
+    """Get singleton fraud graph"""
+    path = Path(settings.fraud_graph_path) if settings.fraud_graph_path else None
+    options = {
+        "path": path,
+        "max_overlay": settings.fraud_graph_max_overlay,
+        "flush_interval_s": settings.fraud_graph_flush_interval_s,
+    }
+    if path is not None and path.is_file():
+        try:
+            return FraudGraph.load(path, **options)
+        except FraudGraphError as exc:
+            print(f"⚠️ Fraud graph unusable, starting empty: {exc}")
+    return FraudGraph(**options)
@@ -0,0 +1,225 @@
+from __future__ import annotations
+
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
+import numpy as np
+
+from app.services.fraud_graph import KINDS, FraudGraphError, MappedFile, node_key, read_arrays, write_arrays
+from app.settings import settings
+
+# Identifiers shared by more users than this (carrier NAT, office Wi-Fi) do not
+# link users into a ring; otherwise one hub glues half the graph together.
+DEFAULT_MAX_SHARED = 50
+RING_MIN_USERS = 3
+# ring_risk = FRAUD_WEIGHT at a known-fraud density of FRAUD_SATURATION or more,
+# plus up to SIZE_WEIGHT as the ring grows towards SIZE_SATURATION users. Size
+# only scales the fraud evidence: a large component with no (or hardly any)
+# known fraud is a community, not a ring, and scores 0.
+FRAUD_WEIGHT = 70
+FRAUD_SATURATION = 0.25
+SIZE_WEIGHT = 30
+SIZE_SATURATION = 50
+
+
+def union_find(n: int, src: np.ndarray, dst: np.ndarray) -> Tuple[np.ndarray, int]:
+    """Component root of each of ``n`` nodes joined by the (src, dst) edges, and the rounds taken.
+
+    Union-find over integer IDs, applied to all edges at once per round: every
+    edge still spanning two sets links the larger root under the smaller
+    (min-label linking, so no cycles), then paths are compressed until every
+    node points straight at its root. Edges inside one set are dropped for
+    good, so later rounds only see what is still unresolved.
+    """
+    parent = np.arange(n, dtype=np.int64)
+    src = np.asarray(src, dtype=np.int64)
+    dst = np.asarray(dst, dtype=np.int64)
+    rounds = 0
+    while src.size:
+        a, b = parent[src], parent[dst]
+        live = a != b
+        if not live.any():
+            break
+        rounds += 1
+        src, dst, a, b = src[live], dst[live], a[live], b[live]
+        np.minimum.at(parent, np.maximum(a, b), np.minimum(a, b))
+        while True:
+            grand = parent[parent]
+            if np.array_equal(grand, parent):
+                break
+            parent = grand
+    return parent, rounds
+
+
+def ring_risk(users: np.ndarray, fraud: np.ndarray, min_users: int = RING_MIN_USERS) -> np.ndarray:
+    """0-100 risk per ring from its known-fraud density, raised by its size."""
+    users = np.asarray(users, dtype=np.float64)
+    density = np.asarray(fraud, dtype=np.float64) / np.maximum(users, 1)
+    evidence = np.minimum(1.0, density / FRAUD_SATURATION)
+    size = np.clip((users - min_users) / max(1, SIZE_SATURATION - min_users), 0.0, 1.0)
+    return np.rint(evidence * (FRAUD_WEIGHT + SIZE_WEIGHT * size)).astype(np.uint8)
+
+
+def _hash_table(keys: np.ndarray, values: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Open-addressing table (linear probing, load <= 0.5) from unique non-zero keys.
+
+    Built vectorised: each round, the first pending key aimed at each free
+    slot takes it and every other pending key moves one slot on.
+    """
+    size = 1 << max(4, (2 * keys.size).bit_length())
+    mask = np.uint64(size - 1)
+    table_keys = np.zeros(size, dtype=np.uint64)
+    table_values = np.full(size, -1, dtype=np.int32)
+    slots = (keys & mask).astype(np.int64)
+    pending = np.arange(keys.size)
+    while pending.size:
+        wanted = slots[pending]
+        free = table_keys[wanted] == 0
+        taken, first = np.unique(wanted[free], return_index=True)
+        winners = pending[free][first]
+        table_keys[taken] = keys[winners]
+        table_values[taken] = values[winners]
+        placed = np.zeros(keys.size, dtype=bool)
+        placed[winners] = True
+        pending = pending[~placed[pending]]
+        slots[pending] = (slots[pending] + 1) & (size - 1)
+    return table_keys, table_values
+
+
+def find_rings(
+    arrays: Dict[str, np.ndarray], max_shared: int = DEFAULT_MAX_SHARED, min_users: int = RING_MIN_USERS
+) -> Tuple[Dict[str, np.ndarray], Dict[str, Any]]:
+    """Connected components over a fraud graph's arrays, scored and indexed for O(1) lookup.
+
+    Users are joined through every device, IP and phone they share with at
+    most ``max_shared`` users. Components of at least ``min_users`` users
+    become rings; each ring member and each identifier inside a ring is
+    indexed by node key.
+    """
+    n_users = int(arrays["user"].size)
+    src_parts, dst_parts = [], []
+    for kind in KINDS:
+        ptr, idx = arrays[f"{kind}_aptr"], arrays[f"{kind}_aidx"]
+        degree = np.diff(ptr)
+        linking = np.repeat((degree >= 2) & (degree <= max_shared), degree)
+        first = np.repeat(idx[ptr[:-1][degree > 0]], degree[degree > 0])
+        src_parts.append(first[linking])
+        dst_parts.append(idx[linking])
+    src = np.concatenate(src_parts).astype(np.int64)
+    dst = np.concatenate(dst_parts).astype(np.int64)
+    root, rounds = union_find(n_users, src[src != dst], dst[src != dst])
+
+    users = np.bincount(root, minlength=n_users)
+    fraud = np.bincount(root, weights=arrays["fraud"], minlength=n_users).astype(np.int64)
+    ring_roots = np.flatnonzero(users >= min_users)
+    ring_of_root = np.full(n_users, -1, dtype=np.int32)
+    ring_of_root[ring_roots] = np.arange(ring_roots.size, dtype=np.int32)
+    user_ring = ring_of_root[root]
+
+    key_parts, ring_parts = [arrays["user"][user_ring >= 0]], [user_ring[user_ring >= 0]]
+    for kind in KINDS:
+        ptr, idx = arrays[f"{kind}_aptr"], arrays[f"{kind}_aidx"]
+        degree = np.diff(ptr)
+        rings = np.full(degree.size, -1, dtype=np.int32)
+        linked = (degree > 0) & (degree <= max_shared)
+        rings[linked] = user_ring[idx[ptr[:-1][linked]]]
+        key_parts.append(arrays[kind][rings >= 0])
+        ring_parts.append(rings[rings >= 0])
+    keys = np.concatenate(key_parts)
+    slot_key, slot_ring = _hash_table(np.where(keys == 0, np.uint64(1), keys), np.concatenate(ring_parts))
+
+    ring_users = users[ring_roots].astype(np.int32)
+    ring_fraud = fraud[ring_roots].astype(np.int32)
+    result = {
+        "slot_key": slot_key,
+        "slot_ring": slot_ring,
+        "ring_users": ring_users,
+        "ring_fraud": ring_fraud,
+        "ring_risk": ring_risk(ring_users, ring_fraud, min_users),
+    }
+    stats = {
+        "users": n_users,
+        "union_edges": int(src.size),
+        "union_rounds": rounds,
+        "rings": int(ring_roots.size),
+        "users_in_rings": int(ring_users.sum()),
+        "largest_ring": int(ring_users.max()) if ring_users.size else 0,
+        "rings_with_fraud": int((ring_fraud > 0).sum()),
+        "max_shared": max_shared,
+        "min_users": min_users,
+    }
+    return result, stats
+
+
+class FraudRings:
+    """Precomputed ring membership: node key -> ring, looked up in O(1) at request time."""
+
+    def __init__(self, arrays: Dict[str, np.ndarray], meta: Optional[Dict[str, Any]] = None) -> None:
+        self.arrays = arrays
+        self.meta = meta or {}
+        self._slot_key = arrays["slot_key"]
+        self._slot_ring = arrays["slot_ring"]
+        self._mask = int(self._slot_key.size) - 1
+
+    @classmethod
+    def load(cls, path: Path) -> "FraudRings":
+        arrays, meta = read_arrays(path)
+        if "slot_key" not in arrays:
+            raise FraudGraphError(f"{path} is not a fraud ring file")
+        return cls(arrays, meta)
+
+    def save(self, path: Path) -> None:
+        write_arrays(path, self.arrays, self.meta)
+
+    def ring_of(self, kind: str, value: str) -> int:
+        """Ring index of a node (kind "user", "device", "ip" or "phone"), or -1."""
+        key = node_key(kind, value) or 1
+        slot_key, slot = self._slot_key, key & self._mask
+        while True:
+            found = int(slot_key[slot])
+            if found == key:
+                return int(self._slot_ring[slot])
+            if found == 0:
+                return -1
+            slot = (slot + 1) & self._mask
+
+    def lookup(
+        self, user_id: Optional[str], device_id: Optional[str], ip_address: Optional[str], phone: Optional[str]
+    ) -> Optional[Dict[str, int]]:
+        """The riskiest ring the user or any of their identifiers belongs to."""
+        best: Optional[Dict[str, int]] = None
+        for kind, value in (("user", user_id), ("device", device_id), ("ip", ip_address), ("phone", phone)):
+            if not value:
+                continue
+            ring = self.ring_of(kind, value)
+            if ring < 0:
+                continue
+            risk = int(self.arrays["ring_risk"][ring])
+            if best is None or risk > best["ring_risk"]:
+                best = {
+                    "ring_id": ring,
+                    "ring_risk": risk,
+                    "ring_users": int(self.arrays["ring_users"][ring]),
+                    "ring_fraud": int(self.arrays["ring_fraud"][ring]),
+                }
+        return best
+
+
+class RingIndex(MappedFile[FraudRings]):
+    """The ring file, reloaded when the batch job writes a new one."""
+
+    def __init__(self, path: Path, reload_interval_s: float = 60.0) -> None:
+        super().__init__(path, FraudRings.load, reload_interval_s, "fraud ring file")
+
+    @property
+    def rings(self) -> Optional[FraudRings]:
+        return self.current
+
+
+@lru_cache()
+def get_ring_index() -> Optional[RingIndex]:
+    """Get singleton fraud ring index; None when no ring file is configured"""
+    if not settings.fraud_rings_path:
+        return None
+    return RingIndex(Path(settings.fraud_rings_path), settings.fraud_rings_reload_interval_s)
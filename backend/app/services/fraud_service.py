@@ -1,8 +1,12 @@
+from app.services.fraud_graph import get_fraud_graph
+from app.services.fraud_rings import get_ring_index
 from app.services.neo4j_service import neo4j_service
 
 
 def analyze_fraud(user_id: str | None, device_id: str | None, ip_address: str | None, phone: str | None) -> dict:
-    result = neo4j_service.analyze_fraud_network(
+    # Neo4j when configured, otherwise the embedded graph answers the same queries.
+    network = neo4j_service if neo4j_service.driver else get_fraud_graph()
+    result = network.analyze_fraud_network(
         user_id=user_id,
         device_id=device_id,
         ip_address=ip_address,
@@ -10,11 +14,24 @@ def analyze_fraud(user_id: str | None, device_id: str | None, ip_address: str |
     )
 
     risk_score = result.get("risk_score", 0)
-    flags = result.get("flags", [])
+    flags = list(result.get("flags", []))
+
+    # Multi-hop rings come from the offline connected-components job; one hash probe per identifier.
+    ring_index = get_ring_index()
+    rings = ring_index.rings if ring_index else None
+    ring = rings.lookup(user_id, device_id, ip_address, phone) if rings else None
+    if ring and ring["ring_risk"] > 0:
+        risk_score = max(risk_score, ring["ring_risk"])
+        flags.append(
+            f"Ring: linked to a group of {ring['ring_users']} users "
+            f"({ring['ring_fraud']} known fraud), ring risk {ring['ring_risk']}."
+        )
 
     return {
         "risk_score": risk_score,
         "flags": flags,
         "recommendation": "REJECT" if risk_score > 70 else "APPROVE",
         "source": result.get("source", "mock"),
+        "ring_id": ring["ring_id"] if ring else None,
+        "ring_risk": ring["ring_risk"] if ring else 0,
     }
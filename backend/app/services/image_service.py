@@ -0,0 +1,104 @@
+from __future__ import annotations
+
+import asyncio
+import math
+import os
+import shutil
+import time
+from pathlib import Path
+from typing import Any, Dict
+
+from app.services.storage_service import UPLOAD_DIR
+from app.settings import settings
+
+ORIGINALS_DIR = UPLOAD_DIR / "originals"
+
+
+def _has_alpha(img: Any) -> bool:
+    return img.mode in ("RGBA", "LA") or (img.mode == "P" and "transparency" in img.info)
+
+
+def _save(img: Any, base: Path, keep_alpha: bool) -> Path:
+    """Encode ``img`` next to ``base`` (a path without extension) and return the written path."""
+    if keep_alpha:
+        path = base.with_name(f"{base.name}.png")
+        img.save(path, format="PNG", optimize=True)
+        return path
+    path = base.with_name(f"{base.name}.jpg")
+    if _has_alpha(img):
+        from PIL import Image  # optional dependency
+
+        background = Image.new("RGB", img.size, (255, 255, 255))
+        background.paste(img.convert("RGBA"), mask=img.convert("RGBA").getchannel("A"))
+        img = background
+    elif img.mode != "RGB":
+        img = img.convert("RGB")
+    # No exif/icc_profile arguments: Pillow writes a bare JPEG, which strips metadata.
+    img.save(path, format="JPEG", quality=settings.image_jpeg_quality, optimize=True, progressive=True)
+    return path
+
+
+def _retain_original(src: Path) -> None:
+    if settings.image_original_retention_hours <= 0:
+        src.unlink(missing_ok=True)
+        return
+    ORIGINALS_DIR.mkdir(parents=True, exist_ok=True)
+    shutil.move(str(src), ORIGINALS_DIR / src.name)
+
+
+def purge_expired_originals() -> int:
+    """Delete retained originals older than the retention window. Returns files removed."""
+    if not ORIGINALS_DIR.exists():
+        return 0
+    cutoff = time.time() - settings.image_original_retention_hours * 3600
+    removed = 0
+    with os.scandir(ORIGINALS_DIR) as entries:
+        for entry in entries:
+            if entry.is_file() and entry.stat().st_mtime < cutoff:
+                os.unlink(entry.path)
+                removed += 1
+    return removed
+
+
+def normalize_image(file_path: str) -> Dict[str, Any]:
+    """Decode an uploaded photo once; write an EXIF-free, downscaled copy and a preview thumbnail."""
+    from PIL import Image, ImageOps  # optional dependency
+
+    src = Path(file_path)
+    original_size = src.stat().st_size
+    max_dim = settings.image_max_dimension
+    with Image.open(src) as opened:
+        original_dimensions = opened.size
+        # For JPEG, let libjpeg decode straight at a reduced scale instead of full resolution.
+        scale = min(1.0, max_dim / max(opened.size))
+        opened.draft("RGB", (math.ceil(opened.width * scale), math.ceil(opened.height * scale)))
+        # Bake the EXIF orientation into pixels before metadata is dropped.
+        img = ImageOps.exif_transpose(opened)
+        img.thumbnail((max_dim, max_dim), Image.Resampling.LANCZOS)
+        keep_alpha = _has_alpha(img)
+        normalized_path = _save(img, src.with_name(f"{src.stem}_n"), keep_alpha)
+        preview = img.copy()
+        preview.thumbnail((settings.image_preview_dimension, settings.image_preview_dimension), Image.Resampling.BILINEAR)
+        preview_path = _save(preview, src.with_name(f"{src.stem}_preview"), keep_alpha=False)
+        dimensions = img.size
+
+    _retain_original(src)
+    if settings.image_original_retention_hours > 0:
+        purge_expired_originals()
+
+    return {
+        "path": str(normalized_path.absolute()),
+        "preview_path": str(preview_path.absolute()),
+        "content_type": "image/png" if keep_alpha else "image/jpeg",
+        "size_bytes": normalized_path.stat().st_size,
+        "preview_size_bytes": preview_path.stat().st_size,
+        "original_size_bytes": original_size,
+        "original_dimensions": list(original_dimensions),
+        "dimensions": list(dimensions),
+        "exif_stripped": True,
+    }
+
+
+async def anormalize_image(file_path: str) -> Dict[str, Any]:
+    """Run image normalisation in a worker thread to keep the event loop free."""
+    return await asyncio.to_thread(normalize_image, file_path)
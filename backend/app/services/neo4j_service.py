@@ -7,6 +7,48 @@ except Exception:  # pragma: no cover - optional dependency
     GraphDatabase = None
 
 
+INGEST_QUERY = """
+MERGE (u:User {id: $user_id})
+MERGE (d:Device {id: $device_id})
+MERGE (ip:IPAddress {addr: $ip_address})
+MERGE (p:PhoneNumber {num: $phone})
+MERGE (u)-[:HAS_DEVICE]->(d)
+MERGE (u)-[:HAS_IP]->(ip)
+MERGE (u)-[:HAS_PHONE]->(p)
+"""
+
+DETECTION_QUERY = """
+MATCH (u:User {id: $user_id})
+OPTIONAL MATCH (u)-[:HAS_DEVICE]->(d:Device)<-[:HAS_DEVICE]-(other_u:User)
+WITH u, count(distinct other_u) as shared_device_count
+OPTIONAL MATCH (u)-[:HAS_IP]->(ip:IPAddress)<-[:HAS_IP]-(other_ip_u:User)
+WITH u, shared_device_count, count(distinct other_ip_u) as shared_ip_count
+OPTIONAL MATCH (u)-[:HAS_PHONE]->(p:PhoneNumber)<-[:HAS_PHONE]-(fraudster:User {is_fraud: true})
+WITH u, shared_device_count, shared_ip_count, count(fraudster) as linked_fraudsters
+RETURN shared_device_count, shared_ip_count, linked_fraudsters
+"""
+
+
+def score_signals(data: dict) -> dict:
+    """Risk score and flags from the detection counts; shared by Neo4j and the embedded fraud graph."""
+    risk_score = 0
+    flags: list[str] = []
+    if data["shared_device_count"] > 2:
+        risk_score += 40
+        flags.append(
+            f"High Risk: Device shared with {data['shared_device_count']} other users."
+        )
+    if data["shared_ip_count"] > 5:
+        risk_score += 20
+        flags.append(
+            f"Medium Risk: IP used by {data['shared_ip_count']} users (Possible VPN/Bot)."
+        )
+    if data["linked_fraudsters"] > 0:
+        risk_score += 100
+        flags.append("CRITICAL: Linked to known fraudster via Phone Number.")
+    return {"risk_score": min(risk_score, 100), "flags": flags}
+
+
 class Neo4jService:
     def __init__(self) -> None:
         self.uri = os.getenv("NEO4J_URI")
@@ -37,29 +79,8 @@ class Neo4jService:
         if not self.driver or not user_id:
             return {"risk_score": 0, "flags": [], "source": "mock"}
 
-        ingest_query = """
-        MERGE (u:User {id: $user_id})
-        MERGE (d:Device {id: $device_id})
-        MERGE (ip:IPAddress {addr: $ip_address})
-        MERGE (p:PhoneNumber {num: $phone})
-        MERGE (u)-[:HAS_DEVICE]->(d)
-        MERGE (u)-[:HAS_IP]->(ip)
-        MERGE (u)-[:HAS_PHONE]->(p)
-        """
-
-        detection_query = """
-        MATCH (u:User {id: $user_id})
-        OPTIONAL MATCH (u)-[:HAS_DEVICE]->(d:Device)<-[:HAS_DEVICE]-(other_u:User)
-        WITH u, count(distinct other_u) as shared_device_count
-        OPTIONAL MATCH (u)-[:HAS_IP]->(ip:IPAddress)<-[:HAS_IP]-(other_ip_u:User)
-        WITH u, shared_device_count, count(distinct other_ip_u) as shared_ip_count
-        OPTIONAL MATCH (u)-[:HAS_PHONE]->(p:PhoneNumber)<-[:HAS_PHONE]-(fraudster:User {is_fraud: true})
-        WITH u, shared_device_count, shared_ip_count, count(fraudster) as linked_fraudsters
-        RETURN shared_device_count, shared_ip_count, linked_fraudsters
-        """
-
         self._run(
-            ingest_query,
+            INGEST_QUERY,
             {
                 "user_id": user_id,
                 "device_id": device_id or f"device-{user_id}",
@@ -67,34 +88,14 @@ class Neo4jService:
                 "phone": phone or "unknown",
             },
         )
-        rows = self._run(detection_query, {"user_id": user_id})
+        rows = self._run(DETECTION_QUERY, {"user_id": user_id})
         data = rows[0] if rows else {
             "shared_device_count": 0,
             "shared_ip_count": 0,
             "linked_fraudsters": 0,
         }
 
-        risk_score = 0
-        flags: list[str] = []
-        if data["shared_device_count"] > 2:
-            risk_score += 40
-            flags.append(
-                f"High Risk: Device shared with {data['shared_device_count']} other users."
-            )
-        if data["shared_ip_count"] > 5:
-            risk_score += 20
-            flags.append(
-                f"Medium Risk: IP used by {data['shared_ip_count']} users (Possible VPN/Bot)."
-            )
-        if data["linked_fraudsters"] > 0:
-            risk_score += 100
-            flags.append("CRITICAL: Linked to known fraudster via Phone Number.")
-
-        return {
-            "risk_score": min(risk_score, 100),
-            "flags": flags,
-            "source": "neo4j",
-        }
+        return {**score_signals(data), "source": "neo4j"}
 
 
 neo4j_service = Neo4jService()
@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 import json
+from functools import lru_cache
 from pathlib import Path
 from typing import Any, Dict, List, Optional
 
@@ -18,20 +19,32 @@ def get_mock_customers() -> List[Dict[str, Any]]:
 
 
 def get_offer_mart() -> List[Dict[str, Any]]:
+    return [dict(offer) for offer in _offer_index()["offers"]]
+
+
+@lru_cache(maxsize=1)
+def _offer_index() -> Dict[str, Any]:
+    """Offer-mart rows plus PAN / phone / name lookup tables, built once per process."""
     offers: List[Dict[str, Any]] = []
+    by_pan: Dict[str, Dict[str, Any]] = {}
+    by_phone: Dict[str, Dict[str, Any]] = {}
+    by_name: Dict[str, Dict[str, Any]] = {}
     for c in _load_customers():
-        offers.append(
-            {
-                "customer_id": c["customer_id"],
-                "name": c["name"],
-                "phone": c["phone"],
-                "pan": c["pan"],
-                "city": c["city"],
-                "credit_score": c["credit_score"],
-                "preapproved_limit": c["preapproved_personal_loan_limit"],
-            }
-        )
-    return offers
+        offer = {
+            "customer_id": c["customer_id"],
+            "name": c["name"],
+            "phone": c["phone"],
+            "pan": c["pan"],
+            "city": c["city"],
+            "credit_score": c["credit_score"],
+            "preapproved_limit": c["preapproved_personal_loan_limit"],
+        }
+        offers.append(offer)
+        # First row wins, as with the original top-to-bottom scan.
+        by_pan.setdefault(offer["pan"].upper(), offer)
+        by_phone.setdefault(offer["phone"], offer)
+        by_name.setdefault(offer["name"].lower(), offer)
+    return {"offers": offers, "pan": by_pan, "phone": by_phone, "name": by_name}
 
 
 def find_customer_offer(
@@ -44,11 +57,10 @@ def find_customer_offer(
     phone_norm = (phone or "").strip()
     name_norm = (customer_name or "").strip().lower()
 
-    for offer in get_offer_mart():
-        if pan_norm and offer["pan"].upper() == pan_norm:
-            return offer
-        if phone_norm and offer["phone"] == phone_norm:
-            return offer
-        if name_norm and offer["name"].lower() == name_norm:
-            return offer
-    return None
+    index = _offer_index()
+    offer = (
+        (pan_norm and index["pan"].get(pan_norm))
+        or (phone_norm and index["phone"].get(phone_norm))
+        or (name_norm and index["name"].get(name_norm))
+    )
+    return dict(offer) if offer else None
@@ -0,0 +1,184 @@
+from __future__ import annotations
+
+import itertools
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Dict, Iterable, List, Mapping, Optional, Sequence, Tuple
+
+import numpy as np
+
+from app.models.state import LoanApplicationDetails
+from app.services.batch_underwriting import Chunk, chunk_facts
+from app.services.policy_engine import DECISIONS, CompiledPolicy, PolicyRule, compile_sweep, document_status
+
+# Variant x application cells scored per block; small enough that the float
+# temporaries stay cache-resident (measured fastest between 64k and 1M cells).
+DEFAULT_CELL_BUDGET = 1 << 18
+MAX_VARIANTS = 100_000
+
+
+def parse_sweep(specs: Iterable[str]) -> Dict[str, np.ndarray]:
+    """Parse ``name=start:stop:step`` (inclusive) or ``name=v1,v2,...`` sweep axes."""
+    grid: Dict[str, np.ndarray] = {}
+    for spec in specs:
+        name, sep, values = spec.partition("=")
+        if not sep or not values.strip():
+            raise ValueError(f"Expected name=start:stop:step or name=v1,v2, got '{spec}'")
+        if ":" in values:
+            parts = [float(v) for v in values.split(":")]
+            if len(parts) != 3 or parts[2] <= 0:
+                raise ValueError(f"Range for '{name}' must be start:stop:step with a positive step")
+            start, stop, step = parts
+            count = int(np.floor((stop - start) / step + 1e-9)) + 1
+            axis = np.round(start + step * np.arange(max(count, 0)), 10)
+        else:
+            axis = np.array([float(v) for v in values.split(",")])
+        if axis.size == 0:
+            raise ValueError(f"Sweep axis '{name}' is empty")
+        grid[name.strip()] = axis
+    return grid
+
+
+def variant_grid(grid: Mapping[str, Sequence[float]]) -> Dict[str, np.ndarray]:
+    """Cartesian product of the sweep axes, one flat array per param."""
+    names = list(grid)
+    combos = list(itertools.product(*(np.asarray(grid[name], dtype=np.float64) for name in names)))
+    if len(combos) > MAX_VARIANTS:
+        raise ValueError(f"Sweep has {len(combos)} variants; the limit is {MAX_VARIANTS}.")
+    return {name: np.array([combo[i] for combo in combos], dtype=np.float64) for i, name in enumerate(names)}
+
+
+@dataclass
+class BacktestSurface:
+    """Outcome totals per policy variant; variant 0 is the current (baseline) policy."""
+
+    version: str
+    params: Dict[str, np.ndarray]
+    rules: Tuple[PolicyRule, ...]
+    counts: np.ndarray  # (variants, rules + 1) applications per matched rule; last column = no match
+    exposure: np.ndarray  # (variants, rules + 1) requested amount per matched rule
+
+    @property
+    def variants(self) -> int:
+        return int(self.counts.shape[0])
+
+    def _by_decision(self, values: np.ndarray) -> Dict[str, np.ndarray]:
+        decisions = [rule.decision for rule in self.rules] + ["manual_review"]
+        return {d: values[:, [i for i, rd in enumerate(decisions) if rd == d]].sum(axis=1) for d in DECISIONS}
+
+    def decision_counts(self) -> Dict[str, np.ndarray]:
+        return self._by_decision(self.counts)
+
+    def decision_exposure(self) -> Dict[str, np.ndarray]:
+        return self._by_decision(self.exposure)
+
+    def rows(self) -> List[Dict[str, Any]]:
+        counts = self.decision_counts()
+        exposure = self.decision_exposure()
+        total = self.counts.sum(axis=1)
+        safe_total = np.maximum(total, 1)
+        approval_rate = counts["approve"] / safe_total
+        out = []
+        for v in range(self.variants):
+            row: Dict[str, Any] = {"variant": "baseline" if v == 0 else v}
+            row.update({name: float(values[v]) for name, values in self.params.items()})
+            row["applications"] = int(total[v])
+            row.update({d: int(counts[d][v]) for d in DECISIONS})
+            row["approval_rate"] = round(float(approval_rate[v]), 6)
+            row["rejection_rate"] = round(float(counts["reject"][v] / safe_total[v]), 6)
+            row["document_request_rate"] = round(float(counts["request_documents"][v] / safe_total[v]), 6)
+            row["approved_exposure"] = round(float(exposure["approve"][v]), 2)
+            row["documents_pending_exposure"] = round(float(exposure["request_documents"][v]), 2)
+            row["approval_rate_delta"] = round(float(approval_rate[v] - approval_rate[0]), 6)
+            row["approved_exposure_delta"] = round(float(exposure["approve"][v] - exposure["approve"][0]), 2)
+            out.append(row)
+        return out
+
+
+def backtest(
+    chunks: Iterable[Chunk],
+    policy: CompiledPolicy,
+    grid: Mapping[str, Sequence[float]],
+    assume_documents_verified: bool = False,
+    cell_budget: int = DEFAULT_CELL_BUDGET,
+) -> BacktestSurface:
+    """Score every threshold combination in ``grid`` against historical applications.
+
+    The swept params stay free in one compiled array plan, so each block of
+    applications is scored for all variants at once as a (variants x
+    applications) matrix; outcomes are folded into per-rule counts and
+    exposure with a single ``bincount`` per block. With
+    ``assume_documents_verified`` the document gate is treated as passed, to
+    see final decisions rather than pending document requests.
+    """
+    swept = list(grid)
+    plan = compile_sweep(policy.spec, swept, params_override=policy.params)
+    variants = variant_grid(grid)
+    params = {name: np.concatenate([[float(policy.params[name])], variants[name]]) for name in swept}
+    free = {name: values[:, None] for name, values in params.items()}
+
+    n_variants = len(next(iter(params.values()))) if params else 1
+    width = len(policy.rules) + 1
+    offsets = (np.arange(n_variants, dtype=np.intp) * width)[:, None]
+    counts = np.zeros(n_variants * width, dtype=np.int64)
+    exposure = np.zeros(n_variants * width, dtype=np.float64)
+    block = max(1, cell_budget // n_variants)
+
+    for chunk in chunks:
+        facts = chunk_facts(chunk)
+        size = len(facts["requested_amount"])
+        if assume_documents_verified:
+            facts["documents_verified"] = np.ones(size, dtype=bool)
+        for start in range(0, size, block):
+            stop = min(start + block, size)
+            rule_idx = plan({name: values[None, start:stop] for name, values in facts.items()}, (n_variants, stop - start), free)
+            # -1 (no rule matched) goes to the trailing column.
+            cells = (np.where(rule_idx < 0, width - 1, rule_idx) + offsets).ravel()
+            amounts = np.broadcast_to(facts["requested_amount"][start:stop], rule_idx.shape).ravel()
+            counts += np.bincount(cells, minlength=counts.size)
+            exposure += np.bincount(cells, weights=amounts, minlength=exposure.size)
+
+    return BacktestSurface(
+        version=policy.version,
+        params=params,
+        rules=policy.rules,
+        counts=counts.reshape(n_variants, width),
+        exposure=exposure.reshape(n_variants, width),
+    )
+
+
+def checkpoint_record(thread_id: str, loan_data: LoanApplicationDetails) -> Optional[Dict[str, Any]]:
+    """Flatten a checkpointed application into a batch row; None if it never reached a loan request."""
+    if not loan_data.requested_amount or not loan_data.tenure_months:
+        return None
+    missing, unverified, _ = document_status(loan_data)
+    return {
+        "application_id": thread_id,
+        "credit_score": loan_data.credit_score,
+        "preapproved_limit": loan_data.preapproved_limit,
+        "requested_amount": loan_data.requested_amount,
+        "monthly_income": loan_data.monthly_income,
+        "verified_monthly_income": loan_data.verified_monthly_income,
+        "tenure_months": loan_data.tenure_months,
+        "existing_emis": loan_data.existing_emis,
+        "interest_rate": loan_data.interest_rate,
+        "employer_tier": loan_data.employer_tier,
+        "purpose_category": loan_data.purpose_category,
+        "documents_verified": "true" if not (missing or unverified) else "false",
+    }
+
+
+async def iter_checkpoint_records(checkpointer: Any) -> AsyncIterator[Dict[str, Any]]:
+    """Latest application snapshot per thread from a LangGraph checkpointer."""
+    seen = set()
+    async for item in checkpointer.alist(None):
+        thread_id = (item.config.get("configurable") or {}).get("thread_id")
+        if not thread_id or thread_id in seen:
+            continue
+        seen.add(thread_id)
+        loan_data = (item.checkpoint.get("channel_values") or {}).get("loan_data")
+        if isinstance(loan_data, dict):
+            loan_data = LoanApplicationDetails.model_validate(loan_data)
+        if isinstance(loan_data, LoanApplicationDetails):
+            record = checkpoint_record(thread_id, loan_data)
+            if record:
+                yield record
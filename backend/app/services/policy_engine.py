@@ -0,0 +1,429 @@
+from __future__ import annotations
+
+import ast
+import json
+import math
+import threading
+import time
+from dataclasses import dataclass
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Mapping, Optional, Sequence, Tuple
+
+import numpy as np
+
+from app.models.state import LoanApplicationDetails
+from app.settings import settings
+
+DEFAULT_POLICY_FILE = Path(__file__).resolve().parent.parent / "data" / "underwriting_policy.json"
+
+# Facts a rule condition may reference; everything else must be a policy param.
+FACTS = (
+    "credit_score",
+    "preapproved_limit",
+    "requested_amount",
+    "monthly_income",
+    "emi",
+    "emi_ratio",
+    "existing_emis",
+    "tenure_months",
+    "documents_verified",
+)
+DECISIONS = ("approve", "reject", "request_documents", "manual_review")
+
+_ALLOWED_NODES = (
+    ast.Expression, ast.BoolOp, ast.And, ast.Or, ast.UnaryOp, ast.Not, ast.USub,
+    ast.BinOp, ast.Add, ast.Sub, ast.Mult, ast.Div, ast.Compare, ast.Lt, ast.LtE,
+    ast.Gt, ast.GtE, ast.Eq, ast.NotEq, ast.Name, ast.Load, ast.Constant,
+)
+
+
+class PolicyError(ValueError):
+    """Raised when a policy file cannot be loaded or compiled."""
+
+
+@dataclass(frozen=True)
+class PolicyRule:
+    id: str
+    when: str
+    decision: str
+    confidence: float
+    message: str
+    rejection_reason: Optional[str] = None
+    reasoning: Optional[str] = None
+    thought: Optional[str] = None
+    policy_version: str = ""
+
+
+# Returned when no rule matches, so a gap in a policy file never auto-approves.
+NO_MATCH_RULE = PolicyRule(
+    id="no_rule_matched",
+    when="",
+    decision="manual_review",
+    confidence=0.5,
+    message="Your application needs a manual review. Our team will get back to you shortly.",
+    reasoning="No underwriting policy rule matched the application.",
+    thought="No policy rule matched; routed to manual review.",
+)
+
+
+class _ParamInliner(ast.NodeTransformer):
+    """Validate a condition and fold policy params into constants."""
+
+    def __init__(self, params: Mapping[str, Any], rule_id: str, free_params: frozenset = frozenset()) -> None:
+        self.params = params
+        self.rule_id = rule_id
+        # Params left as names (threshold sweeps bind them to arrays at call time).
+        self.free_params = free_params
+        self.facts_used: set = set()
+
+    def generic_visit(self, node: ast.AST) -> ast.AST:
+        if not isinstance(node, _ALLOWED_NODES):
+            raise PolicyError(f"Rule '{self.rule_id}': '{type(node).__name__}' is not allowed in conditions.")
+        return super().generic_visit(node)
+
+    def visit_Constant(self, node: ast.Constant) -> ast.AST:
+        if not isinstance(node.value, (int, float, bool)):
+            raise PolicyError(f"Rule '{self.rule_id}': only numeric/boolean literals are allowed.")
+        return node
+
+    def visit_Name(self, node: ast.Name) -> ast.AST:
+        if node.id in ("True", "False"):
+            return ast.copy_location(ast.Constant(node.id == "True"), node)
+        if node.id in self.free_params:
+            return node
+        if node.id in self.params:
+            return ast.copy_location(ast.Constant(self.params[node.id]), node)
+        if node.id in FACTS:
+            self.facts_used.add(node.id)
+            return node
+        raise PolicyError(f"Rule '{self.rule_id}': unknown name '{node.id}'.")
+
+
+class _Vectorizer(ast.NodeTransformer):
+    """Rewrite a validated condition so it evaluates element-wise on arrays."""
+
+    @staticmethod
+    def _call(func: str, args: list) -> ast.Call:
+        return ast.Call(func=ast.Name(func, ast.Load()), args=args, keywords=[])
+
+    def _fold(self, func: str, values: list) -> ast.AST:
+        node = values[0]
+        for value in values[1:]:
+            node = self._call(func, [node, value])
+        return node
+
+    def visit_BoolOp(self, node: ast.BoolOp) -> ast.AST:
+        values = [self.visit(v) for v in node.values]
+        return self._fold("_and" if isinstance(node.op, ast.And) else "_or", values)
+
+    def visit_UnaryOp(self, node: ast.UnaryOp) -> ast.AST:
+        operand = self.visit(node.operand)
+        if isinstance(node.op, ast.Not):
+            return self._call("_not", [operand])
+        return ast.UnaryOp(op=node.op, operand=operand)
+
+    def visit_Compare(self, node: ast.Compare) -> ast.AST:
+        left = self.visit(node.left)
+        parts = []
+        for op, right in zip(node.ops, node.comparators):
+            right = self.visit(right)
+            parts.append(ast.Compare(left=left, ops=[op], comparators=[right]))
+            left = right
+        return self._fold("_and", parts)
+
+
+@dataclass(frozen=True)
+class CompiledPolicy:
+    """A policy compiled into a single straight-line Python function."""
+
+    version: str
+    params: Dict[str, Any]
+    rules: Tuple[PolicyRule, ...]
+    _plan: Callable[[Mapping[str, Any]], int]
+    _batch_plan: Callable[..., np.ndarray]
+    spec: Mapping[str, Any]
+
+    def evaluate(self, facts: Mapping[str, Any]) -> PolicyRule:
+        idx = self._plan(facts)
+        return self.rules[idx] if idx >= 0 else NO_MATCH_RULE
+
+    def evaluate_batch(self, facts: Mapping[str, np.ndarray]) -> np.ndarray:
+        """Matched rule index per row (``-1`` for no match) over columnar facts."""
+        size = len(next(iter(facts.values()))) if facts else 0
+        return self._batch_plan(facts, (size,))
+
+    def rule_for_index(self, idx: int) -> PolicyRule:
+        return self.rules[idx] if idx >= 0 else NO_MATCH_RULE
+
+    def with_params(self, overrides: Optional[Mapping[str, Any]]) -> "CompiledPolicy":
+        """Recompile the same rules with some thresholds replaced."""
+        return compile_policy(self.spec, params_override=overrides) if overrides else self
+
+
+def _resolve_params(spec: Mapping[str, Any], params_override: Optional[Mapping[str, Any]]) -> Dict[str, Any]:
+    params = dict(spec.get("params") or {})
+    unknown = set(params_override or {}) - set(params)
+    if unknown:
+        raise PolicyError(f"Unknown policy param(s): {', '.join(sorted(unknown))}.")
+    params.update(params_override or {})
+    for name, value in params.items():
+        if name in FACTS:
+            raise PolicyError(f"Param '{name}' shadows an application fact.")
+        if isinstance(value, bool) or not isinstance(value, (int, float)):
+            raise PolicyError(f"Param '{name}' must be numeric.")
+    return params
+
+
+def _parse_rules(
+    spec: Mapping[str, Any],
+    params: Mapping[str, Any],
+    version: str,
+    free_params: frozenset = frozenset(),
+) -> Tuple[list, list, list, set]:
+    """Validate every rule; return rules, scalar conditions, array condition trees and the facts read."""
+    raw_rules = spec.get("rules") or []
+    if not raw_rules:
+        raise PolicyError("Policy has no rules.")
+
+    rules = []
+    conditions = []
+    batch_conditions = []
+    facts_used: set = set()
+    for raw in raw_rules:
+        rule_id = str(raw.get("id") or f"rule_{len(rules)}")
+        decision = raw.get("decision")
+        if decision not in DECISIONS:
+            raise PolicyError(f"Rule '{rule_id}': unknown decision '{decision}'.")
+        try:
+            tree = ast.parse(str(raw.get("when", "")), mode="eval")
+        except SyntaxError as exc:
+            raise PolicyError(f"Rule '{rule_id}': invalid condition: {exc.msg}") from exc
+        inliner = _ParamInliner(params, rule_id, free_params)
+        tree = ast.fix_missing_locations(inliner.visit(tree))
+        facts_used |= inliner.facts_used
+        conditions.append(ast.unparse(tree.body))
+        batch_conditions.append(ast.fix_missing_locations(_Vectorizer().visit(tree.body)))
+        rules.append(
+            PolicyRule(
+                id=rule_id,
+                when=str(raw.get("when")),
+                decision=decision,
+                confidence=float(raw.get("confidence", 0.5)),
+                message=str(raw.get("message") or ""),
+                rejection_reason=raw.get("rejection_reason"),
+                reasoning=raw.get("reasoning"),
+                thought=raw.get("thought"),
+                policy_version=version,
+            )
+        )
+    return rules, conditions, batch_conditions, facts_used
+
+
+class _SharedTerms(ast.NodeTransformer):
+    """Replace comparisons that several rules repeat with names computed once."""
+
+    def __init__(self, names: Mapping[str, str]) -> None:
+        self.names = names
+
+    def visit_Compare(self, node: ast.Compare) -> ast.AST:
+        name = self.names.get(ast.unparse(node))
+        return ast.Name(name, ast.Load()) if name else self.generic_visit(node)
+
+
+def _array_plan(
+    name: str,
+    version: str,
+    batch_conditions: list,
+    facts_used: set,
+    free_params: Tuple[str, ...] = (),
+) -> Callable[..., np.ndarray]:
+    """Generate the array plan: first match wins via a shrinking "open" mask.
+
+    ``shape`` is the output shape; facts and free params must broadcast to it.
+    """
+    lines = [f"def {name}(f, shape, p=None):"]
+    lines += [f"    {fact} = f[{fact!r}]" for fact in FACTS if fact in facts_used]
+    lines += [f"    {param} = p[{param!r}]" for param in free_params]
+    # Every array condition is evaluated in full anyway, so a comparison shared by
+    # several rules (e.g. the limit-multiple check) is computed once up front.
+    counts: Dict[str, int] = {}
+    for tree in batch_conditions:
+        for node in ast.walk(tree):
+            if isinstance(node, ast.Compare):
+                key = ast.unparse(node)
+                counts[key] = counts.get(key, 0) + 1
+    shared = {key: f"_t{i}" for i, key in enumerate(k for k, c in counts.items() if c > 1)}
+    lines += [f"    {term} = {key}" for key, term in shared.items()]
+    lines.append("    out = _full(shape, -1, dtype=_int16)")
+    lines.append("    open_ = _ones(shape, dtype=_bool)")
+    for idx, tree in enumerate(batch_conditions):
+        condition = ast.unparse(_SharedTerms(shared).visit(tree))
+        lines.append(f"    hit = _and({condition}, open_)")
+        lines.append(f"    _copyto(out, {idx}, where=hit)")
+        lines.append("    _and(open_, _not(hit), out=open_)")
+    lines.append("    return out")
+    namespace: Dict[str, Any] = {
+        "__builtins__": {},
+        "_and": np.logical_and,
+        "_or": np.logical_or,
+        "_not": np.logical_not,
+        "_copyto": np.copyto,
+        "_full": np.full,
+        "_ones": np.ones,
+        "_int16": np.int16,
+        "_bool": np.bool_,
+    }
+    exec(compile("\n".join(lines), f"<policy {version} {name}>", "exec"), namespace)
+    return namespace[name]
+
+
+def compile_policy(spec: Mapping[str, Any], params_override: Optional[Mapping[str, Any]] = None) -> CompiledPolicy:
+    """Validate a policy spec and compile its rules into one evaluation function."""
+    version = str(spec.get("version") or "unversioned")
+    params = _resolve_params(spec, params_override)
+    rules, conditions, batch_conditions, facts_used = _parse_rules(spec, params, version)
+
+    # Only the facts a policy actually reads are loaded, each exactly once.
+    lines = ["def _plan(f):"]
+    lines += [f"    {name} = f[{name!r}]" for name in FACTS if name in facts_used]
+    for idx, condition in enumerate(conditions):
+        lines.append(f"    if {condition}:")
+        lines.append(f"        return {idx}")
+    lines.append("    return -1")
+    namespace: Dict[str, Any] = {"__builtins__": {}}
+    exec(compile("\n".join(lines), f"<policy {version}>", "exec"), namespace)
+
+    return CompiledPolicy(
+        version=version,
+        params=params,
+        rules=tuple(rules),
+        _plan=namespace["_plan"],
+        _batch_plan=_array_plan("_batch_plan", version, batch_conditions, facts_used),
+        spec=spec,
+    )
+
+
+def compile_sweep(
+    spec: Mapping[str, Any],
+    swept: Sequence[str],
+    params_override: Optional[Mapping[str, Any]] = None,
+) -> Callable[..., np.ndarray]:
+    """Array plan with the ``swept`` params left free instead of inlined.
+
+    Call it as ``plan(facts, shape, params)``: with facts shaped ``(1, n)`` and
+    param values shaped ``(v, 1)`` it scores ``v`` policy variants against
+    ``n`` applications in one pass, returning rule indices shaped ``(v, n)``.
+    """
+    version = str(spec.get("version") or "unversioned")
+    params = _resolve_params(spec, params_override)
+    unknown = set(swept) - set(params)
+    if unknown:
+        raise PolicyError(f"Unknown policy param(s): {', '.join(sorted(unknown))}.")
+    _, _, batch_conditions, facts_used = _parse_rules(spec, params, version, frozenset(swept))
+    return _array_plan("_sweep_plan", version, batch_conditions, facts_used, tuple(swept))
+
+
+def load_policy_spec(path: Path) -> Dict[str, Any]:
+    try:
+        text = path.read_text(encoding="utf-8")
+    except OSError as exc:
+        raise PolicyError(f"Cannot read policy file {path}: {exc}") from exc
+    if path.suffix.lower() in {".yaml", ".yml"}:
+        try:
+            import yaml  # optional dependency
+        except ImportError as exc:
+            raise PolicyError("PyYAML is required for YAML policy files.") from exc
+        spec = yaml.safe_load(text)
+    else:
+        spec = json.loads(text)
+    if not isinstance(spec, dict):
+        raise PolicyError("Policy file must contain a mapping.")
+    return spec
+
+
+def underwriting_facts(
+    loan_data: LoanApplicationDetails,
+    *,
+    monthly_income: float,
+    documents_verified: bool,
+) -> Dict[str, Any]:
+    """Flatten application data into the fact names policy conditions use."""
+    emi = float(loan_data.calculated_emi or 0)
+    return {
+        "credit_score": int(loan_data.credit_score or 0),
+        "preapproved_limit": float(loan_data.preapproved_limit or 0),
+        "requested_amount": float(loan_data.requested_amount or 0),
+        "monthly_income": monthly_income,
+        "emi": emi,
+        "emi_ratio": emi / monthly_income if monthly_income > 0 else math.inf,
+        "existing_emis": float(loan_data.existing_emis or 0),
+        "tenure_months": int(loan_data.tenure_months or 0),
+        "documents_verified": documents_verified,
+    }
+
+
+def document_status(loan_data: LoanApplicationDetails) -> Tuple[List[str], List[str], List[str]]:
+    """Mandatory documents for the application, split into missing, unverified and verified."""
+    docs_by_type = {doc.get("type"): doc for doc in loan_data.documents_received if doc.get("type")}
+    mandatory = ["bank_statement", "address_proof", "selfie_pan"]
+    if loan_data.employment_type == "salaried":
+        mandatory.insert(0, "salary_slip")
+    missing = [d for d in mandatory if d not in docs_by_type]
+    unverified = [d for d in mandatory if d in docs_by_type and not bool((docs_by_type[d] or {}).get("verified"))]
+    verified = [d for d in mandatory if d in docs_by_type and bool((docs_by_type[d] or {}).get("verified"))]
+    return missing, unverified, verified
+
+
+class PolicyEngine:
+    """Holds the compiled policy and hot-reloads it when the file changes.
+
+    A reload compiles the new policy completely before swapping a single
+    reference, so concurrent evaluations see either the old or the new plan.
+    """
+
+    def __init__(self, path: Path, reload_interval_s: float = 5.0) -> None:
+        self.path = path
+        self.reload_interval_s = reload_interval_s
+        self._lock = threading.Lock()
+        self._mtime = self._stat_mtime()
+        self._policy = compile_policy(load_policy_spec(path))
+        self._next_check = time.monotonic() + reload_interval_s
+
+    def _stat_mtime(self) -> float:
+        try:
+            return self.path.stat().st_mtime
+        except OSError:
+            return 0.0
+
+    @property
+    def policy(self) -> CompiledPolicy:
+        if self.reload_interval_s > 0 and time.monotonic() >= self._next_check:
+            self._next_check = time.monotonic() + self.reload_interval_s
+            if self._stat_mtime() != self._mtime:
+                self.reload()
+        return self._policy
+
+    def reload(self) -> bool:
+        """Recompile from disk; on failure keep serving the current policy."""
+        with self._lock:
+            mtime = self._stat_mtime()
+            try:
+                compiled = compile_policy(load_policy_spec(self.path))
+            except (PolicyError, ValueError) as exc:
+                print(f"⚠️ Underwriting policy reload failed, keeping {self._policy.version}: {exc}")
+                self._mtime = mtime
+                return False
+            self._policy = compiled
+            self._mtime = mtime
+            return True
+
+    def evaluate(self, facts: Mapping[str, Any]) -> PolicyRule:
+        return self.policy.evaluate(facts)
+
+
+@lru_cache()
+def get_policy_engine() -> PolicyEngine:
+    """Get singleton policy engine"""
+    path = Path(settings.underwriting_policy_path) if settings.underwriting_policy_path else DEFAULT_POLICY_FILE
+    return PolicyEngine(path, reload_interval_s=settings.policy_reload_interval_s)
@@ -0,0 +1,152 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import uuid
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Dict, Iterable, Optional, Sequence
+
+import numpy as np
+
+from app.models.state import LoanApplicationDetails
+from app.settings import settings
+
+RATE_CARD_FILE = Path(__file__).resolve().parent.parent / "data" / "rate_card.json"
+
+SCORE_MIN, SCORE_MAX = 300, 900
+# Index 0 of each categorical axis is "unknown" (field not yet captured).
+EMPLOYER_TIERS = ("unknown", "tier_1", "tier_2", "tier_3", "unverified")
+PURPOSES = ("unknown", "debt_consolidation", "medical", "wedding", "education", "business", "other", "home_renovation")
+RISK_INDICATORS = ("high_dti", "low_credit", "no_income", "high_leverage")
+
+# Part of the cache key: bump when build_rate_grid's layout or dtype changes.
+GRID_LAYOUT_VERSION = 2
+
+_TIER_INDEX = {name: i for i, name in enumerate(EMPLOYER_TIERS)}
+_PURPOSE_INDEX = {name: i for i, name in enumerate(PURPOSES)}
+_RISK_BIT = {name: 1 << i for i, name in enumerate(RISK_INDICATORS)}
+
+
+def build_rate_grid(card: Dict[str, Any]) -> np.ndarray:
+    """Dense rate table: credit score (1-point steps) x tier x purpose x risk-flag mask."""
+    anchors = np.asarray(card["base_rate_by_credit_score"], dtype=np.float64)
+    scores = np.arange(SCORE_MIN, SCORE_MAX + 1, dtype=np.float64)
+    base = np.interp(scores, anchors[:, 0], anchors[:, 1])
+
+    tier_adj = np.array([card["employer_tier_adjustment"].get(t, 0.0) for t in EMPLOYER_TIERS])
+    purpose_adj = np.array([card["purpose_adjustment"].get(p, 0.0) for p in PURPOSES])
+    flag_adj = np.array([card["risk_indicator_adjustment"].get(f, 0.0) for f in RISK_INDICATORS])
+    masks = np.arange(1 << len(RISK_INDICATORS))
+    risk_adj = ((masks[:, None] >> np.arange(len(RISK_INDICATORS))) & 1) @ flag_adj
+
+    grid = (
+        base[:, None, None, None]
+        + tier_adj[None, :, None, None]
+        + purpose_adj[None, None, :, None]
+        + risk_adj[None, None, None, :]
+    )
+    return np.round(np.clip(grid, card["floor"], card["cap"]), 2)
+
+
+class PricingGrid:
+    """Read-only rate lookups over a precomputed grid.
+
+    The grid is memory-mapped from a cache file keyed by the rate card's
+    content hash, so every worker process on a host shares the same pages.
+    """
+
+    def __init__(self, grid: np.ndarray, card: Dict[str, Any]) -> None:
+        # Plain ndarray view over the same (possibly mmapped) buffer: skips np.memmap's
+        # Python-level __getitem__ on the per-request path.
+        self.grid = np.asarray(grid)
+        self.version = str(card.get("version") or "unversioned")
+        self.unknown_credit_score = float(card.get("unknown_credit_score", 700))
+
+    @staticmethod
+    def risk_mask(risk_indicators: Iterable[str]) -> int:
+        mask = 0
+        for name in risk_indicators:
+            mask |= _RISK_BIT.get(name, 0)
+        return mask
+
+    def rate(
+        self,
+        credit_score: Optional[float],
+        employer_tier: Optional[str] = None,
+        purpose_category: Optional[str] = None,
+        risk_indicators: Iterable[str] = (),
+    ) -> float:
+        """Annual rate (%) for one applicant; fractional scores interpolate between rows."""
+        score = self.unknown_credit_score if credit_score is None else float(credit_score)
+        score = min(max(score, SCORE_MIN), SCORE_MAX) - SCORE_MIN
+        row = int(score)
+        tier = _TIER_INDEX.get(employer_tier or "unknown", 0)
+        purpose = _PURPOSE_INDEX.get(purpose_category or "unknown", 0)
+        mask = self.risk_mask(risk_indicators)
+        rate = self.grid.item(row, tier, purpose, mask)
+        frac = score - row
+        if frac and row + 1 < self.grid.shape[0]:
+            rate = round(rate + frac * (self.grid.item(row + 1, tier, purpose, mask) - rate), 2)
+        return rate
+
+    def rate_for(self, loan_data: LoanApplicationDetails) -> float:
+        return self.rate(
+            loan_data.credit_score,
+            loan_data.employer_tier,
+            loan_data.purpose_category,
+            loan_data.risk_indicators,
+        )
+
+    def rates(
+        self,
+        credit_scores: np.ndarray,
+        employer_tiers: Optional[Sequence[Optional[str]]] = None,
+        purpose_categories: Optional[Sequence[Optional[str]]] = None,
+    ) -> np.ndarray:
+        """Vectorised lookup for batch scoring (integer scores, no risk flags)."""
+        scores = np.asarray(credit_scores, dtype=np.float64)
+        scores = np.where(np.isfinite(scores) & (scores > 0), scores, self.unknown_credit_score)
+        rows = (np.clip(scores, SCORE_MIN, SCORE_MAX) - SCORE_MIN).astype(np.intp)
+        size = rows.size
+        tiers = (
+            np.fromiter((_TIER_INDEX.get(t or "unknown", 0) for t in employer_tiers), dtype=np.intp, count=size)
+            if employer_tiers is not None
+            else np.zeros(size, dtype=np.intp)
+        )
+        purposes = (
+            np.fromiter((_PURPOSE_INDEX.get(p or "unknown", 0) for p in purpose_categories), dtype=np.intp, count=size)
+            if purpose_categories is not None
+            else np.zeros(size, dtype=np.intp)
+        )
+        return self.grid[rows, tiers, purposes, 0]
+
+
+def load_rate_card(path: Path) -> Dict[str, Any]:
+    with path.open("r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _cached_grid(card: Dict[str, Any], cache_dir: Path) -> np.ndarray:
+    key = json.dumps({"layout": GRID_LAYOUT_VERSION, "card": card}, sort_keys=True)
+    digest = hashlib.sha256(key.encode("utf-8")).hexdigest()[:16]
+    path = cache_dir / f"rate_grid_{digest}.npy"
+    if not path.is_file():
+        cache_dir.mkdir(parents=True, exist_ok=True)
+        tmp = cache_dir / f".rate_grid_{digest}.{uuid.uuid4().hex[:6]}.npy"
+        np.save(tmp, build_rate_grid(card))
+        os.replace(tmp, path)
+    return np.load(path, mmap_mode="r")
+
+
+@lru_cache()
+def get_pricing_grid() -> PricingGrid:
+    """Get singleton pricing grid"""
+    card = load_rate_card(Path(settings.rate_card_path) if settings.rate_card_path else RATE_CARD_FILE)
+    try:
+        grid = _cached_grid(card, Path(settings.pricing_cache_dir))
+    except OSError as exc:
+        print(f"⚠️ Pricing grid cache unavailable, building in memory: {exc}")
+        grid = build_rate_grid(card)
+    return PricingGrid(grid, card)
@@ -0,0 +1,144 @@
+from __future__ import annotations
+
+import json
+import re
+from collections import deque
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
+
+from app.settings import settings
+
+TAXONOMY_FILE = Path(__file__).resolve().parent.parent / "data" / "purpose_taxonomy.json"
+CLASSIFY_CACHE_MAX_ENTRIES = 8192
+
+# Purposes are matched over this alphabet only; everything else becomes a word break.
+ALPHABET = " abcdefghijklmnopqrstuvwxyz0123456789"
+_CODES = bytes.maketrans(ALPHABET.encode(), bytes(range(len(ALPHABET))))
+_NON_ALPHABET = re.compile(r"[^a-z0-9]+")
+
+
+class TaxonomyError(ValueError):
+    """Raised when a purpose taxonomy file cannot be loaded or compiled."""
+
+
+class PurposeProfile(NamedTuple):
+    category: str
+    risk_profile: str
+    urgency: str
+    suggested_tenure: int
+    matched: Optional[str]  # synonym that decided the category; None for the default
+    taxonomy_version: str
+
+
+def normalize_purpose(purpose: str) -> str:
+    return _NON_ALPHABET.sub(" ", (purpose or "").lower()).strip()
+
+
+class PurposeTaxonomy:
+    """Loan purpose classifier compiled from a synonym file.
+
+    Every phrase goes into one Aho-Corasick automaton, flattened into a dense
+    transition table over ``ALPHABET``, so a purpose is classified in a single
+    left-to-right pass however many synonyms the file lists. Results are
+    memoised per normalised purpose.
+    """
+
+    def __init__(self, data: Dict[str, Any]) -> None:
+        categories = data.get("categories") or {}
+        self.version = str(data.get("version") or "unversioned")
+        self.default = str(data.get("default") or "other")
+        if self.default not in categories:
+            raise TaxonomyError(f"Default category {self.default!r} is not defined")
+        self.profiles: Dict[str, PurposeProfile] = {}
+        patterns: List[Tuple[str, str, str]] = []  # (pattern, category, phrase)
+        for name, spec in categories.items():
+            try:
+                self.profiles[name] = PurposeProfile(
+                    name, str(spec["risk"]), str(spec["urgency"]), int(spec["typical_tenure"]), None, self.version
+                )
+            except (KeyError, TypeError, ValueError) as exc:
+                raise TaxonomyError(f"Category {name!r}: {exc}") from exc
+            for phrase in spec.get("phrases") or ():
+                stem = normalize_purpose(phrase.rstrip("*"))
+                if not stem:
+                    raise TaxonomyError(f"Category {name!r}: empty phrase {phrase!r}")
+                # Anchored at a word start; whole words unless the phrase ends in *.
+                patterns.append((" " + stem + ("" if phrase.endswith("*") else " "), name, phrase))
+        self.phrase_count = len(patterns)
+        self._delta, self._best = self._compile(patterns)
+        self.classify_normalized = lru_cache(maxsize=CLASSIFY_CACHE_MAX_ENTRIES)(self._match)
+        # Exact repeats (the same purpose on every sales turn) skip normalising too.
+        self.classify = lru_cache(maxsize=CLASSIFY_CACHE_MAX_ENTRIES)(self._classify)
+
+    @staticmethod
+    def _compile(patterns: List[Tuple[str, str, str]]) -> Tuple[List[int], List[Optional[Tuple[int, str, str]]]]:
+        width = len(ALPHABET)
+        goto: List[Dict[int, int]] = [{}]
+        best: List[Optional[Tuple[int, str, str]]] = [None]
+        for pattern, category, phrase in patterns:
+            state = 0
+            for code in pattern.encode().translate(_CODES):
+                nxt = goto[state].get(code)
+                if nxt is None:
+                    nxt = goto[state][code] = len(goto)
+                    goto.append({})
+                    best.append(None)
+                state = nxt
+            if best[state] is None:  # first listing of a duplicate phrase wins
+                best[state] = (len(pattern), category, phrase)
+
+        # Breadth-first: resolve failure links into full transitions, and let each
+        # state inherit the longest phrase ending at it from its failure state.
+        delta = [0] * (len(goto) * width)
+        fail = [0] * len(goto)
+        queue = deque()
+        for code in range(width):
+            nxt = goto[0].get(code, 0)
+            delta[code] = nxt
+            if nxt:
+                queue.append(nxt)
+        while queue:
+            state = queue.popleft()
+            if best[state] is None:
+                best[state] = best[fail[state]]
+            for code in range(width):
+                nxt = goto[state].get(code)
+                if nxt is None:
+                    delta[state * width + code] = delta[fail[state] * width + code]
+                else:
+                    fail[nxt] = delta[fail[state] * width + code]
+                    delta[state * width + code] = nxt
+                    queue.append(nxt)
+        return delta, best
+
+    def _match(self, normalized: str) -> PurposeProfile:
+        delta, best, width = self._delta, self._best, len(ALPHABET)
+        state, hit = 0, None
+        for code in (" " + normalized + " ").encode().translate(_CODES):
+            state = delta[state * width + code]
+            found = best[state]
+            # Longest phrase wins; among equals, the first one seen (it started earlier).
+            if found is not None and (hit is None or found[0] > hit[0]):
+                hit = found
+        if hit is None:
+            return self.profiles[self.default]
+        return self.profiles[hit[1]]._replace(matched=hit[2])
+
+    def _classify(self, purpose: str) -> PurposeProfile:
+        return self.classify_normalized(normalize_purpose(purpose))
+
+
+def load_taxonomy(path: Path) -> PurposeTaxonomy:
+    try:
+        with path.open("r", encoding="utf-8") as f:
+            data = json.load(f)
+    except (OSError, ValueError) as exc:
+        raise TaxonomyError(f"Cannot read purpose taxonomy {path}: {exc}") from exc
+    return PurposeTaxonomy(data)
+
+
+@lru_cache()
+def get_purpose_taxonomy() -> PurposeTaxonomy:
+    """Get singleton purpose taxonomy"""
+    return load_taxonomy(Path(settings.purpose_taxonomy_path) if settings.purpose_taxonomy_path else TAXONOMY_FILE)
@@ -0,0 +1,80 @@
+from __future__ import annotations
+
+import hashlib
+import json
+from functools import lru_cache
+from typing import Any, Dict, Optional, Tuple
+
+from app.services.emi import calculate_emi
+from app.services.offer_mart_service import find_customer_offer
+from app.services.policy_engine import get_policy_engine
+from app.services.pricing_service import get_pricing_grid
+
+QUOTE_CACHE_MAX_ENTRIES = 8192
+QUOTE_CACHE_CONTROL = "private, max-age=300"
+
+
+def build_quote(pan: Optional[str], phone: Optional[str], amount: float, tenure_months: int) -> Dict[str, Any]:
+    """Pre-qualification answer from the offer mart and EMI formula alone.
+
+    No thread, checkpoint or LLM call is involved, and nothing identifying
+    (name, credit score, customer id) is echoed back to the anonymous caller.
+    The rate is the card's headline (unknown-score) rate for everyone: the grid
+    moves per score point, so a score-priced rate would give the score away.
+    Score-based pricing happens once the applicant is in an application.
+    """
+    policy = get_policy_engine().policy
+    params = policy.params
+    offer = find_customer_offer(pan=pan, phone=phone)
+    rate = get_pricing_grid().rate(None)
+    quote: Dict[str, Any] = {
+        "requested_amount": amount,
+        "tenure_months": tenure_months,
+        "annual_rate_percent": rate,
+        "rate_type": "indicative",
+        "emi": round(calculate_emi(amount, rate, tenure_months), 2),
+        "policy_version": policy.version,
+    }
+    if not offer:
+        quote.update({"status": "no_offer", "message": "No pre-approved offer found. Start an application to check eligibility."})
+        return quote
+
+    limit = float(offer["preapproved_limit"])
+    with_documents = limit * float(params.get("limit_multiplier", 1))
+    if offer["credit_score"] < params.get("min_credit_score", 0):
+        status, message = "not_eligible", "We are unable to offer a personal loan at the moment."
+    elif amount <= limit:
+        status, message = "instant_approval", "This amount is within your pre-approved limit."
+    elif amount <= with_documents:
+        status, message = "documents_required", "This amount is available after income and KYC document verification."
+    else:
+        status, message = "above_limit", "This amount is above what we can offer; see the maximum below."
+    quote.update(
+        {
+            "status": status,
+            "message": message,
+            "preapproved_limit": limit if status != "not_eligible" else None,
+            "max_amount_with_documents": with_documents if status != "not_eligible" else None,
+            "emi_at_preapproved_limit": (
+                round(calculate_emi(limit, rate, tenure_months), 2) if status != "not_eligible" else None
+            ),
+        }
+    )
+    return quote
+
+
+@lru_cache(maxsize=QUOTE_CACHE_MAX_ENTRIES)
+def _cached_quote(pan: str, phone: str, amount: float, tenure_months: int, policy_version: str) -> Tuple[bytes, str]:
+    body = json.dumps(build_quote(pan or None, phone or None, amount, tenure_months), separators=(",", ":")).encode()
+    return body, hashlib.sha256(body).hexdigest()[:20]
+
+
+def quote_payload(pan: Optional[str], phone: Optional[str], amount: float, tenure_months: int) -> Tuple[bytes, str]:
+    """Serialized quote and its ETag, memoised per (identifier, amount, tenure, policy version)."""
+    return _cached_quote(
+        (pan or "").strip().upper(),
+        (phone or "").strip(),
+        round(float(amount), 2),
+        int(tenure_months),
+        get_policy_engine().policy.version,
+    )
@@ -0,0 +1,203 @@
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import re
+from collections import OrderedDict
+from threading import Lock
+from typing import Any, Dict, List, Optional, Pattern, Tuple
+
+from app.services.document_verification_service import extract_pdf_text
+
+# Label patterns are tried in order; the first one that yields an amount wins.
+NET_PAY_PATTERNS: Tuple[Pattern[str], ...] = tuple(
+    re.compile(p, re.IGNORECASE)
+    for p in (
+        r"\bnet\s*(?:pay|salary|amount)?\s*(?:payable|paid|credited)\b",
+        r"\bnet\s*(?:pay|salary|take[\s-]*home)\b",
+        r"\btake[\s-]*home\s*(?:pay|salary)?\b",
+        r"\bamount\s*credited\b",
+    )
+)
+GROSS_PAY_PATTERNS: Tuple[Pattern[str], ...] = tuple(
+    re.compile(p, re.IGNORECASE)
+    for p in (
+        r"\bgross\s*(?:pay|salary|earnings|total)\b",
+        r"\btotal\s*earnings\b",
+        r"\bgross\b",
+    )
+)
+EMPLOYER_LABEL_RE = re.compile(
+    r"^\s*(?:employer|company|organi[sz]ation)\s*(?:name)?\s*[:\-]\s*(?P<name>.+?)\s*$",
+    re.IGNORECASE | re.MULTILINE,
+)
+EMPLOYER_SUFFIX_RE = re.compile(
+    r"\b(?:pvt\.?\s*ltd\.?|private\s+limited|limited|ltd\.?|llp|inc\.?|corporation|technologies|services)\b",
+    re.IGNORECASE,
+)
+PAY_PERIOD_RES: Tuple[Pattern[str], ...] = (
+    re.compile(
+        r"\b(?:pay\s*period|salary\s*(?:slip\s*)?for(?:\s*the\s*month(?:\s*of)?)?|month|payslip\s*for)\s*[:\-]?\s*"
+        r"(?P<month>jan|feb|mar|apr|may|jun|jul|aug|sep|sept|oct|nov|dec)[a-z]*[\s,\-/']*(?P<year>\d{2,4})\b",
+        re.IGNORECASE,
+    ),
+    re.compile(
+        r"\b(?P<month>jan|feb|mar|apr|may|jun|jul|aug|sep|sept|oct|nov|dec)[a-z]*[\s,\-/']+(?P<year>20\d{2})\b",
+        re.IGNORECASE,
+    ),
+    re.compile(r"\b(?:pay\s*period|month)\s*[:\-]?\s*(?P<mnum>0?[1-9]|1[0-2])[/\-](?P<year>20\d{2})\b", re.IGNORECASE),
+)
+AMOUNT_RE = re.compile(r"(?:₹|rs\.?|inr)?\s*(?P<value>\d{1,3}(?:,\d{2,3})+(?:\.\d{1,2})?|\d+(?:\.\d{1,2})?)", re.IGNORECASE)
+
+_MONTHS = {
+    "jan": 1, "feb": 2, "mar": 3, "apr": 4, "may": 5, "jun": 6,
+    "jul": 7, "aug": 8, "sep": 9, "sept": 9, "oct": 10, "nov": 11, "dec": 12,
+}
+
+# Below this a match is most likely a day count, a code or a year fragment.
+MIN_PLAUSIBLE_PAY = 1000.0
+CACHE_MAX_ENTRIES = 256
+
+_cache: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+_cache_lock = Lock()
+
+
+def _parse_amount(raw: str) -> Optional[float]:
+    try:
+        return float(raw.replace(",", ""))
+    except ValueError:
+        return None
+
+
+def _amount_after(line: str, start: int) -> Optional[float]:
+    for match in AMOUNT_RE.finditer(line, start):
+        value = _parse_amount(match.group("value"))
+        if value is not None and value >= MIN_PLAUSIBLE_PAY:
+            return value
+    return None
+
+
+def _find_labelled_amount(lines: List[str], patterns: Tuple[Pattern[str], ...]) -> Optional[float]:
+    """Find an amount for a label: same line to the right, else the next non-empty line."""
+    for pattern in patterns:
+        for idx, line in enumerate(lines):
+            match = pattern.search(line)
+            if not match:
+                continue
+            value = _amount_after(line, match.end())
+            if value is None:
+                # Tabular layouts often put the figure on the row below the label.
+                for follow in lines[idx + 1 : idx + 3]:
+                    if follow.strip():
+                        value = _amount_after(follow, 0)
+                        break
+            if value is not None:
+                return value
+    return None
+
+
+def _find_employer(lines: List[str], text: str) -> Optional[str]:
+    labelled = EMPLOYER_LABEL_RE.search(text)
+    if labelled:
+        return labelled.group("name").strip(" .:-") or None
+    # Letterhead heuristic: employer name is usually one of the first lines.
+    for line in lines[:6]:
+        candidate = line.strip()
+        if candidate and EMPLOYER_SUFFIX_RE.search(candidate) and not AMOUNT_RE.fullmatch(candidate):
+            return candidate
+    return None
+
+
+def _find_pay_period(text: str) -> Optional[str]:
+    for pattern in PAY_PERIOD_RES:
+        match = pattern.search(text)
+        if not match:
+            continue
+        year = int(match.group("year"))
+        if year < 100:
+            year += 2000
+        month_name = match.groupdict().get("month")
+        if month_name:
+            month = _MONTHS[month_name.lower()]
+        else:
+            month = int(match.group("mnum"))
+        return f"{year:04d}-{month:02d}"
+    return None
+
+
+def extract_salary_slip_fields(text: str) -> Dict[str, Any]:
+    """Extract net/gross pay, employer name and pay period from salary-slip text."""
+    lines = (text or "").splitlines()
+    net_pay = _find_labelled_amount(lines, NET_PAY_PATTERNS)
+    gross_pay = _find_labelled_amount(lines, GROSS_PAY_PATTERNS)
+    if net_pay is not None and gross_pay is not None and net_pay > gross_pay:
+        # Labels matched the wrong columns; trust the smaller figure as net.
+        net_pay, gross_pay = gross_pay, net_pay
+
+    employer_name = _find_employer(lines, text or "")
+    pay_period = _find_pay_period(text or "")
+    fields_found = [
+        name
+        for name, value in (
+            ("net_pay", net_pay),
+            ("gross_pay", gross_pay),
+            ("employer_name", employer_name),
+            ("pay_period", pay_period),
+        )
+        if value is not None
+    ]
+
+    return {
+        "net_pay": net_pay,
+        "gross_pay": gross_pay,
+        "employer_name": employer_name,
+        "pay_period": pay_period,
+        "verified_income": net_pay if net_pay is not None else gross_pay,
+        "fields_found": fields_found,
+        "confidence": round(len(fields_found) / 4, 2),
+    }
+
+
+def _cache_get(key: str) -> Optional[Dict[str, Any]]:
+    with _cache_lock:
+        hit = _cache.get(key)
+        if hit is not None:
+            _cache.move_to_end(key)
+        return hit
+
+
+def _cache_put(key: str, value: Dict[str, Any]) -> None:
+    with _cache_lock:
+        _cache[key] = value
+        _cache.move_to_end(key)
+        while len(_cache) > CACHE_MAX_ENTRIES:
+            _cache.popitem(last=False)
+
+
+def parse_salary_slip(file_path: str) -> Dict[str, Any]:
+    """Parse a salary slip on disk, caching the result by content hash."""
+    try:
+        with open(file_path, "rb") as f:
+            content_hash = hashlib.sha256(f.read()).hexdigest()
+    except OSError:
+        return {"parsed": False, "reason": "File missing or unreadable."}
+
+    cached = _cache_get(content_hash)
+    if cached is not None:
+        return dict(cached)
+
+    text = extract_pdf_text(file_path)
+    if not text.strip():
+        result: Dict[str, Any] = {"parsed": False, "reason": "No extractable text in document.", "content_hash": content_hash}
+    else:
+        result = {"parsed": True, "content_hash": content_hash, **extract_salary_slip_fields(text)}
+        if result["verified_income"] is None:
+            result["parsed"] = False
+            result["reason"] = "Pay figures not found in document."
+    _cache_put(content_hash, result)
+    return dict(result)
+
+
+async def aparse_salary_slip(file_path: str) -> Dict[str, Any]:
+    """Run salary-slip parsing in a worker thread to keep the event loop free."""
+    return await asyncio.to_thread(parse_salary_slip, file_path)
@@ -0,0 +1,426 @@
+from __future__ import annotations
+
+import io
+import re
+import threading
+import zlib
+from concurrent.futures import Executor, ProcessPoolExecutor
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Union
+
+from jinja2 import Environment
+
+from app.settings import settings
+
+SANCTION_HTML_TEMPLATE = """
+<html>
+  <head>
+    <meta charset="utf-8" />
+    <style>
+      body { font-family: Arial, sans-serif; margin: 24px; color: #222; }
+      h1 { font-size: 22px; margin-bottom: 4px; }
+      .muted { color: #666; font-size: 12px; margin-bottom: 16px; }
+      table { border-collapse: collapse; width: 100%; margin-top: 12px; }
+      td, th { border: 1px solid #ddd; padding: 8px; text-align: left; }
+      th { background: #f3f3f3; }
+    </style>
+  </head>
+  <body>
+    <h1>Personal Loan Sanction Letter</h1>
+    <div class="muted">Reference: {{ referenceNumber }} | Generated: {{ generatedAt }}</div>
+    <p>Dear {{ applicantName }},</p>
+    <p>Your personal loan application is approved subject to standard terms below.</p>
+    <table>
+      <tr><th>Loan Amount</th><td>INR {{ loanDetails.amount }}</td></tr>
+      <tr><th>Interest Rate</th><td>{{ loanDetails.interestRate }}%</td></tr>
+      <tr><th>Tenure (months)</th><td>{{ loanDetails.tenure }}</td></tr>
+      <tr><th>Monthly EMI</th><td>INR {{ loanDetails.emi }}</td></tr>
+      <tr><th>Total Interest</th><td>INR {{ loanDetails.totalInterest }}</td></tr>
+      <tr><th>Total Payable</th><td>INR {{ loanDetails.totalPayable }}</td></tr>
+      <tr><th>Valid Until</th><td>{{ validUntil }}</td></tr>
+    </table>
+  </body>
+</html>
+"""
+
+# (label, value-format) rows of the terms table; formats are filled from the flattened letter data.
+TABLE_ROWS = (
+    ("Loan Amount", "INR {amount}"),
+    ("Interest Rate", "{interestRate}%"),
+    ("Tenure (months)", "{tenure}"),
+    ("Monthly EMI", "INR {emi}"),
+    ("Total Interest", "INR {totalInterest}"),
+    ("Total Payable", "INR {totalPayable}"),
+    ("Valid Until", "{validUntil}"),
+)
+
+BACKENDS = ("direct", "weasyprint")
+# Probed in order when SANCTION_UNICODE_FONT is not set.
+UNICODE_FONT_CANDIDATES = (
+    "/usr/share/fonts/truetype/noto/NotoSans-Regular.ttf",
+    "/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf",
+    "/usr/share/fonts/dejavu/DejaVuSans.ttf",
+    "/usr/share/fonts/TTF/DejaVuSans.ttf",
+)
+
+
+def _pdf_string(value: str) -> bytes:
+    """Encode text as a PDF literal string in WinAnsi (the base-14 font encoding)."""
+    raw = value.encode("cp1252", errors="replace")
+    return b"(" + raw.replace(b"\\", b"\\\\").replace(b"(", b"\\(").replace(b")", b"\\)") + b")"
+
+
+def _winansi(value: str) -> bool:
+    """True when ``value`` is representable in the base-14 fonts' encoding."""
+    try:
+        value.encode("cp1252")
+    except UnicodeEncodeError:
+        return False
+    return True
+
+
+class EmbeddedFont:
+    """A TrueType font embedded as a CID font, for field values WinAnsi cannot encode.
+
+    Only the glyphs a letter uses are embedded, with their glyph ids kept so
+    the content stream addresses them directly; a ToUnicode map keeps the
+    text extractable. Each character is placed as one glyph, without shaping.
+    """
+
+    def __init__(self, path: Path) -> None:
+        from fontTools.ttLib import TTFont  # installed with WeasyPrint
+
+        self.path = Path(path)
+        self._data = self.path.read_bytes()
+        font = TTFont(io.BytesIO(self._data))
+        if "glyf" not in font:
+            raise ValueError(f"{path} is not a TrueType (glyf) font")
+        scale = 1000 / font["head"].unitsPerEm
+        glyph_ids = font.getReverseGlyphMap()
+        self._gids = {code: glyph_ids[name] for code, name in font.getBestCmap().items()}
+        self._widths = {glyph_ids[name]: round(advance * scale) for name, (advance, _) in font["hmtx"].metrics.items()}
+        head, hhea = font["head"], font["hhea"]
+        self.name = re.sub(r"[^A-Za-z0-9-]", "", font["name"].getDebugName(6) or self.path.stem) or "Embedded"
+        self.bbox = [round(v * scale) for v in (head.xMin, head.yMin, head.xMax, head.yMax)]
+        self.ascent = round(hhea.ascent * scale)
+        self.descent = round(hhea.descent * scale)
+        os2 = font["OS/2"] if "OS/2" in font else None
+        self.cap_height = round(getattr(os2, "sCapHeight", 0) * scale) or self.ascent
+
+    def covers(self, text: str) -> bool:
+        return all(ord(ch) in self._gids for ch in text)
+
+    def encode(self, text: str, used: Dict[int, str]) -> bytes:
+        """Hex string of ``text``'s glyph ids (Identity-H), recording each glyph used."""
+        gids = []
+        for ch in text:
+            gid = self._gids.get(ord(ch), 0)
+            used.setdefault(gid, ch)
+            gids.append(gid)
+        return b"<" + "".join(f"{gid:04X}" for gid in gids).encode("ascii") + b">"
+
+    def _subset(self, gids: List[int]) -> bytes:
+        from fontTools import subset
+        from fontTools.ttLib import TTFont
+
+        options = subset.Options()
+        options.retain_gids = True
+        options.notdef_outline = True
+        options.hinting = False
+        options.layout_features = []
+        font = TTFont(io.BytesIO(self._data))
+        subsetter = subset.Subsetter(options)
+        subsetter.populate(gids=gids)
+        subsetter.subset(font)
+        out = io.BytesIO()
+        font.save(out)
+        return out.getvalue()
+
+    def objects(self, used: Dict[int, str], first: int) -> List[bytes]:
+        """Type0 font, CID font, descriptor, font file and ToUnicode map, numbered from ``first``."""
+        gids = sorted(used)
+        font_file = self._subset(gids)
+        packed = zlib.compress(font_file)
+        widths = b" ".join(b"%d [%d]" % (gid, self._widths.get(gid, 0)) for gid in gids)
+        chars = [
+            b"<%04X> <%s>" % (gid, used[gid].encode("utf-16-be").hex().upper().encode("ascii")) for gid in gids
+        ]
+        blocks = b"".join(
+            b"%d beginbfchar\n" % len(chars[i:i + 100]) + b"\n".join(chars[i:i + 100]) + b"\nendbfchar\n"
+            for i in range(0, len(chars), 100)
+        )
+        cmap = (
+            b"/CIDInit /ProcSet findresource begin\n12 dict begin\nbegincmap\n"
+            b"/CIDSystemInfo << /Registry (Adobe) /Ordering (UCS) /Supplement 0 >> def\n"
+            b"/CMapName /Adobe-Identity-UCS def\n/CMapType 2 def\n"
+            b"1 begincodespacerange\n<0000> <FFFF>\nendcodespacerange\n" + blocks
+            + b"endcmap\nCMapName currentdict /CMap defineresource pop\nend\nend"
+        )
+        name = self.name.encode("ascii")
+        return [
+            b"<< /Type /Font /Subtype /Type0 /BaseFont /%s /Encoding /Identity-H "
+            b"/DescendantFonts [%d 0 R] /ToUnicode %d 0 R >>" % (name, first + 1, first + 4),
+            b"<< /Type /Font /Subtype /CIDFontType2 /BaseFont /%s "
+            b"/CIDSystemInfo << /Registry (Adobe) /Ordering (Identity) /Supplement 0 >> "
+            b"/FontDescriptor %d 0 R /CIDToGIDMap /Identity /W [%s] >>" % (name, first + 2, widths),
+            b"<< /Type /FontDescriptor /FontName /%s /Flags 32 /FontBBox [%d %d %d %d] /ItalicAngle 0 "
+            b"/Ascent %d /Descent %d /CapHeight %d /StemV 80 /FontFile2 %d 0 R >>"
+            % (name, *self.bbox, self.ascent, self.descent, self.cap_height, first + 3),
+            b"<< /Length %d /Length1 %d /Filter /FlateDecode >>\nstream\n" % (len(packed), len(font_file))
+            + packed + b"\nendstream",
+            b"<< /Length %d >>\nstream\n" % len(cmap) + cmap + b"\nendstream",
+        ]
+
+
+class DirectPdfTemplate:
+    """Pre-compiled single-page PDF for the fixed sanction-letter layout.
+
+    Everything except the field values (page tree, fonts, table geometry,
+    labels) is laid out once; rendering only escapes values, joins byte
+    segments and writes the xref table.
+    """
+
+    PAGE_WIDTH = 595
+    PAGE_HEIGHT = 842
+    MARGIN = 36
+    LABEL_COL = 164
+    ROW_HEIGHT = 26
+
+    def __init__(self) -> None:
+        self._sizes: Dict[str, int] = {}
+        self._parts: List[Union[bytes, str]] = self._compile_content()
+        self._prefix, self._prefix_offsets = self._compile_static_objects(b"")
+        # Same objects, with the page also referencing an embedded font as /F3 (object 8).
+        self._unicode_prefix, _ = self._compile_static_objects(b" /F3 8 0 R")
+
+    def _compile_content(self) -> List[Union[bytes, str]]:
+        m, w = self.MARGIN, self.PAGE_WIDTH - 2 * self.MARGIN
+        parts: List[Union[bytes, str]] = [
+            b"BT /F2 18 Tf 0.133 g %d 796 Td (Personal Loan Sanction Letter) Tj ET\n" % m,
+            b"BT /F1 9 Tf 0.4 g %d 778 Td " % m,
+            "reference_line",
+            b" Tj ET\nBT /F1 11 Tf 0.133 g %d 748 Td " % m,
+            "salutation",
+            b" Tj ET\nBT /F1 11 Tf %d 730 Td (Your personal loan application is approved subject to standard terms below.) Tj ET\n"
+            % m,
+        ]
+        # Font size of each value, for switching to the embedded font mid-line.
+        self._sizes.update(reference_line=9, salutation=11)
+        top = 706
+        for idx, (label, _) in enumerate(TABLE_ROWS):
+            y = top - (idx + 1) * self.ROW_HEIGHT
+            parts.append(
+                b"q 0.953 g %d %d %d %d re f Q\n" % (m, y, self.LABEL_COL, self.ROW_HEIGHT)
+                + b"q 0.867 G 0.75 w %d %d %d %d re S %d %d m %d %d l S Q\n"
+                % (m, y, w, self.ROW_HEIGHT, m + self.LABEL_COL, y, m + self.LABEL_COL, y + self.ROW_HEIGHT)
+                + b"BT /F2 10 Tf 0.133 g %d %d Td " % (m + 8, y + 9)
+                + _pdf_string(label)
+                + b" Tj ET\nBT /F1 10 Tf %d %d Td " % (m + self.LABEL_COL + 8, y + 9)
+            )
+            parts.append(f"row_{idx}")
+            self._sizes[f"row_{idx}"] = 10
+            parts.append(b" Tj ET\n")
+        # Merge adjacent static segments so rendering joins as few pieces as possible.
+        merged: List[Union[bytes, str]] = []
+        for part in parts:
+            if isinstance(part, bytes) and merged and isinstance(merged[-1], bytes):
+                merged[-1] = merged[-1] + part
+            else:
+                merged.append(part)
+        return merged
+
+    def _compile_static_objects(self, extra_fonts: bytes) -> tuple[bytes, List[int]]:
+        header = b"%PDF-1.4\n%\xe2\xe3\xcf\xd3\n"
+        static = [
+            b"<< /Type /Catalog /Pages 2 0 R >>",
+            b"<< /Type /Pages /Kids [3 0 R] /Count 1 >>",
+            b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 %d %d] /Contents 6 0 R "
+            b"/Resources << /Font << /F1 4 0 R /F2 5 0 R%s >> >> >>" % (self.PAGE_WIDTH, self.PAGE_HEIGHT, extra_fonts),
+            b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica /Encoding /WinAnsiEncoding >>",
+            b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica-Bold /Encoding /WinAnsiEncoding >>",
+        ]
+        out = bytearray(header)
+        offsets = []
+        for number, body in enumerate(static, start=1):
+            offsets.append(len(out))
+            out += b"%d 0 obj\n" % number + body + b"\nendobj\n"
+        return bytes(out), offsets
+
+    def render(
+        self, values: Dict[str, str], title: str, created_at: str, font: Optional[EmbeddedFont] = None
+    ) -> bytes:
+        """Write the letter; with ``font``, values WinAnsi cannot encode are set in that font instead."""
+        unicode = {name for name, value in values.items() if not _winansi(value)} if font is not None else set()
+        used: Dict[int, str] = {}
+
+        def segment(name: str) -> bytes:
+            if name in unicode:
+                return b"/F3 %d Tf " % self._sizes[name] + font.encode(values[name], used)
+            return _pdf_string(values[name])
+
+        content = b"".join(part if isinstance(part, bytes) else segment(part) for part in self._parts)
+        out = bytearray(self._unicode_prefix if unicode else self._prefix)
+        offsets = list(self._prefix_offsets)
+        offsets.append(len(out))
+        out += b"6 0 obj\n<< /Length %d >>\nstream\n" % len(content) + content + b"\nendstream\nendobj\n"
+        offsets.append(len(out))
+        out += b"7 0 obj\n<< /Title " + _pdf_string(title) + b" /CreationDate " + _pdf_string(created_at) + b" >>\nendobj\n"
+        if unicode:
+            for number, body in enumerate(font.objects(used, 8), start=8):
+                offsets.append(len(out))
+                out += b"%d 0 obj\n" % number + body + b"\nendobj\n"
+        xref_at = len(out)
+        out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(offsets) + 1)
+        out += b"".join(b"%010d 00000 n \n" % off for off in offsets)
+        out += b"trailer\n<< /Size %d /Root 1 0 R /Info 7 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(offsets) + 1, xref_at)
+        return bytes(out)
+
+
+def _direct_values(data: Dict[str, Any]) -> Dict[str, str]:
+    flat = {**data["loanDetails"], "validUntil": data["validUntil"]}
+    values = {
+        "reference_line": f"Reference: {data['referenceNumber']} | Generated: {data['generatedAt']}",
+        "salutation": f"Dear {data['applicantName']},",
+    }
+    for idx, (_, fmt) in enumerate(TABLE_ROWS):
+        values[f"row_{idx}"] = fmt.format(**flat)
+    return values
+
+
+def _pdf_date(iso: str) -> str:
+    try:
+        return datetime.fromisoformat(iso).strftime("D:%Y%m%d%H%M%SZ")
+    except ValueError:
+        return ""
+
+
+_weasyprint_ready = False
+
+
+def _weasyprint_worker_init() -> None:
+    """Pay WeasyPrint's import and font-config cost once per worker process."""
+    global _weasyprint_ready
+    try:
+        from weasyprint import HTML  # optional dependency
+
+        HTML(string="<p>warm-up</p>").write_pdf()
+        _weasyprint_ready = True
+    except Exception:
+        _weasyprint_ready = False
+
+
+def _weasyprint_probe() -> bool:
+    return _weasyprint_ready
+
+
+def _weasyprint_write(html: str, file_path: str) -> None:
+    from weasyprint import HTML  # optional dependency, already imported by the initializer
+
+    HTML(string=html).write_pdf(file_path)
+
+
+class SanctionLetterRenderer:
+    """Sanction-letter PDF renderer with pre-compiled templates and a warm worker pool."""
+
+    def __init__(self, backend: Optional[str] = None, workers: Optional[int] = None) -> None:
+        self.backend = (backend or settings.sanction_renderer).lower()
+        if self.backend not in BACKENDS:
+            raise ValueError(f"Unknown sanction renderer backend: {self.backend}")
+        self.workers = max(1, workers or settings.sanction_render_workers)
+        self._lock = threading.Lock()
+        self._started = False
+        self._pool: Optional[Executor] = None
+        self._html_template = None
+        self._direct_template: Optional[DirectPdfTemplate] = None
+        self._unicode_font: Optional[EmbeddedFont] = None
+        self._unicode_font_loaded = False
+        self._inline_weasyprint = True
+
+    def start(self) -> None:
+        """Compile templates and warm the worker pool. Safe to call more than once."""
+        with self._lock:
+            if self._started:
+                return
+            self._html_template = Environment(autoescape=True).from_string(SANCTION_HTML_TEMPLATE)
+            self._direct_template = DirectPdfTemplate()
+            if self.backend == "weasyprint":
+                self._pool = ProcessPoolExecutor(max_workers=self.workers, initializer=_weasyprint_worker_init)
+                # Workers spawn lazily; probing each one runs every initializer before the first approval.
+                probes = [self._pool.submit(_weasyprint_probe) for _ in range(self.workers)]
+                if not all(future.result() for future in probes):
+                    print("⚠️ WeasyPrint unavailable; sanction letters will use the direct PDF writer.")
+                    self._pool.shutdown(wait=False, cancel_futures=True)
+                    self._pool = None
+            self._started = True
+
+    def shutdown(self) -> None:
+        with self._lock:
+            if self._pool is not None:
+                self._pool.shutdown(wait=False, cancel_futures=True)
+                self._pool = None
+            self._started = False
+
+    def render_html(self, data: Dict[str, Any]) -> str:
+        self.start()
+        return self._html_template.render(**data)
+
+    def unicode_font(self) -> Optional[EmbeddedFont]:
+        """The font for names WinAnsi cannot encode: SANCTION_UNICODE_FONT, else the first system candidate."""
+        with self._lock:
+            if not self._unicode_font_loaded:
+                self._unicode_font_loaded = True
+                configured = settings.sanction_unicode_font
+                for candidate in [configured] if configured else UNICODE_FONT_CANDIDATES:
+                    if not Path(candidate).is_file():
+                        continue
+                    try:
+                        self._unicode_font = EmbeddedFont(Path(candidate))
+                        break
+                    except Exception as exc:
+                        print(f"⚠️ Cannot embed sanction letter font {candidate}: {exc}")
+            return self._unicode_font
+
+    def render_direct(self, data: Dict[str, Any], font: Optional[EmbeddedFont] = None) -> bytes:
+        self.start()
+        return self._direct_template.render(
+            _direct_values(data),
+            title=f"Sanction Letter {data['referenceNumber']}",
+            created_at=_pdf_date(data["generatedAt"]),
+            font=font,
+        )
+
+    def render_to_file(self, data: Dict[str, Any], file_path: Path) -> Dict[str, Any]:
+        """Write the letter PDF to ``file_path``; returns the path and the backend that produced it.
+
+        The direct writer's base fonts only cover WinAnsi. A letter with any
+        other text (a Devanagari or Tamil name) is set with an embedded
+        Unicode font when one covers it, else rendered by WeasyPrint.
+        """
+        self.start()
+        if self.backend == "weasyprint" and self._pool is not None:
+            try:
+                self._pool.submit(_weasyprint_write, self.render_html(data), str(file_path)).result()
+                return {"pdfPath": str(file_path.absolute()), "renderer": "weasyprint"}
+            except Exception:
+                # Missing native libs or a crashed worker: the direct writer still produces a valid PDF.
+                pass
+        font = None
+        unencodable = [value for value in _direct_values(data).values() if not _winansi(value)]
+        if unencodable:
+            font = self.unicode_font()
+            if (font is None or not all(font.covers(value) for value in unencodable)) and self._inline_weasyprint:
+                try:
+                    _weasyprint_write(self.render_html(data), str(file_path))
+                    return {"pdfPath": str(file_path.absolute()), "renderer": "weasyprint"}
+                except Exception as exc:
+                    # Usually missing native libraries; don't pay the failed import on every letter.
+                    self._inline_weasyprint = False
+                    print(f"⚠️ WeasyPrint unavailable for non-Latin sanction letters: {exc}")
+            if font is None or not all(font.covers(value) for value in unencodable):
+                print(f"⚠️ Sanction letter {data['referenceNumber']} has characters no available font covers")
+        file_path.write_bytes(self.render_direct(data, font))
+        return {"pdfPath": str(file_path.absolute()), "renderer": "direct"}
+
+
+sanction_renderer = SanctionLetterRenderer()
@@ -2,17 +2,54 @@ from __future__ import annotations
 
 from datetime import datetime, timedelta
 import base64
+import hashlib
+import json
+import os
+import re
 import uuid
 from pathlib import Path
+from typing import Optional, Tuple
 
 from app.models.state import LoanApplicationDetails
 from app.services.emi import calculate_emi
+from app.services.pricing_service import get_pricing_grid
+from app.services.sanction_renderer import sanction_renderer
 
+SANCTIONS_DIR = Path("uploads") / "sanctions"
+REFERENCE_RE = re.compile(r"^SL-[0-9A-F]{8,16}$")
 
-def generate_sanction_letter_data(loan_data: LoanApplicationDetails, interest_rate: float = 12.5) -> dict:
+
+def sanction_reference(loan_data: LoanApplicationDetails, interest_rate: float, thread_id: Optional[str]) -> str:
+    """Deterministic reference for a thread and its sanctioned terms."""
+    key = json.dumps(
+        [
+            thread_id or loan_data.customer_id or "",
+            loan_data.customer_name or "",
+            round(float(loan_data.requested_amount or 0), 2),
+            int(loan_data.tenure_months or 0),
+            float(interest_rate),
+        ]
+    )
+    return f"SL-{hashlib.sha256(key.encode('utf-8')).hexdigest()[:12].upper()}"
+
+
+def _priced_rate(loan_data: LoanApplicationDetails, interest_rate: Optional[float]) -> float:
+    if interest_rate is not None:
+        return float(interest_rate)
+    if loan_data.interest_rate is not None:
+        return float(loan_data.interest_rate)
+    return get_pricing_grid().rate_for(loan_data)
+
+
+def generate_sanction_letter_data(
+    loan_data: LoanApplicationDetails,
+    interest_rate: Optional[float] = None,
+    reference_number: Optional[str] = None,
+) -> dict:
+    interest_rate = _priced_rate(loan_data, interest_rate)
     now = datetime.utcnow()
     valid_until = now + timedelta(days=30)
-    reference_number = f"SL-{uuid.uuid4().hex[:8].upper()}"
+    reference_number = reference_number or f"SL-{uuid.uuid4().hex[:8].upper()}"
     raw_hash = f"{reference_number}-{loan_data.customer_id or 'applicant'}-{now.isoformat()}".encode("utf-8")
     document_hash = base64.b64encode(raw_hash).decode("utf-8")[:32]
 
@@ -46,55 +83,60 @@ def generate_sanction_letter_data(loan_data: LoanApplicationDetails, interest_ra
     }
 
 
-def generate_sanction_letter_pdf(loan_data: LoanApplicationDetails, interest_rate: float = 12.5) -> dict:
-    """Generate sanction letter PDF on disk and return metadata + path."""
-    data = generate_sanction_letter_data(loan_data, interest_rate=interest_rate)
-    sanctions_dir = Path("uploads") / "sanctions"
-    sanctions_dir.mkdir(parents=True, exist_ok=True)
-    filename = f"{data['referenceNumber']}.pdf"
-    file_path = sanctions_dir / filename
-
-    html = f"""
-    <html>
-      <head>
-        <meta charset="utf-8" />
-        <style>
-          body {{ font-family: Arial, sans-serif; margin: 24px; color: #222; }}
-          h1 {{ font-size: 22px; margin-bottom: 4px; }}
-          .muted {{ color: #666; font-size: 12px; margin-bottom: 16px; }}
-          table {{ border-collapse: collapse; width: 100%; margin-top: 12px; }}
-          td, th {{ border: 1px solid #ddd; padding: 8px; text-align: left; }}
-          th {{ background: #f3f3f3; }}
-        </style>
-      </head>
-      <body>
-        <h1>Personal Loan Sanction Letter</h1>
-        <div class="muted">Reference: {data['referenceNumber']} | Generated: {data['generatedAt']}</div>
-        <p>Dear {data['applicantName']},</p>
-        <p>Your personal loan application is approved subject to standard terms below.</p>
-        <table>
-          <tr><th>Loan Amount</th><td>INR {data['loanDetails']['amount']}</td></tr>
-          <tr><th>Interest Rate</th><td>{data['loanDetails']['interestRate']}%</td></tr>
-          <tr><th>Tenure (months)</th><td>{data['loanDetails']['tenure']}</td></tr>
-          <tr><th>Monthly EMI</th><td>INR {data['loanDetails']['emi']}</td></tr>
-          <tr><th>Total Interest</th><td>INR {data['loanDetails']['totalInterest']}</td></tr>
-          <tr><th>Total Payable</th><td>INR {data['loanDetails']['totalPayable']}</td></tr>
-          <tr><th>Valid Until</th><td>{data['validUntil']}</td></tr>
-        </table>
-      </body>
-    </html>
-    """
+def _metadata_path(reference: str) -> Path:
+    return SANCTIONS_DIR / f"{reference}.json"
 
+
+def load_sanction_letter(reference: str) -> Optional[dict]:
+    """Return stored letter metadata if the reference exists and its PDF is on disk."""
+    if not REFERENCE_RE.match(reference):
+        return None
     try:
-        from weasyprint import HTML  # lazy import
-
-        HTML(string=html).write_pdf(str(file_path))
-        data["pdfPath"] = str(file_path.absolute())
-        return data
-    except Exception:
-        # Fallback if PDF generation fails in local environment.
-        txt_fallback = sanctions_dir / f"{data['referenceNumber']}.txt"
-        txt_fallback.write_text(html, encoding="utf-8")
-        data["pdfPath"] = str(txt_fallback.absolute())
-        data["pdfFallback"] = True
-        return data
+        data = json.loads(_metadata_path(reference).read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return None
+    if not Path(data.get("pdfPath", "")).is_file():
+        return None
+    return data
+
+
+def get_sanction_letter_file(reference: str) -> Optional[Tuple[Path, str]]:
+    """Resolve a reference to (pdf path, etag) for serving."""
+    data = load_sanction_letter(reference)
+    if not data:
+        return None
+    return Path(data["pdfPath"]), data["etag"]
+
+
+def generate_sanction_letter_pdf(
+    loan_data: LoanApplicationDetails,
+    interest_rate: Optional[float] = None,
+    thread_id: Optional[str] = None,
+) -> dict:
+    """Generate sanction letter PDF on disk and return metadata + path.
+
+    Letters are keyed by thread and loan terms: re-running an approval for the
+    same terms returns the existing, still-valid letter instead of a new one.
+    """
+    interest_rate = _priced_rate(loan_data, interest_rate)
+    reference = sanction_reference(loan_data, interest_rate, thread_id)
+    existing = load_sanction_letter(reference)
+    if existing and existing.get("validUntil", "") > datetime.utcnow().isoformat():
+        return existing
+
+    data = generate_sanction_letter_data(loan_data, interest_rate=interest_rate, reference_number=reference)
+    SANCTIONS_DIR.mkdir(parents=True, exist_ok=True)
+    file_path = SANCTIONS_DIR / f"{reference}.pdf"
+    # Render beside the target and swap in atomically so readers never see a partial file.
+    tmp_path = SANCTIONS_DIR / f".{reference}.{uuid.uuid4().hex[:6]}.pdf"
+    data.update(sanction_renderer.render_to_file(data, tmp_path))
+    os.replace(tmp_path, file_path)
+    data["pdfPath"] = str(file_path.absolute())
+    data["etag"] = hashlib.sha256(file_path.read_bytes()).hexdigest()[:20]
+    # Regenerating a letter keeps its reference, so the URL carries the content hash.
+    data["url"] = f"/sanction/{reference}?v={data['etag']}"
+
+    tmp_meta = SANCTIONS_DIR / f".{reference}.{uuid.uuid4().hex[:6]}.json"
+    tmp_meta.write_text(json.dumps(data), encoding="utf-8")
+    os.replace(tmp_meta, _metadata_path(reference))
+    return data
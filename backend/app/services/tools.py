@@ -5,16 +5,24 @@ from typing import Optional
 
 from langchain_core.tools import tool
 
-from app.services.credit_bureau import fetch_credit_score
+from app.services.bureau_cache import get_bureau_cache
+from app.services.bureau_client import get_bureau
 from app.services.crm_service import verify_kyc
+from app.services.emi import calculate_emi as emi_formula
 from app.services.fraud_service import analyze_fraud
+from app.services.purpose_taxonomy import get_purpose_taxonomy
+
+# FOIR (%) upper bounds per affordability band; shared with batch underwriting.
+FOIR_BANDS = ((30, "comfortable"), (50, "stretched"), (60, "risky"))
+FOIR_OVER_LIMIT_STATUS = "rejected"
+PROCEED_STATUSES = ("comfortable", "stretched")
+MAX_EMI_SHARE = 0.5
 
 
 @tool
 async def calculate_emi(principal: float, tenure_months: int, interest_rate: float = 12.5) -> str:
     """Calculate EMI and total interest."""
-    r = interest_rate / (12 * 100)
-    emi = (principal * r * (1 + r) ** tenure_months) / ((1 + r) ** tenure_months - 1)
+    emi = emi_formula(principal, interest_rate, tenure_months)
     total_payment = emi * tenure_months
     total_interest = total_payment - principal
 
@@ -31,36 +39,15 @@ async def calculate_emi(principal: float, tenure_months: int, interest_rate: flo
 @tool
 async def analyze_purpose(purpose: str) -> str:
     """Categorize loan purpose and assess risk profile."""
-    purpose_lower = purpose.lower()
-
-    categories = {
-        "debt_consolidation": {"risk": "low", "urgency": "high", "typical_tenure": 36},
-        "medical": {"risk": "medium", "urgency": "critical", "typical_tenure": 12},
-        "wedding": {"risk": "medium", "urgency": "high", "typical_tenure": 24},
-        "education": {"risk": "low", "urgency": "medium", "typical_tenure": 60},
-        "business": {"risk": "high", "urgency": "medium", "typical_tenure": 48},
-        "home_renovation": {"risk": "low", "urgency": "low", "typical_tenure": 84},
-    }
-
-    for keyword, profile in categories.items():
-        if keyword.replace("_", " ") in purpose_lower or keyword in purpose_lower:
-            return json.dumps(
-                {
-                    "category": keyword,
-                    "risk_profile": profile["risk"],
-                    "urgency": profile["urgency"],
-                    "suggested_tenure": profile["typical_tenure"],
-                    "reasoning": f"Detected {keyword} purpose",
-                }
-            )
-
+    profile = get_purpose_taxonomy().classify(purpose)
     return json.dumps(
         {
-            "category": "other",
-            "risk_profile": "medium",
-            "urgency": "medium",
-            "suggested_tenure": 36,
-            "reasoning": "General purpose loan",
+            "category": profile.category,
+            "risk_profile": profile.risk_profile,
+            "urgency": profile.urgency,
+            "suggested_tenure": profile.suggested_tenure,
+            "reasoning": f"Detected {profile.category} purpose ({profile.matched})" if profile.matched else "General purpose loan",
+            "taxonomy_version": profile.taxonomy_version,
         }
     )
 
@@ -71,32 +58,28 @@ async def check_affordability(monthly_income: float, existing_emis: float, propo
     total_obligations = existing_emis + proposed_emi
     foir = (total_obligations / monthly_income) * 100
 
-    status = (
-        "comfortable"
-        if foir < 30
-        else "stretched"
-        if foir < 50
-        else "risky"
-        if foir < 60
-        else "rejected"
-    )
+    status = next((label for limit, label in FOIR_BANDS if foir < limit), FOIR_OVER_LIMIT_STATUS)
 
     return json.dumps(
         {
             "foir_percentage": round(foir, 2),
             "status": status,
-            "max_recommended_emi": round(monthly_income * 0.5, 2),
-            "available_for_new_emi": round(monthly_income * 0.5 - existing_emis, 2),
-            "recommendation": "Proceed" if status in ["comfortable", "stretched"] else "Reduce amount or tenure",
+            "max_recommended_emi": round(monthly_income * MAX_EMI_SHARE, 2),
+            "available_for_new_emi": round(monthly_income * MAX_EMI_SHARE - existing_emis, 2),
+            "recommendation": "Proceed" if status in PROCEED_STATUSES else "Reduce amount or tenure",
         }
     )
 
 
 @tool
-async def fetch_credit_score_tool(pan: Optional[str], aadhaar: Optional[str], monthly_income: Optional[float]) -> str:
-    """Fetch credit score (mock)."""
-    score = fetch_credit_score(pan, aadhaar, monthly_income)
-    return json.dumps({"credit_score": score})
+async def fetch_credit_score_tool(
+    pan: Optional[str], aadhaar: Optional[str], monthly_income: Optional[float], force_refresh: bool = False
+) -> str:
+    """Fetch credit score from the bureau, reusing a cached pull unless force_refresh is set."""
+    result, source = await get_bureau_cache().aget_or_fetch(
+        pan, aadhaar, lambda: get_bureau().inquire(pan, aadhaar, monthly_income), force_refresh=force_refresh
+    )
+    return json.dumps({**result, "source": source})
 
 
 @tool
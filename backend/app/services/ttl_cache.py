@@ -0,0 +1,118 @@
+from __future__ import annotations
+
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional, Tuple
+
+
+class TTLCache:
+    """Expiring key/value store: an in-process LRU, optionally backed by a SQLite file.
+
+    The SQLite tier (WAL mode) is shared by every worker on the host. Values
+    must be JSON-serialisable; keys should already be opaque (hashed).
+    """
+
+    def __init__(
+        self,
+        ttl_s: float,
+        sqlite_path: Optional[Path] = None,
+        max_entries: int = 10000,
+        clock: Callable[[], float] = time.time,
+        table: str = "entries",
+    ) -> None:
+        self.ttl_s = ttl_s
+        self.max_entries = max(1, max_entries)
+        self.clock = clock
+        self.table = table
+        self._memory: "OrderedDict[str, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._db: Optional[sqlite3.Connection] = None
+        if sqlite_path is not None:
+            sqlite_path.parent.mkdir(parents=True, exist_ok=True)
+            self._db = sqlite3.connect(str(sqlite_path), timeout=5.0, check_same_thread=False, isolation_level=None)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute(
+                f"CREATE TABLE IF NOT EXISTS {table} (key TEXT PRIMARY KEY, expires_at REAL NOT NULL, payload TEXT NOT NULL)"
+            )
+        self.counters = {"memory_hits": 0, "sqlite_hits": 0, "misses": 0, "expired": 0}
+
+    def _get_memory(self, key: str, now: float) -> Optional[Dict[str, Any]]:
+        entry = self._memory.get(key)
+        if entry is None:
+            return None
+        if entry[0] <= now:
+            del self._memory[key]
+            self.counters["expired"] += 1
+            return None
+        self._memory.move_to_end(key)
+        return entry[1]
+
+    def _put_memory(self, key: str, expires_at: float, result: Dict[str, Any]) -> None:
+        self._memory[key] = (expires_at, result)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    def _get_sqlite(self, key: str, now: float) -> Optional[Tuple[float, Dict[str, Any]]]:
+        if self._db is None:
+            return None
+        row = self._db.execute(f"SELECT expires_at, payload FROM {self.table} WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            return None
+        if row[0] <= now:
+            self.counters["expired"] += 1
+            return None
+        return row[0], json.loads(row[1])
+
+    def get(self, key: str) -> Tuple[Optional[Dict[str, Any]], Optional[str]]:
+        """Cached result and the tier that had it ("memory" or "sqlite"), or (None, None)."""
+        now = self.clock()
+        with self._lock:
+            result = self._get_memory(key, now)
+            if result is not None:
+                self.counters["memory_hits"] += 1
+                return result, "memory"
+            stored = self._get_sqlite(key, now)
+            if stored is not None:
+                self._put_memory(key, *stored)
+                self.counters["sqlite_hits"] += 1
+                return stored[1], "sqlite"
+            self.counters["misses"] += 1
+        return None, None
+
+    def put(self, key: str, result: Dict[str, Any], ttl_s: Optional[float] = None) -> None:
+        expires_at = self.clock() + (self.ttl_s if ttl_s is None else ttl_s)
+        with self._lock:
+            self._put_memory(key, expires_at, result)
+            if self._db is not None:
+                self._db.execute(
+                    f"INSERT OR REPLACE INTO {self.table} (key, expires_at, payload) VALUES (?, ?, ?)",
+                    (key, expires_at, json.dumps(result)),
+                )
+
+    def purge_expired(self) -> int:
+        now = self.clock()
+        with self._lock:
+            stale = [key for key, (expires_at, _) in self._memory.items() if expires_at <= now]
+            for key in stale:
+                del self._memory[key]
+            if self._db is not None:
+                self._db.execute(f"DELETE FROM {self.table} WHERE expires_at <= ?", (now,))
+        return len(stale)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            counters = dict(self.counters)
+            entries = len(self._memory)
+        hits = counters["memory_hits"] + counters["sqlite_hits"]
+        lookups = hits + counters["misses"]
+        return {
+            **counters,
+            "hit_rate": round(hits / lookups, 4) if lookups else None,
+            "memory_entries": entries,
+            "sqlite": self._db is not None,
+        }
@@ -0,0 +1,283 @@
+from __future__ import annotations
+
+import hashlib
+import re
+import secrets
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from app.settings import settings
+
+KINDS = ("device", "ip", "phone", "pan")
+KIND_LABELS = {"device": "this device", "ip": "this IP address", "phone": "this mobile number", "pan": "this PAN"}
+BUCKETS = 10
+
+
+@dataclass(frozen=True)
+class VelocityRule:
+    """Flag ``limit`` or more verifications for one identifier within ``window_s`` seconds."""
+
+    kind: str
+    window_s: float
+    limit: int
+    risk_score: int
+
+    @property
+    def name(self) -> str:
+        minutes = self.window_s / 60
+        return f"{self.kind}_{minutes / 60:g}h" if minutes >= 60 else f"{self.kind}_{minutes:g}m"
+
+    @property
+    def window_label(self) -> str:
+        minutes = self.window_s / 60
+        amount, unit = (minutes / 60, "hour") if minutes >= 60 else (minutes, "minute")
+        return f"{amount:g} {unit}" + ("" if amount == 1 else "s")
+
+
+DEFAULT_RULES: Tuple[VelocityRule, ...] = (
+    # A burst from one IP: scripted applications or a fraud desk behind one connection.
+    # Kept below the reject threshold: carrier NAT puts many honest applicants on one address.
+    VelocityRule("ip", 600, 30, 60),
+    # One handset should not be applying for several people.
+    VelocityRule("device", 3600, 5, 80),
+    VelocityRule("phone", 86400, 4, 60),
+    VelocityRule("pan", 86400, 4, 60),
+)
+
+
+def normalize(kind: str, value: Optional[str]) -> str:
+    value = (value or "").strip()
+    if kind == "phone":
+        return re.sub(r"\D", "", value)[-10:]
+    if kind == "pan":
+        return value.upper()
+    return value.lower()
+
+
+def velocity_key(salt: bytes, rule: str, value: str) -> int:
+    """Signed 64-bit keyed hash of a rule and identifier (fits a SQLite INTEGER)."""
+    digest = hashlib.blake2b(f"{rule}\x00{value}".encode("utf-8"), digest_size=8, key=salt).digest()
+    return int.from_bytes(digest, "little", signed=True)
+
+
+class RingCounters:
+    """Sliding-window counts per key: a ring of ``buckets`` counters each, in process.
+
+    A key's ring only ever holds its last ``buckets`` buckets; older ones are
+    zeroed as the ring advances. Keys idle for a whole window are evicted,
+    and at most ``max_keys`` are kept (least recently hit go first), so
+    memory stays bounded however many identifiers pass through.
+    """
+
+    def __init__(self, buckets: int = BUCKETS, max_keys: int = 100000) -> None:
+        self.buckets = buckets
+        self.max_keys = max(1, max_keys)
+        # key -> [head bucket, total, counts...]
+        self._rings: "OrderedDict[int, List[int]]" = OrderedDict()
+        self._swept_bucket = 0
+        self.evicted = 0
+
+    def __len__(self) -> int:
+        return len(self._rings)
+
+    def add(self, key: int, bucket: int) -> int:
+        """Count one event in ``bucket`` and return the key's total over the window."""
+        n = self.buckets
+        ring = self._rings.get(key)
+        if ring is None or bucket - ring[0] >= n:
+            ring = [bucket, 0] + [0] * n
+            self._rings[key] = ring
+        else:
+            bucket = max(bucket, ring[0])  # a clock step back counts in the current bucket
+            for b in range(ring[0] + 1, bucket + 1):
+                slot = 2 + b % n
+                ring[1] -= ring[slot]
+                ring[slot] = 0
+            ring[0] = bucket
+            self._rings.move_to_end(key)
+        ring[2 + bucket % n] += 1
+        ring[1] += 1
+        if bucket != self._swept_bucket or len(self._rings) > self.max_keys:
+            self._evict(bucket)
+        return ring[1]
+
+    def _evict(self, bucket: int) -> None:
+        """Drop least recently hit keys while over capacity or idle for a whole window."""
+        self._swept_bucket = bucket
+        rings = self._rings
+        while rings:
+            key, ring = next(iter(rings.items()))
+            if len(rings) <= self.max_keys and bucket - ring[0] < self.buckets:
+                break
+            del rings[key]
+            self.evicted += 1
+
+
+class SQLiteCounters:
+    """The same bucketed counts in a SQLite file (WAL), shared by every worker on the host.
+
+    One row per (key, bucket); a check adds its events and reads the window
+    totals in a single transaction. Rows past their window are swept every
+    ``sweep_interval_s``.
+    """
+
+    def __init__(self, path: Path, sweep_interval_s: float = 60.0, table: str = "velocity_buckets") -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self.table = table
+        self.sweep_interval_s = sweep_interval_s
+        self._next_sweep = 0.0
+        self._db = sqlite3.connect(str(path), timeout=5.0, check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute(
+            f"CREATE TABLE IF NOT EXISTS {table} (key INTEGER NOT NULL, bucket INTEGER NOT NULL, "
+            "count INTEGER NOT NULL, expires_at REAL NOT NULL, PRIMARY KEY (key, bucket)) WITHOUT ROWID"
+        )
+        self._db.execute(f"CREATE INDEX IF NOT EXISTS {table}_expires ON {table} (expires_at)")
+        self.swept = 0
+
+    def add_many(self, events: Sequence[Tuple[int, int, int, float]], now: float) -> List[int]:
+        """Count (key, bucket, buckets, expires_at) events; return each key's total over its window."""
+        db = self._db
+        totals = []
+        db.execute("BEGIN IMMEDIATE")
+        try:
+            for key, bucket, buckets, expires_at in events:
+                db.execute(
+                    f"INSERT INTO {self.table} (key, bucket, count, expires_at) VALUES (?, ?, 1, ?) "
+                    "ON CONFLICT (key, bucket) DO UPDATE SET count = count + 1",
+                    (key, bucket, expires_at),
+                )
+                row = db.execute(
+                    f"SELECT SUM(count) FROM {self.table} WHERE key = ? AND bucket > ?", (key, bucket - buckets)
+                ).fetchone()
+                totals.append(int(row[0] or 0))
+            if now >= self._next_sweep:
+                self._next_sweep = now + self.sweep_interval_s
+                self.swept += db.execute(f"DELETE FROM {self.table} WHERE expires_at <= ?", (now,)).rowcount
+            db.execute("COMMIT")
+        except BaseException:
+            db.execute("ROLLBACK")
+            raise
+        return totals
+
+    def __len__(self) -> int:
+        return int(self._db.execute(f"SELECT COUNT(*) FROM {self.table}").fetchone()[0])
+
+
+class VelocityEngine:
+    """Counts verifications per device, IP, mobile and PAN over sliding windows.
+
+    Every ``check`` records one event for each identifier present and returns
+    the rules it breaches, as a 0-100 risk score and flags. Identifiers are
+    stored only as keyed hashes.
+    """
+
+    def __init__(
+        self,
+        rules: Sequence[VelocityRule] = DEFAULT_RULES,
+        salt: str = "",
+        sqlite_path: Optional[Path] = None,
+        max_keys: int = 100000,
+        buckets: int = BUCKETS,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        unknown = {rule.kind for rule in rules} - set(KINDS)
+        if unknown:
+            raise ValueError(f"Unknown velocity kinds: {sorted(unknown)}")
+        self.rules = tuple(rules)
+        self.salt = hashlib.blake2b(salt.encode("utf-8"), digest_size=32).digest()
+        self.buckets = buckets
+        self.clock = clock
+        self._widths = [rule.window_s / buckets for rule in self.rules]
+        self._names = [rule.name for rule in self.rules]
+        self._lock = threading.Lock()
+        self._memory = [RingCounters(buckets, max_keys) for _ in self.rules]
+        self._sqlite = SQLiteCounters(sqlite_path) if sqlite_path is not None else None
+        self.counters = {"checks": 0, "flagged": 0}
+
+    def check(
+        self,
+        device_id: Optional[str] = None,
+        ip_address: Optional[str] = None,
+        phone: Optional[str] = None,
+        pan: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """Record a verification and return ``risk_score``, ``flags`` and the window ``counts``."""
+        values = {"device": device_id, "ip": ip_address, "phone": phone, "pan": pan}
+        now = self.clock()
+        events: List[Tuple[int, int, int, float]] = []
+        active: List[int] = []
+        for i, rule in enumerate(self.rules):
+            value = normalize(rule.kind, values[rule.kind])
+            if not value:
+                continue
+            bucket = int(now // self._widths[i])
+            events.append((velocity_key(self.salt, self._names[i], value), bucket, self.buckets, now + rule.window_s))
+            active.append(i)
+
+        with self._lock:
+            if self._sqlite is not None:
+                totals = self._sqlite.add_many(events, now) if events else []
+            else:
+                totals = [self._memory[i].add(key, bucket) for i, (key, bucket, _, _) in zip(active, events)]
+            self.counters["checks"] += 1
+
+        risk_score, flags, counts = 0, [], {}
+        for i, total in zip(active, totals):
+            rule = self.rules[i]
+            counts[self._names[i]] = total
+            if total >= rule.limit:
+                risk_score = max(risk_score, rule.risk_score)
+                flags.append(
+                    f"Velocity: {total} applications from {KIND_LABELS[rule.kind]} "
+                    f"in {rule.window_label} (limit {rule.limit})."
+                )
+        if flags:
+            with self._lock:
+                self.counters["flagged"] += 1
+        return {"risk_score": risk_score, "flags": flags, "counts": counts}
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            counters = dict(self.counters)
+            if self._sqlite is not None:
+                tracked = {"sqlite_rows": len(self._sqlite), "swept": self._sqlite.swept}
+            else:
+                tracked = {
+                    "memory_keys": sum(len(ring) for ring in self._memory),
+                    "evicted": sum(ring.evicted for ring in self._memory),
+                }
+        return {
+            **counters,
+            **tracked,
+            "sqlite": self._sqlite is not None,
+            "rules": [
+                {"name": rule.name, "window_s": rule.window_s, "limit": rule.limit, "risk_score": rule.risk_score}
+                for rule in self.rules
+            ],
+        }
+
+
+@lru_cache()
+def get_velocity_engine() -> VelocityEngine:
+    """Get singleton velocity engine"""
+    salt = settings.velocity_salt
+    sqlite_path = Path(settings.velocity_path) if settings.velocity_path else None
+    if not salt:
+        # Workers need the same salt to count the same identifier under the same key.
+        salt = secrets.token_hex(16)
+        if sqlite_path is not None:
+            print("⚠️ VELOCITY_SALT is not set; velocity counters are in-process only")
+            sqlite_path = None
+    try:
+        return VelocityEngine(DEFAULT_RULES, salt, sqlite_path, settings.velocity_max_keys)
+    except sqlite3.Error as exc:
+        print(f"⚠️ Velocity SQLite store unavailable, counting in process only: {exc}")
+        return VelocityEngine(DEFAULT_RULES, salt, None, settings.velocity_max_keys)
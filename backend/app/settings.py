@@ -26,10 +26,57 @@ class Settings(BaseSettings):
 
     postgres_dsn: Optional[str] = Field(None, validation_alias="POSTGRES_DSN")
     state_debug_token: Optional[str] = Field(None, validation_alias="STATE_DEBUG_TOKEN")
+    partner_api_token: Optional[str] = Field(None, validation_alias="PARTNER_API_TOKEN")
+    # Comma-separated addresses or CIDRs of reverse proxies whose X-Forwarded-For is honoured.
+    trusted_proxies: str = Field("", validation_alias="TRUSTED_PROXIES")
     rate_limit_window_s: int = Field(60, validation_alias="RATE_LIMIT_WINDOW_S")
     rate_limit_max_requests: int = Field(120, validation_alias="RATE_LIMIT_MAX_REQUESTS")
+    quote_rate_limit_max_requests: int = Field(600, validation_alias="QUOTE_RATE_LIMIT_MAX_REQUESTS")
     strict_document_verification: bool = Field(False, validation_alias="STRICT_DOCUMENT_VERIFICATION")
 
+    image_max_dimension: int = Field(1600, validation_alias="IMAGE_MAX_DIMENSION")
+    image_jpeg_quality: int = Field(80, validation_alias="IMAGE_JPEG_QUALITY")
+    image_preview_dimension: int = Field(320, validation_alias="IMAGE_PREVIEW_DIMENSION")
+    image_original_retention_hours: int = Field(0, validation_alias="IMAGE_ORIGINAL_RETENTION_HOURS")
+
+    sanction_renderer: str = Field("direct", validation_alias="SANCTION_RENDERER")
+    sanction_render_workers: int = Field(2, validation_alias="SANCTION_RENDER_WORKERS")
+    sanction_unicode_font: Optional[str] = Field(None, validation_alias="SANCTION_UNICODE_FONT")
+
+    underwriting_policy_path: Optional[str] = Field(None, validation_alias="UNDERWRITING_POLICY_PATH")
+    policy_reload_interval_s: float = Field(5.0, validation_alias="POLICY_RELOAD_INTERVAL_S")
+
+    rate_card_path: Optional[str] = Field(None, validation_alias="RATE_CARD_PATH")
+    pricing_cache_dir: str = Field("uploads/cache", validation_alias="PRICING_CACHE_DIR")
+
+    purpose_taxonomy_path: Optional[str] = Field(None, validation_alias="PURPOSE_TAXONOMY_PATH")
+
+    bureau_cache_ttl_days: float = Field(30.0, validation_alias="BUREAU_CACHE_TTL_DAYS")
+    bureau_cache_salt: str = Field("", validation_alias="BUREAU_CACHE_SALT")
+    bureau_cache_path: Optional[str] = Field(None, validation_alias="BUREAU_CACHE_PATH")
+    bureau_cache_max_entries: int = Field(10000, validation_alias="BUREAU_CACHE_MAX_ENTRIES")
+
+    bureau_url: Optional[str] = Field(None, validation_alias="BUREAU_URL")
+    bureau_timeout_s: float = Field(2.0, validation_alias="BUREAU_TIMEOUT_S")
+    bureau_max_connections: int = Field(20, validation_alias="BUREAU_MAX_CONNECTIONS")
+    bureau_retries: int = Field(2, validation_alias="BUREAU_RETRIES")
+    bureau_breaker_failures: int = Field(5, validation_alias="BUREAU_BREAKER_FAILURES")
+    bureau_breaker_reset_s: float = Field(30.0, validation_alias="BUREAU_BREAKER_RESET_S")
+
+    customer_index_salt: str = Field("", validation_alias="CUSTOMER_INDEX_SALT")
+    customer_index_path: Optional[str] = Field(None, validation_alias="CUSTOMER_INDEX_PATH")
+    customer_index_max_entries: int = Field(50000, validation_alias="CUSTOMER_INDEX_MAX_ENTRIES")
+    customer_index_kyc_ttl_days: float = Field(30.0, validation_alias="CUSTOMER_INDEX_KYC_TTL_DAYS")
+
+    fraud_graph_path: Optional[str] = Field(None, validation_alias="FRAUD_GRAPH_PATH")
+    fraud_graph_max_overlay: int = Field(100000, validation_alias="FRAUD_GRAPH_MAX_OVERLAY")
+    fraud_graph_flush_interval_s: float = Field(300.0, validation_alias="FRAUD_GRAPH_FLUSH_INTERVAL_S")
+    fraud_rings_path: Optional[str] = Field(None, validation_alias="FRAUD_RINGS_PATH")
+    fraud_rings_reload_interval_s: float = Field(60.0, validation_alias="FRAUD_RINGS_RELOAD_INTERVAL_S")
+    velocity_salt: str = Field("", validation_alias="VELOCITY_SALT")
+    velocity_path: Optional[str] = Field(None, validation_alias="VELOCITY_PATH")
+    velocity_max_keys: int = Field(100000, validation_alias="VELOCITY_MAX_KEYS")
+
     model_config = SettingsConfigDict(
         env_file=".env",
         env_file_encoding="utf-8",
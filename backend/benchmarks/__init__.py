@@ -0,0 +1 @@
+"""Standalone micro/throughput benchmarks. Run from ``backend/`` with ``python -m benchmarks.<name>``."""
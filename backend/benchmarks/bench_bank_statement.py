@@ -0,0 +1,88 @@
+"""Parse + analyse time for synthetic 12-month bank statements.
+
+Usage (from backend/):
+    python -m benchmarks.bench_bank_statement --rows 5000 --repeat 20
+"""
+from __future__ import annotations
+
+import argparse
+import random
+import statistics
+import tempfile
+import time
+from datetime import date, timedelta
+from pathlib import Path
+
+from app.services.bank_statement_service import analyze_transactions, load_transactions
+
+NARRATIONS = [
+    "UPI/{ref}/SWIGGY/food",
+    "POS {ref} AMAZON PAY",
+    "IMPS/{ref}/RENT PAYMENT",
+    "ATM WDL {ref} MUMBAI",
+    "UPI/{ref}/ZOMATO",
+    "NEFT-{ref}-ELECTRICITY BOARD",
+]
+
+
+def write_statement(path: Path, rows: int, months: int, seed: int) -> None:
+    rng = random.Random(seed)
+    start = date(2025, 1, 1)
+    balance = 150_000.0
+    lines = ["Account Statement,XXXX1234", "Date,Narration,Withdrawal,Deposit,Balance"]
+    fixed_per_month = 3
+    filler = max(rows - months * fixed_per_month, 0)
+    day_span = months * 30
+    events = []
+    for m in range(months):
+        month_start = date(start.year + m // 12, m % 12 + 1, 1)
+        events.append((month_start, "NEFT SALARY ACME TECHNOLOGIES", 0.0, 95_000.0))
+        events.append((month_start + timedelta(days=4), "NACH DR HDFC PERSONAL LOAN EMI", 12_450.0, 0.0))
+        events.append((month_start + timedelta(days=9), "ACH D- BAJAJ FINANCE LTD", 3_210.0, 0.0))
+    for _ in range(filler):
+        when = start + timedelta(days=rng.randrange(day_span))
+        narration = rng.choice(NARRATIONS).format(ref=rng.randrange(10**9, 10**10))
+        events.append((when, narration, round(rng.uniform(50, 4000), 2), 0.0))
+    events.sort(key=lambda e: e[0])
+    for when, narration, debit, credit in events:
+        balance += credit - debit
+        lines.append(
+            f"{when.strftime('%d/%m/%Y')},{narration},{debit if debit else ''},{credit if credit else ''},{balance:.2f}"
+        )
+    path.write_text("\n".join(lines), encoding="utf-8")
+
+
+def run(rows: int, months: int, repeat: int, seed: int) -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "statement.csv"
+        write_statement(path, rows, months, seed)
+        parse_ms, analyse_ms = [], []
+        result = {}
+        for _ in range(repeat):
+            t0 = time.perf_counter()
+            tx = load_transactions(str(path), "text/csv")
+            t1 = time.perf_counter()
+            result = analyze_transactions(tx)
+            t2 = time.perf_counter()
+            parse_ms.append((t1 - t0) * 1000)
+            analyse_ms.append((t2 - t1) * 1000)
+
+    print(f"rows:        {result['transaction_count']} over {result['months_covered']} months")
+    print(f"parse:       median {statistics.median(parse_ms):.2f} ms  max {max(parse_ms):.2f} ms")
+    print(f"analyse:     median {statistics.median(analyse_ms):.2f} ms  max {max(analyse_ms):.2f} ms")
+    print(f"existing_emis: {result['existing_emis']}  (expected 15660.0)")
+    print(f"avg_monthly_salary: {result['average_monthly_salary']}  bounces: {result['bounce_count']}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=5000)
+    parser.add_argument("--months", type=int, default=12)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=11)
+    args = parser.parse_args()
+    run(args.rows, args.months, args.repeat, args.seed)
+
+
+if __name__ == "__main__":
+    main()
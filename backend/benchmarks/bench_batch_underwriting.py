@@ -0,0 +1,84 @@
+"""Rows per minute for batch underwriting, end to end from a CSV file.
+
+Usage (from backend/):
+    python -m benchmarks.bench_batch_underwriting --rows 1000000
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import tempfile
+import time
+
+import numpy as np
+
+from app.services.batch_underwriting import BatchSummary, iter_batch_chunks, stream_underwriting, underwrite_chunk
+from app.services.policy_engine import get_policy_engine
+
+COLUMNS = (
+    "application_id,credit_score,preapproved_limit,requested_amount,monthly_income,"
+    "tenure_months,existing_emis,documents_verified"
+)
+
+
+def _write_corpus(path: str, rows: int, seed: int) -> None:
+    rng = np.random.default_rng(seed)
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(COLUMNS + "\n")
+        for start in range(0, rows, 100_000):
+            n = min(100_000, rows - start)
+            block = np.column_stack(
+                [
+                    np.arange(start, start + n),
+                    rng.integers(550, 900, n),
+                    rng.choice([0, 100_000, 300_000, 500_000, 1_000_000], n),
+                    rng.integers(50_000, 2_000_000, n),
+                    rng.integers(20_000, 250_000, n),
+                    rng.integers(6, 85, n),
+                    rng.integers(0, 30_000, n),
+                    rng.integers(0, 2, n),
+                ]
+            )
+            np.savetxt(f, block, fmt="%d", delimiter=",")
+
+
+def run(rows: int, chunk_rows: int, seed: int) -> None:
+    policy = get_policy_engine().policy
+    with tempfile.TemporaryDirectory() as tmp:
+        source = os.path.join(tmp, "batch.csv")
+        _write_corpus(source, rows, seed)
+
+        start = time.perf_counter()
+        chunks = list(iter_batch_chunks(source, "csv", chunk_rows))
+        parse_s = time.perf_counter() - start
+
+        start = time.perf_counter()
+        for chunk in chunks:
+            underwrite_chunk(chunk, policy)
+        score_s = time.perf_counter() - start
+
+        summary = BatchSummary(policy.version)
+        start = time.perf_counter()
+        with open(os.path.join(tmp, "out.csv"), "w", encoding="utf-8") as out:
+            for block in stream_underwriting(iter_batch_chunks(source, "csv", chunk_rows), policy, "csv", summary):
+                out.write(block)
+        total_s = time.perf_counter() - start
+
+    print(f"{rows} rows, chunk {chunk_rows}, policy {policy.version}")
+    print(f"  parse CSV      {parse_s:7.2f} s  ({rows / parse_s * 60:>13,.0f} rows/min)")
+    print(f"  score (numpy)  {score_s:7.2f} s  ({rows / score_s * 60:>13,.0f} rows/min)")
+    print(f"  end to end     {total_s:7.2f} s  ({rows / total_s * 60:>13,.0f} rows/min)")
+    print(f"  decisions      {summary.decisions}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--chunk-rows", type=int, default=65_536)
+    parser.add_argument("--seed", type=int, default=11)
+    args = parser.parse_args()
+    run(args.rows, args.chunk_rows, args.seed)
+
+
+if __name__ == "__main__":
+    main()
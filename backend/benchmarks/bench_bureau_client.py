@@ -0,0 +1,121 @@
+"""Bureau inquiries against the local stand-in bureau: unpooled vs pooled client vs coalesced batches.
+
+Starts ``app.cli.bureau_server`` in a subprocess on a loopback port with the
+given latency and error rate, then pushes the same inquiries through three
+paths:
+
+- ``unpooled``: a fresh connection per inquiry and no retries, as a naive
+  client would do.
+- ``pooled``: ``BureauClient`` with keep-alive, retries and a breaker.
+- ``batched``: the same client behind ``InquiryBatcher``, as the bulk
+  path uses it.
+
+Usage (from backend/):
+    python -m benchmarks.bench_bureau_client --inquiries 2000 --concurrency 64 --latency-ms 50 --error-rate 0.02
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import socket
+import subprocess
+import sys
+import time
+from typing import Awaitable, Callable, List, Optional, Tuple
+
+import httpx
+
+from app.services.bureau_client import BureauClient, BureauError, InquiryBatcher
+
+
+def _start_server(latency_ms: float, jitter_ms: float, error_rate: float) -> Tuple[str, subprocess.Popen]:
+    """The stand-in bureau in its own process, so it does not share the client's CPU."""
+    with socket.socket() as probe:
+        probe.bind(("127.0.0.1", 0))
+        port = probe.getsockname()[1]
+    server = subprocess.Popen(
+        [
+            sys.executable, "-m", "app.cli.bureau_server", "--port", str(port), "--latency-ms", str(latency_ms),
+            "--jitter-ms", str(jitter_ms), "--error-rate", str(error_rate), "--seed", "7",
+        ]
+    )
+    url = f"http://127.0.0.1:{port}"
+    for _ in range(200):
+        try:
+            httpx.get(f"{url}/health", timeout=1.0)
+            return url, server
+        except httpx.TransportError:
+            time.sleep(0.05)
+    server.terminate()
+    raise RuntimeError("Stand-in bureau did not start")
+
+
+async def _drive(inquire: Callable[[str], Awaitable[dict]], pans: List[str], concurrency: int) -> None:
+    gate = asyncio.Semaphore(concurrency)
+    latencies: List[float] = []
+    failures = 0
+
+    async def one(pan: str) -> None:
+        nonlocal failures
+        async with gate:
+            start = time.perf_counter()
+            try:
+                await inquire(pan)
+            except (BureauError, httpx.HTTPError):
+                failures += 1
+            latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one(pan) for pan in pans))
+    elapsed = time.perf_counter() - start
+    latencies.sort()
+    p50 = latencies[len(latencies) // 2] * 1000
+    p95 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))] * 1000
+    print(
+        f"{len(pans) / elapsed:9.0f} inquiries/s  p50={p50:7.1f} ms  p95={p95:7.1f} ms  "
+        f"failed={failures}/{len(pans)}"
+    )
+
+
+async def run(url: str, inquiries: int, concurrency: int) -> None:
+    pans = [f"BENCH{i:04d}X" for i in range(inquiries)]
+
+    async def unpooled(pan: str) -> dict:
+        async with httpx.AsyncClient(base_url=url, timeout=5.0) as client:
+            response = await client.post("/v1/inquiries", json={"pan": pan})
+            response.raise_for_status()
+            return response.json()
+
+    print(f"{'unpooled, no retries':<22}", end=" ", flush=True)
+    await _drive(unpooled, pans, concurrency)
+
+    client = BureauClient(url, timeout_s=5.0, max_connections=concurrency, retries=2, backoff_s=0.02)
+    print(f"{'pooled client':<22}", end=" ", flush=True)
+    await _drive(lambda pan: client.inquire(pan, None, None), pans, concurrency)
+    retries: Optional[int] = client.stats["retries"]
+
+    batcher = InquiryBatcher(client, max_batch=50, max_wait_s=0.005)
+    print(f"{'pooled + batched':<22}", end=" ", flush=True)
+    await _drive(lambda pan: batcher.inquire(pan, None, None), pans, concurrency)
+    print(f"pooled retries absorbed: {retries}; batch calls: {batcher.batches}")
+    await client.aclose()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--inquiries", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--latency-ms", type=float, default=50.0)
+    parser.add_argument("--jitter-ms", type=float, default=10.0)
+    parser.add_argument("--error-rate", type=float, default=0.02)
+    args = parser.parse_args()
+    url, server = _start_server(args.latency_ms, args.jitter_ms, args.error_rate)
+    try:
+        asyncio.run(run(url, args.inquiries, args.concurrency))
+    finally:
+        server.terminate()
+        server.wait()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,158 @@
+"""Turns, LLM calls and tool runs needed to take a chat application from hello to a decision.
+
+A scripted customer answers whatever the agent asks. ``terse`` customers give
+one detail per message; ``chatty`` ones open with the loan details, name and
+mobile in one message, and ``complete`` ones with every detail including
+email, PAN and Aadhaar. The LLM is replaced by an oracle that returns exactly
+the fields present in each message, so the numbers measure the graph's
+turn structure rather than extraction quality, and no API key is needed.
+
+Usage (from backend/):
+    python -m benchmarks.bench_conversation
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Tuple
+
+from langchain_core.messages import HumanMessage
+from langgraph.checkpoint.memory import MemorySaver
+
+import app.graph.nodes as graph_nodes
+import app.services.sanction_service as sanction_service
+from app.graph.workflow import create_agentic_workflow
+from app.models.state import create_initial_state
+
+# Field values the customer knows, and how they say each one.
+CUSTOMER: Dict[str, Tuple[Any, str]] = {
+    "requested_amount": (300000.0, "I'd like to borrow 300000"),
+    "tenure_months": (24, "24 months"),
+    "loan_purpose": ("wedding", "it's for my wedding"),
+    "employment_type": ("salaried", "I'm salaried"),
+    "monthly_income": (80000.0, "my monthly income is 80000"),
+    "full_name": ("Aarav Mehta", "Aarav Mehta"),
+    "mobile": ("9876501001", "9876501001"),
+    "email": ("aarav@example.com", "aarav@example.com"),
+    "pan": ("ABCDE1234F", "ABCDE1234F"),
+    "aadhaar": ("123456789012", "1234 5678 9012"),
+}
+# What each style of customer says unprompted in their first message.
+STYLES: Dict[str, Tuple[str, ...]] = {
+    "terse": (),
+    "chatty": ("requested_amount", "tenure_months", "loan_purpose", "employment_type", "monthly_income", "full_name", "mobile"),
+    "complete": tuple(CUSTOMER),
+}
+TERMINAL = {"approved", "rejected", "manual_review", "awaiting_documents"}
+
+
+class OracleLLM:
+    """Stands in for the LLM: answers structured extraction from the script's answer key."""
+
+    def __init__(self) -> None:
+        self.answers: Dict[str, Dict[str, Any]] = {}
+        self.calls = 0
+
+    async def achat_structured(self, messages: List[Dict[str, str]], output_schema: Any, system_prompt: str = "") -> Any:
+        self.calls += 1
+        known = self.answers.get(messages[-1]["content"], {})
+        return output_schema(**{k: v for k, v in known.items() if k in output_schema.model_fields})
+
+
+class CountedTool:
+    """Wraps a graph tool to count how often a conversation actually runs it."""
+
+    def __init__(self, tool: Any) -> None:
+        self.tool = tool
+        self.runs = 0
+
+    async def ainvoke(self, args: Dict[str, Any]) -> Any:
+        self.runs += 1
+        return await self.tool.ainvoke(args)
+
+
+TOOLS = ("analyze_purpose", "calculate_emi", "check_affordability", "fetch_credit_score_tool", "analyze_fraud_tool", "verify_kyc_tool")
+
+
+def _answer(interrupt: Dict[str, Any]) -> Tuple[str, Dict[str, Any]]:
+    kind = interrupt.get("type")
+    if kind == "otp_required":
+        return "482913", {"otp": "482913"}
+    if kind == "kyc_consent":
+        return "yes, I consent", {"consent": True}
+    field = (interrupt.get("fields") or [None])[0]
+    if field not in CUSTOMER:
+        raise RuntimeError(f"Customer cannot answer {interrupt}")
+    value, text = CUSTOMER[field]
+    return text, {field: value}
+
+
+async def converse(style: str, thread_id: str) -> Dict[str, Any]:
+    llm = OracleLLM()
+    graph_nodes.get_llm_service = lambda: llm
+    tools = []
+    for name in TOOLS:
+        tool = getattr(graph_nodes, name)
+        tools.append(CountedTool(getattr(tool, "tool", tool)))
+        setattr(graph_nodes, name, tools[-1])
+    graph = create_agentic_workflow(checkpointer=MemorySaver())
+    config = {"configurable": {"thread_id": thread_id}}
+
+    volunteered = STYLES[style]
+    text = ", ".join(CUSTOMER[f][1] for f in volunteered) or "Hi, I need a personal loan"
+    fields = {f: CUSTOMER[f][0] for f in volunteered}
+    inputs: Dict[str, Any] = {**create_initial_state(thread_id)}
+    turns, otp_turn = 0, None
+    while True:
+        turns += 1
+        llm.answers[text] = fields
+        inputs["messages"] = [HumanMessage(content=text)]
+        state = await graph.ainvoke(inputs, config)
+        inputs = {}
+        interrupt = state.get("interrupt_signal") or {}
+        if interrupt.get("type") == "otp_required" and otp_turn is None:
+            otp_turn = turns
+        if state.get("application_status") in TERMINAL:
+            loan_data = state["loan_data"].model_dump()
+            loan_data["full_name"] = loan_data["customer_name"]
+            wrong = sorted(f for f, (value, _) in CUSTOMER.items() if loan_data.get(f) != value)
+            return {
+                "turns": turns,
+                "otp_turn": otp_turn,
+                "llm_calls": llm.calls,
+                "tool_runs": sum(tool.runs for tool in tools),
+                "status": state["application_status"],
+                "wrong_fields": wrong,
+            }
+        if turns > 40:
+            raise RuntimeError(f"No decision after {turns} turns: {interrupt}")
+        text, fields = _answer(interrupt)
+
+
+def run(conversations: int) -> None:
+    sanction_service.SANCTIONS_DIR = Path(tempfile.mkdtemp(prefix="bench_conversation_"))
+    for style in STYLES:
+        start = time.perf_counter()
+        results = [asyncio.run(converse(style, f"bench_{style}_{i}")) for i in range(conversations)]
+        elapsed = time.perf_counter() - start
+        first = results[0]
+        print(
+            f"{style:<8} turns={first['turns']:<3} otp_prompt_at_turn={first['otp_turn']} "
+            f"llm_calls={first['llm_calls']:<3} tool_runs={first['tool_runs']:<3} status={first['status']} "
+            f"wrong_fields={','.join(first['wrong_fields']) or '-'}  "
+            f"graph time/application={elapsed / conversations * 1000:.1f} ms"
+        )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--conversations", type=int, default=20)
+    args = parser.parse_args()
+    run(args.conversations)
+
+
+if __name__ == "__main__":
+    main()
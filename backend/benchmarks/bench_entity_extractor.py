@@ -0,0 +1,217 @@
+"""Per-message cost of reading entities out of chat text: the old helper chain vs the single-pass scanner.
+
+The corpus is typical Indian lending chat (Hinglish, lakh/crore/k amounts,
+spaced Aadhaar and mobile numbers, one field per message or everything at
+once). The legacy column runs every helper a sales + verification turn used
+to call on a message; the scanner column is one uncached ``_scan`` and the
+views the nodes read afterwards. Also reports how often the requested amount
+is read correctly, which is where lakh/crore notation used to go wrong.
+
+Usage (from backend/):
+    python -m benchmarks.bench_entity_extractor --messages 50000
+"""
+from __future__ import annotations
+
+import argparse
+import random
+import re
+import time
+from typing import List, Optional, Tuple
+
+from app.services.entity_extractor import _scan
+
+# (message, requested amount the customer means, or None when there is none)
+CORPUS: List[Tuple[str, Optional[float]]] = [
+    ("I need 5 lakh for my wedding over 3 years, salaried, 80k a month, I'm Aarav Mehta 9876501001", 500000),
+    ("want a loan of Rs. 2,50,000 for 24 months", 250000),
+    ("need 1.5 lakh urgently for hospital bills", 150000),
+    ("mujhe 3 lakh chahiye shaadi ke liye", 300000),
+    ("loan amount 75000", 75000),
+    ("I'd like to borrow 300000", 300000),
+    ("10 lakh for home renovation, 5 years", 1000000),
+    ("need 1.2 crore for business expansion", 12000000),
+    ("₹4,00,000 for 36 months please", 400000),
+    ("looking for 50k for a new laptop", 50000),
+    ("my monthly income is 80000", None),
+    ("salary 65k per month in hand", None),
+    ("I am self employed earning 1.5 lakh pm", None),
+    ("take home around 42,000", None),
+    ("24 months", None),
+    ("two years", None),
+    ("salaried", None),
+    ("freelancer", None),
+    ("Aarav Mehta", None),
+    ("my name is Priya Sharma", None),
+    ("9876501001", None),
+    ("+91 98765 01001", None),
+    ("aarav.mehta@example.com", None),
+    ("ABCDE1234F", None),
+    ("pan is abcde1234f", None),
+    ("1234 5678 9012", None),
+    ("482913", None),
+    ("yes, I consent", None),
+    ("no I don't want that", None),
+    ("okay go ahead", None),
+]
+
+
+def legacy_extract_number(text: str) -> Optional[float]:
+    if not text:
+        return None
+    match = re.search(r"(\d[\d,]*\.?\d*)", text.replace("₹", "").replace("â‚¹", "").replace("rs", ""))
+    if not match:
+        return None
+    try:
+        return float(match.group(1).replace(",", ""))
+    except ValueError:
+        return None
+
+
+def legacy_extract_tenure_months(text: str) -> Optional[int]:
+    if not text:
+        return None
+    match = re.search(r"(\d+)\s*(months|month|mos|m)\b", text.lower())
+    if match:
+        return int(match.group(1))
+    match = re.search(r"(\d+)\s*(years|year|yrs|yr)\b", text.lower())
+    if match:
+        return int(match.group(1)) * 12
+    return None
+
+
+def legacy_extract_employment_type(text: str) -> Optional[str]:
+    if not text:
+        return None
+    lowered = text.lower()
+    if "salaried" in lowered:
+        return "salaried"
+    if "self" in lowered and "employ" in lowered:
+        return "self_employed"
+    if "freelanc" in lowered:
+        return "freelancer"
+    if "unemploy" in lowered:
+        return "unemployed"
+    return None
+
+
+def legacy_extract_email(text: str) -> Optional[str]:
+    if not text:
+        return None
+    match = re.search(r"[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Za-z]{2,}", text)
+    return match.group(0) if match else None
+
+
+def legacy_extract_pan(text: str) -> Optional[str]:
+    if not text:
+        return None
+    match = re.search(r"\b[A-Z]{5}\d{4}[A-Z]\b", text.upper())
+    return match.group(0) if match else None
+
+
+def legacy_extract_aadhaar(text: str) -> Optional[str]:
+    if not text:
+        return None
+    match = re.search(r"\b\d{4}\s?\d{4}\s?\d{4}\b", text)
+    return match.group(0).replace(" ", "") if match else None
+
+
+def legacy_extract_mobile(text: str) -> Optional[str]:
+    if not text:
+        return None
+    match = re.search(r"\b\d{10}\b", text)
+    return match.group(0) if match else None
+
+
+def legacy_extract_consent(text: str) -> Optional[bool]:
+    lowered = (text or "").strip().lower()
+    if not lowered:
+        return None
+    yes_tokens = ["yes", "i consent", "consent", "agree", "approved", "ok", "okay", "yep", "sure"]
+    no_tokens = ["no", "i do not consent", "don't consent", "do not consent", "deny", "disagree"]
+    if any(token in lowered for token in no_tokens):
+        return False
+    if any(token in lowered for token in yes_tokens):
+        return True
+    return None
+
+
+def legacy_looks_like_income_context(text: str) -> bool:
+    lowered = (text or "").lower()
+    markers = ["income", "salary", "per month", "monthly", "take home", "take-home"]
+    return any(m in lowered for m in markers)
+
+
+def legacy_looks_like_loan_amount_context(text: str) -> bool:
+    lowered = (text or "").lower()
+    markers = ["borrow", "loan amount", "need", "want", "amount", "loan", "finance"]
+    return any(m in lowered for m in markers)
+
+
+def legacy_turn(message: str) -> tuple:
+    """Everything the sales and verification nodes used to run on one message."""
+    return (
+        legacy_extract_employment_type(message),
+        legacy_extract_tenure_months(message),
+        legacy_extract_number(message),
+        legacy_looks_like_income_context(message),
+        legacy_looks_like_loan_amount_context(message),
+        legacy_extract_tenure_months(message),
+        legacy_extract_employment_type(message),
+        legacy_extract_consent(message),
+        legacy_extract_mobile(message),
+        legacy_extract_email(message),
+        legacy_extract_pan(message),
+        legacy_extract_aadhaar(message),
+    )
+
+
+def scanner_turn(message: str) -> tuple:
+    found = _scan(message)
+    views = ("employment_type", "tenure_months", "mobile", "email", "pan", "aadhaar", "full_name")
+    return tuple(found.first(kind) for kind in views) + (
+        found.amount("loan"),
+        found.amount("income"),
+        found.amount(None),
+        found.consent(),
+    )
+
+
+def legacy_amount(message: str) -> Optional[float]:
+    """What the old sales node stored as the requested amount when it had asked for it."""
+    number = legacy_extract_number(message)
+    return None if legacy_looks_like_income_context(message) else number
+
+
+def scanner_amount(message: str) -> Optional[float]:
+    found = _scan(message)
+    return found.amount("loan") or found.amount(None)
+
+
+def run(messages: int, seed: int, rounds: int = 3) -> None:
+    rng = random.Random(seed)
+    corpus = [rng.choice(CORPUS)[0] for _ in range(messages)]
+    for label, turn in (("legacy helper chain", legacy_turn), ("single-pass scanner", scanner_turn)):
+        best = float("inf")
+        for _ in range(rounds):  # best of a few rounds: the slower ones measure the machine, not the code
+            start = time.perf_counter()
+            for message in corpus:
+                turn(message)
+            best = min(best, time.perf_counter() - start)
+        print(f"{label:<22} {best / messages * 1e6:7.2f} µs/message")
+
+    amounts = [(text, expected) for text, expected in CORPUS if expected is not None]
+    for label, read in (("legacy", legacy_amount), ("scanner", scanner_amount)):
+        correct = sum(read(text) == expected for text, expected in amounts)
+        print(f"{label:<8} requested amount read correctly in {correct}/{len(amounts)} loan messages")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--messages", type=int, default=50_000)
+    parser.add_argument("--seed", type=int, default=5)
+    args = parser.parse_args()
+    run(args.messages, args.seed)
+
+
+if __name__ == "__main__":
+    main()
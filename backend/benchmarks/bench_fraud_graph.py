@@ -0,0 +1,111 @@
+"""Embedded fraud graph: build, save, memory-mapped load and per-user detection latency.
+
+Generates a synthetic user-device/IP/phone graph with the given number of
+edges (mostly private identifiers plus a few carrier-NAT IP hubs), builds the
+compact arrays, writes and reloads the file, then times ``detect`` (the
+``DETECTION_QUERY`` counts) and ``analyze_fraud_network`` (ingest plus detect)
+for random users.
+
+Usage (from backend/):
+    python -m benchmarks.bench_fraud_graph --edges 20000000
+"""
+from __future__ import annotations
+
+import argparse
+import tempfile
+import time
+from pathlib import Path
+from typing import Callable, List, Tuple
+
+import numpy as np
+
+from app.services.fraud_graph import KINDS, FraudGraph, build_arrays, node_key
+
+HUB_IPS = 20
+
+
+def _keys(kind: str, count: int) -> np.ndarray:
+    return np.fromiter((node_key(kind, f"{kind}{i}") for i in range(count)), dtype=np.uint64, count=count)
+
+
+def _latency(label: str, fn: Callable[[int], object], samples: List[int]) -> None:
+    timings = []
+    for sample in samples:
+        start = time.perf_counter()
+        fn(sample)
+        timings.append(time.perf_counter() - start)
+    timings.sort()
+    p50 = timings[len(timings) // 2] * 1e6
+    p99 = timings[int(len(timings) * 0.99)] * 1e6
+    print(f"{label:<34} p50={p50:7.1f} µs  p99={p99:8.1f} µs")
+
+
+def synthetic_edges(edges: int, rng: np.random.Generator) -> Tuple[int, np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """(n_users, user keys, kind codes, identifier keys, fraud keys) for about ``edges`` edges."""
+    n_users = max(1, edges // 5)
+    sizes = {"device": max(1, int(n_users * 0.8)), "ip": max(1, n_users // 4), "phone": max(1, n_users)}
+
+    start = time.perf_counter()
+    users = _keys("user", n_users)
+    attr_keys = {kind: _keys(kind, size) for kind, size in sizes.items()}
+    print(f"{'hash ' + format(n_users + sum(sizes.values()), ',') + ' node IDs':<34} {time.perf_counter() - start:8.2f} s")
+
+    per_kind = edges // len(KINDS)
+    user_parts, kind_parts, attr_parts = [], [], []
+    for code, kind in enumerate(KINDS):
+        user_parts.append(users[rng.integers(0, n_users, per_kind)])
+        picks = rng.integers(0, sizes[kind], per_kind)
+        if kind == "ip":
+            # Most IPs are private; 5% of IP edges land on a few carrier-NAT hubs, Zipf-distributed.
+            hubs = rng.random(per_kind) < 0.05
+            picks[hubs] = np.minimum(rng.zipf(1.6, int(hubs.sum())) - 1, HUB_IPS - 1)
+        attr_parts.append(attr_keys[kind][picks])
+        kind_parts.append(np.full(per_kind, code, dtype=np.uint8))
+    fraud = users[rng.choice(n_users, max(1, n_users // 200), replace=False)]
+    return n_users, np.concatenate(user_parts), np.concatenate(kind_parts), np.concatenate(attr_parts), fraud
+
+
+def run(edges: int, seed: int, queries: int) -> None:
+    rng = np.random.default_rng(seed)
+    n_users, user_keys, kind_codes, attr_keys, fraud = synthetic_edges(edges, rng)
+
+    start = time.perf_counter()
+    arrays = build_arrays(user_keys, kind_codes, attr_keys, fraud)
+    graph = FraudGraph(arrays, {"built_at": time.time()})
+    stats = graph.stats()
+    print(
+        f"{'build arrays':<34} {time.perf_counter() - start:8.2f} s  {stats['edges']:,} edges, "
+        f"{stats['bytes'] / stats['edges']:.1f} bytes/edge ({stats['bytes'] / 2**20:,.0f} MB)"
+    )
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "fraud_graph.bin"
+        start = time.perf_counter()
+        graph.save(path)
+        print(f"{'save (compact + write)':<34} {time.perf_counter() - start:8.2f} s  {path.stat().st_size / 2**20:,.0f} MB")
+        start = time.perf_counter()
+        graph = FraudGraph.load(path)
+        print(f"{'load (memory-mapped)':<34} {(time.perf_counter() - start) * 1000:8.2f} ms")
+
+        # Users are named by index, so sample names rather than keys.
+        samples = rng.integers(0, n_users, queries).tolist()
+        _latency("detect", lambda i: graph.detect(f"user{i}"), samples)
+        _latency("analyze (ingest + detect)", lambda i: graph.analyze_fraud_network(f"user{i}", f"device{i}", None, f"phone{i}"), samples)
+        _latency("analyze, new applicant", lambda i: graph.analyze_fraud_network(f"new{i}", f"device{i}", f"ip{i % 50}", f"phone{i}"), samples)
+        print(f"overlay edges after queries: {graph.delta_edges:,}")
+        start = time.perf_counter()
+        graph.compact()
+        print(f"{'compact overlay (off the lock)':<34} {time.perf_counter() - start:8.2f} s  {graph.stats()['edges']:,} edges")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--edges", type=int, default=5_000_000)
+    parser.add_argument("--queries", type=int, default=20_000)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+    run(args.edges, args.seed, args.queries)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+"""Fraud ring batch job: union-find over the graph arrays and O(1) ring lookups.
+
+Builds the same synthetic graph as ``bench_fraud_graph``, times ``find_rings``
+(the union edges, union-find rounds and hash index), writes and memory-maps
+the ring file, then times ``FraudRings.lookup`` for members and strangers.
+
+Usage (from backend/):
+    python -m benchmarks.bench_fraud_rings --edges 50000000
+"""
+from __future__ import annotations
+
+import argparse
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+from app.services.fraud_graph import build_arrays
+from app.services.fraud_rings import DEFAULT_MAX_SHARED, FraudRings, find_rings
+from benchmarks.bench_fraud_graph import _latency, synthetic_edges
+
+
+def run(edges: int, seed: int, queries: int, max_shared: int) -> None:
+    rng = np.random.default_rng(seed)
+    n_users, user_keys, kind_codes, attr_keys, fraud = synthetic_edges(edges, rng)
+    start = time.perf_counter()
+    arrays = build_arrays(user_keys, kind_codes, attr_keys, fraud)
+    del user_keys, kind_codes, attr_keys
+    print(f"{'build graph arrays':<34} {time.perf_counter() - start:8.2f} s")
+
+    start = time.perf_counter()
+    ring_arrays, stats = find_rings(arrays, max_shared=max_shared)
+    print(
+        f"{'find rings':<34} {time.perf_counter() - start:8.2f} s  {stats['union_edges']:,} union edges, "
+        f"{stats['union_rounds']} rounds"
+    )
+    print(
+        f"rings: {stats['rings']:,} ({stats['rings_with_fraud']:,} with fraud), "
+        f"{stats['users_in_rings']:,} users, largest {stats['largest_ring']:,}"
+    )
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "fraud_rings.bin"
+        FraudRings(ring_arrays, stats).save(path)
+        start = time.perf_counter()
+        rings = FraudRings.load(path)
+        print(f"{'load (memory-mapped)':<34} {(time.perf_counter() - start) * 1000:8.2f} ms  {path.stat().st_size / 2**20:,.0f} MB")
+
+        samples = rng.integers(0, n_users, queries).tolist()
+        _latency("lookup, known user", lambda i: rings.lookup(f"user{i}", None, None, None), samples)
+        _latency("lookup, new applicant", lambda i: rings.lookup(f"new{i}", f"device{i}", f"ip{i}", f"phone{i}"), samples)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--edges", type=int, default=5_000_000)
+    parser.add_argument("--queries", type=int, default=20_000)
+    parser.add_argument("--max-shared", type=int, default=DEFAULT_MAX_SHARED)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+    run(args.edges, args.seed, args.queries, args.max_shared)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""Latency and byte savings of upload image normalisation on synthetic phone photos.
+
+Usage (from backend/):
+    python -m benchmarks.bench_image_pipeline --images 10 --width 4032 --height 3024
+"""
+from __future__ import annotations
+
+import argparse
+import shutil
+import statistics
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+from app.services.image_service import normalize_image
+
+
+def make_photo(path: Path, width: int, height: int, seed: int) -> None:
+    """Noisy gradient saved at phone-camera quality with an EXIF orientation tag."""
+    from PIL import Image
+
+    rng = np.random.default_rng(seed)
+    x = np.linspace(0, 255, width, dtype=np.float32)
+    y = np.linspace(0, 255, height, dtype=np.float32)[:, None]
+    base = np.stack([np.broadcast_to(x, (height, width)), np.broadcast_to(y, (height, width)), (x + y) % 256], axis=-1)
+    noise = rng.normal(0, 18, size=(height, width, 3)).astype(np.float32)
+    pixels = np.clip(base + noise, 0, 255).astype(np.uint8)
+    img = Image.fromarray(pixels, "RGB")
+    exif = img.getexif()
+    exif[0x0112] = 6  # Orientation: rotate 90 CW
+    exif[0x010F] = "SyntheticPhone"
+    img.save(path, format="JPEG", quality=95, exif=exif.tobytes())
+
+
+def run(images: int, width: int, height: int) -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp_dir = Path(tmp)
+        templates = []
+        for i in range(min(images, 3)):
+            template = tmp_dir / f"template_{i}.jpg"
+            make_photo(template, width, height, seed=i)
+            templates.append(template)
+
+        latencies, before, after, previews = [], 0, 0, 0
+        for i in range(images):
+            src = tmp_dir / f"upload_{i}.jpg"
+            shutil.copyfile(templates[i % len(templates)], src)
+            before += src.stat().st_size
+            start = time.perf_counter()
+            meta = normalize_image(str(src))
+            latencies.append((time.perf_counter() - start) * 1000)
+            after += meta["size_bytes"]
+            previews += meta["preview_size_bytes"]
+
+    latencies.sort()
+    print(f"images:        {images} @ {width}x{height}")
+    print(f"latency:       p50 {statistics.median(latencies):.1f} ms  max {latencies[-1]:.1f} ms")
+    print(f"stored bytes:  {before / 1e6:.2f} MB -> {after / 1e6:.2f} MB ({after / before:.1%})")
+    print(f"preview bytes: {previews / images / 1e3:.1f} KB per image")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--images", type=int, default=10)
+    parser.add_argument("--width", type=int, default=4032)
+    parser.add_argument("--height", type=int, default=3024)
+    args = parser.parse_args()
+    run(args.images, args.width, args.height)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""Per-application latency of the compiled underwriting policy and counter-offer search.
+
+Usage (from backend/):
+    python -m benchmarks.bench_policy_engine --applications 200000
+"""
+from __future__ import annotations
+
+import argparse
+import random
+import time
+
+from app.services.counter_offer import find_counter_offer
+from app.services.policy_engine import DEFAULT_POLICY_FILE, compile_policy, load_policy_spec
+
+
+def _facts(rng: random.Random) -> dict:
+    income = rng.uniform(20_000, 250_000)
+    limit = rng.choice([0, 100_000, 300_000, 500_000, 1_000_000])
+    amount = rng.uniform(50_000, 2_000_000)
+    emi = amount / rng.randint(6, 84) * 1.1
+    return {
+        "credit_score": rng.randint(550, 900),
+        "preapproved_limit": float(limit),
+        "requested_amount": amount,
+        "monthly_income": income,
+        "emi": emi,
+        "emi_ratio": emi / income,
+        "existing_emis": 0.0,
+        "tenure_months": 36,
+        "documents_verified": rng.random() < 0.5,
+    }
+
+
+def run(applications: int, seed: int) -> None:
+    t0 = time.perf_counter()
+    policy = compile_policy(load_policy_spec(DEFAULT_POLICY_FILE))
+    compile_ms = (time.perf_counter() - t0) * 1000
+
+    rng = random.Random(seed)
+    corpus = [_facts(rng) for _ in range(applications)]
+    counts: dict = {}
+    evaluate = policy.evaluate
+    start = time.perf_counter()
+    for facts in corpus:
+        rule = evaluate(facts)
+        counts[rule.id] = counts.get(rule.id, 0) + 1
+    elapsed = time.perf_counter() - start
+
+    print(f"policy {policy.version}: compiled {len(policy.rules)} rules in {compile_ms:.2f} ms")
+    print(f"{applications} applications in {elapsed * 1000:.1f} ms -> {elapsed / applications * 1e6:.3f} µs/application")
+    for rule_id, count in sorted(counts.items(), key=lambda item: -item[1]):
+        print(f"  {rule_id:<32} {count:>8}")
+
+    rejected = [f for f in corpus[:2000] if policy.evaluate(f).decision == "reject"]
+    samples = []
+    offers = 0
+    for facts in rejected:
+        start = time.perf_counter()
+        offers += find_counter_offer(facts, policy) is not None
+        samples.append(time.perf_counter() - start)
+    samples.sort()
+    if samples:
+        print(
+            f"counter-offer search over {len(rejected)} rejections ({offers} offers): "
+            f"p50 {samples[len(samples) // 2] * 1e3:.3f} ms, p99 {samples[int(len(samples) * 0.99)] * 1e3:.3f} ms"
+        )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--applications", type=int, default=200_000)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+    run(args.applications, args.seed)
+
+
+if __name__ == "__main__":
+    main()
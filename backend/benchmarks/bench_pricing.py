@@ -0,0 +1,59 @@
+"""Rate lookups against the precomputed pricing grid, and the cost of rebuilding it.
+
+Usage (from backend/):
+    python -m benchmarks.bench_pricing --lookups 200000
+"""
+from __future__ import annotations
+
+import argparse
+import time
+
+import numpy as np
+
+from app.services.pricing_service import (
+    EMPLOYER_TIERS,
+    PURPOSES,
+    RATE_CARD_FILE,
+    build_rate_grid,
+    get_pricing_grid,
+    load_rate_card,
+)
+
+
+def run(lookups: int, seed: int) -> None:
+    start = time.perf_counter()
+    grid = get_pricing_grid()
+    print(f"{'grid load (build or mmap)':<40} {(time.perf_counter() - start) * 1000:8.2f} ms  shape={grid.grid.shape}")
+
+    rng = np.random.default_rng(seed)
+    scores = rng.integers(300, 901, lookups)
+    tiers = rng.choice(EMPLOYER_TIERS, lookups).tolist()
+    purposes = rng.choice(PURPOSES, lookups).tolist()
+    flags = [("high_dti",) if i % 3 == 0 else () for i in range(lookups)]
+
+    start = time.perf_counter()
+    for score, tier, purpose, risk in zip(scores.tolist(), tiers, purposes, flags):
+        grid.rate(score, tier, purpose, risk)
+    scalar_s = time.perf_counter() - start
+    print(f"{'scalar rate()':<40} {scalar_s / lookups * 1e9:8.0f} ns/lookup")
+
+    start = time.perf_counter()
+    grid.rates(scores, tiers, purposes)
+    vector_s = time.perf_counter() - start
+    print(f"{'vectorised rates()':<40} {vector_s / lookups * 1e9:8.0f} ns/lookup")
+
+    start = time.perf_counter()
+    build_rate_grid(load_rate_card(RATE_CARD_FILE))
+    print(f"{'full grid rebuild from card':<40} {(time.perf_counter() - start) * 1000:8.2f} ms")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--lookups", type=int, default=200_000)
+    parser.add_argument("--seed", type=int, default=11)
+    args = parser.parse_args()
+    run(args.lookups, args.seed)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+"""Loan purpose classification: the old keyword loop vs the compiled taxonomy.
+
+Reports classifications per second for the legacy ``analyze_purpose`` body,
+the taxonomy with every purpose unseen (automaton pass each time) and with
+repeats served from its memo, plus how many labelled purposes each gets right.
+
+Usage (from backend/):
+    python -m benchmarks.bench_purpose_taxonomy --lookups 200000
+"""
+from __future__ import annotations
+
+import argparse
+import random
+import time
+from typing import Dict, List, Tuple
+
+from app.services.purpose_taxonomy import get_purpose_taxonomy, normalize_purpose
+
+# (purpose as customers type it, category it should land in)
+LABELLED: List[Tuple[str, str]] = [
+    ("hospital bills", "medical"),
+    ("Medical emergency", "medical"),
+    ("my father's surgery", "medical"),
+    ("ilaj ke liye", "medical"),
+    ("shaadi", "wedding"),
+    ("sister's wedding", "wedding"),
+    ("marriage expenses", "wedding"),
+    ("renovating my flat", "home_renovation"),
+    ("home renovation", "home_renovation"),
+    ("new modular kitchen", "home_renovation"),
+    ("paying off credit cards", "debt_consolidation"),
+    ("debt consolidation", "debt_consolidation"),
+    ("close my other loans", "debt_consolidation"),
+    ("college fees", "education"),
+    ("MBA abroad", "education"),
+    ("education", "education"),
+    ("expand my shop", "business"),
+    ("business", "business"),
+    ("working capital for my startup", "business"),
+    ("holiday in Goa", "other"),
+    ("buying a bike", "other"),
+]
+
+# Legacy categories: the old loop knew these six keywords and nothing else.
+LEGACY_CATEGORIES: Dict[str, Dict[str, object]] = {
+    "debt_consolidation": {"risk": "low", "urgency": "high", "typical_tenure": 36},
+    "medical": {"risk": "medium", "urgency": "critical", "typical_tenure": 12},
+    "wedding": {"risk": "medium", "urgency": "high", "typical_tenure": 24},
+    "education": {"risk": "low", "urgency": "medium", "typical_tenure": 60},
+    "business": {"risk": "high", "urgency": "medium", "typical_tenure": 48},
+    "home_renovation": {"risk": "low", "urgency": "low", "typical_tenure": 84},
+}
+
+
+def legacy_classify(purpose: str) -> str:
+    """Verbatim logic of the old analyze_purpose, minus the JSON encoding."""
+    purpose_lower = purpose.lower()
+    categories = dict(LEGACY_CATEGORIES)  # the old body rebuilt this dict on every call
+    for keyword in categories:
+        if keyword.replace("_", " ") in purpose_lower or keyword in purpose_lower:
+            return keyword
+    return "other"
+
+
+def _rate(label: str, lookups: int, seconds: float) -> None:
+    print(f"{label:<38} {lookups / seconds:>12,.0f} /s  {seconds / lookups * 1e6:6.2f} µs each")
+
+
+def run(lookups: int, seed: int) -> None:
+    start = time.perf_counter()
+    get_purpose_taxonomy.cache_clear()
+    taxonomy = get_purpose_taxonomy()
+    print(
+        f"{'compile taxonomy ' + taxonomy.version:<38} {(time.perf_counter() - start) * 1000:9.2f} ms  "
+        f"{taxonomy.phrase_count} phrases, {len(taxonomy._best)} states"
+    )
+
+    rng = random.Random(seed)
+    purposes = [rng.choice(LABELLED)[0] for _ in range(lookups)]
+    # Distinct strings with the same wording, so the memo never hits.
+    unseen = [f"{purpose} {i}" for i, purpose in enumerate(purposes)]
+
+    start = time.perf_counter()
+    for purpose in purposes:
+        legacy_classify(purpose)
+    _rate("legacy keyword loop", lookups, time.perf_counter() - start)
+
+    match = taxonomy._match
+    normalized = [normalize_purpose(purpose) for purpose in unseen]
+    start = time.perf_counter()
+    for purpose in normalized:
+        match(purpose)
+    _rate("taxonomy, automaton pass only", lookups, time.perf_counter() - start)
+
+    start = time.perf_counter()
+    for purpose in unseen:
+        taxonomy.classify(purpose)
+    _rate("taxonomy, unseen purposes", lookups, time.perf_counter() - start)
+
+    start = time.perf_counter()
+    for purpose in purposes:
+        taxonomy.classify(purpose)
+    _rate("taxonomy, repeated purposes (memo)", lookups, time.perf_counter() - start)
+
+    for label, classify in (("legacy", legacy_classify), ("taxonomy", lambda p: taxonomy.classify(p).category)):
+        correct = sum(classify(text) == expected for text, expected in LABELLED)
+        print(f"{label:<9} categorised {correct}/{len(LABELLED)} labelled purposes correctly")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--lookups", type=int, default=200_000)
+    parser.add_argument("--seed", type=int, default=13)
+    args = parser.parse_args()
+    run(args.lookups, args.seed)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+"""Load test for GET /quote: requests per second and latency percentiles.
+
+By default requests are fed straight into the ASGI app in-process, which
+measures what one worker can serve without client or socket overhead.
+Pass --url to load a running server over HTTP instead (start it with
+QUOTE_RATE_LIMIT_MAX_REQUESTS raised, or the per-IP limit will trip).
+
+Usage (from backend/):
+    python -m benchmarks.bench_quote --requests 20000 --concurrency 64
+    python -m benchmarks.bench_quote --url http://127.0.0.1:8000 --requests 20000
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import random
+import time
+from typing import Any, Dict, List, Optional
+from urllib.parse import urlencode
+
+import httpx
+
+from app.services.offer_mart_service import get_offer_mart
+
+
+class _AsgiClient:
+    """Minimal in-process GET against the ASGI app: returns the status code."""
+
+    def __init__(self, app: Any) -> None:
+        self.app = app
+
+    async def get(self, path: str, params: Dict[str, Any]) -> int:
+        scope = {
+            "type": "http",
+            "asgi": {"version": "3.0"},
+            "http_version": "1.1",
+            "method": "GET",
+            "scheme": "http",
+            "path": path,
+            "raw_path": path.encode(),
+            "query_string": urlencode(params).encode(),
+            "root_path": "",
+            "headers": [(b"host", b"bench")],
+            "client": ("127.0.0.1", 50000),
+            "server": ("bench", 80),
+        }
+        pending = [{"type": "http.request", "body": b"", "more_body": False}]
+        status = 0
+
+        async def receive() -> Dict[str, Any]:
+            if pending:
+                return pending.pop()
+            await asyncio.Event().wait()  # no disconnect while the response is sent
+            return {"type": "http.disconnect"}
+
+        async def send(message: Dict[str, Any]) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+
+        await self.app(scope, receive, send)
+        return status
+
+
+async def _worker(client: Any, queue: "asyncio.Queue[dict]", latencies: List[float], errors: List[int]) -> None:
+    while True:
+        try:
+            params = queue.get_nowait()
+        except asyncio.QueueEmpty:
+            return
+        start = time.perf_counter()
+        response = await client.get("/quote", params=params)
+        latencies.append(time.perf_counter() - start)
+        status = response if isinstance(response, int) else response.status_code
+        if status != 200:
+            errors.append(status)
+
+
+async def run(requests: int, concurrency: int, url: Optional[str], seed: int) -> None:
+    rng = random.Random(seed)
+    offers = get_offer_mart()
+    queue: "asyncio.Queue[dict]" = asyncio.Queue()
+    for _ in range(requests):
+        offer = rng.choice(offers)
+        key = {"pan": offer["pan"]} if rng.random() < 0.5 else {"phone": offer["phone"]}
+        # Landing pages offer a handful of amount/tenure presets, so quotes repeat.
+        queue.put_nowait({**key, "amount": rng.choice([100000, 200000, 300000, 500000, 800000]), "tenure_months": rng.choice([12, 24, 36, 48, 60])})
+
+    latencies: List[float] = []
+    errors: List[int] = []
+    if url:
+        async with httpx.AsyncClient(base_url=url, limits=httpx.Limits(max_connections=concurrency)) as client:
+            start = time.perf_counter()
+            await asyncio.gather(*(_worker(client, queue, latencies, errors) for _ in range(concurrency)))
+            elapsed = time.perf_counter() - start
+    else:
+        from app.main import app
+        from app.settings import settings
+
+        settings.quote_rate_limit_max_requests = requests + 1
+        client = _AsgiClient(app)
+        start = time.perf_counter()
+        await asyncio.gather(*(_worker(client, queue, latencies, errors) for _ in range(concurrency)))
+        elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    pct = lambda p: latencies[min(len(latencies) - 1, int(p / 100 * len(latencies)))] * 1000  # noqa: E731
+    print(f"{requests} requests, concurrency {concurrency}, {'in-process' if not url else url}")
+    print(f"  throughput  {requests / elapsed:10.0f} req/s")
+    print(f"  latency     p50 {pct(50):.2f} ms | p99 {pct(99):.2f} ms")
+    print(f"  non-200     {len(errors)}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=20000)
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--url", default=None)
+    parser.add_argument("--seed", type=int, default=5)
+    args = parser.parse_args()
+    asyncio.run(run(args.requests, args.concurrency, args.url, args.seed))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+"""Throughput of salary-slip field extraction over a synthetic corpus.
+
+Usage (from backend/):
+    python -m benchmarks.bench_salary_slip --slips 5000
+"""
+from __future__ import annotations
+
+import argparse
+import random
+import time
+from typing import Dict, List, Tuple
+
+from app.services.salary_slip_service import extract_salary_slip_fields
+
+EMPLOYERS = [
+    "Infosys Limited",
+    "Tata Consultancy Services",
+    "Zeta Fintech Pvt Ltd",
+    "Acme Logistics Private Limited",
+    "Nimbus Technologies",
+]
+MONTHS = ["January", "Feb", "March", "Apr", "May", "June", "Jul", "August", "Sept", "Oct", "November", "Dec"]
+
+
+def _fmt_inr(value: float) -> str:
+    return f"{value:,.2f}"
+
+
+def synthetic_slip(rng: random.Random) -> Tuple[str, Dict[str, object]]:
+    """Build one slip in one of three layouts, returning (text, expected fields)."""
+    employer = rng.choice(EMPLOYERS)
+    month_idx = rng.randrange(12)
+    year = rng.choice([2024, 2025, 2026])
+    gross = float(rng.randrange(25_000, 300_000, 500))
+    net = round(gross * rng.uniform(0.72, 0.9), 2)
+    layout = rng.randrange(3)
+    if layout == 0:
+        text = "\n".join(
+            [
+                employer,
+                f"Payslip for {MONTHS[month_idx]} {year}",
+                "Employee: A. Sharma    Days Paid: 30",
+                f"Basic            {_fmt_inr(gross * 0.5)}",
+                f"Gross Earnings   {_fmt_inr(gross)}",
+                f"Total Deductions {_fmt_inr(gross - net)}",
+                f"Net Pay          Rs. {_fmt_inr(net)}",
+            ]
+        )
+    elif layout == 1:
+        text = "\n".join(
+            [
+                f"Employer Name: {employer}",
+                f"Pay Period: {month_idx + 1:02d}/{year}",
+                "Gross Salary",
+                _fmt_inr(gross),
+                "Net Salary Payable",
+                f"INR {_fmt_inr(net)}",
+            ]
+        )
+    else:
+        text = "\n".join(
+            [
+                "SALARY SLIP",
+                f"Company: {employer}",
+                f"Salary for the month of {MONTHS[month_idx]}, {year}",
+                f"Total Earnings: ₹{int(gross)}",
+                f"Take Home: ₹{net}",
+            ]
+        )
+    expected = {
+        "net_pay": net,
+        "gross_pay": gross,
+        "employer_name": employer,
+        "pay_period": f"{year:04d}-{month_idx + 1:02d}",
+    }
+    return text, expected
+
+
+def run(slips: int, seed: int) -> None:
+    rng = random.Random(seed)
+    corpus: List[Tuple[str, Dict[str, object]]] = [synthetic_slip(rng) for _ in range(slips)]
+
+    start = time.perf_counter()
+    results = [extract_salary_slip_fields(text) for text, _ in corpus]
+    elapsed = time.perf_counter() - start
+
+    correct = {key: 0 for key in ("net_pay", "gross_pay", "employer_name", "pay_period")}
+    for result, (_, expected) in zip(results, corpus):
+        for key in correct:
+            if result[key] == expected[key]:
+                correct[key] += 1
+
+    print(f"slips:      {slips}")
+    print(f"elapsed:    {elapsed * 1000:.1f} ms")
+    print(f"throughput: {slips / elapsed:,.0f} slips/s ({elapsed / slips * 1e6:.1f} us/slip)")
+    for key, hits in correct.items():
+        print(f"accuracy[{key}]: {hits / slips:.1%}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--slips", type=int, default=5000)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+    run(args.slips, args.seed)
+
+
+if __name__ == "__main__":
+    main()
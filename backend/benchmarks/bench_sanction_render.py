@@ -0,0 +1,56 @@
+"""p50/p99 sanction-letter render latency for each renderer backend.
+
+Usage (from backend/):
+    python -m benchmarks.bench_sanction_render --iterations 500
+"""
+from __future__ import annotations
+
+import argparse
+import tempfile
+import time
+from pathlib import Path
+from typing import List
+
+from app.models.state import LoanApplicationDetails
+from app.services.sanction_renderer import BACKENDS, SanctionLetterRenderer
+from app.services.sanction_service import generate_sanction_letter_data
+
+
+def _percentile(samples: List[float], pct: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+def run(iterations: int) -> None:
+    loan = LoanApplicationDetails(customer_name="Aarav Mehta", requested_amount=450000, tenure_months=36)
+    with tempfile.TemporaryDirectory() as tmp:
+        for backend in BACKENDS:
+            renderer = SanctionLetterRenderer(backend=backend, workers=1)
+            t0 = time.perf_counter()
+            renderer.start()
+            startup_ms = (time.perf_counter() - t0) * 1000
+            samples: List[float] = []
+            produced_by = set()
+            for i in range(iterations):
+                data = generate_sanction_letter_data(loan)
+                start = time.perf_counter()
+                result = renderer.render_to_file(data, Path(tmp) / f"{backend}_{i}.pdf")
+                samples.append((time.perf_counter() - start) * 1000)
+                produced_by.add(result["renderer"])
+            renderer.shutdown()
+            note = "" if produced_by == {backend} else f"  (fell back to: {', '.join(sorted(produced_by))})"
+            print(
+                f"{backend:<10} startup {startup_ms:8.1f} ms | p50 {_percentile(samples, 50):7.3f} ms"
+                f" | p99 {_percentile(samples, 99):7.3f} ms{note}"
+            )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--iterations", type=int, default=500)
+    args = parser.parse_args()
+    run(args.iterations)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""Velocity checks: per-verification latency and memory, in process and on the shared SQLite store.
+
+Each check counts one device, IP, mobile and PAN against the default rules,
+drawn from a population where a few IPs carry bursts. Reports p50/p99
+latency, how many checks were flagged and how many keys the in-process
+rings (or SQLite rows) hold once idle ones are evicted.
+
+Usage (from backend/):
+    python -m benchmarks.bench_velocity --checks 200000
+"""
+from __future__ import annotations
+
+import argparse
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+from app.services.velocity import DEFAULT_RULES, VelocityEngine
+from benchmarks.bench_fraud_graph import _latency
+
+
+class Clock:
+    def __init__(self) -> None:
+        self.now = time.time()
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def run(checks: int, seed: int, per_second: float, max_keys: int) -> None:
+    rng = np.random.default_rng(seed)
+    people = max(1, checks)
+    person = rng.integers(0, people, checks)
+    # 2% of traffic comes from five busy IPs, the rest from a large pool.
+    ip = np.where(rng.random(checks) < 0.02, rng.integers(0, 5, checks), rng.integers(5, 10 * people, checks))
+    samples = [
+        (f"dev{p}", f"10.{i >> 16 & 255}.{i >> 8 & 255}.{i & 255}", f"9{p:09d}", f"PAN{p:07d}")
+        for p, i in zip(person.tolist(), ip.tolist())
+    ]
+
+    for label, sqlite in (("in process", False), ("sqlite (shared)", True)):
+        clock = Clock()
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "velocity.sqlite" if sqlite else None
+            engine = VelocityEngine(DEFAULT_RULES, "bench", path, max_keys=max_keys, clock=clock)
+            flagged = 0
+
+            def check(i: int) -> None:
+                nonlocal flagged
+                clock.now += 1.0 / per_second
+                flagged += bool(engine.check(*samples[i])["flags"])
+
+            start = time.perf_counter()
+            _latency(f"check, {label}", check, list(range(checks)))
+            elapsed = time.perf_counter() - start
+            stats = engine.stats()
+            held = f"{stats['sqlite_rows']:,} rows" if sqlite else f"{stats['memory_keys']:,} keys ({stats['evicted']:,} evicted)"
+            print(f"  {checks / elapsed:,.0f} checks/s, {flagged:,} flagged, {held}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--checks", type=int, default=100_000)
+    parser.add_argument("--per-second", type=float, default=20.0, help="Simulated verification rate")
+    parser.add_argument("--max-keys", type=int, default=100_000)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+    run(args.checks, args.seed, args.per_second, args.max_keys)
+
+
+if __name__ == "__main__":
+    main()
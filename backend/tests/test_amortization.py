@@ -0,0 +1,74 @@
+from __future__ import annotations
+
+import asyncio
+import json
+
+import numpy as np
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.services.amortization import Prepayment, RateChange, amortize, build_schedule, schedule_grid
+from app.services.emi import calculate_emi
+from app.services.tools import calculate_emi as calculate_emi_tool
+
+
+def test_schedule_reconciles_and_matches_emi():
+    schedule = build_schedule(500000, 12, 60)
+    assert schedule.months == 60
+    assert np.allclose(schedule.emi, calculate_emi(500000, 12, 60))
+    assert abs(schedule.principal.sum() - 500000) < 1e-6
+    assert schedule.closing_balance[-1] == 0
+
+    grid = schedule_grid(500000, [12, 60, 84], [0, 12])
+    assert grid["emi"].shape == (2, 3)
+    assert abs(grid["emi"][1, 1] - calculate_emi(500000, 12, 60)) < 1e-6
+    assert grid["total_interest"][0].tolist() == [0, 0, 0]
+    assert abs(amortize(500000, 12, 60)["total_interest"] - schedule.total_interest) < 1e-6
+
+
+def test_what_ifs():
+    base = build_schedule(500000, 12, 60)
+    shorter = build_schedule(500000, 12, 60, prepayments=[Prepayment(12, 100000)])
+    lower_emi = build_schedule(500000, 12, 60, prepayments=[Prepayment(12, 100000, "emi")])
+    assert shorter.months < 60 and shorter.total_interest < lower_emi.total_interest < base.total_interest
+    assert lower_emi.months == 60 and lower_emi.emi[12] < base.emi[12]
+    for s in (shorter, lower_emi):
+        assert abs(s.principal.sum() + s.prepayment.sum() - 500000) < 1e-6
+
+    repriced = build_schedule(500000, 12, 60, rate_changes=[RateChange(25, 9)])
+    assert repriced.months == 60 and repriced.annual_rate_percent[24] == 9 and repriced.emi[24] < base.emi[24]
+
+    closed = build_schedule(500000, 12, 60, foreclose_month=24, foreclosure_charge_percent=2)
+    assert closed.months == 24 and closed.closing_balance[-1] == 0
+    assert abs(closed.foreclosure_charge - closed.prepayment[-1] * 0.02) < 1e-6
+
+
+def test_tool_emi_handles_zero_rate_and_endpoint():
+    result = json.loads(asyncio.run(calculate_emi_tool.ainvoke({"principal": 120000, "tenure_months": 12, "interest_rate": 0})))
+    assert result["emi"] == 10000.0 and result["total_interest"] == 0.0
+
+    client = TestClient(app)
+    response = client.post(
+        "/loan/schedule",
+        json={
+            "principal": 300000,
+            "tenure_months": 24,
+            "prepayments": [{"month": 6, "amount": 50000}],
+            "grid_tenures": [12, 24],
+            "grid_rates": [10, 12.5],
+        },
+    )
+    assert response.status_code == 200
+    body = response.json()
+    assert body["interest_saved"] > 0
+    assert body["schedule"][5]["prepayment"] == 50000
+    assert len(body["grid"]["emi"]) == 2 and len(body["grid"]["emi"][0]) == 2
+    assert client.post("/loan/schedule", json={"principal": 1000, "tenure_months": 200}).status_code == 422
+    for events in (
+        {"prepayments": [{"month": 24, "amount": 50000}]},
+        {"rate_changes": [{"month": 30, "annual_rate_percent": 9}]},
+        {"foreclose_month": 36},
+    ):
+        response = client.post("/loan/schedule", json={"principal": 300000, "tenure_months": 24, **events})
+        assert response.status_code == 400, events
+        assert "between 1 and" in response.json()["detail"]
@@ -0,0 +1,76 @@
+from __future__ import annotations
+
+import pytest
+from fastapi.testclient import TestClient
+from langgraph.checkpoint.memory import MemorySaver
+
+import app.graph.nodes as graph_nodes
+import app.main as main
+import app.services.sanction_service as sanction_service
+from app.graph.workflow import create_agentic_workflow
+
+APPLICATION = {
+    "customer_name": "Aarav Mehta",
+    "mobile": "98765 01001",
+    "email": "aarav@example.com",
+    "pan": "abcde1234f",
+    "aadhaar": "1234 5678 9012",
+    "requested_amount": 300000,
+    "tenure_months": 24,
+    "loan_purpose": "medical bills",
+    "employment_type": "salaried",
+    "monthly_income": 80000,
+    "otp_verified": True,
+    "kyc_consent": True,
+}
+
+
+@pytest.fixture()
+def client(tmp_path, monkeypatch):
+    def no_llm():
+        raise AssertionError("structured intake must not call the LLM")
+
+    monkeypatch.setattr(graph_nodes, "get_llm_service", no_llm)
+    monkeypatch.setattr(sanction_service, "SANCTIONS_DIR", tmp_path)
+    saver = MemorySaver()
+    monkeypatch.setattr(main, "checkpointer", saver)
+    monkeypatch.setattr(main, "graph", create_agentic_workflow(checkpointer=saver))
+    monkeypatch.setattr(main.settings, "partner_api_token", "partner-secret")
+    return TestClient(main.app, headers={"x-partner-token": "partner-secret"})
+
+
+def test_intake_decides_in_one_call_and_persists_thread(client):
+    approved = client.post("/applications", json={**APPLICATION, "thread_id": "partner_1"})
+    assert approved.status_code == 200
+    body = approved.json()
+    assert body["status"] == "approved" and body["underwriting_rule"].endswith(":within_preapproved_limit")
+    assert body["loan_data"]["pan"] == "ABCDE1234F" and body["loan_data"]["preapproved_limit"] == 400000
+    assert body["sanction_letter"]["url"].startswith("/sanction/")
+
+    state = client.get("/state/partner_1").json()
+    assert state["status"] == "approved" and state["dialogue_stage"] == "closure"
+    assert state["loan_data"]["calculated_emi"] == body["loan_data"]["calculated_emi"]
+    assert client.post("/applications", json={**APPLICATION, "thread_id": "partner_1"}).status_code == 409
+
+    pending = client.post("/applications", json={**APPLICATION, "requested_amount": 700000}).json()
+    assert pending["status"] == "awaiting_documents"
+    assert pending["requires_action"]["type"] == "document_upload"
+    assert client.get(f"/state/{pending['thread_id']}").json()["status"] == "awaiting_documents"
+
+
+def test_intake_rejects_incomplete_or_unconsented_payloads(client):
+    assert client.post("/applications", json={**APPLICATION, "kyc_consent": False}).status_code == 422
+    assert client.post("/applications", json={**APPLICATION, "pan": "ABC123"}).status_code == 422
+    incomplete = {k: v for k, v in APPLICATION.items() if k != "monthly_income"}
+    assert client.post("/applications", json=incomplete).status_code == 422
+    # Server-derived fields cannot be injected by the partner.
+    forged = client.post("/applications", json={**APPLICATION, "preapproved_limit": 5_000_000, "credit_score": 900})
+    assert forged.json()["loan_data"]["preapproved_limit"] == 400000
+
+
+def test_intake_requires_the_partner_token(client, monkeypatch):
+    assert client.post("/applications", json=APPLICATION, headers={"x-partner-token": "wrong"}).status_code == 403
+    assert TestClient(main.app).post("/applications", json=APPLICATION).status_code == 403
+    # No configured token means the endpoint is closed, not open.
+    monkeypatch.setattr(main.settings, "partner_api_token", None)
+    assert client.post("/applications", json=APPLICATION).status_code == 403
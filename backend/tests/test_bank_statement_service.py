@@ -0,0 +1,42 @@
+from __future__ import annotations
+
+from app.services.bank_statement_service import analyze_bank_statement
+
+
+def _write_statement(tmp_path, rows):
+    path = tmp_path / "statement.csv"
+    header = "Account No,XXXX1234\nDate,Narration,Withdrawal,Deposit,Balance\n"
+    path.write_text(header + "\n".join(rows), encoding="utf-8")
+    return str(path)
+
+
+def test_detects_recurring_emi_salary_and_bounces(tmp_path):
+    rows = []
+    balance = 50000.0
+    for month in range(1, 5):
+        balance += 80000
+        rows.append(f"01/{month:02d}/2025,NEFT SALARY ACME {month}1234,,80000,{balance}")
+        balance -= 9500
+        rows.append(f"05/{month:02d}/2025,NACH DR HDFC LOAN EMI REF{month}99,9500,,{balance}")
+        balance -= 1200
+        rows.append(f"12/{month:02d}/2025,UPI/88{month}/GROCERY,1200,,{balance}")
+    rows.append(f"20/04/2025,ACH RETURN INSUFFICIENT FUNDS,500,,{balance - 500}")
+
+    result = analyze_bank_statement(_write_statement(tmp_path, rows), "text/csv")
+
+    assert result["parsed"] is True
+    assert result["months_covered"] == 4
+    assert result["salary_credit_count"] == 4
+    assert result["average_monthly_salary"] == 80000.0
+    assert result["existing_emis"] == 9500.0
+    assert result["bounce_count"] == 1
+    assert result["average_monthly_balance"] > 0
+
+
+def test_closed_loan_is_not_counted(tmp_path):
+    rows = [f"05/{month:02d}/2025,NACH DR OLD FINANCE LOAN,4000,,{100000 - month * 4000}" for month in range(1, 4)]
+    rows += [f"10/{month:02d}/2025,UPI/1/COFFEE,200,,50000" for month in range(4, 8)]
+
+    result = analyze_bank_statement(_write_statement(tmp_path, rows), "text/csv")
+
+    assert result["existing_emis"] == 0.0
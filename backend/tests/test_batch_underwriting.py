@@ -0,0 +1,100 @@
+from __future__ import annotations
+
+import asyncio
+import io
+import json
+
+import numpy as np
+import pytest
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.models.state import LoanApplicationDetails
+from app.services.batch_underwriting import iter_csv_chunks, stream_underwriting, underwrite_chunk
+from app.services.emi import calculate_emi, calculate_emi_array
+from app.services.policy_engine import get_policy_engine, underwriting_facts
+from app.services.pricing_service import get_pricing_grid
+from app.services.tools import check_affordability
+
+CSV = """application_id,credit_score,preapproved_limit,requested_amount,monthly_income,tenure_months,existing_emis,documents_verified
+a1,650,300000,200000,80000,24,0,false
+a2,760,300000,250000,80000,24,5000,false
+a3,760,300000,500000,80000,24,0,false
+a4,760,300000,500000,40000,12,0,true
+a5,760,300000,500000,80000,36,0,true
+a6,760,300000,900000,80000,36,0,true
+"""
+
+
+def test_batch_matches_scalar_policy_and_affordability():
+    policy = get_policy_engine().policy
+    chunks = list(iter_csv_chunks(io.StringIO(CSV), chunk_rows=4))
+    assert [len(c["application_id"]) for c in chunks] == [4, 2]
+
+    results = [underwrite_chunk(c, policy) for c in chunks]
+    rule_ids = [rid for r in results for rid in r["rule_id"].tolist()]
+    for row, rule_id, emi, foir, status in zip(
+        list(__import__("csv").DictReader(io.StringIO(CSV))),
+        rule_ids,
+        np.concatenate([r["emi"] for r in results]),
+        np.concatenate([r["foir_percentage"] for r in results]),
+        np.concatenate([r["affordability_status"] for r in results]),
+    ):
+        loan = LoanApplicationDetails(
+            credit_score=int(row["credit_score"]),
+            preapproved_limit=float(row["preapproved_limit"]),
+            requested_amount=float(row["requested_amount"]),
+            tenure_months=int(row["tenure_months"]),
+            existing_emis=float(row["existing_emis"]),
+        )
+        # No interest_rate column: rows are priced from the rate card, like the chat flow.
+        loan.interest_rate = get_pricing_grid().rate_for(loan)
+        loan.calculated_emi = round(calculate_emi(loan.requested_amount, loan.interest_rate, loan.tenure_months), 2)
+        income = float(row["monthly_income"])
+        facts = underwriting_facts(loan, monthly_income=income, documents_verified=row["documents_verified"] == "true")
+        assert policy.evaluate(facts).id == rule_id
+        assert emi == loan.calculated_emi
+        scalar = json.loads(
+            asyncio.run(
+                check_affordability.ainvoke(
+                    {"monthly_income": income, "existing_emis": loan.existing_emis, "proposed_emi": emi}
+                )
+            )
+        )
+        assert (round(foir, 2), status) == (scalar["foir_percentage"], scalar["status"])
+
+    override = policy.with_params({"min_credit_score": 600})
+    assert underwrite_chunk(chunks[0], override)["rule_id"][0] == "within_preapproved_limit"
+
+
+def test_csv_rows_are_numbered_by_input_position_and_ragged_rows_fail():
+    header = "credit_score,preapproved_limit,requested_amount,monthly_income,tenure_months\n"
+    good = "760,300000,250000,80000,24\n"
+    chunks = list(iter_csv_chunks(io.StringIO(header + good + "\n" + good + good), chunk_rows=2))
+    assert [c["application_id"].tolist() for c in chunks] == [["0", "1"], ["2"]]
+
+    ragged = io.StringIO(header + good + "760,300000\n" + good)
+    with pytest.raises(ValueError, match="line 3"):
+        list(iter_csv_chunks(ragged))
+
+
+def test_emi_array_handles_zero_rate_and_bad_inputs():
+    out = calculate_emi_array(np.array([120000.0, 0.0, 100000.0]), np.array([0.0, 12.5, 12.5]), np.array([12, 12, 24]))
+    assert out[0] == 10000.0 and out[1] == 0.0
+    assert abs(out[2] - calculate_emi(100000.0, 12.5, 24)) < 1e-9
+
+
+def test_batch_endpoint_streams_csv():
+    client = TestClient(app)
+    response = client.post(
+        "/underwriting/batch",
+        files={"file": ("batch.csv", CSV.encode(), "text/csv")},
+        data={"output_format": "jsonl"},
+    )
+    assert response.status_code == 200
+    rows = [json.loads(line) for line in response.text.splitlines()]
+    assert [r["decision"] for r in rows] == ["reject", "approve", "request_documents", "reject", "approve", "reject"]
+
+    bad = client.post("/underwriting/batch", files={"file": ("batch.csv", b"foo,bar\n1,2\n", "text/csv")})
+    assert bad.status_code == 400
+    assert "".join(stream_underwriting(iter([]), get_policy_engine().policy)) == ""
@@ -0,0 +1,105 @@
+from __future__ import annotations
+
+import asyncio
+import json
+
+import pytest
+
+import app.graph.nodes as graph_nodes
+import app.services.bulk_intake as bulk_intake
+import app.services.sanction_service as sanction_service
+from app.services.bulk_intake import BulkProcessor, progress_marker_path
+
+APPLICATION = {
+    "customer_name": "Aarav Mehta",
+    "mobile": "9876501001",
+    "email": "aarav@example.com",
+    "pan": "ABCDE1234F",
+    "aadhaar": "123456789012",
+    "requested_amount": 300000,
+    "tenure_months": 24,
+    "loan_purpose": "medical bills",
+    "employment_type": "salaried",
+    "monthly_income": 80000,
+    "otp_verified": True,
+    "kyc_consent": True,
+}
+
+
+@pytest.fixture()
+def applications(tmp_path, monkeypatch):
+    def no_llm():
+        raise AssertionError("bulk intake must not call the LLM")
+
+    monkeypatch.setattr(graph_nodes, "get_llm_service", no_llm)
+    monkeypatch.setattr(sanction_service, "SANCTIONS_DIR", tmp_path / "sanctions")
+    lines = []
+    for i in range(10):
+        record = {**APPLICATION, "requested_amount": 700000 if i % 3 == 0 else 300000}
+        if i == 4:
+            record["kyc_consent"] = False
+        lines.append(json.dumps(record))
+    lines.insert(6, "")
+    path = tmp_path / "applications.jsonl"
+    path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+    return path
+
+
+def _read(path):
+    return [json.loads(line) for line in path.read_text(encoding="utf-8").splitlines()]
+
+
+def test_bulk_run_writes_decisions_in_input_order(applications, tmp_path):
+    output = tmp_path / "decisions.jsonl"
+    report = asyncio.run(BulkProcessor(concurrency=4, marker_every=3).run(applications, output))
+
+    rows = _read(output)
+    assert [row["line"] for row in rows] == [1, 2, 3, 4, 5, 6, 8, 9, 10, 11]
+    assert rows[4]["status"] == "invalid" and rows[4]["errors"][0]["loc"] == ["kyc_consent"]
+    assert rows[0]["status"] == "awaiting_documents" and rows[1]["status"] == "approved"
+    assert rows[1]["sanction_reference"] and rows[1]["thread_id"] == "bulk_2"
+    assert report["records"] == 10 and report["outcomes"]["invalid"] == 1
+    assert report["stages"]["underwrite"]["count"] == 9
+    assert json.loads(progress_marker_path(output).read_text())["lines"] == 11
+
+
+def test_bulk_run_resumes_from_progress_marker(applications, tmp_path):
+    output = tmp_path / "decisions.jsonl"
+    asyncio.run(BulkProcessor(concurrency=4, marker_every=3).run(applications, output))
+    complete = output.read_text(encoding="utf-8")
+
+    # Crash after the second checkpoint (6 records): output holds a torn tail past the marker.
+    rows = complete.splitlines(keepends=True)
+    marker_path = progress_marker_path(output)
+    marker = json.loads(marker_path.read_text())
+    consumed = applications.read_text(encoding="utf-8").splitlines(keepends=True)[:6]
+    marker.update({"output_bytes": len("".join(rows[:6]).encode()), "lines": 6, "input_offset": len("".join(consumed).encode())})
+    marker_path.write_text(json.dumps(marker))
+    output.write_text("".join(rows[:7]) + '{"line": 9, "sta', encoding="utf-8")
+
+    report = asyncio.run(BulkProcessor(concurrency=4, marker_every=3).run(applications, output))
+    assert report["resumed_from_line"] == 6 and report["records"] == 4
+    assert [row["line"] for row in _read(output)] == [1, 2, 3, 4, 5, 6, 8, 9, 10, 11]
+    assert [row["status"] for row in _read(output)] == [json.loads(row)["status"] for row in rows]
+
+    report = asyncio.run(BulkProcessor().run(applications, output, resume=False))
+    assert report["resumed_from_line"] == 0 and len(_read(output)) == 10
+
+
+def test_bulk_run_records_a_failing_application_and_carries_on(applications, tmp_path, monkeypatch):
+    verify = bulk_intake.verify_structured_application
+
+    async def flaky_verify(state):
+        if state["thread_id"] == "bulk_3":
+            raise RuntimeError("kyc provider exploded")
+        return await verify(state)
+
+    monkeypatch.setattr(bulk_intake, "verify_structured_application", flaky_verify)
+    output = tmp_path / "decisions.jsonl"
+    report = asyncio.run(BulkProcessor(concurrency=4, marker_every=3).run(applications, output))
+
+    rows = _read(output)
+    assert len(rows) == 10 and rows[1]["status"] == "approved" and rows[3]["line"] == 4
+    assert rows[2] == {"line": 3, "status": "error", "error": "RuntimeError: kyc provider exploded"}
+    assert report["outcomes"]["error"] == 1
+    assert json.loads(progress_marker_path(output).read_text())["lines"] == 11
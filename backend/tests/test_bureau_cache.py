@@ -0,0 +1,58 @@
+from __future__ import annotations
+
+from app.services.bureau_cache import BureauCache, identity_key
+
+
+class Clock:
+    def __init__(self) -> None:
+        self.now = 1_000_000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def _fetcher(calls):
+    def fetch():
+        calls.append(1)
+        return {"credit_score": 700 + len(calls)}
+
+    return fetch
+
+
+def test_identity_key_is_salted_and_normalised():
+    assert identity_key("s", "abcde1234f", "1234 5678 9012") == identity_key("s", "ABCDE1234F", "123456789012")
+    assert identity_key("s", "ABCDE1234F", None) != identity_key("t", "ABCDE1234F", None)
+    assert "ABCDE1234F" not in identity_key("s", "ABCDE1234F", None)
+    assert identity_key("s", None, " ") is None
+
+
+def test_hits_until_ttl_then_refetches():
+    clock, calls = Clock(), []
+    cache = BureauCache(ttl_s=30 * 86400, salt="s", clock=clock)
+    assert cache.get_or_fetch("ABCDE1234F", None, _fetcher(calls)) == ({"credit_score": 701}, "bureau")
+    assert cache.get_or_fetch("ABCDE1234F", None, _fetcher(calls)) == ({"credit_score": 701}, "memory")
+    clock.now += 30 * 86400
+    assert cache.get_or_fetch("ABCDE1234F", None, _fetcher(calls)) == ({"credit_score": 702}, "bureau")
+    stats = cache.stats()
+    assert (stats["memory_hits"], stats["misses"], stats["expired"]) == (1, 2, 1)
+    assert stats["hit_rate"] == round(1 / 3, 4)
+
+
+def test_forced_refresh_bypasses_cache():
+    calls = []
+    cache = BureauCache(ttl_s=3600, salt="s")
+    cache.get_or_fetch("ABCDE1234F", None, _fetcher(calls))
+    result, source = cache.get_or_fetch("ABCDE1234F", None, _fetcher(calls), force_refresh=True)
+    assert (result["credit_score"], source) == (702, "bureau")
+    assert cache.get_or_fetch("ABCDE1234F", None, _fetcher(calls))[0]["credit_score"] == 702
+    assert cache.stats()["forced_refreshes"] == 1
+
+
+def test_sqlite_tier_is_shared_between_workers(tmp_path):
+    calls = []
+    first = BureauCache(ttl_s=3600, salt="s", sqlite_path=tmp_path / "bureau.sqlite3")
+    second = BureauCache(ttl_s=3600, salt="s", sqlite_path=tmp_path / "bureau.sqlite3")
+    first.get_or_fetch("ABCDE1234F", "123456789012", _fetcher(calls))
+    assert second.get_or_fetch("ABCDE1234F", "123456789012", _fetcher(calls)) == ({"credit_score": 701}, "sqlite")
+    assert second.get_or_fetch("ABCDE1234F", "123456789012", _fetcher(calls))[1] == "memory"
+    assert len(calls) == 1
@@ -0,0 +1,115 @@
+from __future__ import annotations
+
+import asyncio
+
+import httpx
+import pytest
+
+from app.cli.bureau_server import create_bureau_app
+from app.services.bureau_client import BureauClient, BureauError, BureauUnavailable, CircuitBreaker, InquiryBatcher
+from app.services.credit_bureau import fetch_credit_score
+
+
+def _client(app, **kwargs) -> BureauClient:
+    return BureauClient("http://bureau.test", transport=httpx.ASGITransport(app=app), backoff_s=0.001, **kwargs)
+
+
+def test_inquiry_round_trip_matches_bureau_model():
+    async def run():
+        client = _client(create_bureau_app())
+        try:
+            return await client.inquire("ABCDE1234F", "123456789012", 80000.0)
+        finally:
+            await client.aclose()
+
+    result = asyncio.run(run())
+    assert result["credit_score"] == fetch_credit_score("ABCDE1234F", "123456789012", 80000.0)
+    assert result["report_id"]
+
+
+def test_retries_transient_errors_with_backoff():
+    attempts = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        attempts.append(request.url.path)
+        if len(attempts) < 3:
+            return httpx.Response(503)
+        return httpx.Response(200, json={"credit_score": 760})
+
+    async def run():
+        client = BureauClient("http://bureau.test", transport=httpx.MockTransport(handler), retries=2, backoff_s=0.001)
+        try:
+            return await client.inquire("ABCDE1234F", None, None), client.stats
+        finally:
+            await client.aclose()
+
+    result, stats = asyncio.run(run())
+    assert result == {"credit_score": 760}
+    assert (len(attempts), stats["retries"]) == (3, 2)
+
+
+def test_circuit_opens_after_repeated_failures():
+    app = create_bureau_app(error_rate=1.0)
+
+    async def run():
+        client = _client(app, retries=1, breaker=CircuitBreaker(failure_threshold=2, reset_after_s=60))
+        try:
+            for _ in range(2):
+                with pytest.raises(BureauError):
+                    await client.inquire("ABCDE1234F", None, None)
+            with pytest.raises(BureauUnavailable):
+                await client.inquire("ABCDE1234F", None, None)
+            return client.stats
+        finally:
+            await client.aclose()
+
+    stats = asyncio.run(run())
+    assert stats["requests"] == 4  # the third inquiry never reached the bureau
+    assert stats["rejected_open"] == 1
+    assert app.state.counters["errors"] == 4
+
+
+def test_cancelled_half_open_probe_releases_the_breaker():
+    started = asyncio.Event()
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        started.set()
+        await asyncio.sleep(60)
+        return httpx.Response(200, json={"credit_score": 760})
+
+    async def run():
+        breaker = CircuitBreaker(failure_threshold=1, reset_after_s=0)
+        breaker.record_failure()
+        client = BureauClient("http://bureau.test", transport=httpx.MockTransport(handler), breaker=breaker)
+        try:
+            probe = asyncio.create_task(client.inquire("ABCDE1234F", None, None))
+            await started.wait()
+            probe.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await probe
+            return breaker, client.stats
+        finally:
+            await client.aclose()
+
+    breaker, stats = asyncio.run(run())
+    assert stats["failures"] == 1 and not breaker._probing
+    assert breaker.allow()  # the next caller gets to probe
+
+
+def test_batcher_coalesces_concurrent_inquiries_into_one_call():
+    app = create_bureau_app()
+    pans = [f"ABCDE{i:04d}F" for i in range(30)]
+
+    async def run():
+        client = _client(app)
+        batcher = InquiryBatcher(client, max_batch=50, max_wait_s=0.01)
+        try:
+            results = await asyncio.gather(*(batcher.inquire(pan, None, 50000.0) for pan in pans))
+        finally:
+            await client.aclose()
+        return results, batcher.batches
+
+    results, batches = asyncio.run(run())
+    assert batches == 1
+    assert app.state.counters["batches"] == 1
+    assert [r["credit_score"] for r in results] == [fetch_credit_score(pan, None, 50000.0) for pan in pans]
@@ -0,0 +1,39 @@
+from __future__ import annotations
+
+from app.services.counter_offer import find_counter_offer
+from app.services.emi import calculate_emi
+from app.services.policy_engine import get_policy_engine
+
+
+def _facts(**overrides):
+    facts = {
+        "credit_score": 760,
+        "preapproved_limit": 300000.0,
+        "requested_amount": 900000.0,
+        "monthly_income": 20000.0,
+        "emi": 0.0,
+        "emi_ratio": 0.0,
+        "existing_emis": 0.0,
+        "tenure_months": 24,
+        "documents_verified": False,
+    }
+    facts.update(overrides)
+    return facts
+
+
+def test_offer_is_bounded_by_emi_cap_and_picks_closest_tenure():
+    policy = get_policy_engine().policy
+    offer = find_counter_offer(_facts(), policy)
+    # 50% of 20k income caps the EMI; even 84 months cannot reach 2x the limit.
+    assert offer.tenure_months == 84
+    assert offer.emi <= 10000 and calculate_emi(offer.amount + 1000, 12.5, 84) > 10000
+    assert offer.requires_documents
+
+    rich = find_counter_offer(_facts(monthly_income=200000.0), policy)
+    assert rich.amount == 600000 and rich.tenure_months == 24
+
+
+def test_no_offer_when_a_hard_rule_fails():
+    policy = get_policy_engine().policy
+    assert find_counter_offer(_facts(credit_score=650), policy) is None
+    assert find_counter_offer(_facts(preapproved_limit=0.0), policy) is None
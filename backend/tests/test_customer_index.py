@@ -0,0 +1,57 @@
+from __future__ import annotations
+
+import pytest
+
+from app.services.customer_index import build_customer_index, customer_key
+
+
+class Clock:
+    def __init__(self) -> None:
+        self.now = 1_000_000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+TTLS = {"kyc": 30 * 86400.0, "bureau": 3600.0}
+
+
+def test_keys_need_pan_and_mobile():
+    assert customer_key("s", "kyc", "abcde1234f", "+91 98765 43210") == customer_key("s", "kyc", "ABCDE1234F", "9876543210")
+    assert customer_key("s", "kyc", None, "9876543210") is None
+    assert customer_key("s", "bureau", "ABCDE1234F", None) is None
+    assert customer_key("s", "kyc", "ABCDE1234F", "9876543210") != customer_key("s", "bureau", "ABCDE1234F", "9876543210")
+
+
+def test_outcomes_expire_on_their_own_ttl():
+    clock = Clock()
+    index = build_customer_index("s", TTLS, clock=clock)
+    index.record("kyc", "ABCDE1234F", "9876543210", {"status": "verified"})
+    index.record("bureau", "ABCDE1234F", "9876543210", {"credit_score": 765})
+    assert index.lookup("kyc", "ABCDE1234F", "9876543210") == {"status": "verified", "recorded_at": clock.now}
+    # Same PAN on a different mobile is a different customer record.
+    assert index.lookup("kyc", "ABCDE1234F", "9876543211") is None
+
+    clock.now += 2 * 3600
+    assert index.lookup("bureau", "ABCDE1234F", "9876543210") is None
+    assert index.lookup("kyc", "ABCDE1234F", "9876543210")["status"] == "verified"
+
+
+def test_disabled_outcome_is_never_recorded():
+    index = build_customer_index("s", {**TTLS, "bureau": 0.0})
+    index.record("bureau", "ABCDE1234F", "9876543210", {"credit_score": 765})
+    assert index.lookup("bureau", "ABCDE1234F", "9876543210") is None
+    assert index.stats()["memory_entries"] == 0
+    # Neither OTP nor the device-dependent fraud check is an outcome the index will hold.
+    for kind in ("otp", "fraud"):
+        with pytest.raises(ValueError):
+            build_customer_index("s", {kind: 600.0})
+
+
+def test_sqlite_tier_is_shared_between_workers(tmp_path):
+    path = tmp_path / "customers.sqlite3"
+    first = build_customer_index("s", TTLS, path)
+    first.record("kyc", "ABCDE1234F", "9876543210", {"status": "verified"})
+    second = build_customer_index("s", TTLS, path)
+    assert second.lookup("kyc", "ABCDE1234F", "9876543210")["status"] == "verified"
+    assert second.stats()["sqlite_hits"] == 1
@@ -0,0 +1,50 @@
+from __future__ import annotations
+
+import pytest
+
+from app.services.entity_extractor import extract_entities
+
+
+@pytest.mark.parametrize(
+    "text, expected",
+    [
+        ("need 5 lakh for my wedding", 500000),
+        ("need 1.2 crore for business expansion", 12000000),
+        ("want a loan of Rs. 2,50,000 for 24 months", 250000),
+        ("need 50k for a new laptop", 50000),
+    ],
+)
+def test_indian_amount_notation(text, expected):
+    assert extract_entities(text).amount("loan") == expected
+
+
+def test_amounts_take_role_from_nearest_cue():
+    found = extract_entities("I need 5 lakh over 3 years, salaried, 80k a month")
+    assert found.amount("loan") == 500000
+    assert found.amount("income") == 80000
+    assert found.first("tenure_months").value == 36
+    assert found.first("employment_type").value == "salaried"
+    assert extract_entities("300000").amount(None) == 300000
+
+
+def test_spaced_identifiers_are_not_amounts():
+    found = extract_entities("aadhaar 1234 5678 9012, mobile +91 98765 01001")
+    assert found.first("aadhaar").value == "123456789012"
+    assert found.first("mobile").value == "9876501001"
+    assert found.all("amount") == []
+
+
+def test_consent_is_read_by_word_and_refusal_wins():
+    assert extract_entities("yes, I consent").consent() is True
+    assert extract_entities("I don't consent").consent() is False
+    assert extract_entities("I do not agree").consent() is False
+    assert extract_entities("I do consent").consent() is True
+    assert extract_entities("yes, I do agree").consent() is True
+    assert extract_entities("I know my PAN").consent() is None
+    for hedge in ("not sure", "I'm not sure", "not okay", "I am not ok with this", "yes but not now", "don't go ahead"):
+        assert extract_entities(hedge).consent() is False, hedge
+
+
+def test_name_introduction():
+    assert extract_entities("Hi, I'm Aarav Mehta").first("full_name").value == "Aarav Mehta"
+    assert extract_entities("I am salaried").first("full_name") is None
@@ -0,0 +1,187 @@
+from __future__ import annotations
+
+import random
+import sys
+import types
+import uuid
+
+import pytest
+
+from app.services.fraud_graph import FraudGraph
+from app.services.neo4j_service import DETECTION_QUERY, neo4j_service
+
+LABELS = {"device": ("Device", "id", "HAS_DEVICE"), "ip": ("IPAddress", "addr", "HAS_IP"), "phone": ("PhoneNumber", "num", "HAS_PHONE")}
+
+
+def _corpus(seed: int = 7):
+    """Small dense graph: shared devices and IPs, fraudsters on shared phones, duplicate edges."""
+    rng = random.Random(seed)
+    users = [f"u{i}" for i in range(300)]
+    sizes = {"device": 60, "ip": 20, "phone": 90}
+    edges = []
+    for user in users:
+        for kind, size in sizes.items():
+            for _ in range(rng.choice((0, 1, 1, 1, 2, 3))):
+                edges.append((user, kind, f"{kind}{rng.randrange(size)}"))
+    edges += [(user, "ip", "carrier-nat") for user in rng.sample(users, 280)]  # a hub past the small-list path
+    edges += rng.sample(edges, 50)  # repeats collapse, as MERGE does
+    fraud = set(rng.sample(users, 40)) | {"fraud-without-edges"}
+    return users, edges, fraud
+
+
+def cypher_reference(edges, fraud, user_id):
+    """DETECTION_QUERY evaluated literally: relationships in one path are distinct, counts as written."""
+    rels = set(edges)
+    counts = {}
+    for kind, column in (("device", "shared_device_count"), ("ip", "shared_ip_count")):
+        mine = {value for user, k, value in rels if user == user_id and k == kind}
+        counts[column] = len({user for user, k, value in rels if k == kind and value in mine and user != user_id})
+    phones = {value for user, k, value in rels if user == user_id and k == "phone"}
+    counts["linked_fraudsters"] = sum(
+        1 for user, k, value in rels if k == "phone" and value in phones and user in fraud and user != user_id
+    )
+    return counts
+
+
+def test_matches_cypher_semantics_on_shared_corpus():
+    users, edges, fraud = _corpus()
+    graph = FraudGraph.from_edges(edges, fraud)
+    for user in users + ["fraud-without-edges", "unknown-user"]:
+        assert graph.detect(user) == cypher_reference(edges, fraud, user), user
+
+
+def test_overlay_ingest_matches_full_build_and_survives_compaction(tmp_path):
+    users, edges, fraud = _corpus(11)
+    half = len(edges) // 2
+    late_fraud = sorted(fraud)[:5]
+    graph = FraudGraph.from_edges(edges[:half], fraud - set(late_fraud))
+    for user, kind, value in edges[half:]:
+        graph.ingest(user, *(value if k == kind else None for k in ("device", "ip", "phone")))
+    for user in late_fraud:
+        graph.mark_fraud(user)
+    for user in users:
+        assert graph.detect(user) == cypher_reference(edges, fraud, user), user
+
+    path = tmp_path / "fraud_graph.bin"
+    graph.save(path)
+    assert graph.delta_edges == 0
+    loaded = FraudGraph.load(path)
+    assert loaded.stats()["edges"] == len(set(edges))
+    for user in users:
+        assert loaded.detect(user) == cypher_reference(edges, fraud, user), user
+
+
+def test_analyze_scores_like_neo4j_and_skips_missing_identifiers():
+    graph = FraudGraph.from_edges(
+        [(f"u{i}", "device", "shared-device") for i in range(3)] + [("fraudster", "phone", "9000000001")],
+        ["fraudster"],
+    )
+    result = graph.analyze_fraud_network("applicant", "shared-device", None, "9000000001")
+    assert result["source"] == "embedded"
+    assert result["risk_score"] == 100
+    assert result["flags"][0] == "High Risk: Device shared with 3 other users."
+    # No placeholder IP node, so users without an IP are not all linked to each other.
+    assert graph.analyze_fraud_network("other", None, None, None)["risk_score"] == 0
+    assert graph.stats()["ip_nodes"] == 0
+
+
+@pytest.mark.skipif(neo4j_service.driver is None, reason="Neo4j is not configured")
+def test_parity_with_neo4j_detection_query():
+    users, edges, fraud = _corpus(3)
+    prefix = f"parity-{uuid.uuid4().hex[:8]}-"
+    graph = FraudGraph.from_edges(edges, fraud)
+    try:
+        for user, kind, value in set(edges):
+            label, prop, rel = LABELS[kind]
+            neo4j_service._run(
+                f"MERGE (u:User {{id: $user}}) MERGE (n:{label} {{{prop}: $value}}) MERGE (u)-[:{rel}]->(n)",
+                {"user": prefix + user, "value": prefix + value},
+            )
+        for user in fraud:
+            neo4j_service._run("MERGE (u:User {id: $user}) SET u.is_fraud = true", {"user": prefix + user})
+        for user in users:
+            rows = neo4j_service._run(DETECTION_QUERY, {"user_id": prefix + user})
+            assert rows[0] == graph.detect(user), user
+    finally:
+        neo4j_service._run(
+            "MATCH (n) WHERE coalesce(n.id, n.addr, n.num) STARTS WITH $prefix DETACH DELETE n", {"prefix": prefix}
+        )
+
+
+def test_flush_merges_overlays_from_several_workers(tmp_path):
+    path = tmp_path / "fraud_graph.bin"
+    FraudGraph.from_edges([("u1", "device", "d1")]).save(path)
+    first, second = FraudGraph.load(path), FraudGraph.load(path)
+    first.ingest("u2", "d1", None, None)
+    second.ingest("u3", "d1", None, "9000000001")
+    second.mark_fraud("u4")
+    first.flush(path)
+    second.flush(path)
+    merged = FraudGraph.load(path)
+    assert merged.detect("u1")["shared_device_count"] == 2
+    assert merged.stats()["known_fraud"] == 1
+    assert second.delta_edges == 0 and second.detect("u2")["shared_device_count"] == 2
+
+
+def test_flush_locks_with_msvcrt_where_fcntl_is_missing(tmp_path, monkeypatch):
+    calls = []
+    msvcrt = types.SimpleNamespace(LK_LOCK=1, LK_UNLCK=0, locking=lambda fd, mode, size: calls.append(mode))
+    monkeypatch.setitem(sys.modules, "fcntl", None)  # as on Windows: importing it fails
+    monkeypatch.setitem(sys.modules, "msvcrt", msvcrt)
+    path = tmp_path / "fraud_graph.bin"
+    graph = FraudGraph()
+    graph.ingest("u1", "d1", None, None)
+    graph.flush(path)
+    assert calls == [1, 0]
+    assert FraudGraph.load(path).stats()["edges"] == 1
+
+
+def test_overlay_is_compacted_in_the_background_once_over_its_cap():
+    users, edges, fraud = _corpus(13)
+    graph = FraudGraph.from_edges([], fraud)
+    graph.max_overlay = 100
+    for user, kind, value in edges:
+        graph.ingest(user, *(value if k == kind else None for k in ("device", "ip", "phone")))
+        if graph.maintainer is not None:
+            graph.maintainer.join()
+    assert graph.delta_edges < 100
+    assert graph.stats()["edges"] == len(set(edges))
+    for user in users:
+        assert graph.detect(user) == cypher_reference(edges, fraud, user), user
+
+
+def test_overlay_is_flushed_to_the_file_every_interval(tmp_path):
+    class Clock:
+        now = 1000.0
+
+        def __call__(self) -> float:
+            return self.now
+
+    path, clock = tmp_path / "fraud_graph.bin", Clock()
+    graph = FraudGraph(path=path, flush_interval_s=60, clock=clock)
+    graph.ingest("u1", "d1", None, None)
+    assert graph.maintainer is None and not path.exists()
+    clock.now += 61
+    graph.ingest("u2", "d1", None, None)
+    graph.maintainer.join()
+    assert graph.delta_edges == 0
+    assert FraudGraph.load(path).detect("u1")["shared_device_count"] == 1
+
+
+def test_edges_ingested_during_a_rebuild_are_kept(monkeypatch):
+    import app.services.fraud_graph as fraud_graph
+
+    graph = FraudGraph()
+    graph.ingest("u1", "d1", None, None)
+    rebuild = fraud_graph._rebuild
+
+    def rebuild_while_ingesting(edges, fraud):
+        graph.ingest("u2", "d1", None, None)  # not blocked: the graph lock is free during the rebuild
+        graph.mark_fraud("u3")
+        return rebuild(edges, fraud)
+
+    monkeypatch.setattr(fraud_graph, "_rebuild", rebuild_while_ingesting)
+    graph.compact()
+    assert graph.delta_edges == 1 and graph.stats()["overlay_fraud"] == 1
+    assert graph.detect("u1")["shared_device_count"] == 1
+    assert graph.stats()["known_fraud"] == 1
@@ -0,0 +1,108 @@
+from __future__ import annotations
+
+import random
+
+import numpy as np
+
+import app.services.fraud_service as fraud_service
+from app.services.fraud_graph import FraudGraph
+from app.services.fraud_rings import FraudRings, RingIndex, find_rings, union_find
+
+
+def _components(n, edges):
+    """Reference partition by graph search."""
+    adjacency = {i: set() for i in range(n)}
+    for a, b in edges:
+        adjacency[a].add(b)
+        adjacency[b].add(a)
+    label, seen = [0] * n, set()
+    for start in range(n):
+        if start in seen:
+            continue
+        stack = [start]
+        seen.add(start)
+        while stack:
+            node = stack.pop()
+            label[node] = start
+            for nxt in adjacency[node] - seen:
+                seen.add(nxt)
+                stack.append(nxt)
+    return label
+
+
+def test_union_find_matches_graph_search():
+    rng = random.Random(5)
+    for n, m in ((1, 0), (50, 30), (400, 380), (1000, 2500)):
+        edges = [(rng.randrange(n), rng.randrange(n)) for _ in range(m)]
+        src = np.array([a for a, _ in edges], dtype=np.int64)
+        dst = np.array([b for _, b in edges], dtype=np.int64)
+        root, _ = union_find(n, src, dst)
+        reference = _components(n, edges)
+        # Same partition: both labelings induce identical groupings.
+        pairs = set(zip(root.tolist(), reference))
+        assert len(pairs) == len(set(root.tolist())) == len(set(reference))
+
+
+def _ring_graph():
+    edges = [
+        # A chain through three devices and a phone: invisible one hop out, one ring here.
+        ("a", "device", "d1"), ("b", "device", "d1"), ("b", "device", "d2"), ("c", "device", "d2"),
+        ("c", "phone", "p1"), ("fraudster", "phone", "p1"),
+        # A family on one Wi-Fi: small, clean.
+        ("x", "ip", "home"), ("y", "ip", "home"), ("z", "ip", "home"),
+        ("loner", "device", "d9"),
+    ]
+    # Everyone above also sits behind one carrier NAT, which must not merge them.
+    edges += [(user, "ip", "nat") for user in ("a", "b", "c", "x", "y", "z", "loner")]
+    edges += [(f"bg{i}", "ip", "nat") for i in range(60)]
+    return FraudGraph.from_edges(edges, ["fraudster"])
+
+
+def test_rings_chain_through_devices_but_not_through_hubs():
+    rings_arrays, stats = find_rings(_ring_graph().arrays, max_shared=50)
+    rings = FraudRings(rings_arrays, stats)
+    chain = rings.lookup("a", None, None, None)
+    assert chain["ring_users"] == 4 and chain["ring_fraud"] == 1
+    assert rings.ring_of("device", "d2") == rings.ring_of("phone", "p1") == rings.ring_of("user", "fraudster") == chain["ring_id"]
+    family = rings.lookup("x", None, None, None)
+    assert family["ring_id"] != chain["ring_id"] and family["ring_users"] == 3
+    assert family["ring_risk"] == 0 and chain["ring_risk"] == 71  # full fraud weight plus a little for size
+    assert rings.ring_of("ip", "nat") == -1
+    assert rings.lookup("loner", "d9", None, None) is None
+    # A new applicant is matched by identifiers alone, riskiest ring first.
+    assert rings.lookup("new-thread", "d1", "home", None)["ring_id"] == chain["ring_id"]
+    assert stats["rings"] == 2
+
+
+def test_analyze_fraud_consults_ring_index(tmp_path, monkeypatch):
+    path = tmp_path / "fraud_rings.bin"
+    index = RingIndex(path, reload_interval_s=0)
+    assert index.rings is None  # not built yet
+    rings_arrays, stats = find_rings(_ring_graph().arrays)
+    FraudRings(rings_arrays, stats).save(path)
+    assert index.reload() and index.rings is not None
+
+    monkeypatch.setattr(fraud_service, "get_ring_index", lambda: index)
+    monkeypatch.setattr(fraud_service, "get_fraud_graph", lambda: FraudGraph())
+    result = fraud_service.analyze_fraud("thread-1", None, None, "p1")
+    assert (result["ring_id"], result["ring_risk"]) == (index.rings.ring_of("phone", "p1"), 71)
+    assert result["risk_score"] == 71
+    assert result["flags"][-1] == "Ring: linked to a group of 4 users (1 known fraud), ring risk 71."
+    clean = fraud_service.analyze_fraud("thread-2", None, None, "9999999999")
+    assert (clean["ring_id"], clean["ring_risk"], clean["risk_score"]) == (None, 0, 0)
+
+
+def test_large_clean_component_flags_nobody(monkeypatch):
+    # 500 applicants chained pairwise through devices: one big component, no known fraud.
+    edges = [(f"u{i}", "device", f"d{i}") for i in range(500)] + [(f"u{i + 1}", "device", f"d{i}") for i in range(499)]
+    rings = FraudRings(*find_rings(FraudGraph.from_edges(edges).arrays))
+    member = rings.lookup("u250", None, None, None)
+    assert member["ring_users"] == 500 and member["ring_risk"] == 0
+
+    monkeypatch.setattr(fraud_service, "get_ring_index", lambda: type("Index", (), {"rings": rings})())
+    monkeypatch.setattr(fraud_service, "get_fraud_graph", lambda: FraudGraph())
+    result = fraud_service.analyze_fraud("u250", "d250", None, None)
+    assert result["risk_score"] == 0 and not any(flag.startswith("Ring:") for flag in result["flags"])
+    # One known fraudster among them barely moves the score.
+    one_fraud = FraudRings(*find_rings(FraudGraph.from_edges(edges, ["u0"]).arrays))
+    assert one_fraud.lookup("u250", None, None, None)["ring_risk"] <= 1
@@ -0,0 +1,26 @@
+from __future__ import annotations
+
+from PIL import Image
+
+from app.services.image_service import normalize_image
+from app.settings import settings
+
+
+def test_normalize_image_downscales_strips_exif_and_drops_original(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "image_max_dimension", 800)
+    monkeypatch.setattr(settings, "image_original_retention_hours", 0)
+    src = tmp_path / "selfie.jpg"
+    img = Image.new("RGB", (2400, 1200), (120, 80, 40))
+    exif = img.getexif()
+    exif[0x0112] = 6  # rotate 90 CW on display
+    img.save(src, format="JPEG", quality=95, exif=exif.tobytes())
+
+    meta = normalize_image(str(src))
+
+    assert not src.exists()
+    assert meta["content_type"] == "image/jpeg"
+    with Image.open(meta["path"]) as out:
+        assert out.size == (400, 800)  # orientation applied, longest side capped
+        assert not out.getexif()
+    with Image.open(meta["preview_path"]) as preview:
+        assert max(preview.size) <= settings.image_preview_dimension
@@ -3,7 +3,7 @@ from __future__ import annotations
 from datetime import datetime
 
 import pytest
-from langchain_core.messages import HumanMessage
+from langchain_core.messages import AIMessage, HumanMessage
 
 import app.graph.nodes as graph_nodes
 from app.graph.nodes import sales_agent_node, verification_agent_node, underwriting_agent_node
@@ -124,10 +124,201 @@ async def test_underwriting_approves_within_preapproved_after_salary_slip():
     monkey.setattr(
         graph_nodes,
         "generate_sanction_letter_pdf",
-        lambda _loan_data: {"referenceNumber": "SL-TEST", "pdfPath": "uploads/sanctions/SL-TEST.pdf"},
+        lambda _loan_data, **_kwargs: {"referenceNumber": "SL-TEST", "pdfPath": "uploads/sanctions/SL-TEST.pdf"},
     )
     result = await underwriting_agent_node(state)
     monkey.undo()
 
     assert result["application_status"] == "approved"
     assert result["sanction_letter_path"]["referenceNumber"] == "SL-TEST"
+
+
+@pytest.mark.asyncio
+async def test_sales_turns_rerun_tools_only_when_their_inputs_change():
+    state = _base_state()
+    loan_data = state["loan_data"]
+    loan_data.requested_amount = 300000
+    loan_data.tenure_months = 24
+    loan_data.loan_purpose = "shaadi"
+    state["messages"] = [HumanMessage(content="I am salaried.")]
+    first = await sales_agent_node(state)
+    assert [call.tool_name for call in first["tool_calls"]] == ["analyze_purpose", "calculate_emi"]
+    assert first["loan_data"].purpose_category == "wedding"
+
+    state = {**state, **first, "messages": state["messages"] + [HumanMessage(content="actually I need 400000")]}
+    second = await sales_agent_node(state)
+    assert [call.tool_name for call in second["tool_calls"]][2:] == ["calculate_emi"]
+    assert second["tool_calls"][-1].arguments["principal"] == 400000
+
+    state = {**state, **second, "messages": state["messages"] + [HumanMessage(content="80000")]}
+    third = await sales_agent_node(state)
+    assert third["loan_data"].monthly_income == 80000
+    assert len(third["tool_calls"]) == 3
+
+
+@pytest.mark.asyncio
+async def test_underwriting_reentry_skips_bureau_pull_and_affordability_when_unchanged():
+    state = _base_state()
+    loan_data = state["loan_data"]
+    loan_data.monthly_income = 50000
+    loan_data.requested_amount = 800000
+    loan_data.tenure_months = 36
+    loan_data.preapproved_limit = 500000
+    state["messages"] = [HumanMessage(content="Proceed")]
+    pulls = []
+
+    class StubCreditTool:
+        async def ainvoke(self, args: dict):
+            pulls.append(args)
+            return '{"credit_score": 760}'
+
+    monkey = pytest.MonkeyPatch()
+    monkey.setattr(graph_nodes, "fetch_credit_score_tool", StubCreditTool())
+    first = await underwriting_agent_node(state)
+    assert first["application_status"] == "awaiting_documents"
+    second = await underwriting_agent_node({**state, **first})
+    assert len(pulls) == 1
+    assert second["application_status"] == "awaiting_documents"
+    assert [call.tool_name for call in second["tool_calls"]] == ["fetch_credit_score", "calculate_emi", "check_affordability"]
+
+    # An underwriter's refresh request forces one uncached pull.
+    second["loan_data"].bureau_refresh_requested = True
+    third = await underwriting_agent_node({**state, **second})
+    monkey.undo()
+    assert [args["force_refresh"] for args in pulls] == [False, True]
+    assert third["loan_data"].bureau_refresh_requested is False
+
+
+@pytest.mark.asyncio
+async def test_underwriting_counter_offers_instead_of_rejecting_above_2x():
+    state = _base_state()
+    loan_data = state["loan_data"]
+    loan_data.monthly_income = 60000
+    loan_data.requested_amount = 1500000
+    loan_data.tenure_months = 36
+    loan_data.preapproved_limit = 400000
+    state["messages"] = [HumanMessage(content="Proceed")]
+
+    class StubCreditTool:
+        async def ainvoke(self, _: dict):
+            return '{"credit_score": 760}'
+
+    monkey = pytest.MonkeyPatch()
+    monkey.setattr(graph_nodes, "fetch_credit_score_tool", StubCreditTool())
+    result = await underwriting_agent_node(state)
+
+    offer = result["interrupt_signal"]["offer"]
+    assert result["interrupt_signal"]["type"] == "counter_offer"
+    assert result["application_status"] == "in_progress"
+    assert offer["amount"] == 800000 and offer["emi"] <= 30000
+    assert offer["requires_documents"] is True
+
+    state["loan_data"] = result["loan_data"]
+    state["messages"] = [HumanMessage(content="yes")]
+    accepted = await underwriting_agent_node(state)
+    monkey.undo()
+
+    assert accepted["loan_data"].requested_amount == 800000
+    assert accepted["interrupt_signal"]["type"] == "document_upload"
+
+
+@pytest.mark.asyncio
+async def test_one_message_fast_forwards_from_discovery_to_otp(monkeypatch):
+    from langgraph.checkpoint.memory import MemorySaver
+
+    from app.graph.workflow import create_agentic_workflow
+    from app.models.state import create_initial_state
+
+    calls = []
+
+    class StubLLM:
+        async def achat_structured(self, messages, output_schema, system_prompt=None):
+            calls.append(output_schema.__name__)
+            return output_schema(
+                requested_amount=500000, tenure_months=36, loan_purpose="wedding", employment_type="salaried",
+                monthly_income=80000, full_name="Aarav Mehta", mobile="9876501001", consent=True, otp="123456",
+            )
+
+    monkeypatch.setattr(graph_nodes, "get_llm_service", lambda: StubLLM())
+    graph = create_agentic_workflow(checkpointer=MemorySaver())
+    config = {"configurable": {"thread_id": "thread_ff"}}
+    message = "I need 5 lakh for my wedding over 3 years, salaried, 80k a month, I'm Aarav Mehta 9876501001"
+    state = await graph.ainvoke({**create_initial_state("thread_ff"), "messages": [HumanMessage(content=message)]}, config)
+
+    assert calls == ["ApplicationExtraction"]
+    assert state["interrupt_signal"]["type"] == "otp_required"
+    loan_data = state["loan_data"]
+    assert (loan_data.monthly_income, loan_data.requested_amount, loan_data.customer_name) == (80000, 500000, "Aarav Mehta")
+    # Consent and OTP are only taken as answers to their own prompts.
+    assert loan_data.kyc_consent is None and not loan_data.otp_verified
+
+    state = await graph.ainvoke({"messages": [HumanMessage(content="123456")]}, config)
+    assert calls == ["ApplicationExtraction"]
+    assert state["loan_data"].otp_verified is True
+    assert state["interrupt_signal"]["fields"] == ["email", "pan", "aadhaar"]
+
+
+@pytest.mark.asyncio
+async def test_returning_customer_reuses_verification_outcomes_across_threads(monkeypatch):
+    from app.services.customer_index import build_customer_index
+
+    index = build_customer_index("s", {"kyc": 86400.0, "bureau": 86400.0})
+    monkeypatch.setattr(graph_nodes, "get_customer_index", lambda: index)
+    calls = []
+
+    class StubTool:
+        def __init__(self, name: str, result: str) -> None:
+            self.name, self.result = name, result
+
+        async def ainvoke(self, args: dict):
+            calls.append(self.name)
+            return self.result
+
+    monkeypatch.setattr(graph_nodes, "analyze_fraud_tool", StubTool("fraud", '{"risk_score": 12, "flags": []}'))
+    monkeypatch.setattr(graph_nodes, "verify_kyc_tool", StubTool("kyc", '{"status": "verified"}'))
+    monkeypatch.setattr(graph_nodes, "fetch_credit_score_tool", StubTool("bureau", '{"credit_score": 765}'))
+
+    def applicant(thread_id: str):
+        state = _base_state()
+        state["thread_id"] = thread_id
+        loan_data = state["loan_data"]
+        loan_data.customer_name = "Aarav Mehta"
+        loan_data.mobile = "9876501001"
+        loan_data.monthly_income = 80000.0
+        loan_data.requested_amount = 100000.0
+        loan_data.tenure_months = 24
+        return state
+
+    async def verify_otp(state):
+        state["messages"] = [HumanMessage(content="9876501001")]
+        assert (await verification_agent_node(state))["interrupt_signal"]["type"] == "otp_required"
+        state["messages"] = [
+            AIMessage(content="I've sent a 6-digit OTP to 9876501001. Please enter it here."),
+            HumanMessage(content="123456"),
+        ]
+        state["interrupt_signal"] = {"type": "otp_required", "fields": ["mobile"]}
+        return await verification_agent_node(state)
+
+    # First thread: OTP, then every check calls out and is recorded.
+    state = applicant("thread_first")
+    await verify_otp(state)
+    loan_data = state["loan_data"]
+    loan_data.email, loan_data.pan, loan_data.aadhaar, loan_data.kyc_consent = "a@b.in", "ABCDE1234F", "123456789012", True
+    first = await verification_agent_node({**state, "interrupt_signal": None})
+    assert first["next_step"] == "underwriting_agent"
+    await underwriting_agent_node({**state, **first})
+    assert calls == ["fraud", "kyc", "bureau"]
+
+    # Second thread, same customer: OTP again (it is never reused), then only the fraud check,
+    # which depends on this thread's device and IP.
+    state = applicant("thread_second")
+    second = await verify_otp(state)
+    assert second["interrupt_signal"]["fields"] == ["email", "pan", "aadhaar"]
+    loan_data = state["loan_data"]
+    loan_data.email, loan_data.pan, loan_data.aadhaar, loan_data.kyc_consent = "a@b.in", "ABCDE1234F", "123456789012", True
+    second = await verification_agent_node({**state, "interrupt_signal": None})
+    assert second["next_step"] == "underwriting_agent"
+    assert second["loan_data"].credit_score == 765
+    assert [call.arguments.get("reused") for call in second["tool_calls"] if call.tool_name != "check_velocity"] == [None, True, True]
+    await underwriting_agent_node({**state, **second})
+    assert calls == ["fraud", "kyc", "bureau", "fraud"]
@@ -0,0 +1,73 @@
+from __future__ import annotations
+
+import asyncio
+import io
+from types import SimpleNamespace
+
+import numpy as np
+
+from app.models.state import LoanApplicationDetails
+from app.services.batch_underwriting import chunk_from_records, iter_csv_chunks, underwrite_chunk
+from app.services.policy_backtest import backtest, iter_checkpoint_records, parse_sweep, variant_grid
+from app.services.policy_engine import get_policy_engine
+
+CSV = """application_id,credit_score,preapproved_limit,requested_amount,monthly_income,tenure_months,documents_verified
+a1,650,300000,200000,80000,24,false
+a2,705,300000,250000,80000,24,false
+a3,760,300000,500000,80000,24,false
+a4,760,300000,500000,30000,12,true
+a5,760,300000,700000,80000,36,true
+a6,760,0,900000,80000,36,true
+a7,720,300000,550000,60000,24,true
+"""
+
+
+def test_sweep_matches_recompiling_each_variant():
+    policy = get_policy_engine().policy
+    grid = parse_sweep(["min_credit_score=650:750:50", "limit_multiplier=1.5,2,2.5", "max_emi_ratio=0.4,0.6"])
+    assert grid["min_credit_score"].tolist() == [650.0, 700.0, 750.0]
+    chunks = list(iter_csv_chunks(io.StringIO(CSV), chunk_rows=3))
+    # A tiny cell budget forces several blocks per chunk.
+    surface = backtest(chunks, policy, grid, cell_budget=20)
+    rows = surface.rows()
+
+    variants = variant_grid(grid)
+    assert surface.variants == 1 + len(variants["min_credit_score"])
+    assert rows[0]["variant"] == "baseline" and rows[0]["limit_multiplier"] == 2.0
+    for v, row in enumerate(rows):
+        overrides = {name: row[name] for name in grid}
+        results = [underwrite_chunk(c, policy.with_params(overrides)) for c in chunks]
+        decisions = np.concatenate([r["decision"] for r in results])
+        amounts = np.concatenate([c["requested_amount"] for c in chunks])
+        assert row["applications"] == len(decisions)
+        for decision in ("approve", "reject", "request_documents", "manual_review"):
+            assert row[decision] == int((decisions == decision).sum()), (v, decision)
+        assert row["approved_exposure"] == amounts[decisions == "approve"].sum()
+
+
+def test_checkpoint_records_use_latest_snapshot_per_thread():
+    def snapshot(thread_id, **loan):
+        return SimpleNamespace(
+            config={"configurable": {"thread_id": thread_id}},
+            checkpoint={"channel_values": {"loan_data": LoanApplicationDetails(**loan)}},
+        )
+
+    class _Saver:
+        async def alist(self, config):
+            # Newest first, as the checkpointers list them.
+            yield snapshot("t1", requested_amount=400000, tenure_months=24, credit_score=760, preapproved_limit=300000)
+            yield snapshot("t1", requested_amount=100000, tenure_months=12)
+            yield snapshot("t2", requested_amount=None)
+            yield SimpleNamespace(config={"configurable": {"thread_id": "t3"}}, checkpoint={"channel_values": {}})
+
+    async def collect():
+        return [record async for record in iter_checkpoint_records(_Saver())]
+
+    records = asyncio.run(collect())
+    assert [r["application_id"] for r in records] == ["t1"]
+    assert records[0]["requested_amount"] == 400000 and records[0]["documents_verified"] == "false"
+
+    chunk = chunk_from_records(records)
+    assert np.isnan(chunk["monthly_income"][0]) and chunk["credit_score"][0] == 760
+    result = underwrite_chunk(chunk, get_policy_engine().policy)
+    assert result["decision"].tolist() == ["request_documents"]
@@ -0,0 +1,67 @@
+from __future__ import annotations
+
+import json
+
+import pytest
+
+from app.services.policy_engine import (
+    DEFAULT_POLICY_FILE,
+    PolicyEngine,
+    PolicyError,
+    compile_policy,
+    load_policy_spec,
+)
+
+
+def _facts(**overrides):
+    facts = {
+        "credit_score": 760,
+        "preapproved_limit": 300000.0,
+        "requested_amount": 250000.0,
+        "monthly_income": 80000.0,
+        "emi": 12000.0,
+        "emi_ratio": 0.15,
+        "existing_emis": 0.0,
+        "tenure_months": 24,
+        "documents_verified": False,
+    }
+    facts.update(overrides)
+    return facts
+
+
+def test_default_policy_matches_ps_rules_in_order():
+    policy = compile_policy(load_policy_spec(DEFAULT_POLICY_FILE))
+
+    assert policy.evaluate(_facts(credit_score=650)).id == "credit_below_minimum"
+    assert policy.evaluate(_facts(preapproved_limit=0.0)).id == "no_preapproved_offer"
+    assert policy.evaluate(_facts()).decision == "approve"
+    assert policy.evaluate(_facts(requested_amount=500000.0)).decision == "request_documents"
+    assert policy.evaluate(_facts(requested_amount=500000.0, documents_verified=True)).id == "within_multiplier_affordable"
+    assert policy.evaluate(_facts(requested_amount=500000.0, documents_verified=True, emi_ratio=0.6)).id == "within_multiplier_unaffordable"
+    assert policy.evaluate(_facts(requested_amount=700000.0)).id == "above_multiplier"
+
+    relaxed = compile_policy(load_policy_spec(DEFAULT_POLICY_FILE), params_override={"min_credit_score": 600})
+    assert relaxed.evaluate(_facts(credit_score=650)).decision == "approve"
+
+
+def test_rejects_unsafe_conditions():
+    spec = {"version": "bad", "rules": [{"id": "x", "when": "__import__('os')", "decision": "approve"}]}
+    with pytest.raises(PolicyError):
+        compile_policy(spec)
+
+
+def test_reload_swaps_policy_and_keeps_old_on_error(tmp_path):
+    path = tmp_path / "policy.json"
+    spec = {"version": "v1", "rules": [{"id": "all", "when": "True", "decision": "reject", "message": "no"}]}
+    path.write_text(json.dumps(spec))
+    engine = PolicyEngine(path, reload_interval_s=0)
+
+    spec["version"] = "v2"
+    spec["rules"][0]["decision"] = "approve"
+    path.write_text(json.dumps(spec))
+    assert engine.reload() is True
+    assert engine.evaluate(_facts()).policy_version == "v2"
+
+    path.write_text("{not json")
+    assert engine.reload() is False
+    assert engine.evaluate(_facts()).decision == "approve"
@@ -0,0 +1,60 @@
+from __future__ import annotations
+
+import numpy as np
+
+from app.models.state import LoanApplicationDetails
+from app.services.pricing_service import (
+    RATE_CARD_FILE,
+    SCORE_MAX,
+    SCORE_MIN,
+    PricingGrid,
+    _cached_grid,
+    build_rate_grid,
+    load_rate_card,
+)
+
+
+def _grid() -> PricingGrid:
+    card = load_rate_card(RATE_CARD_FILE)
+    return PricingGrid(build_rate_grid(card), card)
+
+
+def test_rates_follow_score_and_adjustments():
+    grid = _grid()
+    by_score = grid.grid[:, 0, 0, 0]
+    assert by_score.shape[0] == SCORE_MAX - SCORE_MIN + 1
+    assert np.all(np.diff(by_score) <= 0)  # better score never costs more
+
+    base = grid.rate(750, "tier_2", "debt_consolidation")
+    assert base == 12.5
+    assert grid.rate(750, "tier_1", "debt_consolidation") < base
+    assert grid.rate(750, "tier_2", "business") > base
+    assert grid.rate(750, "tier_2", "debt_consolidation", ["high_dti", "no_income"]) == base + 3.0
+    assert grid.rate(10, "unverified", "business", ["no_income", "low_credit"]) == 24.0  # capped
+
+    # Fractional scores interpolate; unknown fields fall back to the card defaults.
+    assert grid.rate(749, "tier_2", "debt_consolidation") > grid.rate(749.5, "tier_2", "debt_consolidation") > base
+    loan = LoanApplicationDetails(credit_score=None, employer_tier=None, purpose_category=None)
+    assert grid.rate_for(loan) == grid.rate(grid.unknown_credit_score, "unknown", "unknown")
+
+    scores = np.array([650, 760, np.nan])
+    vector = grid.rates(scores, ["tier_1", None, "tier_3"], ["medical", "wedding", None])
+    scalar = [grid.rate(650, "tier_1", "medical"), grid.rate(760, None, "wedding"), grid.rate(None, "tier_3", None)]
+    assert np.allclose(vector, scalar)
+
+
+def test_grid_cache_is_reused_and_memory_mapped(tmp_path):
+    card = load_rate_card(RATE_CARD_FILE)
+    first = _cached_grid(card, tmp_path)
+    files = list(tmp_path.glob("rate_grid_*.npy"))
+    assert len(files) == 1
+    assert isinstance(first, np.memmap) and not first.flags.writeable
+
+    mtime = files[0].stat().st_mtime_ns
+    second = _cached_grid(card, tmp_path)
+    assert files[0].stat().st_mtime_ns == mtime
+    assert np.array_equal(first, second)
+
+    changed = dict(card, floor=11.0)
+    _cached_grid(changed, tmp_path)
+    assert len(list(tmp_path.glob("rate_grid_*.npy"))) == 2
@@ -0,0 +1,62 @@
+from __future__ import annotations
+
+import asyncio
+import json
+
+import pytest
+
+from app.services.purpose_taxonomy import PurposeTaxonomy, TaxonomyError, get_purpose_taxonomy
+from app.services.tools import analyze_purpose
+
+
+@pytest.mark.parametrize(
+    "purpose, category",
+    [
+        ("hospital bills", "medical"),
+        ("shaadi", "wedding"),
+        ("renovating my flat", "home_renovation"),
+        ("paying off credit cards", "debt_consolidation"),
+        ("Daughter's college fees!", "education"),
+        ("holiday in Goa", "other"),
+    ],
+)
+def test_classifies_everyday_wording(purpose, category):
+    assert get_purpose_taxonomy().classify(purpose).category == category
+
+
+def test_longest_phrase_wins_and_words_are_whole_unless_starred():
+    taxonomy = PurposeTaxonomy(
+        {
+            "default": "other",
+            "categories": {
+                "other": {"risk": "medium", "urgency": "medium", "typical_tenure": 36, "phrases": []},
+                "business": {"risk": "high", "urgency": "medium", "typical_tenure": 48, "phrases": ["card*"]},
+                "debt_consolidation": {
+                    "risk": "low", "urgency": "high", "typical_tenure": 36, "phrases": ["credit card*", "shop"]
+                },
+            },
+        }
+    )
+    assert taxonomy.classify("two credit cards").matched == "credit card*"
+    assert taxonomy.classify("cardamom").category == "business"
+    assert taxonomy.classify("shopping").category == "other"
+
+
+def test_memoised_per_normalised_purpose():
+    taxonomy = get_purpose_taxonomy()
+    taxonomy.classify_normalized.cache_clear()
+    taxonomy.classify("Hospital  bills")
+    taxonomy.classify("hospital bills.")
+    assert taxonomy.classify_normalized.cache_info().hits == 1
+
+
+def test_default_category_must_exist():
+    with pytest.raises(TaxonomyError):
+        PurposeTaxonomy({"default": "other", "categories": {}})
+
+
+def test_analyze_purpose_tool_reports_profile():
+    result = json.loads(asyncio.run(analyze_purpose.ainvoke({"purpose": "shaadi"})))
+    assert result["category"] == "wedding"
+    assert result["suggested_tenure"] == 24
+    assert result["taxonomy_version"] == get_purpose_taxonomy().version
@@ -0,0 +1,39 @@
+from __future__ import annotations
+
+from fastapi.testclient import TestClient
+
+import app.main as main
+from app.main import app
+from app.services.pricing_service import get_pricing_grid
+
+
+def test_quote_answers_without_graph_and_revalidates(monkeypatch):
+    monkeypatch.setattr(main, "graph", None)
+    client = TestClient(app)
+
+    instant = client.get("/quote", params={"pan": "abcde1234f", "amount": 300000, "tenure_months": 24})
+    assert instant.status_code == 200
+    body = instant.json()
+    assert body["status"] == "instant_approval"
+    assert body["preapproved_limit"] == 400000
+    assert "name" not in body and "credit_score" not in body
+    # The rate does not depend on who asked, so it cannot be read back as a score.
+    assert body["annual_rate_percent"] == get_pricing_grid().rate(None)
+    assert "max-age" in instant.headers["cache-control"]
+
+    again = client.get(
+        "/quote",
+        params={"pan": "ABCDE1234F", "amount": 300000, "tenure_months": 24},
+        headers={"If-None-Match": instant.headers["etag"]},
+    )
+    assert again.status_code == 304
+
+    by_phone = client.get("/quote", params={"phone": "9876501001", "amount": 700000, "tenure_months": 36}).json()
+    assert by_phone["status"] == "documents_required"
+    assert by_phone["annual_rate_percent"] == body["annual_rate_percent"]
+
+    unknown = client.get("/quote", params={"phone": "9000000000", "amount": 100000, "tenure_months": 12}).json()
+    assert unknown["status"] == "no_offer" and unknown["emi"] > 0
+
+    assert client.get("/quote", params={"amount": 100000, "tenure_months": 12}).status_code == 400
+    assert client.get("/quote", params={"pan": "ABCDE1234F", "amount": 100000, "tenure_months": 120}).status_code == 422
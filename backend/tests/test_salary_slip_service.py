@@ -0,0 +1,49 @@
+from __future__ import annotations
+
+import app.services.salary_slip_service as slip_service
+from app.services.salary_slip_service import extract_salary_slip_fields, parse_salary_slip
+
+
+def test_extracts_fields_from_label_value_layout():
+    text = "\n".join(
+        [
+            "Zeta Fintech Pvt Ltd",
+            "Payslip for March 2025",
+            "Gross Earnings   85,000.00",
+            "Net Pay          Rs. 71,250.00",
+        ]
+    )
+    result = extract_salary_slip_fields(text)
+    assert result["net_pay"] == 71250.0
+    assert result["gross_pay"] == 85000.0
+    assert result["employer_name"] == "Zeta Fintech Pvt Ltd"
+    assert result["pay_period"] == "2025-03"
+    assert result["verified_income"] == 71250.0
+
+
+def test_extracts_amount_from_row_below_label():
+    text = "Employer Name: Acme Logistics\nPay Period: 07/2024\nNet Salary Payable\nINR 48,900"
+    result = extract_salary_slip_fields(text)
+    assert result["net_pay"] == 48900.0
+    assert result["employer_name"] == "Acme Logistics"
+    assert result["pay_period"] == "2024-07"
+
+
+def test_parse_salary_slip_caches_by_content_hash(tmp_path, monkeypatch):
+    slip = tmp_path / "slip.pdf"
+    slip.write_bytes(b"%PDF-1.4 fake")
+    calls = []
+
+    def fake_extract(path: str) -> str:
+        calls.append(path)
+        return "Net Pay: 52,000"
+
+    monkeypatch.setattr(slip_service, "extract_pdf_text", fake_extract)
+    first = parse_salary_slip(str(slip))
+    copy = tmp_path / "copy.pdf"
+    copy.write_bytes(slip.read_bytes())
+    second = parse_salary_slip(str(copy))
+
+    assert first["parsed"] is True
+    assert second["verified_income"] == 52000.0
+    assert len(calls) == 1
@@ -0,0 +1,61 @@
+from __future__ import annotations
+
+import pytest
+from fastapi.testclient import TestClient
+
+import app.services.sanction_service as sanction_service
+from app.main import app
+from app.models.state import LoanApplicationDetails
+from app.services.sanction_service import generate_sanction_letter_pdf
+
+
+@pytest.fixture()
+def sanctions_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(sanction_service, "SANCTIONS_DIR", tmp_path)
+    return tmp_path
+
+
+def _loan(**overrides):
+    values = {"customer_name": "Aarav Mehta", "requested_amount": 300000, "tenure_months": 24}
+    values.update(overrides)
+    return LoanApplicationDetails(**values)
+
+
+def test_rerun_for_same_thread_and_terms_reuses_letter(sanctions_dir):
+    first = generate_sanction_letter_pdf(_loan(), thread_id="loan_abc")
+    second = generate_sanction_letter_pdf(_loan(), thread_id="loan_abc")
+    changed = generate_sanction_letter_pdf(_loan(tenure_months=36), thread_id="loan_abc")
+
+    assert second["referenceNumber"] == first["referenceNumber"]
+    assert second["generatedAt"] == first["generatedAt"]
+    assert changed["referenceNumber"] != first["referenceNumber"]
+    assert len(list(sanctions_dir.glob("*.pdf"))) == 2
+
+
+def test_sanction_endpoint_supports_etag_and_ranges(sanctions_dir):
+    letter = generate_sanction_letter_pdf(_loan(), thread_id="loan_xyz")
+    client = TestClient(app)
+
+    full = client.get(letter["url"])
+    assert full.status_code == 200
+    assert full.headers["content-type"] == "application/pdf"
+    assert "immutable" in full.headers["cache-control"]
+    assert letter["url"].endswith(f"?v={full.headers['etag'].strip(chr(34))}")
+    body = full.content
+    # The unversioned URL may change content on regeneration, so it is only revalidated.
+    bare = client.get(f"/sanction/{letter['referenceNumber']}")
+    assert bare.headers["cache-control"] == "private, no-cache"
+    assert bare.content == body
+
+    not_modified = client.get(letter["url"], headers={"If-None-Match": full.headers["etag"]})
+    assert not_modified.status_code == 304
+
+    partial = client.get(letter["url"], headers={"Range": "bytes=0-7"})
+    assert partial.status_code == 206
+    assert partial.content == body[:8]
+    assert partial.headers["content-range"] == f"bytes 0-7/{len(body)}"
+
+    unsatisfiable = client.get(letter["url"], headers={"Range": f"bytes={len(body) + 10}-"})
+    assert unsatisfiable.status_code == 416
+
+    assert client.get("/sanction/SL-000000000000").status_code == 404
@@ -0,0 +1,78 @@
+from __future__ import annotations
+
+import io
+
+from pypdf import PdfReader
+
+from app.models.state import LoanApplicationDetails
+from app.services.sanction_renderer import SanctionLetterRenderer
+from app.services.sanction_service import generate_sanction_letter_data
+from app.settings import settings
+
+
+def test_direct_backend_writes_readable_pdf_with_letter_fields():
+    loan = LoanApplicationDetails(customer_name="Riya (Test) Shah", requested_amount=250000, tenure_months=24)
+    data = generate_sanction_letter_data(loan)
+
+    pdf = SanctionLetterRenderer(backend="direct").render_direct(data)
+
+    reader = PdfReader(io.BytesIO(pdf), strict=True)
+    text = reader.pages[0].extract_text()
+    assert "Dear Riya (Test) Shah," in text
+    assert data["referenceNumber"] in text
+    assert f"INR {data['loanDetails']['emi']}" in text
+
+
+def test_html_template_escapes_applicant_name():
+    data = generate_sanction_letter_data(LoanApplicationDetails(customer_name="<b>x</b>", tenure_months=12))
+
+    html = SanctionLetterRenderer(backend="direct").render_html(data)
+
+    assert "&lt;b&gt;x&lt;/b&gt;" in html
+
+
+def _test_font(path, chars):
+    """A TrueType font with a box glyph for each of ``chars``."""
+    from fontTools.fontBuilder import FontBuilder
+    from fontTools.pens.ttGlyphPen import TTGlyphPen
+
+    names = [".notdef"] + [f"uni{ord(ch):04X}" for ch in sorted(set(chars))]
+    glyphs = {}
+    for name in names:
+        pen = TTGlyphPen(None)
+        pen.moveTo((50, 0))
+        pen.lineTo((50, 700))
+        pen.lineTo((450, 700))
+        pen.lineTo((450, 0))
+        pen.closePath()
+        glyphs[name] = pen.glyph()
+    builder = FontBuilder(1000, isTTF=True)
+    builder.setupGlyphOrder(names)
+    builder.setupCharacterMap({ord(ch): f"uni{ord(ch):04X}" for ch in set(chars)})
+    builder.setupGlyf(glyphs)
+    builder.setupHorizontalMetrics({name: (500, 50) for name in names})
+    builder.setupHorizontalHeader(ascent=800, descent=-200)
+    builder.setupNameTable({"familyName": "Test Sans", "styleName": "Regular"})
+    builder.setupOS2(sCapHeight=700)
+    builder.setupPost()
+    builder.save(str(path))
+
+
+def test_non_latin_name_is_set_in_an_embedded_unicode_font(tmp_path, monkeypatch):
+    name = "Анна Петрова"
+    data = generate_sanction_letter_data(LoanApplicationDetails(customer_name=name, tenure_months=12))
+    font_path = tmp_path / "test-sans.ttf"
+    _test_font(font_path, f"Dear {name},")
+    monkeypatch.setattr(settings, "sanction_unicode_font", str(font_path))
+    renderer = SanctionLetterRenderer(backend="direct")
+
+    result = renderer.render_to_file(data, tmp_path / "letter.pdf")
+
+    assert result["renderer"] == "direct"
+    pdf = (tmp_path / "letter.pdf").read_bytes()
+    text = PdfReader(io.BytesIO(pdf), strict=True).pages[0].extract_text()
+    assert f"Dear {name}," in text
+    assert "?" not in text
+    # Latin-only letters keep the base fonts and embed nothing.
+    latin = generate_sanction_letter_data(LoanApplicationDetails(customer_name="Anna Petrova", tenure_months=12))
+    assert b"/F3" not in renderer.render_direct(latin, renderer.unicode_font())
@@ -0,0 +1,117 @@
+from __future__ import annotations
+
+import pytest
+
+import app.graph.nodes as graph_nodes
+from app.models.state import LoanApplicationDetails, create_initial_state
+from app.services.customer_index import build_customer_index
+from app.services.velocity import DEFAULT_RULES, RingCounters, VelocityEngine, VelocityRule
+
+
+class Clock:
+    def __init__(self) -> None:
+        self.now = 1_000_000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_ip_burst_is_flagged_and_slides_out_of_the_window():
+    clock = Clock()
+    engine = VelocityEngine(DEFAULT_RULES, "s", clock=clock)
+    for i in range(29):
+        result = engine.check(ip_address="203.0.113.7")
+        clock.now += 10
+    assert result["counts"] == {"ip_10m": 29} and result["risk_score"] == 0
+    result = engine.check(ip_address="203.0.113.7")
+    assert result["risk_score"] == 60
+    assert result["flags"] == ["Velocity: 30 applications from this IP address in 10 minutes (limit 30)."]
+    # Another address, and the same phone spelt differently, count separately and together.
+    assert engine.check(ip_address="203.0.113.8", phone="98765 43210")["counts"] == {"ip_10m": 1, "phone_24h": 1}
+    assert engine.check(phone="+91-9876543210")["counts"] == {"phone_24h": 2}
+
+    # Ten minutes on, the first minute's buckets have dropped out.
+    clock.now += 600 - 290 + 60
+    assert engine.check(ip_address="203.0.113.7")["counts"]["ip_10m"] < 30
+    clock.now += 600
+    assert engine.check(ip_address="203.0.113.7")["counts"]["ip_10m"] == 1
+
+
+def test_ring_counters_stay_bounded():
+    rings = RingCounters(buckets=10, max_keys=100)
+    for key in range(1000):
+        rings.add(key, 0)
+    assert len(rings) == 100 and rings.evicted == 900
+    # Idle keys go as soon as a later bucket is counted past their window.
+    rings.add(-1, 10)
+    assert len(rings) == 1
+    assert rings.add(-1, 15) == 2 and rings.add(-1, 21) == 2 and rings.add(-1, 31) == 1
+
+
+def test_sqlite_counts_are_shared_between_workers(tmp_path):
+    clock = Clock()
+    path = tmp_path / "velocity.sqlite"
+    rules = (VelocityRule("device", 3600, 3, 80),)
+    first = VelocityEngine(rules, "s", path, clock=clock)
+    second = VelocityEngine(rules, "s", path, clock=clock)
+    first.check(device_id="dev-1")
+    second.check(device_id="dev-1")
+    assert first.check(device_id="dev-1")["risk_score"] == 80
+    # Another salt is another key space.
+    assert VelocityEngine(rules, "t", path, clock=clock).check(device_id="dev-1")["counts"] == {"device_1h": 1}
+
+    clock.now += 7200
+    assert second.check(device_id="dev-1")["counts"] == {"device_1h": 1}
+    assert second.stats()["sqlite_rows"] == 1
+
+
+@pytest.mark.asyncio
+async def test_verification_passes_client_signals_and_rejects_bursts(monkeypatch):
+    engine = VelocityEngine((VelocityRule("device", 3600, 2, 80),), "s")
+    monkeypatch.setattr(graph_nodes, "get_velocity_engine", lambda: engine)
+    monkeypatch.setattr(graph_nodes, "get_customer_index", lambda: build_customer_index("s", {}))
+    fraud_args = []
+
+    class StubTool:
+        def __init__(self, result: str, seen=None) -> None:
+            self.result, self.seen = result, seen
+
+        async def ainvoke(self, args: dict):
+            if self.seen is not None:
+                self.seen.append(args)
+            return self.result
+
+    monkeypatch.setattr(graph_nodes, "analyze_fraud_tool", StubTool('{"risk_score": 10, "flags": ["Low"]}', fraud_args))
+    monkeypatch.setattr(graph_nodes, "verify_kyc_tool", StubTool('{"status": "verified"}'))
+
+    def applicant(thread_id: str, mobile: str):
+        state = {**create_initial_state(thread_id), "device_id": "dev-9", "ip_address": "198.51.100.4"}
+        state["loan_data"] = LoanApplicationDetails(mobile=mobile, pan="ABCDE1234F")
+        return state
+
+    first = await graph_nodes._run_verification_checks(applicant("t1", "9876500001"), applicant("t1", "9876500001")["loan_data"])
+    assert first["next_step"] == "underwriting_agent"
+    assert (first["fraud_risk_score"], first["fraud_flags"]) == (10, ["Low"])
+    assert fraud_args[0]["device_id"] == "dev-9" and fraud_args[0]["ip_address"] == "198.51.100.4"
+
+    state = applicant("t2", "9876500002")
+    second = await graph_nodes._run_verification_checks(state, state["loan_data"])
+    assert second["application_status"] == "rejected"
+    assert second["fraud_risk_score"] == 80
+    assert second["fraud_flags"][-1] == "Velocity: 2 applications from this device in 1 hour (limit 2)."
+
+
+def test_client_ip_ignores_reported_and_untrusted_forwarded_addresses(monkeypatch):
+    from app.main import client_ip, settings
+
+    monkeypatch.setattr(settings, "trusted_proxies", "")
+    # No trusted proxy: the peer, whatever X-Forwarded-For says.
+    assert client_ip("203.0.113.9", ["1.2.3.4"]) == "203.0.113.9"
+
+    monkeypatch.setattr(settings, "trusted_proxies", "10.0.0.0/8, 127.0.0.1")
+    # Behind our proxies: the nearest hop they did not add; a spoofed leftmost entry is ignored.
+    assert client_ip("10.0.0.2", ["1.2.3.4, 198.51.100.7", "10.0.0.5"]) == "198.51.100.7"
+    assert client_ip("10.0.0.2", []) == "10.0.0.2"
+    assert client_ip("10.0.0.2", ["not-an-ip"]) == "10.0.0.2"
+    # A direct connection from elsewhere cannot use the header at all.
+    assert client_ip("203.0.113.9", ["198.51.100.7"]) == "203.0.113.9"